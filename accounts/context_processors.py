@@ -18,8 +18,17 @@ Variables disponibles dans chaque template :
     {{ has_any_paid_sub }}       → True si au moins un abo payant actif
 """
 
+from core.context_cache import lazy, per_user, shared
+
 from .models import AppSubscription, AppKey
 
+# Clés du cache des valeurs globales (invalidées par accounts.signals)
+SOCIAL_APPS_CACHE = "accounts:social_apps"
+HAS_BUSINESS_CACHE = "accounts:has_business"
+GERMAN_PROFILE_CACHE = "german:profile"
+EXERCISE_TOTAL_CACHE = "prep:active_exercises"
+FRENCH_PROGRESS_CACHE = "prep:completed_exercises"
+
 
 def subscription_context(request):
     """Context processor principal — performances optimisées."""
@@ -58,10 +67,30 @@ def subscription_context(request):
     }
 
 
+def _social_providers():
+    from allauth.socialaccount.models import SocialApp
+
+    return set(SocialApp.objects.values_list("provider", flat=True))
+
+
+def _social_enabled(provider):
+    try:
+        return provider in shared(SOCIAL_APPS_CACHE, _social_providers)
+    except Exception:
+        return False
+
+
+def _user_has_business(user_id):
+    try:
+        from business.models import BusinessProfile
+        return BusinessProfile.objects.filter(owner_id=user_id).exists()
+    except Exception:
+        return False
+
+
 def social_login_context(request):
     """Expose l'etat des connexions sociales sans faire casser les pages auth."""
     try:
-        from allauth.socialaccount.models import SocialApp
         from django.conf import settings
 
         google_in_settings = False
@@ -81,18 +110,17 @@ def social_login_context(request):
         else:
             absolute_next = next_path
 
-        # Check if the user has a business profile
+        # Check if the user has a business profile (évalué seulement si le template l'affiche)
         user_has_business = False
         if request.user.is_authenticated:
-            try:
-                from business.models import BusinessProfile
-                user_has_business = BusinessProfile.objects.filter(owner=request.user).exists()
-            except Exception:
-                pass
+            user_id = request.user.pk
+            user_has_business = lazy(
+                lambda: per_user(user_id, HAS_BUSINESS_CACHE, lambda: _user_has_business(user_id))
+            )
 
         return {
-            "social_google_enabled": google_in_settings or SocialApp.objects.filter(provider="google").exists(),
-            "social_facebook_enabled": facebook_in_settings or SocialApp.objects.filter(provider="facebook").exists(),
+            "social_google_enabled": google_in_settings or lazy(lambda: _social_enabled("google")),
+            "social_facebook_enabled": facebook_in_settings or lazy(lambda: _social_enabled("facebook")),
             "social_next_url": absolute_next,
             "SITE_URL": getattr(settings, "SITE_URL", "https://e-shelle.com").rstrip('/'),
             "user_has_business": user_has_business,
@@ -107,32 +135,22 @@ def social_login_context(request):
         }
 
 
-def german_profile_context(request):
+def _german_state(user_id):
     """
-    Injecte le profil d'allemand de l'utilisateur, sa progression (%),
-    et des conseils d'amélioration personnalisés dans tous les templates.
+    Profil allemand, progression (%) et conseils d'un utilisateur.
+    Lecture seule : le profil est créé par l'espace allemand, pas par le rendu des pages.
     """
-    if not hasattr(request, "user") or not request.user.is_authenticated:
-        return {
-            "german_profile": None,
-            "german_level_progress": 0,
-            "german_evolution_tips": [],
-            "is_german_space": False,
-        }
-
-    path = request.path
-    is_german_space = "/allemand/" in path or "/allemagne/" in path or "/lebenslauf/" in path
-
     try:
         from GermanPrepApp.models import GermanUserProfile
-        
-        # Récupérer ou créer le profil allemand
-        profile, created = GermanUserProfile.objects.get_or_create(user=request.user)
-        
+
+        profile = GermanUserProfile.objects.filter(user_id=user_id).first()
+        if profile is None:
+            profile = GermanUserProfile(user_id=user_id)
+
         # Calculer le pourcentage de progression vers le niveau suivant
         lvl = profile.level
         xp = profile.xp
-        
+
         # Seuils de niveau définis dans compute_level
         thresholds = {
             1: (0, 100),
@@ -141,109 +159,137 @@ def german_profile_context(request):
             4: (500, 900),
             5: (900, 1400),
         }
-        
+
         if lvl in thresholds:
             low, high = thresholds[lvl]
         else:
             low = 1400 + (lvl - 6) * 400
             high = low + 400
-            
+
         range_xp = high - low
         user_xp_in_level = xp - low
-        
+
         progress = 0
         if range_xp > 0:
             progress = min(max(int((user_xp_in_level / range_xp) * 100), 0), 100)
-            
+
         # Conseils dynamiques d'amélioration
         tips = []
         if not profile.placement_level:
             tips.append("🎯 Évalue ton niveau de départ en faisant le test de niveau d'allemand.")
         else:
             tips.append(f"💪 Niveau conseillé : {profile.placement_level}. Entraîne-toi sur ce niveau.")
-            
+
         if profile.best_score < 50:
             tips.append("📚 Prends le temps de bien lire les fiches de cours (Vocabulaire et Grammaire) avant les simulations.")
         elif profile.best_score < 80:
             tips.append("✍️ Revois tes erreurs fréquentes après chaque examen blanc pour cibler tes faiblesses.")
         else:
             tips.append("🚀 Excellent score ! Essaie de passer au niveau supérieur ou d'accélérer ta vitesse de lecture.")
-            
+
         if profile.total_tests < 3:
             tips.append("⏱️ Fais au moins 3 simulations complètes pour débloquer ton analyse de compétences par le coach.")
         else:
             tips.append("🤖 Consulte tes recommandations détaillées du Coach IA dans ton espace progression.")
-            
+
         tips.append("📅 Conseil clé : 20 minutes d'entraînement par jour valent mieux qu'une seule longue session.")
 
-        return {
-            "german_profile": profile,
-            "german_level_progress": progress,
-            "german_evolution_tips": tips[:3],  # Top 3 tips
-            "is_german_space": is_german_space,
-        }
+        return {"profile": profile, "progress": progress, "tips": tips[:3]}  # Top 3 tips
     except Exception:
-        return {
-            "german_profile": None,
-            "german_level_progress": 0,
-            "german_evolution_tips": [],
-            "is_german_space": is_german_space,
-        }
+        return {"profile": None, "progress": 0, "tips": []}
 
 
-def french_profile_context(request):
+def german_profile_context(request):
     """
-    Injecte le profil de français (TCF) de l'utilisateur, sa progression (%),
+    Injecte le profil d'allemand de l'utilisateur, sa progression (%),
     et des conseils d'amélioration personnalisés dans tous les templates.
+    Valeurs paresseuses, mises en cache par utilisateur (TTL court).
     """
     if not hasattr(request, "user") or not request.user.is_authenticated:
         return {
-            "french_level": "B1",
-            "french_level_progress": 0,
-            "french_evolution_tips": [],
-            "is_french_space": False,
+            "german_profile": None,
+            "german_level_progress": 0,
+            "german_evolution_tips": [],
+            "is_german_space": False,
         }
 
     path = request.path
-    is_french_space = "/prep/" in path and not ("/allemand/" in path or "/allemagne/" in path or "/lebenslauf/" in path)
+    is_german_space = "/allemand/" in path or "/allemagne/" in path or "/lebenslauf/" in path
+
+    user_id = request.user.pk
+    state = lazy(lambda: per_user(user_id, GERMAN_PROFILE_CACHE, lambda: _german_state(user_id)))
+    return {
+        "german_profile": lazy(lambda: state["profile"]),
+        "german_level_progress": lazy(lambda: state["progress"]),
+        "german_evolution_tips": lazy(lambda: state["tips"]),
+        "is_german_space": is_german_space,
+    }
+
+
+def _active_exercise_total():
+    from preparation_tests.models import CourseExercise
+
+    return CourseExercise.objects.filter(is_active=True).count()
+
+
+def _completed_exercises(user_id):
+    from preparation_tests.models import UserExerciseProgress
+
+    return UserExerciseProgress.objects.filter(user_id=user_id, is_completed=True).count()
 
+
+def _french_state(user):
     try:
-        from preparation_tests.models import UserExerciseProgress, CourseExercise
-        
         # Progression sur les exercices de français
-        total_exs = CourseExercise.objects.filter(is_active=True).count()
-        completed_exs = UserExerciseProgress.objects.filter(user=request.user, is_completed=True).count()
-        
+        total_exs = shared(EXERCISE_TOTAL_CACHE, _active_exercise_total)
+        completed_exs = per_user(user.pk, FRENCH_PROGRESS_CACHE, lambda: _completed_exercises(user.pk))
+
         progress = 0
         if total_exs > 0:
             progress = min(max(int((completed_exs / total_exs) * 100), 0), 100)
-            
+
         level = "B1"
-        if hasattr(request.user, "profile") and request.user.profile.level:
-            level = request.user.profile.level
-            
+        if hasattr(user, "profile") and user.profile.level:
+            level = user.profile.level
+
         tips = []
         tips.append("🎯 Conseil clé : Le TCF Canada exige un score minimum dans les 4 compétences. Prépare-toi de façon homogène.")
-        
+
         if completed_exs < 5:
             tips.append("✍️ Fais tes premiers exercices corrigés en Compréhension Écrite ou Orale pour lancer ton évaluation.")
         else:
             tips.append("⏱️ Teste tes conditions réelles avec un examen blanc officiel TCF.")
-            
+
         tips.append("🤖 Discute avec le Coach IA pour recevoir des conseils et des corrections personnalisés sur l'Expression Écrite.")
         tips.append("📅 Conseil clé : 20 minutes d'entraînement par jour valent mieux qu'une seule longue session.")
 
-        return {
-            "french_level": level,
-            "french_level_progress": progress,
-            "french_evolution_tips": tips[:3],  # Top 3 tips
-            "is_french_space": is_french_space,
-        }
+        return {"level": level, "progress": progress, "tips": tips[:3]}  # Top 3 tips
     except Exception:
+        return {"level": "B1", "progress": 0, "tips": []}
+
+
+def french_profile_context(request):
+    """
+    Injecte le profil de français (TCF) de l'utilisateur, sa progression (%),
+    et des conseils d'amélioration personnalisés dans tous les templates.
+    Valeurs paresseuses : total d'exercices partagé, progression par utilisateur.
+    """
+    if not hasattr(request, "user") or not request.user.is_authenticated:
         return {
             "french_level": "B1",
             "french_level_progress": 0,
             "french_evolution_tips": [],
-            "is_french_space": is_french_space,
+            "is_french_space": False,
         }
 
+    path = request.path
+    is_french_space = "/prep/" in path and not ("/allemand/" in path or "/allemagne/" in path or "/lebenslauf/" in path)
+
+    user = request.user
+    state = lazy(lambda: _french_state(user))
+    return {
+        "french_level": lazy(lambda: state["level"]),
+        "french_level_progress": lazy(lambda: state["progress"]),
+        "french_evolution_tips": lazy(lambda: state["tips"]),
+        "is_french_space": is_french_space,
+    }
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.template import Context, Template
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+
+# Gabarit qui consomme toutes les valeurs globales, comme le ferait base.html + resto/base.html
+_ALL_VALUES = Template(
+    "{% for c in resto_cities %}{{ c }}{% endfor %}{% for c in resto_categories %}{{ c }}{% endfor %}"
+    "{{ unread_notifications_count }}{{ social_google_enabled }}{{ social_facebook_enabled }}"
+    "{{ user_has_business }}{{ german_profile.level }}{{ german_level_progress }}"
+    "{% for t in german_evolution_tips %}{{ t }}{% endfor %}{{ french_level }}{{ french_level_progress }}"
+    "{% for t in french_evolution_tips %}{{ t }}{% endfor %}"
+)
+
+
+class Command(BaseCommand):
+    help = "Mesure le nombre de requetes SQL des context processors globaux, par page."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", default=["/", "/resto/", "/prep/", "/allemand/"])
+        parser.add_argument("--user", default="", help="Username ou email (defaut : anonyme)")
+
+    def handle(self, *args, **options):
+        user = AnonymousUser()
+        if options["user"]:
+            User = get_user_model()
+            identifier = options["user"].strip()
+            user = (
+                User.objects.filter(username__iexact=identifier).first()
+                or User.objects.filter(email__iexact=identifier).first()
+            )
+            if not user:
+                raise CommandError(f"Utilisateur introuvable: {identifier}")
+
+        processors = [import_string(path) for path in settings.TEMPLATES[0]["OPTIONS"]["context_processors"]]
+        factory = RequestFactory()
+        self.stdout.write(f"{'page':<20} {'processors':>10} {'1er rendu':>10} {'2e rendu':>10}")
+        for path in options["paths"]:
+            counts = []
+            for _ in range(2):
+                request = factory.get(path)
+                request.user = user
+                with CaptureQueriesContext(connection) as processors_ctx:
+                    values = {}
+                    for processor in processors:
+                        values.update(processor(request))
+                with CaptureQueriesContext(connection) as render_ctx:
+                    _ALL_VALUES.render(Context(values))
+                counts.append((len(processors_ctx), len(render_ctx)))
+            self.stdout.write(f"{path:<20} {counts[0][0]:>10} {counts[0][1]:>10} {counts[1][1]:>10}")
@@ -0,0 +1,43 @@
+"""
+accounts/signals.py
+===================
+Invalidation du cache des context processors globaux (voir core.context_cache).
+Les émetteurs sont référencés par label : ils appartiennent à d'autres apps.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.context_cache import bump, forget_user
+
+from .context_processors import (
+    EXERCISE_TOTAL_CACHE,
+    FRENCH_PROGRESS_CACHE,
+    GERMAN_PROFILE_CACHE,
+    HAS_BUSINESS_CACHE,
+    SOCIAL_APPS_CACHE,
+)
+
+
+@receiver([post_save, post_delete], sender="socialaccount.SocialApp")
+def invalidate_social_apps(sender, **kwargs):
+    bump(SOCIAL_APPS_CACHE)
+
+
+@receiver([post_save, post_delete], sender="preparation_tests.CourseExercise")
+def invalidate_exercise_total(sender, **kwargs):
+    bump(EXERCISE_TOTAL_CACHE)
+
+
+@receiver([post_save, post_delete], sender="preparation_tests.UserExerciseProgress")
+def invalidate_french_progress(sender, instance, **kwargs):
+    forget_user(instance.user_id, FRENCH_PROGRESS_CACHE)
+
+
+@receiver([post_save, post_delete], sender="GermanPrepApp.GermanUserProfile")
+def invalidate_german_profile(sender, instance, **kwargs):
+    forget_user(instance.user_id, GERMAN_PROFILE_CACHE)
+
+
+@receiver([post_save, post_delete], sender="business.BusinessProfile")
+def invalidate_user_has_business(sender, instance, **kwargs):
+    forget_user(instance.owner_id, HAS_BUSINESS_CACHE)
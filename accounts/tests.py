@@ -1,3 +1,55 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from accounts.context_processors import french_profile_context, german_profile_context, social_login_context
+from resto.context_processors import resto_globals
+
+
+class LazyContextProcessorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username="amina", password="secret123")
+
+    def _request(self, path="/"):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return request
+
+    def _context(self, path="/"):
+        request = self._request(path)
+        values = {}
+        for processor in (resto_globals, social_login_context, german_profile_context, french_profile_context):
+            values.update(processor(request))
+        return values
+
+    def test_processors_run_no_query_until_values_are_rendered(self):
+        with self.assertNumQueries(0):
+            values = self._context("/allemand/")
+        with self.assertNumQueries(0):
+            Template("{{ SITE_URL }}{{ is_german_space }}").render(Context(values))
+
+    def test_shared_values_are_cached_and_invalidated_by_signals(self):
+        from resto.models import City
+
+        City.objects.create(name="Douala", slug="douala")
+        template = Template("{% for c in resto_cities %}{{ c }};{% endfor %}")
+        self.assertEqual(template.render(Context(self._context())), "Douala;")
+        with self.assertNumQueries(0):
+            template.render(Context(self._context()))
+
+        City.objects.create(name="Bafoussam", slug="bafoussam")
+        self.assertEqual(template.render(Context(self._context())), "Bafoussam;Douala;")
+
+    def test_german_profile_is_read_only_and_refreshed_on_save(self):
+        from GermanPrepApp.models import GermanUserProfile
+
+        template = Template("{{ german_profile.level }}/{{ german_profile.xp }}")
+        self.assertEqual(template.render(Context(self._context("/allemand/"))), "1/0")
+        self.assertFalse(GermanUserProfile.objects.filter(user=self.user).exists())
+
+        GermanUserProfile.objects.create(user=self.user, xp=120, level=2)
+        self.assertEqual(template.render(Context(self._context("/allemand/"))), "2/120")
+        with self.assertNumQueries(0):
+            template.render(Context(self._context("/allemand/")))
@@ -1,41 +1,180 @@
-import os
-import logging
-import urllib.parse
+"""
+Service TTS partagé (gTTS) — un seul point d'entrée pour toutes les apps.
+
+  generate_audio(text, language)          → chemin relatif d'un MP3 (un seul texte)
+  synthesize_batch(items, voice=...)      → TTSBatchResult (chemins + débit)
+
+Chaque clip est identifié par le hash sha256 de (langue, voix, texte normalisé) et
+stocké une seule fois dans le stockage par défaut sous TTS_STORAGE_DIR : deux apps
+qui demandent le même texte partagent le même fichier. Les synthèses tournent dans
+un pool de threads persistant (TTS_WORKERS) : pas de sous-processus ni de
+démarrage d'interpréteur par clip, et une même clé demandée en parallèle n'est
+synthétisée qu'une fois.
+"""
 import hashlib
-import requests
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
 from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 
 logger = logging.getLogger(__name__)
 
-def generate_audio(text: str, language: str = "de", output_dir: str = "audio/german") -> str:
+_POOL = None
+_POOL_LOCK = threading.Lock()
+_INFLIGHT = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _pool():
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "TTS_WORKERS", 4),
+                    thread_name_prefix="tts",
+                )
+    return _POOL
+
+
+def _storage_dir():
+    return getattr(settings, "TTS_STORAGE_DIR", "tts").strip("/")
+
+
+def _clean(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def audio_key(text: str, language: str = "fr", voice: str = "") -> str:
+    """Clé de contenu d'un clip : identique pour un même (texte, langue, voix)."""
+    payload = f"{language.lower()}\x00{voice}\x00{_clean(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def audio_path(key: str, output_dir: str | None = None) -> str:
+    if output_dir:
+        return f"{output_dir.strip('/')}/tts_{key}.mp3"
+    return f"{_storage_dir()}/{key[:2]}/{key}.mp3"
+
+
+def _synthesize(text: str, language: str, voice: str) -> bytes:
+    """Appel gTTS (réseau) ; voice = domaine Google (tld) pour l'accent, ex. « fr », « ca »."""
+    from gtts import gTTS
+
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=language, tld=voice or "com").write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def _render(path: str, text: str, language: str, voice: str) -> str:
+    if default_storage.exists(path):
+        return path
+    data = _synthesize(text, language, voice)
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(data))
+    return path
+
+
+def _submit(key: str, path: str, text: str, language: str, voice: str):
+    """Soumet la synthèse au pool, en partageant le futur si la clé est déjà en cours."""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        created = future is None
+        if created:
+            future = _pool().submit(_render, path, text, language, voice)
+            _INFLIGHT[key] = future
+    if created:
+        # Hors verrou : un futur déjà terminé exécute le callback immédiatement
+        future.add_done_callback(lambda _f, k=key: _release(k))
+    return future
+
+
+def _release(key):
+    with _INFLIGHT_LOCK:
+        _INFLIGHT.pop(key, None)
+
+
+@dataclass
+class TTSBatchResult:
+    paths: dict = field(default_factory=dict)     # (texte, langue) demandé → chemin relatif
+    errors: dict = field(default_factory=dict)    # (texte, langue) demandé → message
+    requested: int = 0
+    unique: int = 0
+    cached: int = 0
+    generated: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def clips_per_second(self) -> float:
+        return self.generated / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.requested} demandé(s), {self.unique} unique(s), {self.cached} déjà en cache, "
+            f"{self.generated} généré(s), {len(self.errors)} échec(s) "
+            f"en {self.elapsed:.1f}s ({self.clips_per_second:.2f} clip/s)"
+        )
+
+
+def synthesize_batch(items, voice: str = "", output_dir: str | None = None) -> TTSBatchResult:
+    """
+    Synthétise un lot de (texte, langue). Les doublons (même clé de contenu) ne
+    sont générés qu'une fois et les clips déjà présents dans le stockage sont réutilisés.
+    """
+    started = time.perf_counter()
+    result = TTSBatchResult()
+    by_key = {}
+    for item in items:
+        result.requested += 1
+        text, language = _clean(item[0]), item[1]
+        if not text:
+            result.errors[item] = "texte vide"
+            continue
+        key = audio_key(text, language, voice)
+        by_key.setdefault(key, (text, language, []))[2].append(item)
+    result.unique = len(by_key)
+
+    futures = {}
+    for key, (text, language, requests) in by_key.items():
+        path = audio_path(key, output_dir)
+        if default_storage.exists(path):
+            result.cached += 1
+            for request in requests:
+                result.paths[request] = path
+            continue
+        futures[key] = (_submit(key, path, text, language, voice), requests)
+
+    for key, (future, requests) in futures.items():
+        try:
+            path = future.result()
+        except Exception as exc:
+            logger.error(f"[TTS] Échec de la génération audio ({key[:12]}) : {exc}")
+            for request in requests:
+                result.errors[request] = str(exc)
+            continue
+        result.generated += 1
+        for request in requests:
+            result.paths[request] = path
+
+    result.elapsed = time.perf_counter() - started
+    logger.info(f"[TTS] Lot : {result.summary()}")
+    return result
+
+
+def generate_audio(text: str, language: str = "de", output_dir: str | None = None, voice: str = "") -> str:
     """
-    Génère un fichier audio MP3 à partir d'un texte allemand (ou autre langue)
-    en utilisant la bibliothèque gTTS qui gère automatiquement les longs textes sans troncature.
-    Sauvegarde le fichier dans MEDIA_ROOT / output_dir et retourne le chemin relatif.
+    Génère (ou réutilise) le MP3 d'un texte et retourne son chemin relatif dans le stockage.
+    Lève une exception si la synthèse échoue.
     """
-    logger.info(f"[TTS] Génération audio ({language}) pour : {text[:60]}...")
-    
-    # Créer le répertoire de sortie s'il n'existe pas
-    full_output_dir = os.path.join(settings.MEDIA_ROOT, output_dir)
-    os.makedirs(full_output_dir, exist_ok=True)
-    
-    # Créer un nom de fichier unique basé sur le hash du texte
-    text_hash = hashlib.md5(text.encode("utf-8")).hexdigest()
-    filename = f"tts_{text_hash}.mp3"
-    relative_path = os.path.join(output_dir, filename).replace("\\", "/")
-    full_path = os.path.join(full_output_dir, filename)
-    
-    # Si le fichier existe déjà, pas besoin de le recréer
-    if os.path.exists(full_path):
-        logger.info(f"[TTS] Fichier existant trouvé : {relative_path}")
-        return relative_path
-        
-    try:
-        from gtts import gTTS
-        tts = gTTS(text=text.strip(), lang=language)
-        tts.save(full_path)
-        logger.info(f"[TTS] Succès de la génération gTTS : {relative_path}")
-        return relative_path
-    except Exception as e:
-        logger.error(f"[TTS] Échec de la génération audio gTTS : {e}")
-        raise
+    logger.info(f"[TTS] Génération audio ({language}) pour : {(text or '')[:60]}...")
+    key = (text, language)
+    result = synthesize_batch([key], voice=voice, output_dir=output_dir)
+    if key not in result.paths:
+        raise RuntimeError(result.errors.get(key, "échec de la génération audio"))
+    return result.paths[key]
@@ -1,3 +1,56 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from ai_engine.services import tts_service
+from preparation_tests.services.audio_assets import audio_assets_for
+
+
+@override_settings(
+    STORAGES={
+        "default":     {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    TTS_STORAGE_DIR="tts",
+)
+class SharedTTSServiceTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(tts_service, "_synthesize", return_value=b"ID3-mp3")
+        self.synthesize = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_deduplicates_identical_texts(self):
+        items = [("Bonjour à tous", "fr"), ("Bonjour   à tous", "fr"), ("Guten Tag", "de")]
+        result = tts_service.synthesize_batch(items)
+
+        self.assertEqual(self.synthesize.call_count, 2)
+        self.assertEqual((result.requested, result.unique, result.generated), (3, 2, 2))
+        self.assertEqual(result.paths[items[0]], result.paths[items[1]])
+        self.assertNotEqual(result.paths[items[0]], result.paths[items[2]])
+        self.assertTrue(default_storage.exists(result.paths[items[2]]))
+
+    def test_second_call_reuses_stored_clip(self):
+        first = tts_service.generate_audio("Salut", language="fr")
+        second = tts_service.generate_audio("Salut", language="fr")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.synthesize.call_count, 1)
+        self.assertTrue(first.startswith("tts/"))
+
+    def test_failure_is_reported_per_item(self):
+        self.synthesize.side_effect = RuntimeError("quota")
+        result = tts_service.synthesize_batch([("Un", "fr"), ("", "fr")])
+
+        self.assertEqual(result.paths, {})
+        self.assertEqual(set(result.errors), {("Un", "fr"), ("", "fr")})
+        with self.assertRaises(RuntimeError):
+            tts_service.generate_audio("Un", language="fr")
+
+    def test_audio_assets_reused_by_path(self):
+        path = tts_service.generate_audio("Ecoutez", language="fr")
+        first = audio_assets_for({path: "fr"})
+        second = audio_assets_for({path: "fr"})
+
+        self.assertEqual(first[path].pk, second[path].pk)
+        self.assertEqual(first[path].kind, "audio")
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annonces_cam', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='annonce',
+            index=models.Index(fields=['statut', '-est_mise_en_avant', '-date_publication', '-id'], name='annonces_catalogue_idx'),
+        ),
+    ]
@@ -3,6 +3,7 @@ models.py — annonces_cam
 Marketplace généraliste camerounaise
 """
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 from django.utils.text import slugify
 from django.urls import reverse
@@ -10,6 +11,8 @@ from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 import uuid
 
+from core.listing import KeysetIndex
+
 
 # ─────────────────────────────────────────────────────────────────
 # CHOIX
@@ -287,6 +290,11 @@ class Annonce(models.Model):
             models.Index(fields=["categorie", "statut"]),
             models.Index(fields=["ville", "statut"]),
             models.Index(fields=["vendeur", "statut"]),
+            # Catalogue paginé par curseur sur le tri par défaut (NULL en dernier, comme KeysetPaginator)
+            KeysetIndex(
+                F("statut"), F("est_mise_en_avant").desc(), F("date_publication").desc(nulls_last=True), F("id").desc(),
+                name="annonces_catalogue_idx",
+            ),
         ]
 
     def __str__(self):
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Annonce, Categorie, StatutAnnonce
+from .views import ANNONCES_PAR_PAGE
+
+
+def _lien(response, parametre):
+    """Lien de pagination portant le curseur `parametre`, décodé en paramètres GET."""
+    href = next(
+        href for href in response.content.decode().split('href="')[1:]
+        if href.startswith("?") and f"{parametre}=" in href
+    ).split('"')[0].replace("&amp;", "&")
+    return parse_qs(urlsplit(href).query)
+
+
+class CatalogueAnnoncesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        vendeur = get_user_model().objects.create_user(username="vendeur", password=None)
+        parent = Categorie.objects.create(nom="Maison", slug="maison")
+        self.categorie = Categorie.objects.create(nom="Meubles", slug="meubles", parent=parent)
+        now = timezone.now()
+        expiration = timezone.localdate() + timedelta(days=30)
+
+        def annonce(n, ville, **champs):
+            return Annonce.objects.create(
+                titre=f"Chaise {n}", categorie=self.categorie, description="-", ville=ville,
+                vendeur=vendeur, telephone_contact="699000000", statut=StatutAnnonce.PUBLIEE,
+                date_expiration=expiration, **champs,
+            )
+
+        # Prix et dates parfois absents : rangés en fin de tri, dans les deux sens de lecture
+        self.annonces = [
+            annonce(
+                n, "Douala",
+                prix=None if n % 6 == 0 else 1000 + (n % 7) * 500,
+                date_publication=None if n % 4 == 0 else now - timedelta(hours=n),
+                est_mise_en_avant=n % 5 == 0,
+            )
+            for n in range(ANNONCES_PAR_PAGE + 5)
+        ]
+        annonce("yaounde", "Yaoundé", prix=1000, date_publication=now)
+
+    def test_curseur_garde_filtres_et_tri(self):
+        url = reverse("annonces:liste_annonces")
+        first = self.client.get(url, {"ville": "Douala", "tri": "prix"})
+        self.assertEqual(len(first.context["annonces"]), ANNONCES_PAR_PAGE)
+
+        params = _lien(first, "apres")
+        self.assertEqual((params["ville"], params["tri"]), (["Douala"], ["prix"]))
+        second = self.client.get(url, params)
+        seen = [a.pk for a in [*first.context["annonces"], *second.context["annonces"]]]
+
+        expected = sorted(self.annonces, key=lambda a: (a.prix is None, a.prix or 0, a.pk))
+        self.assertEqual(seen, [a.pk for a in expected])
+
+        # Retour en arrière : la première page à l'identique
+        back = self.client.get(url, _lien(second, "avant"))
+        self.assertEqual(list(back.context["annonces"]), list(first.context["annonces"]))
+
+    def test_categorie_par_date_null_en_dernier(self):
+        url = reverse("annonces:annonces_par_categorie", args=[self.categorie.slug])
+        first = self.client.get(url, {"tri": "-date_publication"})
+        second = self.client.get(url, _lien(first, "apres"))
+        seen = [a.pk for a in [*first.context["annonces"], *second.context["annonces"]]]
+
+        every = Annonce.objects.filter(categorie=self.categorie)
+        expected = sorted(
+            every, key=lambda a: (a.date_publication is None, -a.date_publication.timestamp() if a.date_publication else 0, -a.pk),
+        )
+        self.assertEqual(seen, [a.pk for a in expected])
@@ -6,11 +6,11 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
-from django.db.models import Q
-from django.core.paginator import Paginator
 from django.utils import timezone
 from datetime import timedelta
 from django.contrib.auth import get_user_model
+from core.listing import KeysetPaginator
+from search.services import filter_queryset
 
 from .models import (
     Annonce, PhotoAnnonce, FavoriAnnonce, SignalementAnnonce,
@@ -32,6 +32,23 @@ def _get_or_create_profil(user):
 # CATALOGUE
 # ─────────────────────────────────────────────────────────────────
 
+ANNONCES_PAR_PAGE = 16
+TRI_DEFAUT = "-est_mise_en_avant"
+# Tri demandé (?tri=) → clés du curseur ; la clé primaire départage les égalités
+TRIS = {
+    "-est_mise_en_avant": ("-est_mise_en_avant", "-date_publication"),
+    "-date_publication":  ("-date_publication",),
+    "prix":               ("prix",),
+    "-prix":              ("-prix",),
+    "-vues":              ("-vues",),
+}
+
+
+def _page_annonces(request, qs):
+    tri = TRIS.get(request.GET.get("tri"), TRIS[TRI_DEFAUT])
+    return KeysetPaginator(qs, tri, ANNONCES_PAR_PAGE).page_for(request)
+
+
 def liste_annonces(request):
     qs = Annonce.objects.publiees().select_related("vendeur", "categorie").prefetch_related("photos")
 
@@ -39,11 +56,7 @@ def liste_annonces(request):
     if form.is_valid():
         d = form.cleaned_data
         if d.get("q"):
-            qs = qs.filter(
-                Q(titre__icontains=d["q"])
-                | Q(description__icontains=d["q"])
-                | Q(quartier__icontains=d["q"])
-            )
+            qs = filter_queryset(qs, d["q"])
         if d.get("categorie"):
             from .models import Categorie as Cat
             try:
@@ -62,18 +75,11 @@ def liste_annonces(request):
         if d.get("prix_max"):
             qs = qs.filter(prix__lte=d["prix_max"])
 
-    # Tri
-    tri = request.GET.get("tri", "-est_mise_en_avant")
-    tris_valides = ["-est_mise_en_avant", "-date_publication", "prix", "-prix", "-vues"]
-    if tri in tris_valides:
-        qs = qs.order_by(tri)
-
-    paginator = Paginator(qs, 16)
-    page = paginator.get_page(request.GET.get("page"))
+    page = _page_annonces(request, qs)
 
     categories = Categorie.objects.filter(parent__isnull=True, est_active=True).prefetch_related("sous_categories").order_by("ordre", "nom")
-    coups_de_coeur = Annonce.objects.coups_de_coeur()[:6]
-    urgentes = Annonce.objects.urgentes()[:4]
+    coups_de_coeur = Annonce.objects.coups_de_coeur().prefetch_related("photos")[:6]
+    urgentes = Annonce.objects.urgentes().prefetch_related("photos")[:4]
 
     return render(request, "annonces_cam/liste_annonces.html", {
         "annonces":       page,
@@ -81,7 +87,6 @@ def liste_annonces(request):
         "categories":     categories,
         "coups_de_coeur": coups_de_coeur,
         "urgentes":       urgentes,
-        "total":          paginator.count,
     })
 
 
@@ -91,18 +96,11 @@ def annonces_par_categorie(request, slug_categorie):
     ids       = [categorie.pk] + sous_ids
     qs = Annonce.objects.publiees().filter(categorie__in=ids).select_related("vendeur", "categorie").prefetch_related("photos")
 
-    tri = request.GET.get("tri", "-est_mise_en_avant")
-    tris_valides = ["-est_mise_en_avant", "-date_publication", "prix", "-prix", "-vues"]
-    if tri in tris_valides:
-        qs = qs.order_by(tri)
-
-    paginator = Paginator(qs, 16)
-    page      = paginator.get_page(request.GET.get("page"))
+    page = _page_annonces(request, qs)
 
     return render(request, "annonces_cam/annonces_par_categorie.html", {
         "categorie":  categorie,
         "annonces":   page,
-        "total":      paginator.count,
     })
 
 
@@ -4,12 +4,14 @@ from apps.tibo.services.shopify_service import ShopifyService
 
 
 class Command(BaseCommand):
-    help = "Importe les produits TIBO depuis Shopify."
+    help = "Importe tout le catalogue TIBO depuis Shopify (pagination par curseur, upsert par lots)."
 
     def add_arguments(self, parser):
-        parser.add_argument("--limit", type=int, default=50)
+        parser.add_argument("--limit", type=int, default=0, help="Nombre maximum de produits (0 = tout le catalogue).")
 
     def handle(self, *args, **options):
-        imported = ShopifyService().import_products(limit=options["limit"])
-        self.stdout.write(self.style.SUCCESS(f"{len(imported)} produits importés."))
-
+        report = ShopifyService().import_products(limit=options["limit"] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.total} produits lus sur {report.pages} page(s): "
+            f"{report.created} créés, {report.updated} mis à jour, {report.unchanged} inchangés."
+        ))
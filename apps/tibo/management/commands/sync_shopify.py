@@ -4,9 +4,15 @@ from apps.tibo.services.shopify_service import ShopifyService
 
 
 class Command(BaseCommand):
-    help = "Synchronise produits, prix et stock Shopify pour TIBO."
+    help = "Synchronise prix et stock Shopify pour TIBO (--full pour réimporter les fiches produits)."
 
-    def handle(self, *args, **options):
-        products = ShopifyService().sync_inventory()
-        self.stdout.write(self.style.SUCCESS(f"Shopify synchronisé: {len(products)} produits."))
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Synchronisation complète au lieu du delta prix/stock.")
 
+    def handle(self, *args, **options):
+        service = ShopifyService()
+        report = service.import_products() if options["full"] else service.sync_inventory()
+        self.stdout.write(self.style.SUCCESS(
+            f"Shopify synchronisé: {report.updated + report.created} produits modifiés, "
+            f"{report.unchanged} inchangés, {report.missing} inconnus."
+        ))
@@ -0,0 +1,254 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.tibo.models import Category, Inventory, Product, ProductImage, Supplier
+
+DEFAULT_CATEGORY = "Sélection TIBO"
+CHUNK_SIZE = 250
+
+PRODUCT_UPDATE_FIELDS = [
+    "title",
+    "short_description",
+    "description",
+    "category",
+    "supplier",
+    "price",
+    "compare_at_price",
+    "currency",
+    "affiliate_url",
+    "canonical_url",
+    "is_active",
+    "metadata",
+    "updated_at",
+]
+
+
+@dataclass
+class SyncReport:
+    pages: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    images: int = 0
+    inventories: int = 0
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged
+
+    def as_dict(self):
+        return {**asdict(self), "total": self.total}
+
+
+def payload_hash(payload):
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _decimal(value):
+    if value in (None, ""):
+        return None
+    return Decimal(str(value))
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class CatalogSyncService:
+    """Synchronisation en masse du catalogue : quelques requêtes par lot, quel que soit le nombre de produits."""
+
+    def __init__(self, source, supplier=None, chunk_size=CHUNK_SIZE):
+        self.source = source
+        self.supplier = supplier
+        self.chunk_size = chunk_size
+        self.report = SyncReport()
+        self._categories = None
+        self._suppliers = None
+
+    # ── Référentiels en mémoire ─────────────────────────────────────────────
+
+    def _category(self, name):
+        if self._categories is None:
+            self._categories = {category.name: category for category in Category.objects.all()}
+        if name not in self._categories:
+            self._categories[name] = Category.objects.create(name=name)
+        return self._categories[name]
+
+    def _supplier(self, name):
+        if self.supplier is not None:
+            return self.supplier
+        if self._suppliers is None:
+            self._suppliers = {supplier.name: supplier for supplier in Supplier.all_objects.filter(source=self.source)}
+        if name not in self._suppliers:
+            self._suppliers[name] = Supplier.objects.create(name=name, source=self.source)
+        return self._suppliers[name]
+
+    def _existing(self, external_ids, *fields):
+        queryset = Product.all_objects.filter(source=self.source, external_id__in=external_ids)
+        return {product.external_id: product for product in queryset.only("id", "external_id", *fields)}
+
+    def _upsert_inventories(self, quantities):
+        now = timezone.now()
+        rows = [
+            Inventory(product_id=product_id, quantity=quantity, last_synced_at=now)
+            for product_id, quantity in quantities.items()
+        ]
+        Inventory.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["product"],
+            update_fields=["quantity", "last_synced_at", "updated_at"],
+        )
+        self.report.inventories += len(rows)
+
+    # ── Synchronisation complète ────────────────────────────────────────────
+
+    def sync(self, payloads):
+        for chunk in _chunks(payloads, self.chunk_size):
+            self._sync_chunk(chunk)
+        return self.report
+
+    def _unique_slugs(self, products):
+        candidates = {product.pk: slugify(product.title)[:250] or str(product.pk) for product in products}
+        taken = set(Product.all_objects.filter(slug__in=candidates.values()).values_list("slug", flat=True))
+        for product in products:
+            slug = candidates[product.pk]
+            if slug in taken:
+                slug = f"{slug[:250 - len(product.external_id) - 1]}-{product.external_id}"
+            taken.add(slug)
+            product.slug = slug
+
+    @transaction.atomic
+    def _sync_chunk(self, payloads):
+        # Un même produit peut réapparaître entre deux pages : la dernière version gagne.
+        by_id = {str(payload["external_id"]): payload for payload in payloads}
+        existing = self._existing(by_id, "slug", "metadata")
+
+        products, new_products, images, quantities = [], [], {}, {}
+        for external_id, payload in by_id.items():
+            digest = payload_hash(payload)
+            current = existing.get(external_id)
+            if current is not None and (current.metadata or {}).get("sync_hash") == digest:
+                self.report.unchanged += 1
+                continue
+
+            product = Product(
+                source=self.source,
+                external_id=external_id,
+                title=payload["title"],
+                short_description=payload.get("short_description", "")[:320],
+                description=payload.get("description") or payload.get("short_description") or payload["title"],
+                category=self._category(payload.get("category") or DEFAULT_CATEGORY),
+                supplier=self._supplier(payload.get("supplier_name") or self.source.title()),
+                price=_decimal(payload.get("price")) or Decimal("0.00"),
+                compare_at_price=_decimal(payload.get("compare_at_price")),
+                currency=payload.get("currency", "CAD"),
+                affiliate_url=payload.get("affiliate_url", ""),
+                canonical_url=payload.get("canonical_url", ""),
+                is_active=payload.get("is_active", True),
+                metadata={**payload.get("metadata", {}), "sync_hash": digest},
+            )
+            if current is None:
+                new_products.append(product)
+                self.report.created += 1
+            else:
+                product.pk, product.slug = current.pk, current.slug
+                self.report.updated += 1
+            products.append(product)
+            images[product.pk] = payload.get("images", [])
+            quantities[product.pk] = int(payload.get("quantity") or 0)
+
+        if not products:
+            return
+        self._unique_slugs(new_products)
+        # Clé de conflit = pk : les produits connus gardent leur id, les nouveaux sont insérés.
+        Product.all_objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+        self._upsert_inventories(quantities)
+        self._upsert_images({product.pk: product for product in products}, images)
+
+    def _upsert_images(self, products, images):
+        known = {
+            (product_id, remote_url): pk
+            for pk, product_id, remote_url in ProductImage.objects.filter(product_id__in=images).values_list(
+                "pk", "product_id", "remote_url"
+            )
+        }
+        rows = []
+        for product_id, urls in images.items():
+            for index, remote_url in enumerate(dict.fromkeys(urls)):
+                image = ProductImage(
+                    product_id=product_id,
+                    remote_url=remote_url,
+                    alt_text=products[product_id].title[:180],
+                    is_primary=index == 0,
+                    sort_order=index,
+                )
+                if (product_id, remote_url) in known:
+                    image.pk = known[(product_id, remote_url)]
+                rows.append(image)
+        if rows:
+            ProductImage.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=["alt_text", "is_primary", "sort_order", "updated_at"],
+            )
+        self.report.images += len(rows)
+
+    # ── Mode delta : prix et stock uniquement ───────────────────────────────
+
+    def sync_stock_and_prices(self, rows):
+        """rows : dicts external_id / price / compare_at_price / quantity. Les produits inconnus sont ignorés."""
+        for chunk in _chunks(rows, self.chunk_size):
+            self._delta_chunk(chunk)
+        return self.report
+
+    @transaction.atomic
+    def _delta_chunk(self, rows):
+        by_id = {str(row["external_id"]): row for row in rows}
+        existing = self._existing(by_id, "price", "compare_at_price")
+        stock = dict(Inventory.objects.filter(product__in=existing.values()).values_list("product_id", "quantity"))
+
+        repriced, quantities = [], {}
+        for external_id, row in by_id.items():
+            product = existing.get(external_id)
+            if product is None:
+                self.report.missing += 1
+                continue
+            price = _decimal(row.get("price")) or Decimal("0.00")
+            compare_at_price = _decimal(row.get("compare_at_price"))
+            quantity = int(row.get("quantity") or 0)
+            changed = False
+            if (product.price, product.compare_at_price) != (price, compare_at_price):
+                product.price, product.compare_at_price = price, compare_at_price
+                product.updated_at = timezone.now()
+                repriced.append(product)
+                changed = True
+            if stock.get(product.pk) != quantity:
+                quantities[product.pk] = quantity
+                changed = True
+            if changed:
+                self.report.updated += 1
+            else:
+                self.report.unchanged += 1
+
+        if repriced:
+            Product.all_objects.bulk_update(repriced, ["price", "compare_at_price", "updated_at"])
+        if quantities:
+            self._upsert_inventories(quantities)
@@ -2,7 +2,10 @@ import os
 
 import requests
 
-from apps.tibo.services.product_service import ProductService
+from apps.tibo.services.catalog_sync_service import CatalogSyncService
+
+PAGE_SIZE = 250
+DELTA_FIELDS = "id,variants"
 
 
 class ShopifyService:
@@ -10,6 +13,7 @@ class ShopifyService:
         self.shop_domain = shop_domain or os.getenv("TIBO_SHOPIFY_SHOP_DOMAIN", "")
         self.access_token = access_token or os.getenv("TIBO_SHOPIFY_ACCESS_TOKEN", "")
         self.api_version = os.getenv("TIBO_SHOPIFY_API_VERSION", "2026-01")
+        self.session = requests.Session()
 
     @property
     def base_url(self):
@@ -18,37 +22,78 @@ class ShopifyService:
     def _headers(self):
         return {"X-Shopify-Access-Token": self.access_token, "Content-Type": "application/json"}
 
-    def import_products(self, limit=50):
-        if not self.shop_domain or not self.access_token:
-            return []
-        response = requests.get(f"{self.base_url}/products.json", headers=self._headers(), params={"limit": limit}, timeout=30)
-        response.raise_for_status()
-        imported = []
-        for item in response.json().get("products", []):
-            variant = (item.get("variants") or [{}])[0]
-            payload = {
-                "external_id": item["id"],
-                "title": item["title"],
-                "short_description": item.get("body_html", "")[:300],
-                "description": item.get("body_html", ""),
-                "category": item.get("product_type") or "Shopify",
-                "price": variant.get("price") or "0.00",
-                "compare_at_price": variant.get("compare_at_price"),
-                "currency": "CAD",
-                "quantity": variant.get("inventory_quantity") or 0,
-                "canonical_url": f"https://{self.shop_domain}/products/{item.get('handle')}",
-                "images": [image.get("src") for image in item.get("images", []) if image.get("src")],
-                "metadata": item,
-            }
-            imported.append(ProductService.upsert_external_product("shopify", payload))
-        return imported
+    @property
+    def is_configured(self):
+        return bool(self.shop_domain and self.access_token)
+
+    def iter_pages(self, fields=None, page_size=PAGE_SIZE):
+        """Parcourt tout le catalogue en suivant le curseur `page_info` de l'en-tête Link."""
+        url = f"{self.base_url}/products.json"
+        params = {"limit": page_size}
+        if fields:
+            params["fields"] = fields
+        while url:
+            response = self.session.get(url, headers=self._headers(), params=params, timeout=30)
+            response.raise_for_status()
+            yield response.json().get("products", [])
+            # L'URL "next" porte déjà limit, fields et page_info.
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+    def iter_products(self, fields=None, limit=None, report=None):
+        count = 0
+        for page in self.iter_pages(fields=fields, page_size=min(limit or PAGE_SIZE, PAGE_SIZE)):
+            if report is not None:
+                report.pages += 1
+            for item in page:
+                if limit and count >= limit:
+                    return
+                count += 1
+                yield item
+
+    def product_payload(self, item):
+        variant = (item.get("variants") or [{}])[0]
+        return {
+            "external_id": item["id"],
+            "title": item["title"],
+            "short_description": (item.get("body_html") or "")[:300],
+            "description": item.get("body_html") or "",
+            "category": item.get("product_type") or "Shopify",
+            "price": variant.get("price") or "0.00",
+            "compare_at_price": variant.get("compare_at_price"),
+            "currency": "CAD",
+            "quantity": variant.get("inventory_quantity") or 0,
+            "canonical_url": f"https://{self.shop_domain}/products/{item.get('handle')}",
+            "images": [image.get("src") for image in item.get("images", []) if image.get("src")],
+            "metadata": item,
+        }
+
+    @staticmethod
+    def stock_payload(item):
+        variant = (item.get("variants") or [{}])[0]
+        return {
+            "external_id": item["id"],
+            "price": variant.get("price") or "0.00",
+            "compare_at_price": variant.get("compare_at_price"),
+            "quantity": variant.get("inventory_quantity") or 0,
+        }
+
+    def import_products(self, limit=None):
+        sync = CatalogSyncService("shopify")
+        if not self.is_configured:
+            return sync.report
+        items = self.iter_products(limit=limit, report=sync.report)
+        return sync.sync(self.product_payload(item) for item in items)
 
     def sync_inventory(self):
-        return self.import_products()
+        sync = CatalogSyncService("shopify")
+        if not self.is_configured:
+            return sync.report
+        items = self.iter_products(fields=DELTA_FIELDS, report=sync.report)
+        return sync.sync_stock_and_prices(self.stock_payload(item) for item in items)
 
     def sync_orders(self):
         return []
 
     def update_prices(self):
-        return self.import_products()
-
+        return self.sync_inventory()
@@ -5,7 +5,12 @@ from apps.tibo.tasks import shared_task
 
 @shared_task(name="tibo.sync_shopify_products")
 def sync_shopify_products():
-    return len(ShopifyService().import_products())
+    return ShopifyService().import_products().as_dict()
+
+
+@shared_task(name="tibo.sync_shopify_inventory")
+def sync_shopify_inventory():
+    return ShopifyService().sync_inventory().as_dict()
 
 
 @shared_task(name="tibo.sync_amazon_prices")
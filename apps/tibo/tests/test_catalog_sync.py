@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.tibo.models import Inventory, Product, ProductImage
+from apps.tibo.services.shopify_service import ShopifyService
+
+
+def shopify_item(number, price="10.00", quantity=3, title=None):
+    return {
+        "id": 1000 + number,
+        "title": title or f"Produit {number}",
+        "body_html": f"Description {number}",
+        "product_type": f"Rayon {number % 3}",
+        "handle": f"produit-{number}",
+        "variants": [{"price": price, "compare_at_price": None, "inventory_quantity": quantity}],
+        "images": [{"src": f"https://cdn.example.com/{number}-a.jpg"}, {"src": f"https://cdn.example.com/{number}-b.jpg"}],
+    }
+
+
+class FakeResponse:
+    def __init__(self, products, next_url=None):
+        self._products = products
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"products": self._products}
+
+
+class FakeSession:
+    """Sert le catalogue par pages et suit page_info comme l'API Shopify."""
+
+    def __init__(self, items, page_size=4):
+        self.items = items
+        self.page_size = page_size
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls.append((url, params))
+        offset = int(url.split("page_info=")[1]) if "page_info=" in url else 0
+        end = offset + self.page_size
+        next_url = f"https://shop.example.com/products.json?page_info={end}" if end < len(self.items) else None
+        return FakeResponse(self.items[offset:end], next_url)
+
+
+class ShopifyCatalogSyncTests(TestCase):
+    def _service(self, items):
+        service = ShopifyService(shop_domain="shop.example.com", access_token="token")
+        service.session = FakeSession(items)
+        return service
+
+    def test_import_parcourt_toutes_les_pages(self):
+        items = [shopify_item(n) for n in range(10)]
+        service = self._service(items)
+
+        report = service.import_products()
+
+        self.assertEqual((report.pages, report.created), (3, 10))
+        self.assertEqual(len(service.session.calls), 3)
+        self.assertEqual(Product.all_objects.filter(source="shopify").count(), 10)
+        self.assertEqual(Inventory.objects.filter(quantity=3).count(), 10)
+        self.assertEqual(ProductImage.objects.filter(is_primary=True).count(), 10)
+        self.assertEqual(ProductImage.objects.count(), 20)
+        self.assertEqual(len({product.slug for product in Product.all_objects.all()}), 10)
+
+    def test_reimport_ignore_les_produits_inchanges(self):
+        items = [shopify_item(n) for n in range(6)]
+        self._service(items).import_products()
+        items[2] = shopify_item(2, price="12.50", quantity=7, title="Produit 2 revu")
+
+        with CaptureQueriesContext(connection) as queries:
+            report = self._service(items).import_products()
+
+        self.assertEqual((report.updated, report.unchanged, report.created), (1, 5, 0))
+        self.assertLess(len(queries), 15)
+        product = Product.all_objects.get(external_id="1002")
+        self.assertEqual((product.title, product.price), ("Produit 2 revu", Decimal("12.50")))
+        self.assertEqual(product.inventory.quantity, 7)
+        self.assertEqual(product.images.count(), 2)
+
+    def test_nombre_de_requetes_independant_du_catalogue(self):
+        with CaptureQueriesContext(connection) as small:
+            self._service([shopify_item(n) for n in range(4)]).import_products()
+        with CaptureQueriesContext(connection) as large:
+            self._service([shopify_item(n) for n in range(100, 140)]).import_products()
+        # Seuls les GET de pages supplementaires ajoutent des requetes, pas les produits.
+        self.assertLessEqual(len(large), len(small) + 12)
+
+    def test_delta_met_a_jour_prix_et_stock_seulement(self):
+        items = [shopify_item(n) for n in range(5)]
+        self._service(items).import_products()
+        delta = [shopify_item(n, title="Ignore") for n in range(5)]
+        delta[1]["variants"][0].update(price="8.00", inventory_quantity=0)
+        delta.append(shopify_item(99))
+
+        report = self._service(delta).sync_inventory()
+
+        self.assertEqual((report.updated, report.unchanged, report.missing), (1, 4, 1))
+        product = Product.all_objects.get(external_id="1001")
+        self.assertEqual((product.title, product.price), ("Produit 1", Decimal("8.00")))
+        self.assertEqual(product.inventory.quantity, 0)
+        self.assertFalse(Product.all_objects.filter(external_id="1099").exists())
@@ -14,6 +14,7 @@ from .models import (
     BusinessActivationCode,
     BusinessCatalogItem,
     BusinessCatalogItemImage,
+    BusinessDailyStats,
     BusinessLeadEvent,
     BusinessProfile,
     BusinessReview,
@@ -250,6 +251,15 @@ class BusinessLeadEventAdmin(admin.ModelAdmin):
     readonly_fields = ("public_id", "created_at")
 
 
+@admin.register(BusinessDailyStats)
+class BusinessDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ("business", "day", "event_type", "source", "count")
+    list_filter = ("event_type", "source", "day")
+    search_fields = ("business__name",)
+    date_hierarchy = "day"
+    raw_id_fields = ("business",)
+
+
 @admin.register(PaymentRequest)
 class PaymentRequestAdmin(admin.ModelAdmin):
     list_display = ("business", "plan", "requested_by", "method", "amount_xaf", "status", "phone", "whatsapp_contact", "created_at", "confirmed_at")
@@ -0,0 +1,269 @@
+"""
+Compteurs business en écriture différée (write-behind).
+
+Les redirections de tracking (track, go_business, go_slide, vitrine publique) et
+les impressions de l'agent n'écrivent plus en base : elles ajoutent
+  - des incréments de compteurs  (BusinessProfile, HomeAdSlide)
+  - des événements en ajout seul (création de BusinessLeadEvent, IP/UA d'un clic)
+dans un tampon. flush() vide le tampon et applique le tout avec une requête
+UPDATE groupée par modèle/champ et un bulk_create des événements.
+
+Tampon :
+  - Redis (BUSINESS_COUNTERS_REDIS_URL, par défaut le Redis du cache) : partagé
+    entre workers web, vidé par la tâche Celery business.tasks.flush_business_counters
+  - mémoire du processus (dev/tests uniquement) : vidé au fil de l'eau dès que
+    l'intervalle BUSINESS_COUNTERS_FLUSH_SECONDS est écoulé ; perdu au redémarrage
+
+Un échec du vidage au fil de l'eau est journalisé sans faire échouer la requête
+(le tampon est reconstitué) ; seule la tâche Celery propage l'erreur.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE = "profile"
+SLIDE = "slide"
+
+EVENT_COUNTERS = {
+    "view":     ("views_count",),
+    "whatsapp": ("whatsapp_clicks", "leads_count"),
+    "phone":    ("phone_clicks", "leads_count"),
+    "detail":   ("detail_clicks",),
+}
+DEFAULT_EVENT_COUNTERS = ("leads_count",)
+
+
+# ── Tampons ───────────────────────────────────────────────────────────────────
+
+class _MemoryBuffer:
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._events = []
+
+    def incr(self, deltas):
+        with self._lock:
+            self._counters.update(deltas)
+
+    def push(self, record):
+        with self._lock:
+            self._events.append(record)
+
+    def drain(self):
+        with self._lock:
+            counters, self._counters = self._counters, Counter()
+            events, self._events = self._events, []
+        return dict(counters), events
+
+
+class _RedisBuffer:
+    shared = True
+    COUNTERS = "business:counters"
+    EVENTS = "business:events"
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def incr(self, deltas):
+        pipe = self._client.pipeline(transaction=False)
+        for key, delta in deltas.items():
+            pipe.hincrby(self.COUNTERS, key, delta)
+        pipe.execute()
+
+    def push(self, record):
+        self._client.rpush(self.EVENTS, json.dumps(record))
+
+    def drain(self):
+        # MULTI/EXEC : lecture + suppression atomiques, les nouveaux hits vont dans des clés neuves
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hgetall(self.COUNTERS)
+        pipe.delete(self.COUNTERS)
+        pipe.lrange(self.EVENTS, 0, -1)
+        pipe.delete(self.EVENTS)
+        counters, _, events, _ = pipe.execute()
+        return (
+            {key.decode(): int(value) for key, value in counters.items()},
+            [json.loads(raw) for raw in events],
+        )
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                url = getattr(settings, "BUSINESS_COUNTERS_REDIS_URL", "")
+                if not url and not settings.DEBUG:
+                    logger.warning("Business counters: no Redis configured, using a per-process memory buffer")
+                _buffer = _RedisBuffer(url) if url else _MemoryBuffer()
+    return _buffer
+
+
+def _flush_interval():
+    return getattr(settings, "BUSINESS_COUNTERS_FLUSH_SECONDS", 15)
+
+
+# ── Ingestion ─────────────────────────────────────────────────────────────────
+
+def increment(kind, pk, **deltas):
+    """Ajoute des incréments de compteurs (kind = PROFILE ou SLIDE)."""
+    increment_many(kind, [pk], **deltas)
+
+
+def increment_many(kind, pks, **deltas):
+    """Même incrément pour plusieurs objets (ex. impressions des slides de la home)."""
+    items = {f"{kind}:{pk}:{field}": delta for pk in pks for field, delta in deltas.items() if delta}
+    if not items:
+        return
+    buffer = get_buffer()
+    buffer.incr(items)
+    _maybe_flush(buffer)
+
+
+def count_event(business_id, event_type):
+    """Incrémente les compteurs du profil correspondant au type d'événement."""
+    fields = EVENT_COUNTERS.get(event_type, DEFAULT_EVENT_COUNTERS)
+    increment(PROFILE, business_id, **{field: 1 for field in fields})
+
+
+def log_event(business_id, event_type, target_url="", source="chat", metadata=None,
+              ip_address=None, user_agent=""):
+    """Enregistre un BusinessLeadEvent à créer au prochain flush (ajout seul)."""
+    buffer = get_buffer()
+    buffer.push({
+        "op": "create",
+        "business_id": business_id,
+        "event_type": event_type,
+        "target_url": target_url or "",
+        "source": source,
+        "metadata": metadata or {},
+        "ip_address": ip_address,
+        "user_agent": user_agent or "",
+    })
+    _maybe_flush(buffer)
+
+
+def log_hit(event_id, ip_address=None, user_agent=""):
+    """Enregistre l'IP/UA d'un clic sur un événement existant."""
+    if not (ip_address or user_agent):
+        return
+    buffer = get_buffer()
+    buffer.push({"op": "hit", "event_id": event_id, "ip_address": ip_address, "user_agent": user_agent or ""})
+    _maybe_flush(buffer)
+
+
+def _maybe_flush(buffer):
+    if buffer.shared:
+        return
+    if time.monotonic() - _last_flush >= _flush_interval():
+        flush(raise_errors=False)
+
+
+# ── Vidage ────────────────────────────────────────────────────────────────────
+
+def flush(raise_errors=True) -> dict:
+    """
+    Applique le tampon en base. Retourne le nombre de lignes/événements traités.
+    En cas d'erreur, le tampon est reconstitué ; l'exception n'est propagée que si
+    raise_errors (tâche Celery), pas depuis une requête web.
+    """
+    global _last_flush
+    _last_flush = time.monotonic()
+    buffer = get_buffer()
+    counters, events = buffer.drain()
+    if not counters and not events:
+        return {"rows": 0, "events": 0}
+
+    try:
+        with transaction.atomic():
+            rows = _apply_counters(counters)
+            created = _apply_events(events)
+    except Exception as exc:
+        logger.exception("Business counters flush failed, re-buffering: %s", exc)
+        if counters:
+            buffer.incr(counters)
+        for record in events:
+            buffer.push(record)
+        if raise_errors:
+            raise
+        return {"rows": 0, "events": 0}
+    return {"rows": rows, "events": created}
+
+
+def _apply_counters(counters) -> int:
+    from .models import BusinessProfile, HomeAdSlide
+
+    models = {PROFILE: BusinessProfile, SLIDE: HomeAdSlide}
+    by_field = defaultdict(lambda: defaultdict(dict))
+    for key, delta in counters.items():
+        kind, pk, field = key.split(":", 2)
+        if delta and kind in models:
+            by_field[kind][field][int(pk)] = delta
+
+    rows = 0
+    for kind, fields in by_field.items():
+        model = models[kind]
+        pks = set()
+        updates = {}
+        for field, deltas in fields.items():
+            pks.update(deltas)
+            updates[field] = F(field) + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        if kind == PROFILE:
+            updates["updated_at"] = timezone.now()
+        rows += model.objects.filter(pk__in=pks).update(**updates)
+    return rows
+
+
+def _apply_events(events) -> int:
+    from .models import BusinessLeadEvent, BusinessProfile
+
+    creates = [r for r in events if r["op"] == "create"]
+    hits = [r for r in events if r["op"] == "hit"]
+
+    existing = set(
+        BusinessProfile.objects.filter(pk__in={r["business_id"] for r in creates}).order_by().values_list("pk", flat=True)
+    )
+    new_events = [
+        BusinessLeadEvent(
+            business_id=r["business_id"],
+            event_type=r["event_type"],
+            target_url=r["target_url"],
+            source=r["source"],
+            metadata=r["metadata"],
+            ip_address=r["ip_address"],
+            user_agent=r["user_agent"],
+        )
+        for r in creates if r["business_id"] in existing
+    ]
+    # created_at (auto_now_add) prend l'heure du flush : décalage ≤ BUSINESS_COUNTERS_FLUSH_SECONDS
+    BusinessLeadEvent.objects.bulk_create(new_events, batch_size=500)
+
+    if hits:
+        latest = {r["event_id"]: r for r in hits}
+        to_update = list(BusinessLeadEvent.objects.filter(pk__in=latest).order_by().only("pk"))
+        for event in to_update:
+            event.ip_address = latest[event.pk]["ip_address"]
+            event.user_agent = latest[event.pk]["user_agent"]
+        BusinessLeadEvent.objects.bulk_update(to_update, ["ip_address", "user_agent"], batch_size=500)
+    return len(new_events) + len(hits)
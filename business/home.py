@@ -0,0 +1,176 @@
+"""
+Donnees de la page d'accueil, mises en cache dans le cache partage (core.cache).
+
+  home_ad_slides()          → slides publicitaires en ligne (tag HOME_SLIDES_CACHE_TAG)
+  app_promo_slides()        → slides de promotion des applications (meme tag)
+  premium_showcase_items()  → vitrine produits / biens / plats (tag HOME_SHOWCASE_CACHE_TAG)
+
+Les tags sont invalides par business.signals a chaque modification des modeles
+sources ; le TTL borne en plus la fraicheur des compteurs (vues, leads) affiches.
+"""
+from django.db.models import Q
+from django.utils import timezone
+
+from core.cache import cached
+
+from .models import AppPromotionSlide, BusinessCatalogItem, HomeAdSlide
+
+HOME_SLIDES_CACHE_TAG = "home:slides"
+HOME_SHOWCASE_CACHE_TAG = "home:showcase"
+SLIDES_TIMEOUT = 60
+SHOWCASE_TIMEOUT = 60 * 5
+
+
+def home_ad_slides():
+    """Slides actifs et en ligne, sans doublons, dans l'ordre d'affichage."""
+    return cached("home", "ad_slides", _build_home_ad_slides, SLIDES_TIMEOUT, tags=HOME_SLIDES_CACHE_TAG)
+
+
+def app_promo_slides():
+    return cached(
+        "home", "app_promo_slides",
+        lambda: list(AppPromotionSlide.objects.filter(is_active=True).order_by("order", "-created_at")),
+        SLIDES_TIMEOUT, tags=HOME_SLIDES_CACHE_TAG,
+    )
+
+
+def premium_showcase_items():
+    """Elements de la vitrine, du plus recent au plus ancien."""
+    return cached("home", "showcase", _build_showcase_items, SHOWCASE_TIMEOUT, tags=HOME_SHOWCASE_CACHE_TAG)
+
+
+def _build_home_ad_slides():
+    now = timezone.now()
+    untimed_slides = list(
+        HomeAdSlide.objects.filter(is_active=True)
+        .filter(starts_at__isnull=True)
+        .exclude(ends_at__lt=now)
+        .select_related("business")
+        .order_by("order", "-created_at")[:12]
+    )
+    timed_slides = list(
+        HomeAdSlide.objects.filter(is_active=True, starts_at__lte=now)
+        .exclude(ends_at__lt=now)
+        .select_related("business")
+        .order_by("order", "-created_at")[:12]
+    )
+    slide_ids = set()
+    merged_slides = []
+    for slide in untimed_slides + timed_slides:
+        if slide.pk not in slide_ids and slide.is_live:
+            merged_slides.append(slide)
+            slide_ids.add(slide.pk)
+    return merged_slides
+
+
+def _build_showcase_items():
+    now = timezone.now()
+    recent_catalog_items = list(
+        BusinessCatalogItem.objects.filter(is_active=True, business__is_active=True)
+        .select_related("business")
+        .order_by("-created_at")
+    )
+    try:
+        from immobilier_cameroun.models import Bien, StatutBien
+        recent_immo_items = list(
+            Bien.objects.filter(statut=StatutBien.PUBLIE)
+            .filter(Q(est_mis_en_avant=True) | Q(est_coup_de_coeur=True))
+            .prefetch_related("photos")
+            .order_by("-date_publication", "-updated_at")
+        )
+    except Exception:
+        recent_immo_items = []
+    try:
+        from resto.models import Dish
+        recent_dishes = list(
+            Dish.objects.filter(is_active=True, restaurant__is_approved=True, restaurant__is_active=True)
+            .select_related("restaurant", "restaurant__city", "restaurant__neighborhood")
+            .order_by("-id")[:30]
+        )
+    except Exception:
+        recent_dishes = []
+    items = []
+    for item in recent_catalog_items:
+        business = item.business
+        items.append(
+            {
+                "_rank": item.created_at,
+                "tag": item.get_item_type_display(),
+                "title": item.title,
+                "description": item.description,
+                "kind": f"{business.get_module_display()} · {business.city or 'Cameroun'}",
+                "meta": business.district or business.city or "Proche",
+                "price": item.formatted_price,
+                "image": item.image_url,
+                "initial": item.title[:1],
+                "url": f"{business.get_absolute_url()}?produit={item.id}",
+                "contact_url": item.to_public_item().get("contact_url") or business.get_absolute_url(),
+                "views": item.views_count,
+                "leads": business.leads_count,
+            }
+        )
+    for bien in recent_immo_items:
+        photo = getattr(bien, "photo_principale", None)
+        image = ""
+        if photo and getattr(photo, "image", None):
+            try:
+                image = photo.image.url
+            except Exception:
+                image = ""
+        try:
+            contact_url = bien.get_whatsapp_url()
+        except Exception:
+            contact_url = bien.get_absolute_url()
+        items.append(
+            {
+                "_rank": bien.date_publication or bien.updated_at,
+                "tag": "Immobilier",
+                "title": bien.titre,
+                "description": bien.description,
+                "kind": f"{bien.get_type_bien_display()} · {bien.ville}",
+                "meta": bien.quartier or bien.ville or "Cameroun",
+                "price": bien.prix_formate,
+                "image": image,
+                "initial": bien.titre[:1],
+                "url": bien.get_absolute_url(),
+                "contact_url": contact_url,
+                "views": bien.vues,
+                "leads": 0,
+            }
+        )
+    for dish in recent_dishes:
+        image_url = ""
+        if dish.image:
+            try:
+                image_url = dish.image.url
+            except Exception:
+                image_url = ""
+        contact_url = dish.restaurant.whatsapp_url(dish.name)
+        try:
+            from django.urls import reverse
+            detail_url = reverse("resto:restaurant_detail", kwargs={"slug": dish.restaurant.slug})
+        except Exception:
+            detail_url = f"/resto/restaurant/{dish.restaurant.slug}/"
+        items.append(
+            {
+                "_rank": dish.restaurant.created_at,
+                "tag": "Plat",
+                "title": dish.name,
+                "description": dish.description,
+                "kind": f"{dish.restaurant.name} · {dish.restaurant.city.name}",
+                "meta": dish.restaurant.neighborhood.name if dish.restaurant.neighborhood else (dish.restaurant.address or dish.restaurant.city.name),
+                "price": dish.formatted_price,
+                "image": image_url,
+                "initial": dish.name[:1],
+                "url": detail_url,
+                "contact_url": contact_url,
+                "views": dish.restaurant.views_count,
+                "leads": 0,
+            }
+        )
+    items = sorted(
+        items,
+        key=lambda entry: entry.get("_rank") or now,
+        reverse=True,
+    )
+    return items
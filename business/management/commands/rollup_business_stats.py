@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from business.rollups import archive_lead_events, rollup_day
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agregats BusinessDailyStats (backfill) et archive les evenements bruts anciens."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=1, help="Nombre de jours passes a recalculer (defaut : 1)")
+        parser.add_argument(
+            "--archive-before-days", type=int, default=0,
+            help="Archive puis supprime les evenements bruts plus anciens que N jours",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        rows = 0
+        for offset in range(options["days"], -1, -1):
+            rows += rollup_day(today - timedelta(days=offset))
+        self.stdout.write(self.style.SUCCESS(f"{rows} ligne(s) d'agregats sur {options['days'] + 1} jour(s)."))
+
+        if options["archive_before_days"]:
+            archived = archive_lead_events(today - timedelta(days=options["archive_before_days"]))
+            self.stdout.write(self.style.SUCCESS(f"{archived} evenement(s) brut(s) archive(s)."))
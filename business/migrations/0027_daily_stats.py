@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-17 20:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0026_businessprofile_expiry_reminder_sent_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('event_type', models.CharField(choices=[('view', 'Vue'), ('whatsapp', 'WhatsApp'), ('phone', 'Appel'), ('detail', 'Details'), ('order', 'Commande')], max_length=20)),
+                ('source', models.CharField(max_length=40)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Statistique journaliere business',
+                'verbose_name_plural': 'Statistiques journalieres business',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='businessleadevent',
+            index=models.Index(fields=['created_at'], name='business_lead_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessleadevent',
+            index=models.Index(fields=['business', 'created_at'], name='business_lead_biz_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='businessdailystats',
+            name='business',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='business.businessprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='businessdailystats',
+            index=models.Index(fields=['day'], name='business_daily_stats_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='businessdailystats',
+            constraint=models.UniqueConstraint(fields=('business', 'day', 'event_type', 'source'), name='business_daily_stats_unique'),
+        ),
+    ]
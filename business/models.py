@@ -578,6 +578,10 @@ class BusinessLeadEvent(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Demande/clic business"
         verbose_name_plural = "Demandes/clics business"
+        indexes = [
+            models.Index(fields=["created_at"], name="business_lead_created_idx"),
+            models.Index(fields=["business", "created_at"], name="business_lead_biz_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.get_event_type_display()} - {self.business.name}"
@@ -586,6 +590,37 @@ class BusinessLeadEvent(models.Model):
         return reverse("business:track", kwargs={"public_id": self.public_id})
 
 
+class BusinessDailyStats(models.Model):
+    """
+    Agregat journalier des BusinessLeadEvent (fiche, jour, action, source → nombre).
+    Alimente par business.tasks.rollup_business_daily_stats ; les rapports lisent
+    ces lignes au lieu de recompter les evenements bruts.
+    """
+
+    business = models.ForeignKey(BusinessProfile, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    event_type = models.CharField(max_length=20, choices=BusinessLeadEvent.EventType.choices)
+    source = models.CharField(max_length=40)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        verbose_name = "Statistique journaliere business"
+        verbose_name_plural = "Statistiques journalieres business"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["business", "day", "event_type", "source"],
+                name="business_daily_stats_unique",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="business_daily_stats_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.business_id} {self.day} {self.event_type}/{self.source}: {self.count}"
+
+
 class PaymentRequest(models.Model):
     """Demande de paiement adaptée terrain: cash, reception, Mobile Money manuel."""
 
@@ -3,35 +3,51 @@ from io import BytesIO
 from django.utils import timezone
 
 from .models import BusinessLeadEvent
+from .rollups import day_bounds, event_stats, event_totals
 
+CONTACT_EVENTS = (
+    BusinessLeadEvent.EventType.WHATSAPP,
+    BusinessLeadEvent.EventType.PHONE,
+    BusinessLeadEvent.EventType.ORDER,
+)
 
-def business_report_context(business, days: int = 30):
-    since = timezone.now() - timezone.timedelta(days=days)
-    events = business.lead_events.filter(created_at__gte=since)
-    views = events.filter(event_type=BusinessLeadEvent.EventType.VIEW).count()
-    contacts = events.filter(
-        event_type__in=[
-            BusinessLeadEvent.EventType.WHATSAPP,
-            BusinessLeadEvent.EventType.PHONE,
-            BusinessLeadEvent.EventType.ORDER,
-        ]
-    ).count()
-    details = events.filter(event_type=BusinessLeadEvent.EventType.DETAIL).count()
-    total = events.count()
-    event_stats = list(events.values("event_type").order_by("event_type"))
+
+def report_window(days: int = 30, start=None, end=None):
+    """Fenetre (start, end, nb_jours) : dates explicites, sinon les `days` derniers jours."""
+    end = end or timezone.localdate()
+    start = start or end - timezone.timedelta(days=days - 1)
+    if start > end:
+        start, end = end, start
+    return start, end, (end - start).days + 1
+
+
+def business_report_context(business, days: int = 30, start=None, end=None):
+    start, end, days = report_window(days, start, end)
+    totals = event_totals(business, start, end)
+    views = totals.get(BusinessLeadEvent.EventType.VIEW, 0)
+    contacts = sum(totals.get(event_type, 0) for event_type in CONTACT_EVENTS)
+    details = totals.get(BusinessLeadEvent.EventType.DETAIL, 0)
+    total = sum(totals.values())
     summary = (
         f"Rapport E-Shelle {days} jours pour {business.name}: "
         f"{views} vues IA/home, {contacts} contacts, {details} clics detail, "
         f"plan actuel: {business.get_plan_display()}."
     )
+    # Evenements bruts : uniquement pour la liste des derniers evenements (LIMIT)
+    events = business.lead_events.filter(
+        created_at__gte=day_bounds(start)[0], created_at__lt=day_bounds(end)[1],
+    )
     return {
         "events": events,
+        "event_stats": event_stats(totals),
         "views": views,
         "contacts": contacts,
         "details": details,
         "total": total,
         "summary": summary,
         "days": days,
+        "start": start,
+        "end": end,
     }
 
 
@@ -74,7 +90,11 @@ def render_business_report_pdf(business, context: dict) -> bytes:
     story = [
         Paragraph("Rapport de performance E-Shelle", title_style),
         Paragraph(f"<b>{business.name}</b> - {business.get_module_display()} - {business.city or 'Ville non renseignee'}", normal),
-        Paragraph(f"Periode analysee : {context['days']} jours", normal),
+        Paragraph(
+            f"Periode analysee : {context['days']} jours "
+            f"({context['start']:%d/%m/%Y} - {context['end']:%d/%m/%Y})",
+            normal,
+        ),
         Spacer(1, 0.35 * cm),
     ]
 
@@ -0,0 +1,137 @@
+"""
+Agregats journaliers des evenements business (BusinessDailyStats).
+
+  rollup_day(day)              → recalcule les lignes d'un jour depuis les evenements bruts
+  rollup_recent(days_back)     → aujourd'hui + les days_back jours precedents (tache horaire)
+  event_totals(business, ...)  → {event_type: total} sur une fenetre de dates quelconque
+  archive_lead_events(before)  → exporte (JSONL gzip) puis supprime les evenements bruts
+                                 anterieurs a before, apres avoir fige leurs agregats
+
+Les jours passes sont lus dans les agregats (une ligne par action/source et par
+jour) ; le jour courant, encore incomplet, est compte sur les evenements bruts.
+"""
+import gzip
+import json
+import logging
+from datetime import datetime, time, timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.utils import timezone
+
+from .models import BusinessDailyStats, BusinessLeadEvent
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = "business/lead_events_archive"
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def rollup_day(day) -> int:
+    """Recalcule (idempotent) les agregats d'un jour. Retourne le nombre de lignes."""
+    start, end = day_bounds(day)
+    rows = (
+        BusinessLeadEvent.objects.filter(created_at__gte=start, created_at__lt=end)
+        .values("business_id", "event_type", "source")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    stats = [
+        BusinessDailyStats(
+            business_id=row["business_id"],
+            day=day,
+            event_type=row["event_type"],
+            source=row["source"],
+            count=row["total"],
+        )
+        for row in rows
+    ]
+    if not stats:
+        # Jour sans evenement brut (ou deja archive) : les agregats existants font foi
+        return 0
+    with transaction.atomic():
+        BusinessDailyStats.objects.filter(day=day).delete()
+        BusinessDailyStats.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+def rollup_recent(days_back: int = 1) -> int:
+    today = timezone.localdate()
+    return sum(rollup_day(today - timedelta(days=offset)) for offset in range(days_back, -1, -1))
+
+
+def event_totals(business, start, end) -> dict:
+    """
+    Totaux par action entre start et end (dates incluses), en deux requetes
+    au plus quelle que soit la longueur de la fenetre. business=None → toutes les fiches.
+    """
+    scope = {"business": business} if business is not None else {}
+    today = timezone.localdate()
+    totals = {}
+    last_rolled = min(end, today - timedelta(days=1))
+    if start <= last_rolled:
+        rows = (
+            BusinessDailyStats.objects.filter(day__gte=start, day__lte=last_rolled, **scope)
+            .values("event_type")
+            .annotate(total=Sum("count"))
+            .order_by()
+        )
+        for row in rows:
+            totals[row["event_type"]] = row["total"]
+    if start <= today <= end:
+        live_start, live_end = day_bounds(today)
+        rows = (
+            BusinessLeadEvent.objects.filter(created_at__gte=live_start, created_at__lt=live_end, **scope)
+            .values("event_type")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            totals[row["event_type"]] = totals.get(row["event_type"], 0) + row["total"]
+    return totals
+
+
+def event_stats(totals: dict) -> list:
+    """Lignes {event_type, total} triees, au format attendu par les templates."""
+    rows = [{"event_type": event_type, "total": total} for event_type, total in totals.items() if total]
+    return sorted(rows, key=lambda row: (-row["total"], row["event_type"]))
+
+
+def archive_lead_events(before) -> int:
+    """
+    Archive jour par jour les evenements bruts anterieurs a la date before :
+    agregats recalcules, export JSONL gzip dans le stockage par defaut, suppression.
+    """
+    oldest = BusinessLeadEvent.objects.aggregate(first=Min("created_at"))["first"]
+    if not oldest:
+        return 0
+
+    archived = 0
+    day = timezone.localtime(oldest).date()
+    while day < before:
+        start, end = day_bounds(day)
+        events = BusinessLeadEvent.objects.filter(created_at__gte=start, created_at__lt=end)
+        if events.exists():
+            rollup_day(day)
+            lines = [
+                json.dumps(row, default=str)
+                for row in events.order_by("created_at").values(
+                    "public_id", "business_id", "event_type", "source", "target_url",
+                    "metadata", "ip_address", "user_agent", "created_at",
+                ).iterator(chunk_size=2000)
+            ]
+            path = f"{ARCHIVE_DIR}/{day:%Y/%m}/{day.isoformat()}.jsonl.gz"
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            default_storage.save(path, ContentFile(gzip.compress("\n".join(lines).encode())))
+            deleted, _ = events.delete()
+            archived += deleted
+            logger.info("Archived %s business lead event(s) for %s", deleted, day)
+        day += timedelta(days=1)
+    return archived
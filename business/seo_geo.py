@@ -6,8 +6,14 @@ from django.shortcuts import render
 from django.urls import reverse
 from django.utils.text import slugify
 
+from core.cache import cached, cached_view
+
 from .models import BusinessProfile
 
+# Tag du cache partagé invalidé à chaque modification d'une fiche (voir BusinessConfig.ready)
+PROFILES_CACHE_TAG = "business:profiles"
+SEO_CACHE_TIMEOUT = 60 * 15
+
 
 SEO_SERVICE_MAP = {
     "restaurants": {
@@ -103,13 +109,15 @@ SEO_SERVICE_MAP = {
 }
 
 
+@cached_view("business", timeout=SEO_CACHE_TIMEOUT, tags=PROFILES_CACHE_TAG)
 def geo_index(request):
     cities = _available_cities()
     services = SEO_SERVICE_MAP
     popular_pages = []
     for city in cities[:8]:
+        counts = _service_counts(city["slug"])
         for service_slug, service in services.items():
-            count = _business_qs(city["slug"], service_slug).count()
+            count = counts.get(service_slug, 0)
             if count:
                 popular_pages.append({"city": city, "service_slug": service_slug, "service": service, "count": count})
     return render(
@@ -124,6 +132,7 @@ def geo_index(request):
     )
 
 
+@cached_view("business", timeout=SEO_CACHE_TIMEOUT, tags=PROFILES_CACHE_TAG)
 def geo_landing(request, city_slug, service_slug):
     service = SEO_SERVICE_MAP.get(service_slug)
     if not service:
@@ -166,38 +175,65 @@ def geo_landing(request, city_slug, service_slug):
     )
 
 
+def _city_filter(city_slug):
+    return Q(city__iexact=city_slug.replace("-", " ")) | Q(city__iexact=_city_name_from_slug(city_slug))
+
+
 def _business_qs(city_slug, service_slug):
     service = SEO_SERVICE_MAP[service_slug]
-    city_filter = Q(city__iexact=city_slug.replace("-", " ")) | Q(city__iexact=_city_name_from_slug(city_slug))
     return (
         BusinessProfile.objects.filter(is_active=True, module=service["module"])
-        .filter(city_filter)
+        .filter(_city_filter(city_slug))
         .order_by("-plan", "-boost_expires_at", "-leads_count", "-views_count", "name")
     )
 
 
 def _available_cities():
-    rows = (
-        BusinessProfile.objects.filter(is_active=True)
-        .exclude(city="")
-        .values("city")
-        .annotate(total=Count("id"))
-        .order_by("-total", "city")
-    )
-    return [{"name": row["city"], "slug": slugify(row["city"]), "total": row["total"]} for row in rows]
+    def build():
+        rows = (
+            BusinessProfile.objects.filter(is_active=True)
+            .exclude(city="")
+            .values("city")
+            .annotate(total=Count("id"))
+            .order_by("-total", "city")
+        )
+        return [{"name": row["city"], "slug": slugify(row["city"]), "total": row["total"]} for row in rows]
+
+    return cached("business", "seo:cities", build, SEO_CACHE_TIMEOUT, tags=PROFILES_CACHE_TAG)
 
 
 def _city_name_from_slug(city_slug):
-    match = BusinessProfile.objects.filter(city__iexact=city_slug.replace("-", " ")).values_list("city", flat=True).first()
-    return match or city_slug.replace("-", " ").title()
+    def build():
+        match = BusinessProfile.objects.filter(city__iexact=city_slug.replace("-", " ")).values_list("city", flat=True).first()
+        return match or city_slug.replace("-", " ").title()
+
+    return cached("business", f"seo:city:{city_slug}", build, SEO_CACHE_TIMEOUT, tags=PROFILES_CACHE_TAG)
+
+
+def _service_counts(city_slug):
+    """Nombre de fiches actives par service SEO dans une ville, en une requête groupée par module."""
+    def build():
+        modules = {service["module"] for service in SEO_SERVICE_MAP.values()}
+        rows = (
+            BusinessProfile.objects.filter(is_active=True, module__in=modules)
+            .filter(_city_filter(city_slug))
+            .values("module")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        by_module = {row["module"]: row["total"] for row in rows}
+        return {slug: by_module.get(service["module"], 0) for slug, service in SEO_SERVICE_MAP.items()}
+
+    return cached("business", f"seo:counts:{city_slug}", build, SEO_CACHE_TIMEOUT, tags=PROFILES_CACHE_TAG)
 
 
 def _related_pages(city_slug, current_service_slug):
+    counts = _service_counts(city_slug)
     pages = []
     for slug, service in SEO_SERVICE_MAP.items():
         if slug == current_service_slug:
             continue
-        count = _business_qs(city_slug, slug).count()
+        count = counts.get(slug, 0)
         if count:
             pages.append({"slug": slug, "service": service, "count": count})
     return pages[:8]
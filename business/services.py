@@ -3,6 +3,7 @@ from django.db import transaction
 from django.urls import reverse
 from django.utils import timezone
 
+from .counters import count_event, log_event, log_hit
 from .models import BusinessCatalogItem, BusinessLeadEvent, BusinessProfile
 
 
@@ -105,45 +106,40 @@ def record_business_impression(
     source: str = "chat",
     metadata: dict | None = None,
 ) -> None:
-    """Compte une vue quand une fiche business est affichee dans l'agent."""
-    event = create_tracking_event(
-        business,
-        BusinessLeadEvent.EventType.VIEW,
-        "",
+    """Compte une vue quand une fiche business est affichee dans l'agent (ecriture differee)."""
+    record_lead(business, BusinessLeadEvent.EventType.VIEW, "", source=source, metadata=metadata)
+
+
+def record_lead(
+    business: BusinessProfile,
+    event_type: str,
+    target_url: str,
+    source: str = "chat",
+    metadata: dict | None = None,
+    request=None,
+) -> str:
+    """
+    Compte un lead sans toucher a la ligne BusinessProfile : l'evenement et les
+    increments partent dans le tampon de business.counters, vide periodiquement.
+    """
+    count_event(business.pk, event_type)
+    log_event(
+        business.pk,
+        event_type,
+        target_url,
         source=source,
-        metadata=metadata or {},
+        metadata=metadata,
+        ip_address=_client_ip(request) if request else None,
+        user_agent=request.META.get("HTTP_USER_AGENT", "")[:300] if request else "",
     )
-    record_event_hit(event)
+    return target_url or "/"
 
 
-@transaction.atomic
 def record_event_hit(event: BusinessLeadEvent, request=None) -> str:
-    """Compte le clic puis retourne l'URL finale."""
-    business = BusinessProfile.objects.select_for_update().get(pk=event.business_id)
-
-    if event.event_type == BusinessLeadEvent.EventType.VIEW:
-        business.views_count += 1
-        fields = ["views_count", "updated_at"]
-    elif event.event_type == BusinessLeadEvent.EventType.WHATSAPP:
-        business.whatsapp_clicks += 1
-        business.leads_count += 1
-        fields = ["whatsapp_clicks", "leads_count", "updated_at"]
-    elif event.event_type == BusinessLeadEvent.EventType.PHONE:
-        business.phone_clicks += 1
-        business.leads_count += 1
-        fields = ["phone_clicks", "leads_count", "updated_at"]
-    elif event.event_type == BusinessLeadEvent.EventType.DETAIL:
-        business.detail_clicks += 1
-        fields = ["detail_clicks", "updated_at"]
-    else:
-        business.leads_count += 1
-        fields = ["leads_count", "updated_at"]
-
-    business.save(update_fields=fields)
+    """Compte le clic (ecriture differee) puis retourne l'URL finale."""
+    count_event(event.business_id, event.event_type)
     if request:
-        event.ip_address = _client_ip(request)
-        event.user_agent = request.META.get("HTTP_USER_AGENT", "")[:300]
-        event.save(update_fields=["ip_address", "user_agent"])
+        log_hit(event.pk, _client_ip(request), request.META.get("HTTP_USER_AGENT", "")[:300])
     return event.target_url or "/"
 
 
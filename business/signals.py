@@ -194,3 +194,19 @@ if Bien:
                 "description": instance.description,
             },
         )
+
+
+# ── Invalidation du cache partagé (pages SEO locales, accueil) ─────────────────
+
+from core.cache import invalidate_on  # noqa: E402
+
+from .home import HOME_SHOWCASE_CACHE_TAG, HOME_SLIDES_CACHE_TAG  # noqa: E402
+from .seo_geo import PROFILES_CACHE_TAG  # noqa: E402
+
+invalidate_on(PROFILES_CACHE_TAG, "business.BusinessProfile")
+invalidate_on(HOME_SLIDES_CACHE_TAG, "business.HomeAdSlide", "business.AppPromotionSlide")
+invalidate_on(
+    HOME_SHOWCASE_CACHE_TAG,
+    "business.BusinessCatalogItem",
+    *[model for model in (Restaurant, Bien, _model("resto", "Dish")) if model],
+)
@@ -85,3 +85,48 @@ def downgrade_expired_businesses():
 
     log.info(f"downgrade_expired_businesses: {count} fiche(s) retrogradee(s) en Gratuit.")
     return count
+
+
+@shared_task(ignore_result=True)
+def flush_business_counters():
+    """
+    Vide le tampon des compteurs business (clics, vues, impressions, evenements)
+    vers la base : un UPDATE groupe par modele et un bulk_create des evenements.
+    """
+    from business.counters import flush
+
+    result = flush()
+    if result["rows"] or result["events"]:
+        log.info(f"flush_business_counters: {result['rows']} ligne(s), {result['events']} evenement(s).")
+    return result
+
+
+@shared_task(ignore_result=True)
+def rollup_business_daily_stats(days_back=1):
+    """
+    Met a jour les agregats BusinessDailyStats du jour et des days_back jours
+    precedents (la veille est ainsi figee apres minuit).
+    """
+    from business.rollups import rollup_recent
+
+    rows = rollup_recent(days_back)
+    log.info(f"rollup_business_daily_stats: {rows} ligne(s) d'agregats.")
+    return rows
+
+
+@shared_task(ignore_result=True)
+def archive_business_lead_events():
+    """
+    Archive les evenements bruts plus anciens que BUSINESS_LEAD_EVENT_RETENTION_DAYS
+    (0 = conservation illimitee). Les rapports continuent de lire les agregats.
+    """
+    from django.conf import settings
+
+    from business.rollups import archive_lead_events
+
+    retention = getattr(settings, "BUSINESS_LEAD_EVENT_RETENTION_DAYS", 0)
+    if not retention:
+        return 0
+    archived = archive_lead_events(timezone.localdate() - timedelta(days=retention))
+    log.info(f"archive_business_lead_events: {archived} evenement(s) archive(s).")
+    return archived
@@ -1,3 +1,186 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.storage import default_storage
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import counters
+from .models import BusinessDailyStats, BusinessLeadEvent, BusinessProfile
+from .reporting import business_report_context
+from .rollups import archive_lead_events, event_totals, rollup_recent
+from .services import create_tracking_event, record_business_impression
+
+
+@override_settings(BUSINESS_COUNTERS_REDIS_URL="", BUSINESS_COUNTERS_FLUSH_SECONDS=3600)
+class WriteBehindCountersTests(TestCase):
+    def setUp(self):
+        counters._buffer = None
+        self.addCleanup(setattr, counters, "_buffer", None)
+        self.business = BusinessProfile.objects.create(
+            module=BusinessProfile.Module.RESTO, name="Chez Mama", whatsapp="699000000",
+        )
+
+    def test_clicks_are_buffered_until_flush(self):
+        response = self.client.get(
+            reverse("business:go_business", args=[self.business.pk, "whatsapp"]),
+            HTTP_USER_AGENT="pytest",
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].startswith("https://wa.me/237699000000"))
+
+        self.business.refresh_from_db()
+        self.assertEqual((self.business.views_count, self.business.whatsapp_clicks), (0, 0))
+        self.assertFalse(BusinessLeadEvent.objects.exists())
+
+        counters.flush()
+        self.business.refresh_from_db()
+        self.assertEqual(self.business.views_count, 1)
+        self.assertEqual(self.business.whatsapp_clicks, 1)
+        self.assertEqual(self.business.leads_count, 1)
+        event = BusinessLeadEvent.objects.get()
+        self.assertEqual((event.event_type, event.source, event.user_agent), ("whatsapp", "home", "pytest"))
+
+    def test_flush_applies_accumulated_increments_in_bulk(self):
+        other = BusinessProfile.objects.create(module=BusinessProfile.Module.GAZ, name="Gaz Rapide")
+        for _ in range(3):
+            record_business_impression(self.business, source="central_agent")
+        record_business_impression(other)
+        tracked = create_tracking_event(self.business, BusinessLeadEvent.EventType.PHONE, "https://e-shelle.com/appel/")
+        self.client.get(tracked.tracking_url(), REMOTE_ADDR="10.0.0.1")
+
+        with self.assertNumQueries(7):
+            result = counters.flush()
+        self.assertEqual(result, {"rows": 2, "events": 5})
+
+        self.business.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.business.views_count, self.business.phone_clicks, self.business.leads_count), (3, 1, 1))
+        self.assertEqual(other.views_count, 1)
+        tracked.refresh_from_db()
+        self.assertEqual(tracked.ip_address, "10.0.0.1")
+        self.assertEqual(counters.flush(), {"rows": 0, "events": 0})
+
+    @override_settings(BUSINESS_COUNTERS_FLUSH_SECONDS=0)
+    def test_inline_flush_error_keeps_redirect_and_buffer(self):
+        url = reverse("business:go_business", args=[self.business.pk, "whatsapp"])
+        with mock.patch.object(counters, "_apply_counters", side_effect=DatabaseError("base indisponible")):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+        with mock.patch.object(counters, "_apply_counters", side_effect=DatabaseError("base indisponible")):
+            with self.assertRaises(DatabaseError):
+                counters.flush()
+
+        counters.flush()
+        self.business.refresh_from_db()
+        self.assertEqual(self.business.whatsapp_clicks, 1)
+
+
+@override_settings(STORAGES={
+    "default":     {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class DailyStatsRollupTests(TestCase):
+    def setUp(self):
+        self.business = BusinessProfile.objects.create(module=BusinessProfile.Module.RESTO, name="Chez Mama")
+        self.today = timezone.localdate()
+        now = timezone.now()
+        for days_ago, event_type, source in [
+            (0, "view", "chat"),
+            (0, "whatsapp", "home"),
+            (1, "view", "chat"),
+            (1, "view", "chat"),
+            (2, "phone", "chat"),
+            (20, "detail", "home"),
+        ]:
+            event = create_tracking_event(self.business, event_type, "", source=source)
+            BusinessLeadEvent.objects.filter(pk=event.pk).update(created_at=now - timedelta(days=days_ago))
+        rollup_recent(days_back=30)
+
+    def test_report_reads_rollups_plus_live_day(self):
+        self.assertEqual(
+            BusinessDailyStats.objects.get(business=self.business, day=self.today - timedelta(days=1)).count, 2,
+        )
+        with self.assertNumQueries(2):
+            totals = event_totals(self.business, self.today - timedelta(days=6), self.today)
+        self.assertEqual(totals, {"view": 3, "whatsapp": 1, "phone": 1})
+
+        context = business_report_context(self.business, days=7)
+        self.assertEqual((context["views"], context["contacts"], context["details"], context["total"]), (3, 2, 0, 5))
+
+        start = self.today - timedelta(days=25)
+        context = business_report_context(self.business, start=start, end=self.today - timedelta(days=2))
+        self.assertEqual((context["days"], context["total"]), (24, 2))
+
+    def test_performance_report_accepts_date_window(self):
+        from django.contrib.auth import get_user_model
+
+        owner = get_user_model().objects.create_user(username="mama", password="secret123")
+        BusinessProfile.objects.filter(pk=self.business.pk).update(owner=owner)
+        self.client.force_login(owner)
+        url = reverse("business:performance_report", args=[self.business.pk])
+        response = self.client.get(url, {"start": (self.today - timedelta(days=1)).isoformat(), "end": self.today.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["days"], 2)
+        self.assertEqual({row["event_type"]: row["total"] for row in response.context["event_stats"]}, {"view": 3, "whatsapp": 1})
+
+        response = self.client.get(reverse("business:performance_report_pdf", args=[self.business.pk]), {"days": 30})
+        self.assertEqual(response["Content-Type"], "application/pdf")
+
+    def test_archive_keeps_rollups_and_exports_raw_events(self):
+        archived = archive_lead_events(self.today - timedelta(days=1))
+        self.assertEqual(archived, 2)
+        self.assertEqual(BusinessLeadEvent.objects.count(), 4)
+        old_day = self.today - timedelta(days=20)
+        self.assertTrue(default_storage.exists(f"business/lead_events_archive/{old_day:%Y/%m}/{old_day.isoformat()}.jsonl.gz"))
+
+        rollup_recent(days_back=30)
+        context = business_report_context(self.business, days=30)
+        self.assertEqual((context["details"], context["total"]), (1, 6))
+
+
+class SharedCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.url = reverse("business:geo_landing", args=["douala", "restaurants"])
+        BusinessProfile.objects.create(module=BusinessProfile.Module.RESTO, name="Chez Mama", city="Douala")
+
+    def test_anonymous_landing_is_cached_until_a_profile_changes(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertNotIn(b"__cached_view_csrf_token__", second.content)
+        self.assertIn("csrftoken", second.cookies)
+
+        BusinessProfile.objects.create(module=BusinessProfile.Module.RESTO, name="Le Wouri", city="Douala")
+        third = self.client.get(self.url)
+        self.assertEqual(third["X-Cache"], "MISS")
+        self.assertContains(third, "Le Wouri")
+
+    def test_variants_by_host_and_authenticated_bypass(self):
+        from django.contrib.auth import get_user_model
+
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_HOST="www.e-shelle.com")["X-Cache"], "MISS")
+
+        self.client.force_login(get_user_model().objects.create_user(username="mama", password="secret123"))
+        self.assertNotIn("X-Cache", self.client.get(self.url))
+
+    def test_hit_miss_metrics_are_exposed_to_staff(self):
+        from django.contrib.auth import get_user_model
+
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.client.force_login(
+            get_user_model().objects.create_user(username="admin", password="secret123", is_staff=True)
+        )
+        stats = self.client.get(reverse("cache_stats")).json()["namespaces"]
+        self.assertGreaterEqual(stats["business"]["hits"], 1)
+        self.assertGreaterEqual(stats["business"]["misses"], 1)
@@ -42,8 +42,10 @@ from .models import (
 )
 from .ai_delivery import generate_client_ai_kit, kit_summary_for_whatsapp
 from .ai_arsenal import arsenal_agents, arsenal_stats, fidelisation_agent, opportunites_agent
-from .reporting import business_report_context, render_business_report_pdf
-from .services import collect_business_items, create_tracking_event, record_event_hit
+from .reporting import CONTACT_EVENTS, business_report_context, render_business_report_pdf, report_window
+from .rollups import event_stats as rollup_event_stats, event_totals
+from .counters import PROFILE, SLIDE, increment
+from .services import collect_business_items, record_event_hit, record_lead
 
 
 BUSINESS_KEY_PRICE_XAF = 9900
@@ -578,9 +580,8 @@ def go_business(request, business_id, event_type):
     event_kind = allowed.get(event_type, BusinessLeadEvent.EventType.DETAIL)
     target_url = _business_public_target(business, event_kind)
     if event_kind != BusinessLeadEvent.EventType.VIEW:
-        BusinessProfile.objects.filter(pk=business.pk).update(views_count=F("views_count") + 1)
-    event = create_tracking_event(business, event_kind, target_url, source="home")
-    return redirect(record_event_hit(event, request=request))
+        increment(PROFILE, business.pk, views_count=1)
+    return redirect(record_lead(business, event_kind, target_url, source="home", request=request))
 
 
 @require_GET
@@ -588,17 +589,17 @@ def go_slide(request, slide_id):
     """Clic sur un slide publicitaire de la home."""
     slide = get_object_or_404(HomeAdSlide.objects.select_related("business"), pk=slide_id, is_active=True)
     target_url = slide.destination_url()
-    HomeAdSlide.objects.filter(pk=slide.pk).update(clicks_count=F("clicks_count") + 1)
+    increment(SLIDE, slide.pk, clicks_count=1)
     if slide.business:
-        BusinessProfile.objects.filter(pk=slide.business_id).update(views_count=F("views_count") + 1)
-        event = create_tracking_event(
+        increment(PROFILE, slide.business_id, views_count=1)
+        target_url = record_lead(
             slide.business,
             BusinessLeadEvent.EventType.ORDER,
             target_url,
             source="home_slide",
             metadata={"slide_id": slide.pk, "slide_title": slide.title},
+            request=request,
         )
-        target_url = record_event_hit(event, request=request)
     return redirect(target_url)
 
 
@@ -620,7 +621,7 @@ def _business_public_target(business, event_kind):
 def public_profile(request, public_slug):
     """Vitrine publique centrale d'une activite E-Shelle."""
     business = get_object_or_404(BusinessProfile, public_slug=public_slug, is_active=True)
-    BusinessProfile.objects.filter(pk=business.pk).update(views_count=F("views_count") + 1)
+    increment(PROFILE, business.pk, views_count=1)
     source_object = business.content_object
     source_url = ""
     if source_object and hasattr(source_object, "get_absolute_url"):
@@ -1464,7 +1465,7 @@ def eshelle_command_center(request):
         ]
     )
     businesses = BusinessProfile.objects.filter(is_active=True)
-    lead_events = BusinessLeadEvent.objects.filter(created_at__gte=since)
+    lead_totals = event_totals(None, *report_window(days)[:2])
 
     query_logs = CentralAgentQueryLog.objects.filter(created_at__gte=since) if CentralAgentQueryLog else []
     query_count = query_logs.count() if CentralAgentQueryLog else 0
@@ -1526,7 +1527,7 @@ def eshelle_command_center(request):
         "hot": open_requests.filter(lead_score__gte=80).count(),
         "sold": UnmetSearchRequest.objects.filter(status=UnmetSearchRequest.Status.SOLD, updated_at__gte=since).count(),
         "pipeline_value": open_requests.aggregate(total=Sum("estimated_value_xaf"))["total"] or 0,
-        "contacts": lead_events.filter(event_type__in=[BusinessLeadEvent.EventType.WHATSAPP, BusinessLeadEvent.EventType.PHONE, BusinessLeadEvent.EventType.ORDER]).count(),
+        "contacts": sum(lead_totals.get(event_type, 0) for event_type in CONTACT_EVENTS),
         "active_partners": partner_accounts.count(),
         "providers": businesses.count(),
     }
@@ -2172,13 +2173,8 @@ def dashboard(request):
         share_text = f"Decouvrez {current.name} sur E-Shelle: {public_url}"
         share_whatsapp_url = f"https://wa.me/?text={urllib.parse.quote(share_text)}"
         whatsapp_url = current.whatsapp_url(f"Bonjour {current.name}, je viens de votre boutique E-Shelle: {public_url}")
-        filtered_events = current.lead_events.filter(created_at__gte=since)
-        recent_events = filtered_events.order_by("-created_at")[:12]
-        event_stats = (
-            filtered_events.values("event_type")
-            .annotate(total=Count("id"))
-            .order_by("-total")
-        )
+        recent_events = current.lead_events.filter(created_at__gte=since).order_by("-created_at")[:12]
+        event_stats = rollup_event_stats(event_totals(current, *report_window(days)[:2]))
         chart_stats = _event_chart_stats(event_stats)
         marketing_pack = _build_marketing_pack(current)
     return render(
@@ -2371,12 +2367,9 @@ def redeem_activation_code(request):
 def performance_report(request, business_id):
     """Rapport prestataire imprimable/partageable."""
     business = get_object_or_404(BusinessProfile, pk=business_id, owner=request.user)
-    days = _positive_int(request.GET.get("days"), 30)
-    since = timezone.now() - timezone.timedelta(days=days)
-    report_context = business_report_context(business, days)
-    filtered_events = report_context["events"]
-    events = filtered_events.order_by("-created_at")[:80]
-    event_stats = filtered_events.values("event_type").annotate(total=Count("id")).order_by("-total")
+    report_context = business_report_context(business, *_report_dates(request))
+    events = report_context["events"].order_by("-created_at")[:80]
+    event_stats = report_context["event_stats"]
     chart_stats = _event_chart_stats(event_stats)
     report_text = report_context["summary"]
     import urllib.parse
@@ -2391,7 +2384,9 @@ def performance_report(request, business_id):
             "chart_stats": chart_stats,
             "report_text": report_text,
             "whatsapp_url": whatsapp_url,
-            "days": days,
+            "days": report_context["days"],
+            "start": report_context["start"],
+            "end": report_context["end"],
         },
     )
 
@@ -2399,10 +2394,12 @@ def performance_report(request, business_id):
 @login_required
 def performance_report_pdf(request, business_id):
     business = get_object_or_404(BusinessProfile, pk=business_id, owner=request.user)
-    days = _positive_int(request.GET.get("days"), 30)
-    report_context = business_report_context(business, days)
+    report_context = business_report_context(business, *_report_dates(request))
     pdf = render_business_report_pdf(business, report_context)
-    filename = f"rapport-e-shelle-{business.slug or business.id}-{days}j.pdf"
+    filename = (
+        f"rapport-e-shelle-{business.slug or business.id}-"
+        f"{report_context['start']:%Y%m%d}-{report_context['end']:%Y%m%d}.pdf"
+    )
     response = HttpResponse(pdf, content_type="application/pdf")
     response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
@@ -2448,6 +2445,19 @@ def _event_chart_stats(event_stats):
     ]
 
 
+def _report_dates(request):
+    """(days, start, end) d'un rapport : ?start=AAAA-MM-JJ&end=AAAA-MM-JJ ou ?days=7|30|90|365."""
+    from django.utils.dateparse import parse_date
+
+    def _date(name):
+        try:
+            return parse_date(request.GET.get(name, ""))
+        except ValueError:
+            return None
+
+    return _positive_int(request.GET.get("days"), 30), _date("start"), _date("end")
+
+
 def _positive_int(value, default):
     try:
         number = int(value)
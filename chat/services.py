@@ -6,6 +6,8 @@ import urllib.parse
 from django.conf import settings
 from django.db.models import Q
 
+from search.services import MATCH_ANY, filter_queryset, is_indexed
+
 logger = logging.getLogger(__name__)
 
 
@@ -223,8 +225,8 @@ def get_module_results(module: str, query: str, limit: int = 3) -> list:
         return []
 
 
-def _results_or_external(module: str, query: str) -> list:
-    results = get_module_results(module, query)
+def _results_or_external(module: str, query: str, module_results: list | None = None) -> list:
+    results = get_module_results(module, query) if module_results is None else module_results
     if results:
         return results
     if module in {"adgen", "business_onboarding"}:
@@ -597,12 +599,14 @@ def _apply_location_filter(qs, query: str, *fields):
         if exact.exists():
             return exact
 
-    broad_q = Q()
-    for term in terms:
-        for field in fields:
-            broad_q |= Q(**{f"{field}__icontains": term})
-
-    matched = qs.filter(broad_q).distinct()
+    if is_indexed(qs):
+        matched = filter_queryset(qs, terms, match=MATCH_ANY, field="location")
+    else:
+        broad_q = Q()
+        for term in terms:
+            for field in fields:
+                broad_q |= Q(**{f"{field}__icontains": term})
+        matched = qs.filter(broad_q).distinct()
     return matched if matched.exists() else qs
 
 
@@ -611,12 +615,14 @@ def _apply_text_filter(qs, query: str, *fields):
     if not terms:
         return qs
 
-    text_q = Q()
-    for term in terms:
-        for field in fields:
-            text_q |= Q(**{f"{field}__icontains": term})
-
-    matched = qs.filter(text_q).distinct()
+    if is_indexed(qs):
+        matched = filter_queryset(qs, terms, match=MATCH_ANY)
+    else:
+        text_q = Q()
+        for term in terms:
+            for field in fields:
+                text_q |= Q(**{f"{field}__icontains": term})
+        matched = qs.filter(text_q).distinct()
     return matched if matched.exists() else qs
 
 
@@ -0,0 +1,258 @@
+# core/cache.py — Cache partagé de la plateforme (Redis en production, mémoire locale sinon)
+#
+#   key(namespace, *parts)                     → clé préfixée par app (« gaz:accueil:... »)
+#   cached(namespace, name, builder, ...)      → lit ou calcule une donnée, avec métriques
+#   invalidate(*tags)                          → invalide toutes les entrées portant ces tags
+#   invalidate_on(tags, *models)               → branche post_save/post_delete → invalidate
+#   cached_view(namespace, timeout, tags, ...) → met en cache la réponse d'une vue GET
+#   stats() / reset_stats()                    → compteurs hit/miss par namespace
+#
+# Invalidation par tags versionnés : chaque tag a un numéro de version, inclus dans la
+# clé des entrées qui en dépendent. invalidate() incrémente la version : les anciennes
+# entrées ne sont plus jamais lues et expirent d'elles-mêmes (aucun scan de clés).
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 300
+METRICS_FLUSH_SECONDS = 30
+
+_MISSING = object()
+_NAMESPACES_KEY = "cache:metrics:namespaces"
+
+# Jeton CSRF des pages en cache : remplacé au stockage, réinjecté (jeton du visiteur) à la lecture
+_CSRF_PLACEHOLDER = b"__cached_view_csrf_token__"
+_CSRF_PATTERNS = (
+    re.compile(rb'name="csrf-token" content="([A-Za-z0-9]{32,})"'),
+    re.compile(rb'name="csrfmiddlewaretoken" value="([A-Za-z0-9]{32,})"'),
+)
+
+
+def key(namespace: str, *parts) -> str:
+    return ":".join([namespace, *(str(part) for part in parts)])
+
+
+# ── Tags versionnés ───────────────────────────────────────────────────────────
+
+def _tag_key(tag: str) -> str:
+    return f"cache:tag:{tag}"
+
+
+def tag_versions(tags) -> str:
+    """Empreinte des versions courantes des tags (une seule lecture du cache)."""
+    if not tags:
+        return "0"
+    keys = [_tag_key(tag) for tag in tags]
+    found = cache.get_many(keys)
+    missing = {k: 1 for k in keys if k not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return ".".join(str(found[k]) for k in keys)
+
+
+def invalidate(*tags: str) -> None:
+    for tag in tags:
+        tag_key = _tag_key(tag)
+        cache.add(tag_key, 1, None)
+        try:
+            cache.incr(tag_key)
+        except ValueError:
+            cache.set(tag_key, 2, None)
+
+
+def invalidate_on(tags, *models) -> None:
+    """
+    Invalide tags à chaque post_save / post_delete des modèles donnés
+    (classes ou labels « app.Model »). À appeler depuis AppConfig.ready().
+    """
+    tags = (tags,) if isinstance(tags, str) else tuple(tags)
+
+    def receiver(sender, **kwargs):
+        invalidate(*tags)
+
+    for model in models:
+        uid = f"core.cache:{','.join(tags)}:{model if isinstance(model, str) else model._meta.label}"
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+
+
+# ── Métriques hit/miss ────────────────────────────────────────────────────────
+# Comptées en mémoire puis reportées dans le cache partagé toutes les
+# METRICS_FLUSH_SECONDS : pas d'aller-retour supplémentaire par lecture.
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+_metrics_flushed_at = time.monotonic()
+
+
+def _record(namespace: str, hit: bool) -> None:
+    global _metrics_flushed_at
+    field = "hits" if hit else "misses"
+    with _metrics_lock:
+        counts = _metrics.setdefault(namespace, {"hits": 0, "misses": 0})
+        counts[field] += 1
+        if time.monotonic() - _metrics_flushed_at < METRICS_FLUSH_SECONDS:
+            return
+        pending = {ns: dict(values) for ns, values in _metrics.items()}
+        _metrics.clear()
+        _metrics_flushed_at = time.monotonic()
+    flush_metrics(pending)
+
+
+def flush_metrics(pending=None) -> None:
+    if pending is None:
+        with _metrics_lock:
+            pending = {ns: dict(values) for ns, values in _metrics.items()}
+            _metrics.clear()
+    if not pending:
+        return
+    try:
+        namespaces = set(cache.get(_NAMESPACES_KEY) or ()) | set(pending)
+        cache.set(_NAMESPACES_KEY, sorted(namespaces), None)
+        for namespace, values in pending.items():
+            for field, delta in values.items():
+                if not delta:
+                    continue
+                metric_key = f"cache:metrics:{namespace}:{field}"
+                cache.add(metric_key, 0, None)
+                cache.incr(metric_key, delta)
+    except Exception as exc:
+        logger.warning(f"[cache] Report des métriques impossible : {exc}")
+
+
+def stats() -> dict:
+    """{namespace: {hits, misses, hit_rate}} agrégés sur tous les processus."""
+    flush_metrics()
+    namespaces = cache.get(_NAMESPACES_KEY) or []
+    keys = [f"cache:metrics:{ns}:{field}" for ns in namespaces for field in ("hits", "misses")]
+    values = cache.get_many(keys)
+    result = {}
+    for namespace in namespaces:
+        hits = values.get(f"cache:metrics:{namespace}:hits", 0)
+        misses = values.get(f"cache:metrics:{namespace}:misses", 0)
+        total = hits + misses
+        result[namespace] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total * 100, 1) if total else 0.0,
+        }
+    return result
+
+
+def reset_stats() -> None:
+    namespaces = cache.get(_NAMESPACES_KEY) or []
+    cache.delete_many(
+        [f"cache:metrics:{ns}:{field}" for ns in namespaces for field in ("hits", "misses")] + [_NAMESPACES_KEY]
+    )
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# ── Données et vues ───────────────────────────────────────────────────────────
+
+def _entry_key(namespace: str, name: str, tags) -> str:
+    return key(namespace, name, f"t{tag_versions(tags)}")
+
+
+def cached(namespace: str, name: str, builder, timeout: int = DEFAULT_TIMEOUT, tags=()):
+    """Retourne la valeur en cache ou la calcule via builder() puis la stocke."""
+    entry_key = _entry_key(namespace, name, tags)
+    value = cache.get(entry_key, _MISSING)
+    if value is not _MISSING:
+        _record(namespace, True)
+        return value
+    _record(namespace, False)
+    value = builder()
+    cache.set(entry_key, value, timeout)
+    return value
+
+
+def _has_pending_messages(request) -> bool:
+    storage = getattr(request, "_messages", None)
+    try:
+        return bool(storage is not None and len(storage))
+    except Exception:
+        return True
+
+
+def _strip_csrf_token(content: bytes):
+    for pattern in _CSRF_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            return content.replace(match.group(1), _CSRF_PLACEHOLDER)
+    return None
+
+
+def cached_view(namespace: str, timeout: int = DEFAULT_TIMEOUT, tags=(), per_user: bool = False):
+    """
+    Met en cache les réponses 200 d'une vue GET, par hôte (sous-domaines) et URL complète.
+
+    Variantes : visiteurs anonymes partagés ; utilisateurs connectés servis sans
+    cache, ou dans une variante par utilisateur si per_user=True. Le jeton CSRF de la
+    page est remplacé à chaque lecture par celui du visiteur. Une réponse qui pose
+    un cookie ou affiche des messages n'est jamais stockée.
+    """
+    tags = (tags,) if isinstance(tags, str) else tuple(tags)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or _has_pending_messages(request):
+                return view(request, *args, **kwargs)
+            user = getattr(request, "user", None)
+            authenticated = bool(user is not None and user.is_authenticated)
+            if authenticated and not per_user:
+                return view(request, *args, **kwargs)
+
+            variant = f"u{user.pk}" if authenticated else "anon"
+            fingerprint = hashlib.md5(
+                f"{request.get_host()}|{request.get_full_path()}|{variant}".encode()
+            ).hexdigest()
+            entry_key = _entry_key(namespace, f"view:{view.__name__}:{fingerprint}", tags)
+
+            stored = cache.get(entry_key)
+            if stored is not None:
+                _record(namespace, True)
+                content, content_type = stored
+                if _CSRF_PLACEHOLDER in content:
+                    content = content.replace(_CSRF_PLACEHOLDER, get_token(request).encode())
+                response = HttpResponse(content, content_type=content_type)
+                response["X-Cache"] = "HIT"
+                patch_vary_headers(response, ("Cookie",))
+                return response
+
+            _record(namespace, False)
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, "render", None)) and not getattr(response, "is_rendered", True):
+                response = response.render()
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not response.cookies
+                and not _has_pending_messages(request)
+            ):
+                content = response.content
+                if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+                    content = _strip_csrf_token(content)
+                if content is not None:
+                    cache.set(entry_key, (content, response["Content-Type"]), timeout)
+                    response["X-Cache"] = "MISS"
+            patch_vary_headers(response, ("Cookie",))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,58 @@
+# core/context_cache.py — Valeurs globales des context processors, paresseuses et en cache
+#
+#   lazy(func)                          → valeur calculée seulement si un template l'utilise
+#   shared(name, builder)               → donnée commune à tous (villes, catégories, ...),
+#                                         versionnée (core.cache) : bump(name) l'invalide partout
+#   per_user(user_id, name, builder)    → valeur propre à un utilisateur, TTL court
+#                                         (CONTEXT_CACHE_USER_TTL) ; forget_user() l'invalide
+#
+# Les context processors tournent sur chaque page rendue : ils ne doivent renvoyer
+# que des valeurs lazy(), pour qu'une page qui n'affiche pas une donnée ne paie
+# aucune requête SQL pour elle.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+
+from . import cache as shared_cache
+
+PREFIX = "ctx"
+SHARED_TIMEOUT = 60 * 60 * 6
+
+_MISSING = object()
+
+
+def lazy(func):
+    """Enveloppe func : évaluée au premier usage (rendu du template), une seule fois."""
+    return SimpleLazyObject(func)
+
+
+def shared(name: str, builder, timeout: int = SHARED_TIMEOUT):
+    """Donnée partagée, recalculée uniquement après bump(name) ou expiration."""
+    return shared_cache.cached(PREFIX, name, builder, timeout, tags=(f"{PREFIX}:{name}",))
+
+
+def bump(name: str) -> None:
+    """Invalide une donnée partagée (appelé par les signaux des modèles sources)."""
+    shared_cache.invalidate(f"{PREFIX}:{name}")
+
+
+def _user_key(user_id, name: str) -> str:
+    return f"{PREFIX}:user:{user_id}:{name}"
+
+
+def per_user(user_id, name: str, builder, timeout: int | None = None):
+    """Valeur propre à un utilisateur ; TTL court pour absorber les écritures sans signal."""
+    if timeout is None:
+        timeout = getattr(settings, "CONTEXT_CACHE_USER_TTL", 60)
+    user_key = _user_key(user_id, name)
+    value = cache.get(user_key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.set(user_key, value, timeout)
+    return value
+
+
+def forget_user(user_id, *names: str) -> None:
+    if user_id:
+        cache.delete_many([_user_key(user_id, name) for name in names])
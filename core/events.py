@@ -0,0 +1,387 @@
+# core/events.py — Canal d'événements temps réel (Server-Sent Events) et compteurs non lus
+#
+#   publier(user_id, type, **data)      → petit événement JSON vers tous les onglets ouverts de l'utilisateur
+#   flux_evenements(request)            → vue SSE async : une connexion inactive par onglet au lieu du polling
+#   enregistrer_instantane(fonction)    → état initial envoyé à l'ouverture (compteurs d'une app, ...)
+#   lire_compteurs / initialiser_compteurs / ajuster_compteur / definir_compteur / invalider_compteurs
+#                                       → compteurs par utilisateur, tenus à jour à l'écriture
+#
+# Courtier :
+#   - Redis (EVENTS_REDIS_URL) : pub/sub partagé entre workers web et Celery, compteurs en hash
+#   - mémoire du processus (dev, tests) : une file asyncio par connexion
+#
+# Les compteurs ne sont modifiés que s'ils existent déjà : un hash absent (expiré,
+# invalidé) est recalculé depuis la base par l'app propriétaire à la lecture suivante.
+# Ce recalcul n'est écrit que si le hash est toujours absent (jamais d'écrasement d'un
+# hash tenu à jour entre-temps) ; une écriture tombée pendant le recalcul (hash absent)
+# marque les compteurs « sales » et le hash recalculé n'est alors gardé que
+# COMPTEURS_TTL_RECALCUL secondes, le temps que l'agrégat suivant la voie.
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+COMPTEURS_TTL = 24 * 3600
+COMPTEURS_TTL_RECALCUL = 30
+
+_INITIALISER_SI_ABSENT = """
+if redis.call('exists', KEYS[1]) == 1 then return 0 end
+local ttl = ARGV[1]
+if redis.call('exists', KEYS[2]) == 1 then ttl = ARGV[2] end
+redis.call('hset', KEYS[1], unpack(ARGV, 3))
+redis.call('expire', KEYS[1], ttl)
+return 1
+"""
+
+_AJUSTER_SI_EXISTE = """
+if redis.call('exists', KEYS[1]) == 0 then
+    redis.call('set', KEYS[2], 1, 'EX', ARGV[3])
+    return nil
+end
+local valeur = redis.call('hincrby', KEYS[1], ARGV[1], ARGV[2])
+if valeur < 0 then redis.call('hset', KEYS[1], ARGV[1], 0) valeur = 0 end
+return valeur
+"""
+
+_DEFINIR_SI_EXISTE = """
+if redis.call('exists', KEYS[1]) == 0 then
+    redis.call('set', KEYS[2], 1, 'EX', ARGV[3])
+    return nil
+end
+return redis.call('hset', KEYS[1], ARGV[1], ARGV[2])
+"""
+
+
+def canal(user_id) -> str:
+    return f"events:user:{user_id}"
+
+
+def _cle_compteurs(user_id) -> str:
+    return f"events:compteurs:{user_id}"
+
+
+def _cle_sale(cle) -> str:
+    return f"{cle}:sale"
+
+
+# ── Courtiers ─────────────────────────────────────────────────────────────────
+
+class _MemoryBroker:
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._abonnes = defaultdict(set)
+        self._hashes = {}
+        self._sales = {}
+
+    def publish(self, nom, message):
+        with self._lock:
+            abonnes = list(self._abonnes.get(nom, ()))
+        for loop, queue in abonnes:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:  # boucle fermée : connexion en cours de fermeture
+                pass
+
+    @asynccontextmanager
+    async def abonnement(self, nom):
+        queue = asyncio.Queue()
+        abonne = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._abonnes[nom].add(abonne)
+
+        async def suivant(timeout):
+            try:
+                return await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        try:
+            yield suivant
+        finally:
+            with self._lock:
+                self._abonnes[nom].discard(abonne)
+
+    # Compteurs
+    def lire(self, cle):
+        with self._lock:
+            entree = self._vivant(cle)
+            return None if entree is None else dict(entree[1])
+
+    def _vivant(self, cle):
+        entree = self._hashes.get(cle)
+        if entree is not None and entree[0] < time.monotonic():
+            del self._hashes[cle]
+            return None
+        return entree
+
+    def _salir(self, cle, ttl):
+        self._sales[cle] = time.monotonic() + ttl
+
+    def initialiser(self, cle, valeurs, ttl, ttl_recalcul):
+        with self._lock:
+            if self._vivant(cle) is not None:
+                return False
+            if self._sales.pop(cle, 0) > time.monotonic():
+                ttl = ttl_recalcul
+            self._hashes[cle] = (time.monotonic() + ttl, {k: int(v) for k, v in valeurs.items()})
+            return True
+
+    def ajuster(self, cle, champ, delta):
+        with self._lock:
+            entree = self._vivant(cle)
+            if entree is None:
+                self._salir(cle, COMPTEURS_TTL_RECALCUL)
+                return None
+            entree[1][champ] = max(0, entree[1].get(champ, 0) + delta)
+            return entree[1][champ]
+
+    def definir(self, cle, champ, valeur):
+        with self._lock:
+            entree = self._vivant(cle)
+            if entree is None:
+                self._salir(cle, COMPTEURS_TTL_RECALCUL)
+            else:
+                entree[1][champ] = int(valeur)
+
+    def supprimer(self, cle):
+        with self._lock:
+            self._hashes.pop(cle, None)
+            self._salir(cle, COMPTEURS_TTL_RECALCUL)
+
+
+class _RedisBroker:
+    shared = True
+
+    def __init__(self, url):
+        import redis
+        self._url = url
+        self._client = redis.Redis.from_url(url)
+        self._initialiser = self._client.register_script(_INITIALISER_SI_ABSENT)
+        self._ajuster = self._client.register_script(_AJUSTER_SI_EXISTE)
+        self._definir = self._client.register_script(_DEFINIR_SI_EXISTE)
+
+    def publish(self, nom, message):
+        self._client.publish(nom, json.dumps(message))
+
+    @asynccontextmanager
+    async def abonnement(self, nom):
+        # Client asyncio propre à la connexion SSE (lié à la boucle courante)
+        import redis.asyncio as aioredis
+        client = aioredis.Redis.from_url(self._url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(nom)
+
+        async def suivant(timeout):
+            message = await pubsub.get_message(timeout=timeout)
+            return json.loads(message["data"]) if message else None
+
+        try:
+            yield suivant
+        finally:
+            await pubsub.unsubscribe(nom)
+            await pubsub.aclose()
+            await client.aclose()
+
+    # Compteurs
+    def lire(self, cle):
+        valeurs = self._client.hgetall(cle)
+        if not valeurs:
+            return None
+        return {k.decode(): int(v) for k, v in valeurs.items()}
+
+    def initialiser(self, cle, valeurs, ttl, ttl_recalcul):
+        champs = [item for k, v in valeurs.items() for item in (k, int(v))]
+        return bool(self._initialiser(keys=[cle, _cle_sale(cle)], args=[ttl, ttl_recalcul, *champs]))
+
+    def ajuster(self, cle, champ, delta):
+        return self._ajuster(keys=[cle, _cle_sale(cle)], args=[champ, delta, COMPTEURS_TTL_RECALCUL])
+
+    def definir(self, cle, champ, valeur):
+        self._definir(keys=[cle, _cle_sale(cle)], args=[champ, int(valeur), COMPTEURS_TTL_RECALCUL])
+
+    def supprimer(self, cle):
+        pipe = self._client.pipeline(transaction=True)
+        pipe.delete(cle)
+        pipe.set(_cle_sale(cle), 1, ex=COMPTEURS_TTL_RECALCUL)
+        pipe.execute()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                url = getattr(settings, "EVENTS_REDIS_URL", "")
+                _broker = _RedisBroker(url) if url else _MemoryBroker()
+    return _broker
+
+
+# ── Publication ───────────────────────────────────────────────────────────────
+
+def publier(user_id, type_evenement, **data) -> None:
+    """Publie un événement ; une erreur du courtier ne doit jamais casser l'écriture qui l'a déclenché."""
+    try:
+        get_broker().publish(canal(user_id), {"type": type_evenement, **data})
+    except Exception as exc:
+        logger.warning("Publication d'événement %s impossible pour %s: %s", type_evenement, user_id, exc)
+
+
+# ── Compteurs ─────────────────────────────────────────────────────────────────
+#
+# Un hash vide est stocké quand même (avec un champ sentinelle) : « initialisé à zéro »
+# doit se distinguer de « jamais calculé ».
+
+_SENTINELLE = "_init"
+
+
+def lire_compteurs(user_id):
+    """Compteurs de l'utilisateur, ou None s'ils doivent être recalculés depuis la base."""
+    try:
+        valeurs = get_broker().lire(_cle_compteurs(user_id))
+    except Exception as exc:
+        logger.warning("Lecture des compteurs de %s impossible: %s", user_id, exc)
+        return None
+    if valeurs is None:
+        return None
+    valeurs.pop(_SENTINELLE, None)
+    return valeurs
+
+
+def initialiser_compteurs(user_id, valeurs) -> bool:
+    """Écrit les compteurs recalculés s'ils sont toujours absents ; False si un autre les a posés."""
+    try:
+        return get_broker().initialiser(
+            _cle_compteurs(user_id), {_SENTINELLE: 1, **valeurs}, COMPTEURS_TTL, COMPTEURS_TTL_RECALCUL,
+        )
+    except Exception as exc:
+        logger.warning("Initialisation des compteurs de %s impossible: %s", user_id, exc)
+        return True
+
+
+def ajuster_compteur(user_id, champ, delta) -> None:
+    try:
+        get_broker().ajuster(_cle_compteurs(user_id), champ, delta)
+    except Exception as exc:
+        logger.warning("Mise à jour du compteur %s de %s impossible: %s", champ, user_id, exc)
+
+
+def definir_compteur(user_id, champ, valeur) -> None:
+    try:
+        get_broker().definir(_cle_compteurs(user_id), champ, valeur)
+    except Exception as exc:
+        logger.warning("Mise à jour du compteur %s de %s impossible: %s", champ, user_id, exc)
+
+
+def invalider_compteurs(*user_ids) -> None:
+    for user_id in user_ids:
+        try:
+            get_broker().supprimer(_cle_compteurs(user_id))
+        except Exception as exc:
+            logger.warning("Invalidation des compteurs de %s impossible: %s", user_id, exc)
+
+
+# ── Flux SSE ──────────────────────────────────────────────────────────────────
+
+_instantanes = []
+
+
+def enregistrer_instantane(fonction):
+    """fonction(user) → (type, data) ou None ; appelée (sync) à chaque ouverture de connexion."""
+    _instantanes.append(fonction)
+    return fonction
+
+
+def _instantane(user):
+    evenements = []
+    for fonction in _instantanes:
+        try:
+            resultat = fonction(user)
+        except Exception:
+            logger.exception("Instantané SSE %s en échec", fonction.__name__)
+            continue
+        if resultat:
+            evenements.append(resultat)
+    return evenements
+
+
+def _instantane_puis_liberer(user):
+    """
+    Instantané, puis fermeture des connexions base du thread de la requête : Django ne
+    les fermerait qu'à la fin de la réponse, soit après EVENTS_SSE_MAX_SECONDS de flux
+    (une connexion Postgres par onglet ouvert). request.auser() a tourné dans ce même thread.
+    """
+    from django.db import connections
+
+    try:
+        return _instantane(user)
+    finally:
+        connections.close_all()
+
+
+def format_sse(type_evenement, data) -> str:
+    return f"event: {type_evenement}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _flux(user, duree_max, keepalive, retry_ms):
+    from asgiref.sync import sync_to_async
+
+    yield f"retry: {retry_ms}\n\n"
+    for type_evenement, data in await sync_to_async(_instantane_puis_liberer)(user):
+        yield format_sse(type_evenement, data)
+
+    fin = time.monotonic() + duree_max
+    async with get_broker().abonnement(canal(user.pk)) as suivant:
+        while (reste := fin - time.monotonic()) > 0:
+            message = await suivant(min(keepalive, reste))
+            if message is None:
+                yield ": ping\n\n"
+                continue
+            yield format_sse(message.pop("type", "message"), message)
+
+
+async def flux_evenements(request):
+    """
+    GET /evenements/ — flux text/event-stream de l'utilisateur connecté.
+
+    La connexion est fermée au bout de EVENTS_SSE_MAX_SECONDS ; EventSource se reconnecte
+    seul. Servi en WSGI (worker synchrone), le flux n'envoie que l'instantané et se
+    ferme : le client se reconnecte après EVENTS_SSE_WSGI_RETRY_MS (polling léger).
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+
+    if "wsgi.version" in request.META:
+        # Worker synchrone : pas de connexion longue, contenu fini (itérable synchrone)
+        from asgiref.sync import sync_to_async
+        evenements = await sync_to_async(_instantane)(user)
+        contenu = [
+            f"retry: {getattr(settings, 'EVENTS_SSE_WSGI_RETRY_MS', 30000)}\n\n",
+            *(format_sse(type_evenement, data) for type_evenement, data in evenements),
+        ]
+    else:
+        contenu = _flux(
+            user,
+            duree_max=getattr(settings, "EVENTS_SSE_MAX_SECONDS", 300),
+            keepalive=getattr(settings, "EVENTS_SSE_KEEPALIVE_SECONDS", 20),
+            retry_ms=3000,
+        )
+    response = StreamingHttpResponse(contenu, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx : pas de mise en tampon du flux
+    return response
@@ -0,0 +1,264 @@
+# core/listing.py — Pagination par clé (keyset) et comptes en cache des pages de liste
+#
+#   KeysetPaginator(queryset, ordering, per_page, name=...)
+#   paginator.page(after=..., before=...)  → KeysetPage (itérable, has_next, next_cursor…)
+#   paginator.page_for(request)            → idem, curseurs lus dans ?apres= / ?avant=
+#   page.count / page.count_display         → compte approché, plafonné et mis en cache
+#   page.exact_count                        → compte exact, calculé seulement si demandé
+#   KeysetIndex(F(...).desc(nulls_last=True), ..., name=...)
+#                                           → index qui suit le tri du paginateur, NULL compris
+#
+# OFFSET relit et jette toutes les lignes des pages précédentes : plus on descend,
+# plus la page est lente. Ici chaque page repart de la dernière ligne affichée
+# (WHERE (k1, k2, pk) < (v1, v2, id) déplié en OR/AND, NULL rangés en dernier) :
+# coût constant quelle que soit la profondeur. Les curseurs sont signés et opaques ;
+# un curseur illisible ou d'un autre tri renvoie la première page.
+#
+# Le COUNT(*) complet n'est plus fait à chaque affichage : le total est compté avec un
+# plafond (COUNT_CAP), mis en cache par signature de filtres (SQL de la requête),
+# et n'est même pas calculé si la première page suffit à tout afficher.
+#
+# Les clés NULL-ables sont triées NULL en dernier : l'index qui sert la liste doit le
+# déclarer (Postgres range les NULL en tête d'un index DESC par défaut), sinon chaque
+# page retrie tout l'ensemble filtré.
+
+import hashlib
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import cached_property, reduce
+from operator import or_
+
+from django.core import signing
+from django.db import models
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+
+from core.cache import cached
+
+logger = logging.getLogger(__name__)
+
+COUNT_CAP = 1000
+COUNT_TIMEOUT = 120
+AFTER_PARAM = "apres"
+BEFORE_PARAM = "avant"
+
+_SALT = "core.listing"
+
+
+class _Key:
+    """Une clé de tri : champ du modèle, sens, colonne NULL possible."""
+
+    def __init__(self, model, spec: str):
+        self.descending = spec.startswith("-")
+        name = spec.lstrip("-")
+        self.field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        self.name = self.field.name
+        self.nullable = self.field.null
+
+    def order_by(self, reverse=False):
+        descending = self.descending != reverse
+        expression = F(self.name)
+        if not self.nullable:
+            return expression.desc() if descending else expression.asc()
+        # NULL en dernier dans le sens de lecture, premier en sens inverse
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        return expression.desc(**nulls) if descending else expression.asc(**nulls)
+
+    def equal(self, value):
+        if value is None:
+            return Q(**{f"{self.name}__isnull": True})
+        return Q(**{self.name: value})
+
+    def after(self, value):
+        """Lignes placées après value dans l'ordre de lecture."""
+        if value is None:
+            return Q(pk__in=[])
+        q = Q(**{f"{self.name}__{'lt' if self.descending else 'gt'}": value})
+        if self.nullable:
+            q |= Q(**{f"{self.name}__isnull": True})
+        return q
+
+    def before(self, value):
+        """Lignes placées avant value dans l'ordre de lecture."""
+        if value is None:
+            return Q(**{f"{self.name}__isnull": False})
+        return Q(**{f"{self.name}__{'gt' if self.descending else 'lt'}": value})
+
+    def dump(self, obj):
+        value = getattr(obj, self.field.attname)
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def load(self, value):
+        return None if value is None else self.field.to_python(value)
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page: int, name: str = "", count_timeout: int = COUNT_TIMEOUT):
+        """
+        ordering : clés de tri (« -champ » pour décroissant), champs directs du modèle ;
+                   la clé primaire est ajoutée en dernier pour départager les égalités.
+        name     : préfixe des clés de cache des comptes (label du modèle par défaut).
+        """
+        model = queryset.model
+        specs = list(ordering)
+        if specs[-1].lstrip("-") not in ("pk", model._meta.pk.name):
+            specs.append("-pk" if specs[-1].startswith("-") else "pk")
+        self.queryset = queryset
+        self.keys = [_Key(model, spec) for spec in specs]
+        self.per_page = per_page
+        self.name = name or model._meta.label_lower
+        self.count_timeout = count_timeout
+        self.signature = ",".join(specs)
+
+    # ── Curseurs ──────────────────────────────────────────────────────────────
+
+    def cursor_for(self, obj) -> str:
+        return signing.dumps({"o": self.signature, "v": [key.dump(obj) for key in self.keys]}, salt=_SALT)
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            payload = signing.loads(cursor, salt=_SALT)
+            if payload.get("o") != self.signature:
+                return None
+            values = [key.load(value) for key, value in zip(self.keys, payload["v"], strict=True)]
+        except Exception as exc:
+            logger.debug("Curseur de liste ignoré: %s", exc)
+            return None
+        return values
+
+    def _seek(self, values, direction):
+        """(k1, …, kn) après/avant values, déplié en OR de préfixes égaux."""
+        terms = []
+        for index, key in enumerate(self.keys):
+            prefix = [k.equal(v) for k, v in zip(self.keys[:index], values)]
+            terms.append(reduce(lambda a, b: a & b, prefix, getattr(key, direction)(values[index])))
+        return reduce(or_, terms)
+
+    # ── Pages ─────────────────────────────────────────────────────────────────
+
+    def page(self, after=None, before=None):
+        after_values = self._decode(after)
+        before_values = None if after_values else self._decode(before)
+        backwards = before_values is not None
+
+        qs = self.queryset.order_by(*(key.order_by(reverse=backwards) for key in self.keys))
+        if after_values:
+            qs = qs.filter(self._seek(after_values, "after"))
+        elif backwards:
+            qs = qs.filter(self._seek(before_values, "before"))
+
+        rows = list(qs[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            return KeysetPage(self, rows, has_next=True, has_previous=more)
+        return KeysetPage(self, rows, has_next=more, has_previous=after_values is not None)
+
+    def page_for(self, request):
+        return self.page(after=request.GET.get(AFTER_PARAM), before=request.GET.get(BEFORE_PARAM))
+
+    # ── Comptes ───────────────────────────────────────────────────────────────
+
+    def _count_key(self, kind):
+        sql, params = self.queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(repr((sql, params)).encode()).hexdigest()
+        return f"{self.name}:{kind}:{digest}"
+
+    def capped_count(self) -> int:
+        """Compte plafonné à COUNT_CAP + 1 (au-delà : « 1000+ »), en cache par filtres."""
+        return cached(
+            "listing", self._count_key("capped"),
+            lambda: self.queryset.order_by()[:COUNT_CAP + 1].count(),
+            timeout=self.count_timeout,
+        )
+
+    def exact_count(self) -> int:
+        return cached(
+            "listing", self._count_key("exact"),
+            lambda: self.queryset.order_by().count(),
+            timeout=self.count_timeout,
+        )
+
+
+class KeysetIndex(models.Index):
+    """
+    Index déclarant le placement des NULL de chaque clé (OrderBy nulls_first/nulls_last).
+    SQLite refuse NULLS FIRST/LAST dans CREATE INDEX : le modificateur y est retiré, ses
+    NULL étant déjà les plus petits (DESC → NULL en dernier, comme le paginateur).
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "sqlite":
+            return super().create_sql(model, schema_editor, using=using, **kwargs)
+        index = self.clone()
+        index.expressions = tuple(_sans_nulls(expression) for expression in self.expressions)
+        return super(KeysetIndex, index).create_sql(model, schema_editor, using=using, **kwargs)
+
+
+def _sans_nulls(expression):
+    if not isinstance(expression, OrderBy):
+        return expression
+    expression = expression.copy()
+    expression.nulls_first = expression.nulls_last = None
+    return expression
+
+
+class KeysetPage:
+    def __init__(self, paginator, object_list, has_next, has_previous):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @cached_property
+    def next_cursor(self):
+        return self.paginator.cursor_for(self.object_list[-1]) if self.has_next and self.object_list else ""
+
+    @cached_property
+    def previous_cursor(self):
+        return self.paginator.cursor_for(self.object_list[0]) if self.has_previous and self.object_list else ""
+
+    @cached_property
+    def _complete(self):
+        # Première page sans suite : le total est la page elle-même, sans requête
+        return not self.has_next and not self.has_previous
+
+    @cached_property
+    def count(self) -> int:
+        if self._complete:
+            return len(self.object_list)
+        return self.paginator.capped_count()
+
+    @property
+    def count_is_capped(self) -> bool:
+        return self.count > COUNT_CAP
+
+    @property
+    def count_display(self) -> str:
+        return f"{COUNT_CAP}+" if self.count_is_capped else str(self.count)
+
+    @cached_property
+    def exact_count(self) -> int:
+        if not self.count_is_capped:
+            return self.count
+        return self.paginator.exact_count()
@@ -0,0 +1,98 @@
+# core/sampling.py — Tirage aléatoire (pondéré) sans ORDER BY RANDOM()
+#
+#   SamplePool(name, queryset, weight=None, timeout, tags)
+#   pool.sample(k)         → k objets distincts tirés au hasard (une requête in_bulk)
+#   pool.sample_ids(k)     → seulement les ids
+#
+# ORDER BY RANDOM() trie toute la table filtrée à chaque affichage. Ici, les ids du
+# vivier (et leurs poids cumulés) sont mis en cache via core.cache.cached : tags
+# invalidés au changement de modèle (invalidate_on), expiration courte sinon.
+# Le tirage est en O(k) (O(k log n) pondéré) et seules les k lignes tirées sont lues.
+#
+# Les lignes devenues inéligibles depuis la construction du vivier sont écartées par
+# in_bulk (appliqué au queryset filtré) : le tirage peut alors rendre moins de k objets.
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+from core.cache import cached
+
+DEFAULT_TIMEOUT = 300
+_MAX_REJECTIONS = 8   # tirages pondérés rejetés (doublons) par objet demandé avant repli
+
+
+class SamplePool:
+    def __init__(self, name: str, queryset, weight=None, timeout: int = DEFAULT_TIMEOUT, tags=()):
+        """
+        queryset : vivier filtré (select_related / prefetch_related conservés pour in_bulk).
+        weight   : expression SQL (Case/When, F, Value…) donnant un poids > 0 par ligne.
+        """
+        self.name = name
+        self.queryset = queryset
+        self.weight = weight
+        self.timeout = timeout
+        self.tags = tuple(tags)
+
+    # ── Vivier en cache ───────────────────────────────────────────────────────
+
+    def _build(self):
+        qs = self.queryset.order_by()
+        if self.weight is None:
+            return list(qs.values_list("pk", flat=True)), None
+        rows = list(qs.annotate(_sample_weight=self.weight).values_list("pk", "_sample_weight"))
+        ids = [pk for pk, _ in rows]
+        cumulative = list(accumulate(max(float(w or 0), 0.0) for _, w in rows))
+        return ids, cumulative
+
+    def pool(self):
+        return cached("sampling", self.name, self._build, timeout=self.timeout, tags=self.tags)
+
+    # ── Tirage ────────────────────────────────────────────────────────────────
+
+    def sample_ids(self, k: int, rng=random):
+        ids, cumulative = self.pool()
+        if k <= 0 or not ids:
+            return []
+        if k >= len(ids):
+            if cumulative is None:
+                return rng.sample(ids, len(ids))
+            return _weighted_order(ids, cumulative, rng)
+        if cumulative is None:
+            return rng.sample(ids, k)
+
+        total = cumulative[-1]
+        if total <= 0:
+            return rng.sample(ids, k)
+        chosen, seen = [], set()
+        attempts = k * _MAX_REJECTIONS
+        while len(chosen) < k and attempts:
+            attempts -= 1
+            index = bisect_right(cumulative, rng.random() * total)
+            index = min(index, len(ids) - 1)
+            if index not in seen:
+                seen.add(index)
+                chosen.append(ids[index])
+        if len(chosen) < k:
+            # Poids très concentrés : on termine sans remise sur le reste du vivier
+            taken = set(chosen)
+            chosen += [pk for pk in _weighted_order(ids, cumulative, rng) if pk not in taken][:k - len(chosen)]
+        return chosen
+
+    def sample(self, k: int, rng=random):
+        ids = self.sample_ids(k, rng)
+        if not ids:
+            return []
+        found = self.queryset.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+
+def _weighted_order(ids, cumulative, rng):
+    """Permutation pondérée complète (Efraimidis–Spirakis), O(n log n) : repli uniquement."""
+    previous, keyed = 0.0, []
+    for pk, upto in zip(ids, cumulative):
+        weight = upto - previous
+        previous = upto
+        keyed.append((rng.random() ** (1.0 / weight) if weight > 0 else -rng.random(), pk))
+    keyed.sort(reverse=True)
+    return [pk for _, pk in keyed]
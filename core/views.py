@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from . import cache as shared_cache
+
+
+@staff_member_required
+def cache_stats(request):
+    """Compteurs hit/miss du cache partagé par namespace (staff). ?reset=1 remet à zéro."""
+    if request.GET.get("reset") == "1":
+        shared_cache.reset_stats()
+    return JsonResponse({
+        "backend": settings.CACHES["default"]["BACKEND"],
+        "namespaces": shared_cache.stats(),
+    })
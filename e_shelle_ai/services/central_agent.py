@@ -7,6 +7,7 @@ ajoutant la priorite aux prestataires Premium/Business.
 
 import json
 import logging
+import threading
 import urllib.parse
 
 from django.conf import settings
@@ -15,68 +16,102 @@ from django.db.models import Q
 logger = logging.getLogger(__name__)
 
 
-class CentralAgentService:
-    """Route les demandes utilisateur vers le bon module E-Shelle."""
+_RETRIEVAL_POOL = None
+_RETRIEVAL_POOL_LOCK = threading.Lock()
 
-    def route_message(self, user_message: str, conversation_history: list | None = None, user=None) -> dict:
-        conversation_history = conversation_history or []
 
-        from chat import services as legacy
+def _retrieval_pool():
+    """Pool de threads partage par toutes les requetes du processus."""
+    global _RETRIEVAL_POOL
+    if _RETRIEVAL_POOL is None:
+        from concurrent.futures import ThreadPoolExecutor
 
-        fallback = legacy._fallback_route(user_message)
-        fallback = self._attach_results(fallback, user_message)
+        with _RETRIEVAL_POOL_LOCK:
+            if _RETRIEVAL_POOL is None:
+                _RETRIEVAL_POOL = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "CENTRAL_AGENT_RETRIEVAL_WORKERS", 16),
+                    thread_name_prefix="central-agent",
+                )
+    return _RETRIEVAL_POOL
 
-        api_key = getattr(settings, "OPENAI_API_KEY", "")
-        if not api_key:
-            return fallback
 
-        system_prompt = self._system_prompt(legacy.SYSTEM_PROMPT, user)
-        messages = [{"role": "system", "content": system_prompt}]
-        for msg in conversation_history[-10:]:
-            role = msg.get("role")
-            content = msg.get("content")
-            if role in {"user", "assistant"} and content:
-                messages.append({"role": role, "content": content})
-        messages.append({"role": "user", "content": user_message})
+def _run_source(func, *args, **kwargs):
+    from django.db import close_old_connections, connections
 
-        try:
-            from openai import OpenAI
+    # Les threads du pool sont durables : chacun garde sa connexion selon CONN_MAX_AGE,
+    # comme un worker HTTP (ouverte au besoin, recyclee si trop vieille ou cassee).
+    close_old_connections()
+    try:
+        result = func(*args, **kwargs)
+    except Exception:
+        connections.close_all()
+        raise
+    close_old_connections()
+    return result
+
+
+class _Retrieval:
+    """Recherches multi-modules d'une requete, lancees en parallele.
+
+    Chaque source dispose de son propre budget de temps (CENTRAL_AGENT_SOURCE_TIMEOUT,
+    surcharge possible par source via CENTRAL_AGENT_SOURCE_TIMEOUTS) : une source
+    trop lente est ignoree et la reponse part avec les resultats partiels.
+    Les sources deja lancees pour un module sont reutilisees si la route change.
+    """
+
+    def __init__(self, service, query: str):
+        self.service = service
+        self.query = query
+        self.futures = {}
+        self.results = {}
+
+    def _builders(self, module: str) -> dict:
+        from chat import services as legacy
 
-            client = OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model=getattr(settings, "OPENAI_CHAT_MODEL", "gpt-4o"),
-                messages=messages,
-                response_format={"type": "json_object"},
-                max_tokens=500,
-                temperature=0.7,
-            )
-            result = json.loads(response.choices[0].message.content)
-            result = legacy._normalize_result(result, fallback)
-            result = self._attach_results(result, user_message)
-            if result.get("generate_image") and result.get("image_prompt"):
-                result["image_url"] = legacy.generate_image(result["image_prompt"])
-            else:
-                result["image_url"] = ""
-            return result
-        except Exception as exc:
-            logger.exception("Central agent routing error: %s", exc)
-            fallback["error"] = str(exc)
-            return fallback
-"""Service central de routage pour E-Shelle AI.
+        query = self.query
+        return {
+            ("premium", module): lambda: self.service._premium_business_results(query, module=module, limit=3),
+            ("dishes", None): lambda: self.service._resto_dish_results(query, limit=3),
+            ("catalog", None): lambda: self.service._business_catalog_results(query, limit=3),
+            ("extra", module): lambda: self.service._extra_module_results(module, query, limit=3),
+            ("module", module): lambda: legacy.get_module_results(module, query, limit=3),
+        }
 
-Ce module devient le cerveau commun du chat public et, progressivement, de
-l'agent IA avance. Il garde la compatibilite avec le routeur existant tout en
-ajoutant la priorite aux prestataires Premium/Business.
-"""
+    def start(self, module: str) -> "_Retrieval":
+        import time
 
-import json
-import logging
-import urllib.parse
+        for key, builder in self._builders(module).items():
+            if key not in self.futures:
+                self.futures[key] = (time.monotonic(), _retrieval_pool().submit(_run_source, builder))
+        return self
 
-from django.conf import settings
-from django.db.models import Q
+    def _timeout(self, source: str) -> float:
+        overrides = getattr(settings, "CENTRAL_AGENT_SOURCE_TIMEOUTS", {}) or {}
+        return float(overrides.get(source, getattr(settings, "CENTRAL_AGENT_SOURCE_TIMEOUT", 2.0)))
 
-logger = logging.getLogger(__name__)
+    def _result(self, key) -> list:
+        import time
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        if key in self.results:
+            return self.results[key]
+        started, future = self.futures[key]
+        remaining = max(0.0, self._timeout(key[0]) - (time.monotonic() - started))
+        try:
+            value = future.result(timeout=remaining) or []
+        except FutureTimeout:
+            logger.warning("Central agent source %s timed out (module=%s)", key[0], key[1])
+            value = []
+        except Exception as exc:
+            logger.exception("Central agent source %s error: %s", key[0], exc)
+            value = []
+        self.results[key] = value
+        return value
+
+    def groups(self, module: str) -> dict:
+        """Resultats par source pour un module (lance les sources manquantes)."""
+        self.start(module)
+        return {key[0]: self._result(key) for key in self._builders(module)}
 
 
 class CentralAgentService:
@@ -88,11 +123,12 @@ class CentralAgentService:
         from chat import services as legacy
 
         fallback = legacy._fallback_route(user_message)
-        fallback = self._attach_results(fallback, user_message)
+        # Les recherches du module de repli tournent pendant l'appel au LLM.
+        retrieval = _Retrieval(self, user_message).start(fallback["module"])
 
         api_key = getattr(settings, "OPENAI_API_KEY", "")
         if not api_key:
-            return fallback
+            return self._attach_results(fallback, user_message, retrieval)
 
         system_prompt = self._system_prompt(legacy.SYSTEM_PROMPT, user)
         messages = [{"role": "system", "content": system_prompt}]
@@ -116,7 +152,7 @@ class CentralAgentService:
             )
             result = json.loads(response.choices[0].message.content)
             result = legacy._normalize_result(result, fallback)
-            result = self._attach_results(result, user_message)
+            result = self._attach_results(result, user_message, retrieval)
             if result.get("generate_image") and result.get("image_prompt"):
                 result["image_url"] = legacy.generate_image(result["image_prompt"])
             else:
@@ -124,33 +160,29 @@ class CentralAgentService:
             return result
         except Exception as exc:
             logger.exception("Central agent routing error: %s", exc)
+            fallback = self._attach_results(fallback, user_message, retrieval)
             fallback["error"] = str(exc)
             return fallback
 
-    def _attach_results(self, route: dict, query: str) -> dict:
+    def _attach_results(self, route: dict, query: str, retrieval: "_Retrieval | None" = None) -> dict:
         from chat import services as legacy
 
         module = route.get("module", "general")
-        premium_results = self._premium_business_results(query, module=module, limit=3)
-        
-        # Multi-app search: search resto dishes and business catalog items
-        dish_results = self._resto_dish_results(query, limit=3)
-        catalog_results = self._business_catalog_results(query, limit=3)
-        
-        extra_results = self._extra_module_results(module, query, limit=3)
-        module_results = legacy.get_module_results(module, query, limit=3)
+        retrieval = retrieval or _Retrieval(self, query)
+        groups = retrieval.groups(module)
 
+        # Multi-app search: premium businesses, resto dishes, business catalog items
         results = self._merge_results(
-            premium_results, 
-            dish_results, 
-            catalog_results, 
-            extra_results, 
-            module_results
+            groups["premium"],
+            groups["dishes"],
+            groups["catalog"],
+            groups["extra"],
+            groups["module"],
         )
         if self._has_unmatched_need(query, results):
             return self._attach_unmet_search(route, query)
         if not results:
-            results = legacy._results_or_external(module, query)
+            results = legacy._results_or_external(module, query, module_results=groups["module"])
         if self._has_unmatched_need(query, results):
             return self._attach_unmet_search(route, query)
         if self._should_ask_location(module, query):
@@ -449,6 +481,7 @@ class CentralAgentService:
 
     def _pharma_results(self, query: str, limit: int) -> list:
         from pharma.models import Pharmacie, StockPharmacie
+        from search.services import MATCH_ANY, filter_queryset
 
         terms = self._search_terms(query)
         stock_qs = (
@@ -457,10 +490,7 @@ class CentralAgentService:
             .order_by("-pharmacie__is_featured", "-pharmacie__is_verified", "medicament__nom")
         )
         if terms:
-            q = Q()
-            for term in terms:
-                q |= Q(medicament__nom__icontains=term) | Q(pharmacie__nom__icontains=term) | Q(pharmacie__ville__nom__icontains=term) | Q(pharmacie__quartier__nom__icontains=term)
-            matched = stock_qs.filter(q).distinct()
+            matched = filter_queryset(stock_qs, terms, match=MATCH_ANY)
             if matched.exists():
                 stock_qs = matched
 
@@ -847,6 +877,9 @@ class CentralAgentService:
         return resolved_card
 
     def _filter_businesses(self, qs, query: str):
+        # Index unifié (search) : plein texte classé au lieu de chaînes icontains
+        from search.services import MATCH_ANY, filter_queryset
+
         terms = self._search_terms(query)
         if not terms:
             return qs
@@ -854,39 +887,17 @@ class CentralAgentService:
         need_terms = self._need_terms(query)
         location_terms = [term for term in terms if term not in need_terms]
         if need_terms:
-            need_filter = Q()
-            for term in need_terms:
-                need_filter |= (
-                    Q(name__icontains=term)
-                    | Q(description__icontains=term)
-                    | Q(promo_headline__icontains=term)
-                    | Q(promo_offer__icontains=term)
-                )
-            qs = qs.filter(need_filter).distinct()
+            qs = filter_queryset(qs, need_terms, match=MATCH_ANY)
             if not qs.exists():
                 return qs.none()
 
             if location_terms:
-                location_filter = Q()
-                for term in location_terms:
-                    location_filter |= Q(city__icontains=term) | Q(district__icontains=term)
-                location_matched = qs.filter(location_filter).distinct()
+                location_matched = filter_queryset(qs, location_terms, match=MATCH_ANY, field="location")
                 if location_matched.exists():
                     return location_matched
             return qs
 
-        query_filter = Q()
-        for term in terms:
-            query_filter |= (
-                Q(name__icontains=term)
-                | Q(city__icontains=term)
-                | Q(district__icontains=term)
-                | Q(description__icontains=term)
-                | Q(promo_headline__icontains=term)
-                | Q(promo_offer__icontains=term)
-            )
-
-        matched = qs.filter(query_filter).distinct()
+        matched = filter_queryset(qs, terms, match=MATCH_ANY)
         if matched.exists():
             return matched
         return qs.none() if self._need_terms(query) else qs
@@ -1027,16 +1038,20 @@ class CentralAgentService:
         return value[: limit - 1].rstrip() + "..."
 
     def _apply_text_filter(self, qs, query: str, *fields: str):
+        from search.services import MATCH_ANY, filter_queryset, is_indexed
+
         terms = self._need_terms(query) or self._search_terms(query)
         if not terms:
             return qs
 
-        query_filter = Q()
-        for term in terms:
-            for field in fields:
-                query_filter |= Q(**{f"{field}__icontains": term})
-
-        matched = qs.filter(query_filter).distinct()
+        if is_indexed(qs):
+            matched = filter_queryset(qs, terms, match=MATCH_ANY)
+        else:
+            query_filter = Q()
+            for term in terms:
+                for field in fields:
+                    query_filter |= Q(**{f"{field}__icontains": term})
+            matched = qs.filter(query_filter).distinct()
         if matched.exists():
             return matched
         return qs.none() if self._need_terms(query) else qs
@@ -0,0 +1,83 @@
+"""
+e_shelle_ai/tasks.py
+Taches Celery de l'agent IA : suivi des generations video cote serveur.
+
+Le navigateur n'interroge plus /ai/api/video/poll/ toutes les quelques secondes :
+la tache verifie l'operation Google et pousse un evenement "video" sur le flux SSE
+(/evenements/) des qu'elle est terminee.
+"""
+import logging
+
+from celery import shared_task
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VIDEO_POLL_INTERVAL = 10     # secondes entre deux verifications
+VIDEO_POLL_MAX = 60          # ~10 minutes avant abandon
+VIDEO_RESULTAT_TTL = 3600
+
+
+def _cle_video(operation_name: str) -> str:
+    return f"ai:video:{operation_name}"
+
+
+def finaliser_video(user, operation_name: str, conversation_id=None, prompt: str = "Vidéo générée") -> dict:
+    """
+    Verifie l'operation ; a la fin, decompte le quota, enregistre le message
+    et publie l'evenement une seule fois (tache et poll de secours peuvent se croiser).
+    """
+    from core.events import publier
+    from .models import AIConversation, AIMessage
+    from .services.quota_service import QuotaService
+    from .services.tools.google_media_generator import check_google_video_status
+
+    deja = cache.get(_cle_video(operation_name))
+    if deja:
+        return deja
+
+    result = check_google_video_status(operation_name)
+    if result.get("error") or not result.get("done"):
+        return result
+
+    quota_service = QuotaService()
+    payload = {"done": True, "video_url": result["video_url"]}
+    if not cache.add(_cle_video(operation_name), payload, VIDEO_RESULTAT_TTL):
+        return cache.get(_cle_video(operation_name)) or payload
+
+    quota_service.increment_usage(user, "image")
+
+    # Sauvegarder dans le message de conversation si conv_id fourni
+    if conversation_id:
+        try:
+            conv = AIConversation.objects.get(pk=conversation_id, user=user)
+            AIMessage.objects.create(
+                conversation=conv,
+                role="assistant",
+                content=f"Vidéo générée : {prompt}",
+                message_type="video",
+                image_url=result["video_url"],
+            )
+        except Exception as e:
+            logger.error(f"Error saving video message: {e}")
+
+    payload = {**payload, "quota": quota_service.get_remaining(user)}
+    publier(user.pk, "video", operation_name=operation_name, **payload)
+    return payload
+
+
+@shared_task(bind=True, max_retries=VIDEO_POLL_MAX, default_retry_delay=VIDEO_POLL_INTERVAL)
+def suivre_video_task(self, user_id: int, operation_name: str, conversation_id=None, prompt: str = "Vidéo générée"):
+    """Reprogramme la verification jusqu'a la fin de l'operation video."""
+    from django.contrib.auth import get_user_model
+    from core.events import publier
+
+    user = get_user_model().objects.get(pk=user_id)
+    result = finaliser_video(user, operation_name, conversation_id, prompt)
+
+    if result.get("error"):
+        publier(user_id, "video", operation_name=operation_name, error=result["error"])
+        return {"status": "error", "message": result["error"]}
+    if not result.get("done"):
+        raise self.retry()
+    return {"status": "done", "video_url": result["video_url"]}
@@ -0,0 +1,78 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from e_shelle_ai.services.central_agent import _Retrieval
+
+
+class FakeSources:
+    """Sources de recherche simulees : chaque appel est compte par source et module."""
+
+    def __init__(self, slow=()):
+        self.calls = []
+        self.slow = set(slow)
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def _source(self, name, module=None):
+        with self.lock:
+            self.calls.append((name, module))
+        if name in self.slow:
+            self.release.wait(5)
+        return [{"title": f"{name}:{module}"}]
+
+    def _premium_business_results(self, query, module="general", limit=3):
+        return self._source("premium", module)
+
+    def _resto_dish_results(self, query, limit=3):
+        return self._source("dishes")
+
+    def _business_catalog_results(self, query, limit=3):
+        return self._source("catalog")
+
+    def _extra_module_results(self, module, query, limit=3):
+        return self._source("extra", module)
+
+    def get_module_results(self, module, query, limit=3):
+        return self._source("module", module)
+
+
+class RetrievalTests(SimpleTestCase):
+    def _retrieval(self, sources):
+        patcher = mock.patch("chat.services.get_module_results", sources.get_module_results)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(sources.release.set)
+        return _Retrieval(sources, "ndole pas cher")
+
+    @override_settings(CENTRAL_AGENT_SOURCE_TIMEOUT=2.0, CENTRAL_AGENT_SOURCE_TIMEOUTS={"catalog": 0.2})
+    def test_source_lente_ignoree_a_son_budget(self):
+        sources = FakeSources(slow={"catalog"})
+        retrieval = self._retrieval(sources)
+
+        started = time.monotonic()
+        groups = retrieval.groups("resto")
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(groups["catalog"], [])
+        self.assertEqual(groups["dishes"], [{"title": "dishes:None"}])
+        self.assertEqual(groups["module"], [{"title": "module:resto"}])
+        self.assertLess(elapsed, 1.5)
+
+    def test_changement_de_route_sans_relancer_les_sources_partagees(self):
+        sources = FakeSources()
+        retrieval = self._retrieval(sources).start("resto")
+
+        groups = retrieval.groups("gaz")
+        retrieval.groups("resto")
+
+        self.assertEqual(groups["premium"], [{"title": "premium:gaz"}])
+        self.assertEqual(sources.calls.count(("dishes", None)), 1)
+        self.assertEqual(sources.calls.count(("catalog", None)), 1)
+        self.assertEqual(
+            sorted(call for call in sources.calls if call[1]),
+            [("extra", "gaz"), ("extra", "resto"), ("module", "gaz"), ("module", "resto"),
+             ("premium", "gaz"), ("premium", "resto")],
+        )
@@ -24,7 +24,7 @@ from .services.context_builder import UserContextBuilder
 from .services.memory_service import MemoryService
 from .services.quota_service import QuotaService
 from .services.tools.google_media_generator import (
-    generate_google_image, start_google_video, check_google_video_status
+    generate_google_image, start_google_video
 )
 from django.conf import settings
 
@@ -401,10 +401,23 @@ class StartVideoView(LoginRequiredMixin, View):
                 "error": f"Génération vidéo impossible : {result['error']}"
             }, status=500)
 
+        # Suivi cote serveur : la fin est poussee sur le flux SSE (evenement "video")
+        from .tasks import suivre_video_task
+        suivi = True
+        try:
+            suivre_video_task.apply_async(
+                (user.pk, result["operation_name"], conv_id, prompt),
+                countdown=suivre_video_task.default_retry_delay,
+            )
+        except Exception as e:
+            logger.warning(f"Video watcher not queued, client will poll: {e}")
+            suivi = False
+
         return JsonResponse({
             "operation_name": result["operation_name"],
             "conversation_id": conv_id,
             "prompt": prompt,
+            "server_watch": suivi,
         })
 
 
@@ -423,7 +436,9 @@ class PollVideoView(LoginRequiredMixin, View):
         if not operation_name:
             return JsonResponse({"error": "Nom de l'opération manquant."}, status=400)
 
-        result = check_google_video_status(operation_name)
+        # Secours (pas de worker Celery, pas d'EventSource) : meme finalisation que la tache
+        from .tasks import finaliser_video
+        result = finaliser_video(user, operation_name, conversation_id, prompt)
 
         if result.get("error"):
             return JsonResponse({"error": result["error"]}, status=500)
@@ -431,29 +446,10 @@ class PollVideoView(LoginRequiredMixin, View):
         if not result.get("done"):
             return JsonResponse({"done": False})
 
-        # Vidéo terminée !
-        # Incrémenter le quota
-        quota_service = QuotaService()
-        quota_service.increment_usage(user, "image")
-
-        # Sauvegarder dans le message de conversation si conv_id fourni
-        if conversation_id:
-            try:
-                conv = AIConversation.objects.get(pk=conversation_id, user=user)
-                AIMessage.objects.create(
-                    conversation=conv,
-                    role="assistant",
-                    content=f"Vidéo générée : {prompt}",
-                    message_type="video",
-                    image_url=result["video_url"],
-                )
-            except Exception as e:
-                logger.error(f"Error saving video message: {e}")
-
         return JsonResponse({
             "done": True,
             "video_url": result["video_url"],
-            "quota": quota_service.get_remaining(user),
+            "quota": result.get("quota") or QuotaService().get_remaining(user),
         })
 
 
@@ -5,6 +5,12 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Le flux d'événements /evenements/ (core.events, SSE) garde une connexion ouverte
+par onglet : il doit être servi par un serveur ASGI. En production (deploy/eshelle.service) :
+    gunicorn --worker-class uvicorn_worker.UvicornWorker edu_cm.asgi:application
+En local : uvicorn edu_cm.asgi:application. Sous WSGI (runserver, gunicorn sync), le flux
+n'envoie que l'état initial et le client se reconnecte périodiquement.
 """
 
 import os
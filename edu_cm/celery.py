@@ -2,6 +2,7 @@
 Configuration Celery pour E-Shelle.
 Lance les workers avec: celery -A edu_cm worker -l info
 Lance le scheduler avec: celery -A edu_cm beat -l info
+File Njangi dédiée (NJANGI_FANOUT_QUEUE=njangi) : celery -A edu_cm worker -Q njangi -c 8 -l info
 """
 
 import os
@@ -146,10 +147,10 @@ app.conf.beat_schedule = {
         "schedule": crontab(minute="*/5"),
     },
 
-    # Sync statistiques Facebook toutes les 6h
+    # Sync statistiques Facebook — seuls les posts échus (fréquence selon l'âge du post)
     "fb-sync-stats": {
         "task": "facebook_agent.tasks.sync_post_stats",
-        "schedule": crontab(hour="*/6", minute=0),
+        "schedule": crontab(minute="*/15"),
     },
 
     # Vérification du token chaque matin à 6h
@@ -190,6 +191,12 @@ app.conf.beat_schedule = {
         "schedule": crontab(hour=3, minute=0, day_of_week=0),
     },
 
+    # Points de contrôle du fond commun — chaque jour à 1h00
+    "njangi-fund-ledger-checkpoints": {
+        "task": "njangi.tasks.checkpoint_fund_ledgers",
+        "schedule": crontab(hour=1, minute=0),
+    },
+
     # ── Germany Opportunities — Recherche quotidien d'Ausbildung ──────────────
     "germany-fetch-ausbildung": {
         "task": "germany_opportunities.tasks.fetch_ausbildung_offers",
@@ -224,5 +231,34 @@ app.conf.beat_schedule = {
         "task": "business.tasks.downgrade_expired_businesses",
         "schedule": crontab(hour=8, minute=15),
     },
+    # Agrégats journaliers des leads (rapports) — toutes les heures à H+05
+    "business-rollup-daily-stats": {
+        "task": "business.tasks.rollup_business_daily_stats",
+        "schedule": crontab(minute=5),
+    },
+    # Archivage des événements bruts au-delà de la rétention — chaque jour à 3h30
+    "business-archive-lead-events": {
+        "task": "business.tasks.archive_business_lead_events",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    # Compteurs de leads en écriture différée — vidage du tampon Redis
+    "business-flush-counters": {
+        "task": "business.tasks.flush_business_counters",
+        "schedule": float(os.getenv("BUSINESS_COUNTERS_FLUSH_SECONDS", "15")),
+    },
+
+    # ── E-Shelle Resto ─────────────────────────────────────────────────────
+    # Statut ouvert/fermé basculé aux heures d'ouverture et de fermeture
+    "resto-sync-opening-status": {
+        "task": "resto.tasks.sync_opening_status_task",
+        "schedule": crontab(minute="*/5"),
+    },
+
+    # ── WhatsApp Agent — Campagnes ─────────────────────────────────────────
+    # Reconciliation des compteurs incrémentaux des campagnes — toutes les 15 min
+    "whatsapp-reconcile-campaign-stats": {
+        "task": "whatsapp_agent.tasks.reconcilier_stats_campagnes_task",
+        "schedule": crontab(minute="*/15"),
+    },
 }
 
@@ -153,6 +153,8 @@ INSTALLED_APPS = [
     "e_shelle_ai.apps.EshelleAiConfig",
     "chat.apps.ChatConfig",
     "business.apps.BusinessConfig",
+    "search.apps.SearchConfig",
+    "images.apps.ImagesConfig",
 
     # ── Facebook Agent IA — Auto-publication sur la page Facebook ──
     "facebook_agent.apps.FacebookAgentConfig",
@@ -205,6 +207,8 @@ OPENAI_IMAGE_SIZE         = "1024x1024"
 OPENAI_IMAGE_QUALITY      = "hd"
 AI_MAX_CONTEXT_MESSAGES   = 20   # Nb messages gardés dans le contexte GPT
 AI_MEMORY_SUMMARY_THRESHOLD = 40 # Résumé auto après N messages
+CENTRAL_AGENT_RETRIEVAL_WORKERS = int(os.getenv("CENTRAL_AGENT_RETRIEVAL_WORKERS", "16"))  # Recherches parallèles de l'agent central
+CENTRAL_AGENT_SOURCE_TIMEOUT    = float(os.getenv("CENTRAL_AGENT_SOURCE_TIMEOUT", "2.0"))  # Budget (s) par source de recherche
 
 # AdGen
 ADGEN_MAX_CAMPAIGNS_FREE = 5
@@ -276,7 +280,8 @@ if DATABASE_URL and not USE_SQLITE and (not DEBUG or USE_POSTGRES == "true"):
             "PASSWORD": _u.password,
             "HOST":     _u.hostname,
             "PORT":     str(_u.port or 5432),
-            "CONN_MAX_AGE": 60,
+            # 0 sous ASGI (deploy/eshelle.service) : connexions persistantes déconseillées
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
         }
     }
 else:
@@ -535,6 +540,13 @@ WHATSAPP_API_URL = os.getenv(
 WHATSAPP_VERIFY_TOKEN = os.getenv("WHATSAPP_VERIFY_TOKEN", "")
 WHATSAPP_DRY_RUN = os.getenv("WHATSAPP_DRY_RUN", "True").lower() in ("1", "true", "yes")
 WHATSAPP_CONFIG_READY = bool(WHATSAPP_TOKEN and WHATSAPP_PHONE_ID and WHATSAPP_VERIFY_TOKEN)
+# Dispatcher des campagnes : débit par numéro (palier Meta), lots, relances par message
+WHATSAPP_RATE_PER_SECOND = float(os.getenv("WHATSAPP_RATE_PER_SECOND", "80"))
+WHATSAPP_RATE_BURST = int(os.getenv("WHATSAPP_RATE_BURST", "80"))
+WHATSAPP_DISPATCH_BATCH = int(os.getenv("WHATSAPP_DISPATCH_BATCH", "200"))
+WHATSAPP_DISPATCH_MAX_SECONDS = int(os.getenv("WHATSAPP_DISPATCH_MAX_SECONDS", "240"))
+WHATSAPP_DISPATCH_MAX_ATTEMPTS = int(os.getenv("WHATSAPP_DISPATCH_MAX_ATTEMPTS", "3"))
+WHATSAPP_HTTP_TIMEOUT = float(os.getenv("WHATSAPP_HTTP_TIMEOUT", "10"))
 
 # ── Celery — Broker & Backend ──────────────────────────────────────
 CELERY_BROKER_URL         = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -546,6 +558,70 @@ CELERY_RESULT_SERIALIZER  = "json"
 CELERY_TIMEZONE           = TIME_ZONE
 CELERY_BEAT_SCHEDULER     = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# ── Cache partagé — Redis du broker (base dédiée), mémoire locale en dev ──
+# CACHE_REDIS_URL non défini : broker Celery en production, mémoire locale si DEBUG.
+# CACHE_REDIS_URL vide : mémoire locale (un cache par processus).
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+if CACHE_REDIS_URL is None and not DEBUG:
+    _broker_base, _, _broker_db = CELERY_BROKER_URL.rstrip("/").rpartition("/")
+    if not _broker_db.isdigit():
+        _broker_base = CELERY_BROKER_URL.rstrip("/")
+    CACHE_REDIS_URL = f"{_broker_base}/{os.getenv('CACHE_REDIS_DB', '1')}"
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+            "KEY_PREFIX": "eshelle",
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "eshelle-default",
+            "TIMEOUT": 300,
+        }
+    }
+
+# Njangi — sous-tâches par groupe des jobs planifiés : file dédiée (vide = file par défaut ;
+# parallélisme = -c du worker de cette file) et débit max par worker (ex. « 60/m », vide = libre)
+NJANGI_FANOUT_QUEUE = os.getenv("NJANGI_FANOUT_QUEUE", "")
+NJANGI_FANOUT_RATE_LIMIT = os.getenv("NJANGI_FANOUT_RATE_LIMIT", "")
+# Njangi — au-delà de ce nombre de prêts actifs, l'état du fond PDF est rendu en tâche Celery
+NJANGI_PDF_ASYNC_MIN_LOANS = int(os.getenv("NJANGI_PDF_ASYNC_MIN_LOANS", "150"))
+
+# Business — compteurs de leads en écriture différée (tampon Redis partagé, par défaut celui du cache ;
+# vide = tampon mémoire par processus, réservé au dev/tests)
+BUSINESS_COUNTERS_REDIS_URL = os.getenv("BUSINESS_COUNTERS_REDIS_URL", CACHE_REDIS_URL or "")
+BUSINESS_COUNTERS_FLUSH_SECONDS = int(os.getenv("BUSINESS_COUNTERS_FLUSH_SECONDS", "15"))
+# Business — durée de conservation des événements de leads bruts (0 = illimitée ; les agrégats restent)
+BUSINESS_LEAD_EVENT_RETENTION_DAYS = int(os.getenv("BUSINESS_LEAD_EVENT_RETENTION_DAYS", "0"))
+
+# TTS partagé — threads de synthèse gTTS et dossier des clips (dédupliqués par contenu) dans le stockage
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+TTS_STORAGE_DIR = os.getenv("TTS_STORAGE_DIR", "tts")
+
+# Context processors — TTL (s) des valeurs globales mises en cache par utilisateur (core.context_cache)
+CONTEXT_CACHE_USER_TTL = int(os.getenv("CONTEXT_CACHE_USER_TTL", "60"))
+
+# Phone OCR — analyses Tesseract en parallèle par vidéo
+PHONE_OCR_WORKERS = int(os.getenv("PHONE_OCR_WORKERS", "4"))
+PHONE_OCR_JOB_TIMEOUT = int(os.getenv("PHONE_OCR_JOB_TIMEOUT", "1800"))  # job en cours au-delà : abandonné, relancé
+
+# Événements temps réel (SSE) — pub/sub et compteurs non lus (vide = courtier mémoire, un seul processus)
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", CACHE_REDIS_URL or "")
+EVENTS_SSE_MAX_SECONDS = int(os.getenv("EVENTS_SSE_MAX_SECONDS", "300"))
+EVENTS_SSE_KEEPALIVE_SECONDS = int(os.getenv("EVENTS_SSE_KEEPALIVE_SECONDS", "20"))
+EVENTS_SSE_WSGI_RETRY_MS = int(os.getenv("EVENTS_SSE_WSGI_RETRY_MS", "30000"))
+
+# Images responsives — largeurs des déclinaisons (WebP + JPEG) générées en tâche Celery
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1024,1600").split(",")]
+IMAGE_VARIANT_WEBP_QUALITY = int(os.getenv("IMAGE_VARIANT_WEBP_QUALITY", "78"))
+IMAGE_VARIANT_JPEG_QUALITY = int(os.getenv("IMAGE_VARIANT_JPEG_QUALITY", "80"))
+
 # Celery Beat — planning défini dans edu_cm/celery.py (app.conf.beat_schedule)
 
 # ── Logging — capture les erreurs Django en production ─────────────────────────
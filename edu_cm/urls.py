@@ -7,6 +7,8 @@ from django.shortcuts import render, redirect
 from django.http import HttpResponse
 from django.utils import timezone
 from business import views as business_views
+from core import events as core_events
+from core import views as core_views
 from billing import views_affiliate
 from seo_agent import views as seo_views
 import urllib.parse
@@ -49,150 +51,20 @@ def home_view(request):
     except Exception:
         ctx["gaz_depots_vedette"] = []
     try:
-        from django.utils import timezone
-        from django.db.models import Q, Sum
-        from business.models import BusinessCatalogItem, BusinessLeadEvent, BusinessProfile, HomeAdSlide, AppPromotionSlide
-        now = timezone.now()
+        from django.db.models import Sum
+        from business.home import app_promo_slides, home_ad_slides, premium_showcase_items
+        from business.models import BusinessCatalogItem, BusinessLeadEvent, BusinessProfile
         premium_businesses = list(
             BusinessProfile.objects.filter(
                 is_active=True,
                 plan__in=[BusinessProfile.Plan.PREMIUM, BusinessProfile.Plan.BUSINESS],
             ).order_by("-boost_expires_at", "-subscription_expires_at", "-leads_count", "-updated_at")[:12]
         )
-        recent_catalog_items = list(
-            BusinessCatalogItem.objects.filter(is_active=True, business__is_active=True)
-            .select_related("business")
-            .order_by("-created_at")
-        )
-        try:
-            from immobilier_cameroun.models import Bien, StatutBien
-            recent_immo_items = list(
-                Bien.objects.filter(statut=StatutBien.PUBLIE)
-                .filter(Q(est_mis_en_avant=True) | Q(est_coup_de_coeur=True))
-                .prefetch_related("photos")
-                .order_by("-date_publication", "-updated_at")
-            )
-        except Exception:
-            recent_immo_items = []
-        try:
-            from resto.models import Dish
-            recent_dishes = list(
-                Dish.objects.filter(is_active=True, restaurant__is_approved=True, restaurant__is_active=True)
-                .select_related("restaurant", "restaurant__city", "restaurant__neighborhood")
-                .order_by("-id")[:30]
-            )
-        except Exception:
-            recent_dishes = []
-        premium_showcase_items = []
-        for item in recent_catalog_items:
-            business = item.business
-            premium_showcase_items.append(
-                {
-                    "_rank": item.created_at,
-                    "tag": item.get_item_type_display(),
-                    "title": item.title,
-                    "description": item.description,
-                    "kind": f"{business.get_module_display()} · {business.city or 'Cameroun'}",
-                    "meta": business.district or business.city or "Proche",
-                    "price": item.formatted_price,
-                    "image": item.image_url,
-                    "initial": item.title[:1],
-                    "url": f"{business.get_absolute_url()}?produit={item.id}",
-                    "contact_url": item.to_public_item().get("contact_url") or business.get_absolute_url(),
-                    "views": item.views_count,
-                    "leads": business.leads_count,
-                }
-            )
-        for bien in recent_immo_items:
-            photo = getattr(bien, "photo_principale", None)
-            image = ""
-            if photo and getattr(photo, "image", None):
-                try:
-                    image = photo.image.url
-                except Exception:
-                    image = ""
-            try:
-                contact_url = bien.get_whatsapp_url()
-            except Exception:
-                contact_url = bien.get_absolute_url()
-            premium_showcase_items.append(
-                {
-                    "_rank": bien.date_publication or bien.updated_at,
-                    "tag": "Immobilier",
-                    "title": bien.titre,
-                    "description": bien.description,
-                    "kind": f"{bien.get_type_bien_display()} · {bien.ville}",
-                    "meta": bien.quartier or bien.ville or "Cameroun",
-                    "price": bien.prix_formate,
-                    "image": image,
-                    "initial": bien.titre[:1],
-                    "url": bien.get_absolute_url(),
-                    "contact_url": contact_url,
-                    "views": bien.vues,
-                    "leads": 0,
-                }
-            )
-        for dish in recent_dishes:
-            image_url = ""
-            if dish.image:
-                try:
-                    image_url = dish.image.url
-                except Exception:
-                    image_url = ""
-            contact_url = dish.restaurant.whatsapp_url(dish.name)
-            try:
-                from django.urls import reverse
-                detail_url = reverse("resto:restaurant_detail", kwargs={"slug": dish.restaurant.slug})
-            except Exception:
-                detail_url = f"/resto/restaurant/{dish.restaurant.slug}/"
-            premium_showcase_items.append(
-                {
-                    "_rank": dish.restaurant.created_at,
-                    "tag": "Plat",
-                    "title": dish.name,
-                    "description": dish.description,
-                    "kind": f"{dish.restaurant.name} · {dish.restaurant.city.name}",
-                    "meta": dish.restaurant.neighborhood.name if dish.restaurant.neighborhood else (dish.restaurant.address or dish.restaurant.city.name),
-                    "price": dish.formatted_price,
-                    "image": image_url,
-                    "initial": dish.name[:1],
-                    "url": detail_url,
-                    "contact_url": contact_url,
-                    "views": dish.restaurant.views_count,
-                    "leads": 0,
-                }
-            )
-        premium_showcase_items = sorted(
-            premium_showcase_items,
-            key=lambda entry: entry.get("_rank") or now,
-            reverse=True,
-        )
-        # Ne plus ajouter les fiches entreprises comme fallbacks dans la vitrine produits/services
-        pass
-        home_ad_slides = list(
-            HomeAdSlide.objects.filter(is_active=True)
-            .filter(starts_at__isnull=True)
-            .exclude(ends_at__lt=now)
-            .select_related("business")
-            .order_by("order", "-created_at")[:12]
-        )
-        timed_slides = list(
-            HomeAdSlide.objects.filter(is_active=True, starts_at__lte=now)
-            .exclude(ends_at__lt=now)
-            .select_related("business")
-            .order_by("order", "-created_at")[:12]
-        )
-        slide_ids = set()
-        merged_slides = []
-        for slide in home_ad_slides + timed_slides:
-            if slide.pk not in slide_ids and slide.is_live:
-                merged_slides.append(slide)
-                slide_ids.add(slide.pk)
+        showcase_items = premium_showcase_items()
+        merged_slides = home_ad_slides()
         if merged_slides:
-            from django.db.models import F
-            HomeAdSlide.objects.filter(pk__in=[slide.pk for slide in merged_slides[:10]]).update(
-                impressions_count=F("impressions_count") + 1
-            )
+            from business.counters import SLIDE, increment_many
+            increment_many(SLIDE, [slide.pk for slide in merged_slides[:10]], impressions_count=1)
         active_businesses = BusinessProfile.objects.filter(is_active=True)
         top_verified_businesses = list(
             active_businesses.filter(is_verified=True)
@@ -222,7 +94,7 @@ def home_view(request):
             "events": BusinessLeadEvent.objects.count(),
         }
         from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-        paginator = Paginator(premium_showcase_items, 30)
+        paginator = Paginator(showcase_items, 30)
         page_num = request.GET.get('page', 1)
         try:
             paginated_items = paginator.page(page_num)
@@ -233,7 +105,7 @@ def home_view(request):
 
         ctx["premium_showcase_items"] = paginated_items
         ctx["home_ad_slides"] = merged_slides[:10]
-        ctx["app_promo_slides"] = list(AppPromotionSlide.objects.filter(is_active=True).order_by("order", "-created_at"))
+        ctx["app_promo_slides"] = app_promo_slides()
         ctx["hero_businesses"] = [item for item in premium_businesses if item.promo_image][:6] or premium_businesses[:6]
     except Exception:
         ctx["premium_businesses"] = []
@@ -476,6 +348,8 @@ def commercial_pdf_view(request):
 urlpatterns = [
     path("avatar/", avatar_redirect, name="avatar_redirect"),
     path("e-shelle-commercial.pdf", commercial_pdf_view, name="commercial_pdf"),
+    path("admin/cache-stats/", core_views.cache_stats, name="cache_stats"),
+    path("evenements/", core_events.flux_evenements, name="evenements"),
     path("admin/", admin.site.urls),
 
     # Authentification (vues custom E-Shelle)
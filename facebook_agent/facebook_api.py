@@ -3,14 +3,18 @@ Client Meta Graph API pour E-Shelle Auto-Post.
 Gère la publication, la récupération de stats et le refresh de token.
 """
 
+import json
 import requests
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger("facebook_agent")
 
 GRAPH_API_BASE = "https://graph.facebook.com/v25.0"
+GRAPH_BATCH_LIMIT = 50  # Maximum de requêtes par appel batch Graph API
+POST_STATS_FIELDS = "likes.summary(true),comments.summary(true),shares,reactions.summary(true)"
 
 
 class FacebookAPIError(Exception):
@@ -32,6 +36,8 @@ class FacebookAPIClient:
         self.page_id = page_id
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": "E-Shelle-AutoPost/1.0"})
+        # Connexions keep-alive réutilisées entre les appels (batchs de stats notamment)
+        self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
 
     def _request(
         self,
@@ -138,24 +144,54 @@ class FacebookAPIClient:
     # Statistiques                                                         #
     # ------------------------------------------------------------------ #
 
+    @staticmethod
+    def _parse_post_stats(result: dict) -> Dict[str, int]:
+        return {
+            "likes": result.get("likes", {}).get("summary", {}).get("total_count", 0),
+            "comments": result.get("comments", {}).get("summary", {}).get("total_count", 0),
+            "shares": result.get("shares", {}).get("count", 0),
+            "reactions": result.get("reactions", {}).get("summary", {}).get("total_count", 0),
+        }
+
     def get_post_insights(self, post_id: str) -> Dict[str, Any]:
         """Récupère les statistiques d'un post (likes, commentaires, partages)."""
         try:
-            result = self._request(
-                "GET",
-                post_id,
-                params={"fields": "likes.summary(true),comments.summary(true),shares,reactions.summary(true)"},
-            )
-            return {
-                "likes": result.get("likes", {}).get("summary", {}).get("total_count", 0),
-                "comments": result.get("comments", {}).get("summary", {}).get("total_count", 0),
-                "shares": result.get("shares", {}).get("count", 0),
-                "reactions": result.get("reactions", {}).get("summary", {}).get("total_count", 0),
-            }
+            result = self._request("GET", post_id, params={"fields": POST_STATS_FIELDS})
+            return self._parse_post_stats(result)
         except FacebookAPIError as e:
             logger.warning(f"[FacebookAPI] Impossible de récupérer les stats du post {post_id}: {e}")
             return {"likes": 0, "comments": 0, "shares": 0, "reactions": 0}
 
+    def get_posts_insights(self, post_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Statistiques de plusieurs posts via l'API batch Graph (50 requêtes par appel).
+        Les posts en erreur sont absents du résultat : leurs stats en base restent inchangées.
+        """
+        stats = {}
+        for start in range(0, len(post_ids), GRAPH_BATCH_LIMIT):
+            chunk = post_ids[start:start + GRAPH_BATCH_LIMIT]
+            batch = [
+                {"method": "GET", "relative_url": f"{post_id}?fields={POST_STATS_FIELDS}"}
+                for post_id in chunk
+            ]
+            try:
+                responses = self._request(
+                    "POST", "", params={"include_headers": "false"}, data={"batch": json.dumps(batch)},
+                )
+            except FacebookAPIError as e:
+                logger.warning(f"[FacebookAPI] Batch stats en échec ({len(chunk)} posts): {e}")
+                continue
+            # Une réponse par requête, dans l'ordre ; null si Meta a abandonné la sous-requête
+            for post_id, item in zip(chunk, responses):
+                if not item or item.get("code") != 200:
+                    logger.warning(f"[FacebookAPI] Stats indisponibles pour le post {post_id}: {item}")
+                    continue
+                try:
+                    stats[post_id] = self._parse_post_stats(json.loads(item.get("body") or "{}"))
+                except ValueError:
+                    logger.warning(f"[FacebookAPI] Réponse batch illisible pour le post {post_id}")
+        return stats
+
     def get_page_insights(self) -> Dict[str, Any]:
         """Récupère les statistiques globales de la page."""
         try:
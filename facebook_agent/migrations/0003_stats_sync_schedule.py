@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facebook_agent', '0002_alter_contentrule_section_alter_posttemplate_section_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentstats',
+            name='rolled_up_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Agrégé jusqu'au"),
+        ),
+        migrations.AddField(
+            model_name='publishedpost',
+            name='stats_next_sync_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Prochaine sync des stats'),
+        ),
+    ]
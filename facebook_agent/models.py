@@ -209,6 +209,9 @@ class PublishedPost(models.Model):
     shares_count = models.PositiveIntegerField(default=0, verbose_name="Partages")
     reach = models.PositiveIntegerField(default=0, verbose_name="Portée")
     stats_updated_at = models.DateTimeField(null=True, blank=True, verbose_name="Stats mises à jour le")
+    stats_next_sync_at = models.DateTimeField(
+        null=True, blank=True, db_index=True, verbose_name="Prochaine sync des stats"
+    )
 
     class Meta:
         verbose_name = "Post Publié"
@@ -273,6 +276,9 @@ class AgentStats(models.Model):
     total_reach = models.PositiveIntegerField(default=0, verbose_name="Portée totale")
     total_likes = models.PositiveIntegerField(default=0, verbose_name="Likes totaux")
     total_comments = models.PositiveIntegerField(default=0, verbose_name="Commentaires totaux")
+    rolled_up_until = models.DateTimeField(
+        null=True, blank=True, verbose_name="Agrégé jusqu'au"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
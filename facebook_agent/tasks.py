@@ -5,7 +5,7 @@ Automatise la génération et publication de posts selon un planning.
 
 import logging
 import time
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from celery import shared_task
 from django.utils import timezone
@@ -252,112 +252,218 @@ def process_pending_scheduled_posts():
     from facebook_agent.models import ScheduledPost
 
     now = timezone.now()
-    pending = ScheduledPost.objects.filter(
-        status__in=("en_attente", "approuve"),
-        scheduled_at__lte=now,
-        retry_count__lt=3,
+    # Une seule requête : les ids servent à la fois au comptage et à la distribution
+    post_ids = list(
+        ScheduledPost.objects.filter(
+            status__in=("en_attente", "approuve"),
+            scheduled_at__lte=now,
+            retry_count__lt=3,
+        ).values_list("id", flat=True)
     )
 
-    count = pending.count()
-    if count:
-        logger.info(f"[Task] {count} posts planifiés à traiter")
-        for post in pending:
-            publish_scheduled_post.delay(str(post.id))
+    if post_ids:
+        logger.info(f"[Task] {len(post_ids)} posts planifiés à traiter")
+        for post_id in post_ids:
+            publish_scheduled_post.delay(str(post_id))
 
-    return {"processed": count}
+    return {"processed": len(post_ids)}
 
 
 # ------------------------------------------------------------------ #
 # Tâche : synchroniser les statistiques des posts                     #
 # ------------------------------------------------------------------ #
 
+STATS_MAX_AGE = timedelta(days=7)
+
+# (âge maximum du post, intervalle entre deux syncs) : un post frais bouge vite,
+# un post d'une semaine presque plus.
+STATS_SYNC_INTERVALS = (
+    (timedelta(hours=6), timedelta(minutes=15)),
+    (timedelta(days=1), timedelta(hours=1)),
+    (timedelta(days=3), timedelta(hours=6)),
+    (STATS_MAX_AGE, timedelta(days=1)),
+)
+
+
+def next_stats_sync(published_at, now):
+    """Date de la prochaine sync des stats d'un post, None au-delà de STATS_MAX_AGE."""
+    age = now - published_at
+    for max_age, interval in STATS_SYNC_INTERVALS:
+        if age < max_age:
+            return now + interval
+    return None
+
+
 @shared_task
 def sync_post_stats(published_post_id: str = None):
-    """Met à jour les statistiques (likes, commentaires, partages) des posts récents."""
-    from facebook_agent.models import PublishedPost, FacebookPageConfig
+    """
+    Met à jour les statistiques (likes, commentaires, partages) des posts récents.
+    Seuls les posts dont la prochaine sync est échue sont interrogés, par batchs
+    Graph API de 50, puis écrits en un bulk_update.
+    """
+    from django.db.models import Q
+    from facebook_agent.models import PublishedPost
     from facebook_agent.facebook_api import FacebookAPIClient
 
-    # Sync les posts des 7 derniers jours si pas d'ID spécifique
+    now = timezone.now()
+    posts = PublishedPost.objects.select_related("page_config").exclude(facebook_post_id="")
     if published_post_id:
-        posts = PublishedPost.objects.filter(id=published_post_id)
+        posts = posts.filter(id=published_post_id)
     else:
-        cutoff = timezone.now() - timedelta(days=7)
-        posts = PublishedPost.objects.filter(published_at__gte=cutoff)
+        posts = posts.filter(published_at__gte=now - STATS_MAX_AGE).filter(
+            Q(stats_next_sync_at__isnull=True) | Q(stats_next_sync_at__lte=now)
+        )
 
-    updated = 0
-    config = FacebookPageConfig.objects.filter(is_active=True).first()
-    if not config:
+    by_page = {}
+    for post in posts:
+        if post.page_config.is_active:
+            by_page.setdefault(post.page_config_id, []).append(post)
+    if not by_page:
         return {"updated": 0}
 
-    fb_client = FacebookAPIClient(config.page_access_token, config.page_id)
+    changed, deltas = [], {}
+    for page_posts in by_page.values():
+        config = page_posts[0].page_config
+        fb_client = FacebookAPIClient(config.page_access_token, config.page_id)
+        stats_by_id = fb_client.get_posts_insights([post.facebook_post_id for post in page_posts])
+
+        for post in page_posts:
+            stats = stats_by_id.get(post.facebook_post_id)
+            if stats is not None:
+                likes, comments = stats.get("likes", 0), stats.get("comments", 0)
+                delta = deltas.setdefault(post.published_at, [0, 0])
+                delta[0] += likes - post.likes_count
+                delta[1] += comments - post.comments_count
+                post.likes_count = likes
+                post.comments_count = comments
+                post.shares_count = stats.get("shares", 0)
+                post.stats_updated_at = now
+            # Même en cas d'échec : le post sera réessayé au prochain créneau
+            post.stats_next_sync_at = next_stats_sync(post.published_at, now)
+            changed.append(post)
+
+    PublishedPost.objects.bulk_update(
+        changed,
+        ["likes_count", "comments_count", "shares_count", "stats_updated_at", "stats_next_sync_at"],
+        batch_size=500,
+    )
+    _apply_stats_deltas(deltas)
 
-    for post in posts:
-        try:
-            stats = fb_client.get_post_insights(post.facebook_post_id)
-            post.likes_count = stats.get("likes", 0)
-            post.comments_count = stats.get("comments", 0)
-            post.shares_count = stats.get("shares", 0)
-            post.stats_updated_at = timezone.now()
-            post.save(update_fields=[
-                "likes_count", "comments_count", "shares_count", "stats_updated_at"
-            ])
-            updated += 1
-        except Exception as e:
-            logger.warning(f"[Task] Erreur sync stats post {post.facebook_post_id}: {e}")
-
-    logger.info(f"[Task] Stats synchronisées pour {updated} posts")
+    updated = sum(1 for post in changed if post.stats_updated_at == now)
+    logger.info(f"[Task] Stats synchronisées pour {updated}/{len(changed)} posts")
     return {"updated": updated}
 
 
+def _apply_stats_deltas(deltas):
+    """
+    Reporte les variations de likes/commentaires sur les AgentStats déjà agrégées.
+    Un post au-delà du point d'agrégation sera compté en entier par update_daily_stats.
+    """
+    from django.db.models import F
+    from facebook_agent.models import AgentStats
+
+    dates = {timezone.localdate(published_at) for published_at in deltas}
+    rolled_up = dict(
+        AgentStats.objects.filter(date__in=dates, rolled_up_until__isnull=False)
+        .values_list("date", "rolled_up_until")
+    )
+    per_day = {}
+    for published_at, (likes, comments) in deltas.items():
+        day = timezone.localdate(published_at)
+        if day in rolled_up and published_at <= rolled_up[day] and (likes or comments):
+            total = per_day.setdefault(day, [0, 0])
+            total[0] += likes
+            total[1] += comments
+    for day, (likes, comments) in per_day.items():
+        AgentStats.objects.filter(date=day).update(
+            total_likes=F("total_likes") + likes,
+            total_comments=F("total_comments") + comments,
+        )
+
+
 # ------------------------------------------------------------------ #
 # Tâche : mettre à jour les stats journalières                        #
 # ------------------------------------------------------------------ #
 
-@shared_task
-def update_daily_stats(section: str = None):
-    """Met à jour les statistiques journalières agrégées."""
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    return start, start + timedelta(days=1)
+
+
+def _rollup_day(day, until, create=True):
+    """
+    Ajoute aux AgentStats du jour les posts et logs créés depuis `rolled_up_until`.
+    La première agrégation d'une ligne (point d'agrégation vide) repart de zéro.
+    """
+    from django.db import transaction
+    from django.db.models import Count, Q, Sum
     from facebook_agent.models import AgentStats, PublishedPost, AgentLog
-    from django.db.models import Sum, Count
-    from django.utils.timezone import now
 
-    today = now().date()
-    stats, _ = AgentStats.objects.get_or_create(date=today)
+    day_start, day_end = _day_bounds(day)
+    end = min(until, day_end)
+
+    with transaction.atomic():
+        if create:
+            AgentStats.objects.get_or_create(date=day)
+        stats = AgentStats.objects.select_for_update().filter(date=day).first()
+        if stats is None or (stats.rolled_up_until and stats.rolled_up_until >= end):
+            return stats
+
+        if stats.rolled_up_until is None:
+            window = {"gte": day_start}
+            stats.total_posts_published = stats.total_likes = stats.total_comments = 0
+            stats.total_reach = stats.total_tokens_used = 0
+            stats.total_posts_generated = stats.total_posts_failed = 0
+            stats.posts_by_section = {}
+        else:
+            window = {"gt": stats.rolled_up_until}
 
-    # Compter les posts du jour
-    today_posts = PublishedPost.objects.filter(published_at__date=today)
-    stats.total_posts_published = today_posts.count()
+        new_posts = PublishedPost.objects.filter(
+            **{f"published_at__{op}": value for op, value in window.items()}, published_at__lte=end
+        )
+        agg = new_posts.aggregate(
+            count=Count("id"),
+            likes=Sum("likes_count"),
+            comments=Sum("comments_count"),
+            reach=Sum("reach"),
+        )
+        stats.total_posts_published += agg["count"]
+        stats.total_likes += agg["likes"] or 0
+        stats.total_comments += agg["comments"] or 0
+        stats.total_reach += agg["reach"] or 0
+
+        posts_by_section = dict(stats.posts_by_section or {})
+        for item in new_posts.values("section").annotate(count=Count("id")):
+            posts_by_section[item["section"]] = posts_by_section.get(item["section"], 0) + item["count"]
+        stats.posts_by_section = posts_by_section
+
+        logs = AgentLog.objects.filter(
+            **{f"created_at__{op}": value for op, value in window.items()}, created_at__lte=end
+        ).aggregate(
+            tokens=Sum("tokens_used"),
+            generated=Count("id", filter=Q(action="generate_content", level="success")),
+            failed=Count("id", filter=Q(action="publish_post", level="error")),
+        )
+        stats.total_tokens_used += logs["tokens"] or 0
+        stats.total_posts_generated += logs["generated"]
+        stats.total_posts_failed += logs["failed"]
 
-    # Agrégations
-    agg = today_posts.aggregate(
-        total_likes=Sum("likes_count"),
-        total_comments=Sum("comments_count"),
-        total_reach=Sum("reach"),
-    )
-    stats.total_likes = agg["total_likes"] or 0
-    stats.total_comments = agg["total_comments"] or 0
-    stats.total_reach = agg["total_reach"] or 0
-
-    # Posts par section
-    posts_by_section = {}
-    for item in today_posts.values("section").annotate(count=Count("id")):
-        posts_by_section[item["section"]] = item["count"]
-    stats.posts_by_section = posts_by_section
-
-    # Tokens IA utilisés
-    token_agg = AgentLog.objects.filter(
-        created_at__date=today
-    ).aggregate(total=Sum("tokens_used"))
-    stats.total_tokens_used = token_agg["total"] or 0
-
-    # Posts générés et échoués
-    stats.total_posts_generated = AgentLog.objects.filter(
-        created_at__date=today, action="generate_content", level="success"
-    ).count()
-    stats.total_posts_failed = AgentLog.objects.filter(
-        created_at__date=today, action="publish_post", level="error"
-    ).count()
-
-    stats.save()
+        stats.rolled_up_until = end
+        stats.save()
+    return stats
+
+
+@shared_task
+def update_daily_stats(section: str = None):
+    """
+    Met à jour les statistiques journalières agrégées, de façon incrémentale :
+    seuls les posts et logs postérieurs au dernier passage sont agrégés.
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    # Clôture la veille : les posts publiés entre le dernier passage et minuit
+    _rollup_day(today - timedelta(days=1), now, create=False)
+    stats = _rollup_day(today, now)
     return {"date": str(today), "published": stats.total_posts_published}
 
 
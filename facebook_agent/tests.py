@@ -0,0 +1,77 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .facebook_api import FacebookAPIClient
+from .models import AgentStats, FacebookPageConfig, PublishedPost
+from .tasks import sync_post_stats, update_daily_stats
+
+
+def batch_response(likes=0, comments=0):
+    """Simule la reponse de l'API batch : une entree par sous-requete."""
+    def _request(method, endpoint, params=None, data=None, timeout=30):
+        batch = json.loads(data["batch"])
+        body = {
+            "likes": {"summary": {"total_count": likes}},
+            "comments": {"summary": {"total_count": comments}},
+            "shares": {"count": 1},
+        }
+        return [{"code": 200, "body": json.dumps(body)} for _ in batch]
+    return _request
+
+
+class SyncPostStatsTests(TestCase):
+    def setUp(self):
+        self.config = FacebookPageConfig.objects.create(page_id="123", page_name="E-Shelle", page_access_token="t")
+
+    def _post(self, number, age=timedelta(0)):
+        post = PublishedPost.objects.create(
+            page_config=self.config, section="general", facebook_post_id=f"123_{number}", content="x",
+        )
+        if age:
+            PublishedPost.objects.filter(pk=post.pk).update(published_at=timezone.now() - age)
+        return post
+
+    def test_stats_recuperees_par_batchs_de_50(self):
+        for number in range(60):
+            self._post(number)
+        with mock.patch.object(FacebookAPIClient, "_request", side_effect=batch_response(likes=4)) as request:
+            result = sync_post_stats()
+
+        self.assertEqual(result, {"updated": 60})
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(PublishedPost.objects.filter(likes_count=4, stats_next_sync_at__isnull=False).count(), 60)
+
+    def test_frequence_adaptee_a_l_age_du_post(self):
+        fresh = self._post(1)
+        old = self._post(2, age=timedelta(days=4))
+        with mock.patch.object(FacebookAPIClient, "_request", side_effect=batch_response()):
+            sync_post_stats()
+        fresh.refresh_from_db()
+        old.refresh_from_db()
+        now = timezone.now()
+        self.assertLess(fresh.stats_next_sync_at, now + timedelta(minutes=16))
+        self.assertGreater(old.stats_next_sync_at, now + timedelta(hours=23))
+
+        # Au passage suivant, aucun post n'est echu : aucun appel Graph
+        with mock.patch.object(FacebookAPIClient, "_request") as request:
+            self.assertEqual(sync_post_stats(), {"updated": 0})
+        request.assert_not_called()
+
+    def test_stats_journalieres_incrementales(self):
+        self._post(1)
+        stats = update_daily_stats()
+        self.assertEqual(stats["published"], 1)
+
+        self._post(2)
+        with mock.patch.object(FacebookAPIClient, "_request", side_effect=batch_response(likes=5, comments=2)):
+            sync_post_stats()
+        update_daily_stats()
+
+        day = AgentStats.objects.get(date=timezone.localdate())
+        self.assertEqual(day.total_posts_published, 2)
+        self.assertEqual(day.posts_by_section, {"general": 2})
+        self.assertEqual((day.total_likes, day.total_comments), (10, 4))
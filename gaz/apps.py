@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class GazConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gaz'
+
+    def ready(self):
+        from core.cache import invalidate_on
+
+        from .views import LANDING_CACHE_TAG
+
+        invalidate_on(LANDING_CACHE_TAG, *self.get_models())
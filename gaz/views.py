@@ -1,11 +1,16 @@
 """gaz/views.py — E-Shelle Gaz"""
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from search.services import filter_queryset
+from core.cache import cached_view
 from .models import VilleGaz, QuartierGaz, MarqueGaz, DepotGaz, AvisDepot
 from .forms import DepotGazForm
 
+LANDING_CACHE_TAG = "gaz:landing"
+LANDING_CACHE_TIMEOUT = 60 * 10
 
+
+@cached_view("gaz", timeout=LANDING_CACHE_TIMEOUT, tags=LANDING_CACHE_TAG)
 def accueil(request):
     """Page d'accueil — hero + depots mis en avant + selection ville."""
     villes    = VilleGaz.objects.filter(active=True).prefetch_related("depots")
@@ -88,12 +93,7 @@ def catalogue(request):
         depots = depots.filter(tailles__contains=taille)
 
     if q:
-        depots = depots.filter(
-            Q(nom__icontains=q) |
-            Q(adresse__icontains=q) |
-            Q(zone_livraison__icontains=q) |
-            Q(quartier__nom__icontains=q)
-        )
+        depots = filter_queryset(depots, q)
 
     depots = depots.distinct().order_by("-is_featured", "-is_verified", "nom")
 
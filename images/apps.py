@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ImagesConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "images"
+    verbose_name = "Images responsives"
+
+    def ready(self):
+        from . import signals
+        signals.connect()
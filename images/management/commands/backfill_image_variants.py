@@ -0,0 +1,69 @@
+"""
+E-Shelle Images — Déclinaisons des photos déjà en stockage.
+
+Parcourt les champs du REGISTRY, retient les fichiers sans déclinaisons prêtes et
+les traite dans un pool de processus (Pillow, sans base) ; les résultats sont
+enregistrés par lots depuis le processus principal.
+
+Usage:
+    python manage.py backfill_image_variants
+    python manage.py backfill_image_variants --workers 8 --model resto.Dish
+    python manage.py backfill_image_variants --retry-failed
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from images.models import ImageAsset
+from images.registry import registered_models
+from images.services import record, render_variants
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = "Génère les déclinaisons responsives des images existantes (pool de processus)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        parser.add_argument("--model", action="append", default=[], help="Limiter à app_label.Model (répétable)")
+        parser.add_argument("--retry-failed", action="store_true", help="Retenter les images en échec")
+
+    def handle(self, *args, **options):
+        sources = self._pending_sources(options["model"], options["retry_failed"])
+        self.stdout.write(f"{len(sources)} image(s) à décliner avec {options['workers']} processus")
+        if not sources:
+            return
+
+        # Les processus fils ne touchent pas la base : connexions fermées avant le fork
+        connections.close_all()
+        done = failed = 0
+        batch = []
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            for result in pool.map(render_variants, sources, chunksize=8):
+                batch.append(result)
+                failed += bool(result.get("error"))
+                if len(batch) >= BATCH_SIZE:
+                    done += record(batch)
+                    batch = []
+                    self.stdout.write(f"  {done}/{len(sources)}")
+        done += record(batch)
+        self.stdout.write(self.style.SUCCESS(f"{done} image(s) traitée(s), {failed} en échec"))
+
+    def _pending_sources(self, labels, retry_failed):
+        names = set()
+        for model, fields in registered_models():
+            if labels and model._meta.label not in labels:
+                continue
+            for field in fields:
+                names.update(
+                    model._default_manager.exclude(**{f"{field}__isnull": True})
+                    .exclude(**{field: ""}).values_list(field, flat=True)
+                )
+        skip = [ImageAsset.STATUS_READY] if retry_failed else [ImageAsset.STATUS_READY, ImageAsset.STATUS_FAILED]
+        done = set(
+            ImageAsset.objects.filter(status__in=skip).values_list("source", flat=True).iterator(chunk_size=2000)
+        )
+        return sorted(names - done)
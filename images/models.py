@@ -0,0 +1,35 @@
+"""
+E-Shelle Images — Déclinaisons responsives des photos téléversées
+
+Une ligne par fichier source (nom dans le stockage), quel que soit le modèle qui
+le référence : les déclinaisons sont partagées si deux objets pointent sur la même image.
+"""
+from django.db import models
+
+
+class ImageAsset(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_READY = "ready"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "En attente"),
+        (STATUS_READY, "Prête"),
+        (STATUS_FAILED, "Échec"),
+    ]
+
+    source = models.CharField(max_length=500, unique=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # [{"w": 320, "h": 240, "webp": "<nom>", "jpeg": "<nom>"}, ...] par largeur croissante
+    variants = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Image responsive"
+        verbose_name_plural = "Images responsives"
+
+    def __str__(self):
+        return f"{self.source} ({self.get_status_display()})"
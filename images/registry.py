@@ -0,0 +1,29 @@
+"""
+E-Shelle Images — Champs image traités par le pipeline
+
+"app_label.ModelName" → champs ImageField dont chaque fichier téléversé reçoit ses
+déclinaisons (post_save), et que backfill_image_variants parcourt pour l'existant.
+Les modèles absents (app non installée) sont ignorés.
+"""
+
+REGISTRY = {
+    "annonces_cam.PhotoAnnonce": ("image",),
+    "immobilier_cameroun.PhotoBien": ("image",),
+    "resto.Dish": ("image",),
+    "resto.Restaurant": ("cover_image",),
+    "business.BusinessCatalogItem": ("image",),
+    "business.BusinessCatalogItemImage": ("image",),
+    "boutique.Produit": ("thumbnail",),
+    "boutique.ImageProduit": ("image",),
+    "formations.Formation": ("thumbnail",),
+}
+
+
+def registered_models():
+    from django.apps import apps
+
+    for label, fields in REGISTRY.items():
+        try:
+            yield apps.get_model(label), fields
+        except LookupError:
+            continue
@@ -0,0 +1,193 @@
+"""
+E-Shelle Images — Génération et lecture des déclinaisons
+
+  render_variants(source)   → décline une image en plusieurs largeurs (WebP + JPEG) ;
+                              pur traitement fichier, sans base : utilisable en pool de processus
+  record(results)           → enregistre les résultats (upsert ImageAsset) et purge le cache
+  request_variants(names)   → crée les lignes en attente et planifie la tâche Celery
+  get_asset(source)         → déclinaisons prêtes d'une image (cache, puis base)
+  get_assets(sources)       → idem pour toute une grille : un get_many, au plus une requête
+
+Les déclinaisons sont réencodées sans métadonnées : l'EXIF (GPS, appareil…) n'est
+jamais servi ; l'orientation EXIF est appliquée aux pixels avant d'être perdue.
+"""
+import hashlib
+import io
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import ImageAsset
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = "variants"
+ASSET_CACHE_TIMEOUT = 24 * 3600
+MISSING_CACHE_TIMEOUT = 60
+_MISSING = "missing"
+
+
+def variant_widths():
+    return sorted(getattr(settings, "IMAGE_VARIANT_WIDTHS", (320, 640, 1024, 1600)))
+
+
+def _variant_base(source: str) -> str:
+    directory, filename = posixpath.split(source)
+    stem = posixpath.splitext(filename)[0]
+    digest = hashlib.sha1(source.encode()).hexdigest()[:8]
+    return posixpath.join(VARIANTS_DIR, directory, f"{stem}-{digest}")
+
+
+def _cache_key(source: str) -> str:
+    return "images:asset:" + hashlib.sha1(source.encode()).hexdigest()
+
+
+# ── Génération ────────────────────────────────────────────────────────────────
+
+def _save(storage, name, image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **options)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def render_variants(source: str, storage=None, widths=None) -> dict:
+    """Retourne {"source", "width", "height", "variants"} ou {"source", "error"}."""
+    from PIL import Image, ImageOps
+
+    storage = storage or default_storage
+    widths = widths or variant_widths()
+    try:
+        with storage.open(source, "rb") as fh:
+            image = Image.open(fh)
+            image.load()
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "PA") or "transparency" in image.info else "RGB")
+
+        width, height = image.size
+        targets = sorted({w for w in widths if w < width} | {min(width, widths[-1])})
+        base = _variant_base(source)
+        webp_quality = getattr(settings, "IMAGE_VARIANT_WEBP_QUALITY", 78)
+        jpeg_quality = getattr(settings, "IMAGE_VARIANT_JPEG_QUALITY", 80)
+
+        variants = []
+        for target in targets:
+            resized = image if target == width else image.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS
+            )
+            if resized.mode == "RGBA":
+                flat = Image.new("RGB", resized.size, (255, 255, 255))
+                flat.paste(resized, mask=resized.getchannel("A"))
+            else:
+                flat = resized
+            variants.append({
+                "w": resized.width,
+                "h": resized.height,
+                "webp": _save(storage, f"{base}-{target}.webp", resized, "WEBP", quality=webp_quality, method=4),
+                "jpeg": _save(storage, f"{base}-{target}.jpg", flat, "JPEG",
+                              quality=jpeg_quality, optimize=True, progressive=True),
+            })
+        return {"source": source, "width": width, "height": height, "variants": variants}
+    except Exception as exc:
+        logger.warning("Déclinaisons impossibles pour %s: %s", source, exc)
+        return {"source": source, "error": str(exc)}
+
+
+def record(results) -> int:
+    """Upsert des ImageAsset à partir des résultats de render_variants."""
+    assets = [
+        ImageAsset(
+            source=result["source"],
+            width=result.get("width"),
+            height=result.get("height"),
+            variants=result.get("variants", []),
+            status=ImageAsset.STATUS_FAILED if result.get("error") else ImageAsset.STATUS_READY,
+            error=result.get("error", ""),
+        )
+        for result in results
+    ]
+    if not assets:
+        return 0
+    ImageAsset.objects.bulk_create(
+        assets,
+        update_conflicts=True,
+        unique_fields=["source"],
+        update_fields=["width", "height", "variants", "status", "error", "updated_at"],
+    )
+    cache.delete_many([_cache_key(asset.source) for asset in assets])
+    return len(assets)
+
+
+def generate(source: str) -> dict:
+    result = render_variants(source)
+    record([result])
+    return result
+
+
+# ── Planification ─────────────────────────────────────────────────────────────
+
+def request_variants(sources) -> list:
+    """Crée les ImageAsset manquants (en attente) et planifie leur génération après commit."""
+    sources = {name for name in sources if name}
+    if not sources:
+        return []
+    known = set(ImageAsset.objects.filter(source__in=sources).values_list("source", flat=True))
+    new = sorted(sources - known)
+    if not new:
+        return []
+    ImageAsset.objects.bulk_create([ImageAsset(source=name) for name in new], ignore_conflicts=True)
+
+    def enqueue():
+        from .tasks import generate_image_variants_task
+        for name in new:
+            try:
+                generate_image_variants_task.delay(name)
+            except Exception as exc:
+                # Sans broker : reste en attente, repris par backfill_image_variants
+                logger.warning("Déclinaisons de %s non planifiées: %s", name, exc)
+
+    transaction.on_commit(enqueue)
+    return new
+
+
+# ── Lecture ───────────────────────────────────────────────────────────────────
+
+def get_asset(source: str):
+    """dict {"width", "height", "variants"} si les déclinaisons sont prêtes, sinon None."""
+    return get_assets([source]).get(source)
+
+
+def get_assets(sources) -> dict:
+    """{source: dict ou None} pour plusieurs images : un seul aller-retour cache, une requête au plus."""
+    keys = {_cache_key(source): source for source in sources if source}
+    if not keys:
+        return {}
+    assets = {keys[key]: None if value == _MISSING else value for key, value in cache.get_many(keys).items()}
+
+    missing = set(keys.values()) - assets.keys()
+    if missing:
+        rows = {
+            row.pop("source"): row
+            for row in ImageAsset.objects.filter(source__in=missing, status=ImageAsset.STATUS_READY)
+            .values("source", "width", "height", "variants")
+        }
+        ready, absent = {}, {}
+        for source in missing:
+            asset = rows.get(source)
+            if asset and asset["variants"]:
+                ready[_cache_key(source)] = assets[source] = asset
+            else:
+                absent[_cache_key(source)] = _MISSING
+                assets[source] = None
+        if ready:
+            cache.set_many(ready, ASSET_CACHE_TIMEOUT)
+        if absent:
+            cache.set_many(absent, MISSING_CACHE_TIMEOUT)
+    return assets
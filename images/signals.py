@@ -0,0 +1,35 @@
+"""
+E-Shelle Images — Déclinaisons planifiées au téléversement
+
+Chaque modèle du REGISTRY déclenche, après sauvegarde, la génération des déclinaisons
+des fichiers qui n'en ont pas encore (nouveau téléversement ou fichier remplacé).
+"""
+import logging
+
+from django.db.models.signals import post_save
+
+logger = logging.getLogger(__name__)
+
+
+def request_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    from .registry import REGISTRY
+    from .services import request_variants
+
+    if raw:
+        return
+    fields = REGISTRY.get(sender._meta.label, ())
+    if update_fields is not None:
+        fields = [name for name in fields if name in update_fields]
+    names = [getattr(instance, name).name for name in fields if getattr(instance, name)]
+    try:
+        request_variants(names)
+    except Exception as exc:
+        logger.error("Déclinaisons non demandées pour %s #%s: %s", sender._meta.label, instance.pk, exc)
+
+
+def connect():
+    from .registry import registered_models
+
+    for model, _ in registered_models():
+        uid = model._meta.label_lower.replace(".", "_")
+        post_save.connect(request_on_save, sender=model, dispatch_uid=f"images_variants_{uid}")
@@ -0,0 +1,14 @@
+"""
+E-Shelle Images — Tâches Celery
+"""
+from celery import shared_task
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=60, ignore_result=True)
+def generate_image_variants_task(self, source: str):
+    from .services import generate
+
+    result = generate(source)
+    # Fichier pas encore visible (stockage distant, réplication) : nouvel essai
+    if result.get("error") and "No such file" in result["error"]:
+        raise self.retry()
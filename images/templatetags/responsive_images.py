@@ -0,0 +1,76 @@
+"""
+E-Shelle Images — Template Tags
+
+    {% load responsive_images %}
+    {% responsive_img photo.image alt=annonce.titre sizes="(max-width: 640px) 50vw, 320px" class="ann-card__img" %}
+
+Émet <picture> (WebP + JPEG de secours, srcset par largeur, width/height pour réserver
+la place) si les déclinaisons sont prêtes, sinon un simple <img> sur l'original.
+
+Grilles : charger les déclinaisons de toute la page en un lot, puis les passer au tag
+(sinon une lecture de cache, voire une requête, par image) :
+
+    {% responsive_assets annonces path="photos.image" as image_assets %}
+    {% responsive_img photo.image alt=annonce.titre assets=image_assets %}
+"""
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from images.services import get_asset, get_assets
+
+register = template.Library()
+
+DEFAULT_SIZES = "100vw"
+
+
+def _srcset(variants, key):
+    return ", ".join(f"{default_storage.url(v[key])} {v['w']}w" for v in variants)
+
+
+def _sources(value, path):
+    """Noms de fichiers au bout de path ; les relations multiples (photos) sont parcourues via .all()."""
+    if not path:
+        if value:
+            yield value.name
+        return
+    value = getattr(value, path[0], None)
+    if hasattr(value, "all"):
+        for item in value.all():
+            yield from _sources(item, path[1:])
+    elif value is not None:
+        yield from _sources(value, path[1:])
+
+
+@register.simple_tag
+def responsive_assets(*collections, path="image"):
+    """Déclinaisons de toutes les images des collections (pages, listes) : {source: dict ou None}."""
+    attrs = path.split(".")
+    return get_assets(
+        source for collection in collections if collection
+        for item in collection for source in _sources(item, attrs)
+    )
+
+
+@register.simple_tag
+def responsive_img(field, alt="", sizes=DEFAULT_SIZES, loading="lazy", assets=None, **attrs):
+    if not field:
+        return ""
+    extra = format_html_join("", ' {}="{}"', ((name.replace("_", "-"), value) for name, value in attrs.items()))
+    asset = assets[field.name] if assets and field.name in assets else get_asset(field.name)
+    if not asset:
+        return format_html(
+            '<img src="{}" alt="{}" loading="{}" decoding="async"{}>', field.url, alt, loading, extra,
+        )
+
+    variants = asset["variants"]
+    fallback = variants[-1]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="{}" decoding="async"{}>'
+        '</picture>',
+        _srcset(variants, "webp"), sizes,
+        default_storage.url(fallback["jpeg"]), _srcset(variants, "jpeg"), sizes,
+        asset["width"], asset["height"], alt, loading, extra,
+    )
@@ -0,0 +1,118 @@
+import io
+import shutil
+import tempfile
+from datetime import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .models import ImageAsset
+from .services import get_asset, get_assets, record, render_variants
+
+
+def jpeg_bytes(size=(1200, 800), exif=True):
+    image = Image.new("RGB", size, (200, 120, 40))
+    options = {}
+    if exif:
+        data = Image.Exif()
+        data[0x010F] = "Appareil de test"  # Make
+        options["exif"] = data.tobytes()
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", **options)
+    return buffer.getvalue()
+
+
+class ImageVariantsTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.storage = FileSystemStorage(location=self.media, base_url="/media/")
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_declinaisons_par_largeur_sans_exif(self):
+        source = self.storage.save("resto/dishes/ndole.jpg", io.BytesIO(jpeg_bytes()))
+        result = render_variants(source, storage=self.storage, widths=[320, 640, 1024, 1600])
+
+        self.assertEqual((result["width"], result["height"]), (1200, 800))
+        # Jamais d'agrandissement : la plus grande déclinaison est l'original
+        self.assertEqual([v["w"] for v in result["variants"]], [320, 640, 1024, 1200])
+        self.assertEqual(result["variants"][0]["h"], 213)
+        for variant in result["variants"]:
+            with self.storage.open(variant["webp"]) as fh:
+                self.assertEqual(Image.open(fh).format, "WEBP")
+            with self.storage.open(variant["jpeg"]) as fh:
+                self.assertFalse(Image.open(fh).getexif())
+
+    def test_fichier_illisible_marque_en_echec(self):
+        source = self.storage.save("resto/dishes/casse.jpg", io.BytesIO(b"pas une image"))
+        record([render_variants(source, storage=self.storage)])
+
+        asset = ImageAsset.objects.get(source=source)
+        self.assertEqual(asset.status, ImageAsset.STATUS_FAILED)
+        self.assertIsNone(get_asset(source))
+
+    def test_grille_chargee_en_un_lot(self):
+        sources = [self.storage.save(f"annonces/photo-{n}.jpg", io.BytesIO(jpeg_bytes())) for n in range(3)]
+        record([render_variants(source, storage=self.storage, widths=[320]) for source in sources[:2]])
+
+        with self.assertNumQueries(1):
+            assets = get_assets([*sources, ""])
+        self.assertEqual(set(assets), set(sources))
+        self.assertIsNone(assets[sources[2]])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_assets(sources), assets)
+
+        # Le tag de grille parcourt les relations multiples, responsive_img ne relit plus le cache
+        photos = [SimpleNamespace(image=SimpleNamespace(name=source, url="/media/original.jpg")) for source in sources]
+        annonces = [SimpleNamespace(photos=SimpleNamespace(all=lambda p=photo: [p])) for photo in photos]
+        template = Template(
+            '{% load responsive_images %}{% responsive_assets annonces path="photos.image" as image_assets %}'
+            '{% for a in annonces %}{% for p in a.photos.all %}'
+            '{% responsive_img p.image alt="x" assets=image_assets %}{% endfor %}{% endfor %}'
+        )
+        with mock.patch("images.templatetags.responsive_images.get_asset") as get_one:
+            html = template.render(Context({"annonces": annonces}))
+        get_one.assert_not_called()
+        self.assertEqual(html.count("<picture>"), 2)
+        self.assertEqual(html.count('<img src="/media/original.jpg"'), 1)
+
+    def test_balise_picture_puis_repli_img(self):
+        with override_settings(MEDIA_ROOT=self.media, MEDIA_URL="/media/"):
+            from resto.models import City, Dish, Restaurant
+
+            owner = get_user_model().objects.create_user(username="owner", password=None)
+            restaurant = Restaurant.objects.create(
+                owner=owner, name="Chez Mama", slug="chez-mama",
+                city=City.objects.create(name="Douala", slug="douala"),
+                address="-", phone="+237600000000", whatsapp="+237600000000",
+                opening_time=time(8), closing_time=time(22),
+            )
+            dish = Dish.objects.create(
+                restaurant=restaurant, name="Ndolé", price=2500,
+                image=SimpleUploadedFile("ndole.jpg", jpeg_bytes(), content_type="image/jpeg"),
+            )
+            template = Template('{% load responsive_images %}{% responsive_img dish.image alt=dish.name class="w-full" %}')
+
+            # post_save : ligne en attente, l'original est servi tel quel
+            asset = ImageAsset.objects.get(source=dish.image.name)
+            self.assertEqual(asset.status, ImageAsset.STATUS_PENDING)
+            html = template.render(Context({"dish": dish}))
+            self.assertTrue(html.startswith("<img "))
+            self.assertIn(f'src="{dish.image.url}"', html)
+
+            record([render_variants(dish.image.name, widths=[320, 640])])
+            html = template.render(Context({"dish": dish}))
+
+        self.assertTrue(html.startswith("<picture>"))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn(" 320w, ", html)
+        self.assertIn('width="1200" height="800"', html)
+        self.assertIn('alt="Ndolé" loading="lazy" decoding="async" class="w-full"', html)
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('immobilier_cameroun', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bien',
+            index=models.Index(fields=['statut', '-est_mis_en_avant', '-est_coup_de_coeur', '-date_publication', '-id'], name='immo_bien_catalogue_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-18 00:23
+
+import core.listing
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('immobilier_cameroun', '0002_catalogue_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bien',
+            name='immo_bien_catalogue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='bien',
+            index=core.listing.KeysetIndex(models.F('statut'), models.OrderBy(models.F('est_mis_en_avant'), descending=True), models.OrderBy(models.F('est_coup_de_coeur'), descending=True), models.OrderBy(models.F('date_publication'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='immo_bien_catalogue_idx'),
+        ),
+    ]
@@ -3,10 +3,13 @@ models.py — immobilier_cameroun
 Marketplace immobilière professionnelle — e-shelle.com
 """
 from django.db import models
+from django.db.models import F
 from django.conf import settings
 from django.utils import timezone
 import uuid
 
+from core.listing import KeysetIndex
+
 
 # ─────────────────────────────────────────────────────────────────
 # CHOIX / CONSTANTES
@@ -287,6 +290,12 @@ class Bien(models.Model):
         indexes             = [
             models.Index(fields=["statut", "ville"]),
             models.Index(fields=["type_bien", "type_transaction"]),
+            # Catalogue paginé par curseur sur le tri par défaut (NULL en dernier, comme KeysetPaginator)
+            KeysetIndex(
+                F("statut"), F("est_mis_en_avant").desc(), F("est_coup_de_coeur").desc(),
+                F("date_publication").desc(nulls_last=True), F("id").desc(),
+                name="immo_bien_catalogue_idx",
+            ),
         ]
 
     def __str__(self):
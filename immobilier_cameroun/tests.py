@@ -1,3 +1,52 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Bien, StatutBien
+from .views import BIENS_PAR_PAGE
+
+
+class CatalogueBiensTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        owner = get_user_model().objects.create_user(username="bailleur", password=None)
+        now = timezone.now()
+        self.biens = [
+            Bien.objects.create(
+                titre=f"Studio {n}", description="-", prix=50000 + n * 1000, ville="Douala",
+                quartier="Akwa", proprietaire=owner, statut=StatutBien.PUBLIE,
+                est_mis_en_avant=n % 5 == 0,
+                # Quelques biens sans date de publication : rangés en fin de tri
+                date_publication=None if n % 4 == 0 else now - timedelta(days=n),
+            )
+            for n in range(BIENS_PAR_PAGE + 5)
+        ]
+
+    def test_pages_suivantes_par_curseur_avec_filtres(self):
+        url = reverse("immobilier:liste_biens")
+        response = self.client.get(url, {"ville": "Douala"})
+        first = response.context["page_obj"]
+        self.assertEqual(len(first), BIENS_PAR_PAGE)
+        self.assertContains(response, f"{len(self.biens)} biens disponibles")
+
+        # Le lien « suivant » garde les filtres et porte le curseur
+        next_link = next(
+            href for href in response.content.decode().split('href="')[1:]
+            if href.startswith("?") and "apres=" in href
+        ).split('"')[0].replace("&amp;", "&")
+        params = parse_qs(urlsplit(next_link).query)
+        self.assertEqual(params["ville"], ["Douala"])
+
+        second = self.client.get(url, params).context["page_obj"]
+        seen = [b.pk for b in [*first, *second]]
+        self.assertEqual(len(seen), len(self.biens))
 
-# Create your tests here.
+        expected = Bien.objects.order_by("-est_mis_en_avant", "-est_coup_de_coeur", "-date_publication", "-id")
+        published_last = sorted(expected, key=lambda b: (not b.est_mis_en_avant, b.date_publication is None))
+        self.assertEqual(seen, [b.pk for b in published_last])
@@ -6,12 +6,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponseForbidden
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from core.listing import KeysetPaginator
+from search.services import filter_queryset
 
 from .models import (
     Bien, ProfilImmo, FavorisBien,
@@ -25,6 +26,9 @@ from .forms import (
 from .utils import calculer_stats_bien
 
 BIENS_PAR_PAGE = 12
+# Biens mis en avant puis coups de cœur en tête, quel que soit le tri choisi
+TRI_PREFIXE = ("-est_mis_en_avant", "-est_coup_de_coeur")
+TRI_DEFAUT = "-date_publication"
 MAX_BIENS_GRATUIT = getattr(settings, "IMMOBILIER_MAX_BIENS_GRATUIT", 3)
 
 
@@ -57,13 +61,7 @@ def liste_biens(request):
         data = form.cleaned_data
 
         if data.get("q"):
-            q = data["q"]
-            biens_qs = biens_qs.filter(
-                Q(titre__icontains=q)
-                | Q(description__icontains=q)
-                | Q(ville__icontains=q)
-                | Q(quartier__icontains=q)
-            )
+            biens_qs = filter_queryset(biens_qs, data["q"])
         if data.get("type_bien"):
             biens_qs = biens_qs.filter(type_bien=data["type_bien"])
         if data.get("type_transaction"):
@@ -77,18 +75,16 @@ def liste_biens(request):
         if data.get("chambres_min") is not None:
             biens_qs = biens_qs.filter(nombre_chambres__gte=data["chambres_min"])
 
-        tri = data.get("tri") or "-date_publication"
-        biens_qs = biens_qs.order_by("-est_mis_en_avant", "-est_coup_de_coeur", tri)
+        tri = data.get("tri") or TRI_DEFAUT
     else:
-        biens_qs = biens_qs.order_by("-est_mis_en_avant", "-est_coup_de_coeur", "-date_publication")
+        tri = TRI_DEFAUT
 
     # Biens coups de cœur (sidebar / bandeau)
     coups_de_coeur = Bien.objects.filter(
         statut=StatutBien.PUBLIE, est_coup_de_coeur=True
     ).prefetch_related("photos")[:4]
 
-    paginator = Paginator(biens_qs, BIENS_PAR_PAGE)
-    page_obj  = paginator.get_page(request.GET.get("page"))
+    page_obj = KeysetPaginator(biens_qs, (*TRI_PREFIXE, tri), BIENS_PAR_PAGE).page_for(request)
 
     # IDs des favoris de l'utilisateur connecté
     favoris_ids = set()
@@ -102,7 +98,6 @@ def liste_biens(request):
         "form":           form,
         "coups_de_coeur": coups_de_coeur,
         "favoris_ids":    favoris_ids,
-        "nb_resultats":   biens_qs.count(),
     })
 
 
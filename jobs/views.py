@@ -3,10 +3,15 @@ from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
+from core.cache import cached_view
+from search.services import filter_queryset
 
 from .forms import CandidatureJobForm, OffreJobForm
 from .models import OffreJob, SecteurJob, VilleJob, CanadaJobOffer
 
+LANDING_CACHE_TAG = "jobs:landing"
+LANDING_CACHE_TIMEOUT = 60 * 10
+
 
 def check_user_has_french_premium(user) -> bool:
     if not user.is_authenticated:
@@ -23,6 +28,7 @@ def check_user_has_french_premium(user) -> bool:
     return False
 
 
+@cached_view("jobs", timeout=LANDING_CACHE_TIMEOUT, tags=LANDING_CACHE_TAG)
 def accueil(request):
     offres_featured = OffreJob.objects.filter(is_active=True, is_featured=True).select_related("ville", "secteur")[:6]
     offres_recentes = OffreJob.objects.filter(is_active=True).select_related("ville", "secteur")[:8]
@@ -45,12 +51,7 @@ def catalogue(request):
     contrat = request.GET.get("contrat", "")
 
     if q:
-        offres = offres.filter(
-            Q(titre__icontains=q) |
-            Q(entreprise__icontains=q) |
-            Q(description__icontains=q) |
-            Q(quartier__icontains=q)
-        )
+        offres = filter_queryset(offres, q)
     if ville_slug:
         offres = offres.filter(ville__slug=ville_slug)
     if secteur_slug:
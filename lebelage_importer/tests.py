@@ -0,0 +1,55 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from tools.lebelage_fixture_site import FixtureSite
+from tools.lebelage_shopify_agent import CrawlerEngine
+
+
+class CrawlerEngineTests(SimpleTestCase):
+    def setUp(self):
+        self.site = FixtureSite(categories=3, products_per_category=8, per_page=4).start()
+        self.addCleanup(self.site.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_path = Path(tmp.name) / "state.json"
+        self.cache_dir = Path(tmp.name) / "cache"
+
+    def _engine(self, **kwargs):
+        options = {"max_pages": 2, "limit": 0, "workers": 4, "delay": 0.0, "per_host": 4}
+        options.update(kwargs)
+        return CrawlerEngine(self.site.url, **options)
+
+    def test_crawl_parallele_trouve_les_memes_produits_que_le_sequentiel(self):
+        sequential = self._engine(workers=1).run()
+        parallel = self._engine(workers=4).run()
+
+        self.assertEqual(len(sequential), 24)
+        self.assertEqual(sorted(p.source_url for p in parallel), sorted(p.source_url for p in sequential))
+        self.assertEqual(len({p.title for p in parallel}), 24)
+
+    def test_crawl_interrompu_reprend_sans_retelecharger(self):
+        first = self._engine(state_path=self.state_path)
+        urls = first.discover()
+        first.scrape_products(urls)
+        self.assertTrue(self.state_path.exists())
+        requests_before = self.site.requests
+
+        resumed = self._engine(state_path=self.state_path)
+        products = resumed.run()
+
+        self.assertTrue(resumed.stats.resumed)
+        self.assertEqual(len(products), 24)
+        self.assertEqual(self.site.requests, requests_before)
+        self.assertFalse(self.state_path.exists())
+
+    def test_recrawl_ne_relit_que_les_produits_modifies(self):
+        self._engine(cache_dir=self.cache_dir).run()
+        self.site.touch("p1-2")
+
+        engine = self._engine(cache_dir=self.cache_dir)
+        products = {p.title: p for p in engine.run()}
+
+        self.assertEqual(engine.stats.not_modified, engine.stats.pages - 1)
+        self.assertEqual(products["Serum p1-2"].price_amount, "13.00")
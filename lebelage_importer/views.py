@@ -11,16 +11,15 @@ from django.shortcuts import render
 
 from tools.lebelage_shopify_agent import (
     BASE_URL,
+    CrawlerEngine,
     Product,
     compare_lebelage_to_shopify,
-    crawl_product_urls,
     enrich_products,
     export_shopify_products,
     import_to_shopify,
     save_comparison_report,
     save_csv,
     save_json,
-    scrape_product,
 )
 
 
@@ -30,6 +29,9 @@ SHOPIFY_EXPORT_JSON = Path(settings.BASE_DIR) / "tmp" / "shopify_products.json"
 SHOPIFY_EXPORT_CSV = Path(settings.BASE_DIR) / "tmp" / "shopify_products.csv"
 COMPARISON_JSON = Path(settings.BASE_DIR) / "tmp" / "lebelage_shopify_comparison.json"
 COMPARISON_CSV = Path(settings.BASE_DIR) / "tmp" / "lebelage_shopify_comparison.csv"
+CRAWL_STATE = Path(settings.BASE_DIR) / "tmp" / "lebelage_crawl_state.json"
+CRAWL_CACHE_DIR = Path(settings.BASE_DIR) / "tmp" / "lebelage_http_cache"
+CRAWL_WORKERS = 4
 
 
 def _int_from_post(request, key: str, default: int, minimum: int, maximum: int) -> int:
@@ -213,25 +215,32 @@ def dashboard(request):
                             f"{len(local_products)} produit(s) envoye(s) dans Shopify en brouillon.",
                         )
             else:
-                product_urls = crawl_product_urls(
-                    start_url=form_state["source_url"],
+                # Meme moteur que la CLI : reprise d'un crawl interrompu, pages inchangees en 304
+                engine = CrawlerEngine(
+                    form_state["source_url"],
                     max_pages=form_state["max_pages"],
                     limit=form_state["limit"],
-                    sleep=form_state["sleep"],
+                    workers=CRAWL_WORKERS,
+                    delay=form_state["sleep"],
+                    state_path=CRAWL_STATE,
+                    cache_dir=CRAWL_CACHE_DIR,
                 )
-                scraped_products = []
-                for product_url in product_urls:
-                    scraped_products.append(scrape_product(product_url))
-
                 scraped_products = enrich_products(
-                    scraped_products,
+                    engine.run(),
                     shipping=form_state["shipping"],
                     margin=form_state["margin"],
                 )
                 save_json(scraped_products, EXPORT_JSON)
                 save_csv(scraped_products, EXPORT_CSV)
                 products = [asdict(product) for product in scraped_products]
-                messages.success(request, f"{len(products)} produit(s) LEBELAGE exporte(s) en local.")
+                messages.success(
+                    request,
+                    (
+                        f"{len(products)} produit(s) LEBELAGE exporte(s) en local "
+                        f"({engine.stats.pages} page(s), {engine.stats.not_modified} inchangee(s)"
+                        f"{', crawl repris' if engine.stats.resumed else ''})."
+                    ),
+                )
 
         except Exception as exc:  # noqa: BLE001 - shown in local operator UI
             messages.error(request, f"Erreur: {exc}")
@@ -0,0 +1,222 @@
+"""
+Commande Django : Benchmark du moteur de calcul des intérêts Njangi+
+
+Crée un groupe synthétique (par défaut 500 membres sur 36 mois), puis compare
+le nombre de requêtes SQL et la durée de :
+  - l'ancien calcul mois par mois (boucles Python + update_or_create par membre)
+  - le moteur batch InterestCalculationService.calculate_months
+
+Toutes les données sont créées dans une transaction annulée en fin de commande.
+
+Usage :
+  python manage.py benchmark_interest_engine
+  python manage.py benchmark_interest_engine --members 100 --months 12
+  python manage.py benchmark_interest_engine --skip-legacy
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_calculate_month(group, year, month):
+    """Réplique de l'ancien calcul mensuel (référence du benchmark)."""
+    from njangi.models.fund import FundDeposit
+    from njangi.models.loan import Loan
+    from njangi.models.wallet import MonthlyGroupInterest, MemberMonthlyStatement
+    from njangi.services import _first_day, _last_day
+
+    first = _first_day(year, month)
+    last  = _last_day(year, month)
+
+    active_deposits = FundDeposit.objects.filter(
+        membership__group=group, deposited_at__date__lte=last,
+    ).filter(Q(status="active") | Q(withdrawn_at__date__gte=first))
+    pool_total = sum(d.amount for d in active_deposits)
+
+    active_loans = Loan.objects.filter(
+        membership__group=group, disbursed_at__date__lte=last,
+    ).filter(
+        Q(status="active") |
+        Q(status="completed", completed_at__date__gte=first) |
+        Q(status="defaulted")
+    )
+    loans_outstanding = sum(l.amount_approved for l in active_loans)
+    total_interest = int(sum(
+        Decimal(str(l.amount_approved)) * Decimal(str(l.interest_rate)) / Decimal("100")
+        for l in active_loans
+    ))
+
+    record, _ = MonthlyGroupInterest.objects.update_or_create(
+        group=group, year=year, month=month,
+        defaults={
+            "total_pool":               int(pool_total),
+            "total_loans_outstanding":  int(loans_outstanding),
+            "total_interest_generated": total_interest,
+            "nb_active_loans":          active_loans.count(),
+            "nb_depositors":            active_deposits.count(),
+            "is_calculated":            True,
+            "calculated_at":            timezone.now(),
+        }
+    )
+
+    deposits_by_member = {}
+    for deposit in active_deposits:
+        mid = deposit.membership_id
+        deposits_by_member[mid] = deposits_by_member.get(mid, Decimal("0")) + deposit.amount
+
+    for membership_id, deposit_amt in deposits_by_member.items():
+        share = Decimal(str(deposit_amt)) / Decimal(str(pool_total)) if pool_total else Decimal("0")
+        interest_earned = int(share * total_interest)
+        prev_cumul = MemberMonthlyStatement.objects.filter(
+            membership_id=membership_id, monthly_record__year__lte=year,
+        ).exclude(monthly_record=record).aggregate(total=Sum("interest_earned"))["total"] or 0
+        cumulative = int(prev_cumul) + interest_earned
+        MemberMonthlyStatement.objects.update_or_create(
+            membership_id=membership_id,
+            monthly_record=record,
+            defaults={
+                "deposit_balance":       int(deposit_amt),
+                "pool_share_pct":        round(float(share * 100), 2),
+                "contribution_to_loans": int(share * loans_outstanding),
+                "interest_earned":       interest_earned,
+                "cumulative_interest":   cumulative,
+                "wallet_balance":        int(deposit_amt) + cumulative,
+            }
+        )
+    return record
+
+
+class Command(BaseCommand):
+    help = "Compare les requêtes SQL de l'ancien calcul d'intérêts et du moteur batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--members", type=int, default=500, help="Nombre de membres synthétiques (défaut : 500)")
+        parser.add_argument("--months", type=int, default=36, help="Nombre de mois d'historique (défaut : 36)")
+        parser.add_argument("--skip-legacy", action="store_true", help="Ne mesurer que le moteur batch")
+        parser.add_argument("--seed", type=int, default=42, help="Graine aléatoire")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write(self.style.SUCCESS("Données synthétiques supprimées (rollback)."))
+
+    def _run(self, options):
+        from njangi.services import InterestCalculationService
+
+        group, periods = self._build_group(options["members"], options["months"], options["seed"])
+        self.stdout.write(
+            self.style.HTTP_INFO(
+                f"\n{'='*60}\n"
+                f"  Benchmark intérêts Njangi+\n"
+                f"  {options['members']} membres | {len(periods)} mois\n"
+                f"{'='*60}\n"
+            )
+        )
+
+        if not options["skip_legacy"]:
+            with transaction.atomic():
+                queries, elapsed = self._measure(
+                    lambda: [_legacy_calculate_month(group, y, m) for y, m in periods]
+                )
+                transaction.set_rollback(True)
+            self._report("Ancien calcul (mois par mois)", queries, elapsed)
+
+        queries, elapsed = self._measure(
+            lambda: InterestCalculationService.calculate_months(group, periods)
+        )
+        self._report("Moteur batch", queries, elapsed)
+
+    def _measure(self, func):
+        # execute_wrapper plutôt que CaptureQueriesContext (journal limité à 9000 requêtes)
+        counter = {"queries": 0}
+
+        def count(execute, sql, params, many, context):
+            counter["queries"] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        return counter["queries"], elapsed
+
+    def _report(self, label, queries, elapsed):
+        self.stdout.write(f"  {label:<32} {queries:>8,} requêtes  {elapsed:>8.2f} s")
+
+    def _build_group(self, nb_members, nb_months, seed):
+        from njangi.models import FundDeposit, Group, Loan, Membership
+
+        rng = random.Random(seed)
+        User = get_user_model()
+        now = timezone.now()
+        start = (now - timedelta(days=31 * (nb_months - 1))).date().replace(day=1)
+
+        periods = []
+        year, month = start.year, start.month
+        while len(periods) < nb_months:
+            periods.append((year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        tag = f"bench{int(time.time())}"
+        users = User.objects.bulk_create([
+            User(username=f"{tag}_{i}", email=f"{tag}_{i}@bench.local")
+            for i in range(nb_members)
+        ])
+        users = list(User.objects.filter(username__startswith=f"{tag}_").order_by("pk"))
+        group = Group.objects.create(
+            name=f"Benchmark {tag}", created_by=users[0], contribution_amount=10000,
+            max_members=nb_members, start_date=start, plan="association",
+        )
+        Membership.objects.bulk_create([
+            Membership(user=u, group=group, hand_order=i + 1) for i, u in enumerate(users)
+        ])
+        memberships = list(group.memberships.order_by("pk"))
+
+        def month_start(index):
+            y, m = periods[index]
+            return datetime(y, m, rng.randint(1, 28), 12, tzinfo=dt_timezone.utc)
+
+        deposits = []
+        for ms in memberships:
+            for _ in range(rng.randint(1, 3)):
+                deposits.append(FundDeposit(
+                    membership=ms, amount=rng.randrange(10_000, 500_000, 5_000),
+                    interest_rate=group.fund_deposit_rate,
+                ))
+        FundDeposit.objects.bulk_create(deposits, batch_size=500)
+        deposits = list(FundDeposit.objects.filter(membership__group=group))
+        for dep in deposits:
+            dep.deposited_at = month_start(rng.randrange(nb_months))
+        FundDeposit.objects.bulk_update(deposits, ["deposited_at"], batch_size=500)
+
+        loans = []
+        for ms in rng.sample(memberships, k=max(1, nb_members // 3)):
+            amount = rng.randrange(20_000, 300_000, 5_000)
+            idx = rng.randrange(nb_months)
+            disbursed = month_start(idx)
+            completed = idx + 3 < nb_months
+            loans.append(Loan(
+                membership=ms, amount_requested=amount, amount_approved=amount,
+                interest_rate=group.fund_loan_rate, duration_months=3,
+                status="completed" if completed else "active",
+                disbursed_at=disbursed,
+                completed_at=disbursed + timedelta(days=90) if completed else None,
+                due_date=(disbursed + timedelta(days=90)).date(),
+            ))
+        Loan.objects.bulk_create(loans, batch_size=500)
+        return group, periods
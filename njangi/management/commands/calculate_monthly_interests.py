@@ -195,32 +195,33 @@ class Command(BaseCommand):
         )
 
         results = []
-        year, month = start.year, start.month
 
-        while (year, month) <= (today.year, today.month):
-            if dry_run:
-                preview = self._dry_run_preview(group, year, month, service)
-                results.append({"year": year, "month": month, "interest": preview.get("total_interest", 0)})
+        if not dry_run:
+            # Moteur batch : tous les mois en une passe, cumul reporté en mémoire
+            try:
+                records = service.calculate_all_months(group)
+            except Exception as exc:
+                self.stderr.write(self.style.ERROR(f"    ✗ Erreur : {exc}"))
+                return results
+            for record in records:
+                interest = int(record.total_interest_generated)
+                results.append({"year": record.year, "month": record.month, "interest": interest})
                 self.stdout.write(
-                    f"    [DRY-RUN] {month:02d}/{year} — "
-                    f"Intérêts estimés : {int(preview.get('total_interest', 0)):,} FCFA"
+                    f"    ✓ {record.month:02d}/{record.year} — "
+                    f"Pool : {int(record.total_pool):,} FCFA | "
+                    f"Intérêts : {interest:,} FCFA | "
+                    f"Prêts actifs : {record.nb_active_loans}"
                 )
-            else:
-                try:
-                    record = service.calculate_month(group, year, month)
-                    interest = int(record.total_interest_generated)
-                    results.append({"year": year, "month": month, "interest": interest})
-                    self.stdout.write(
-                        f"    ✓ {month:02d}/{year} — "
-                        f"Pool : {int(record.total_pool):,} FCFA | "
-                        f"Intérêts : {interest:,} FCFA | "
-                        f"Prêts actifs : {record.nb_active_loans}"
-                    )
-                except Exception as exc:
-                    self.stderr.write(
-                        self.style.ERROR(f"    ✗ {month:02d}/{year} — Erreur : {exc}")
-                    )
-                    results.append({"year": year, "month": month, "interest": 0})
+            return results
+
+        year, month = start.year, start.month
+        while (year, month) <= (today.year, today.month):
+            preview = self._dry_run_preview(group, year, month, service)
+            results.append({"year": year, "month": month, "interest": preview.get("total_interest", 0)})
+            self.stdout.write(
+                f"    [DRY-RUN] {month:02d}/{year} — "
+                f"Intérêts estimés : {int(preview.get('total_interest', 0)):,} FCFA"
+            )
 
             # Passer au mois suivant
             if month == 12:
@@ -0,0 +1,88 @@
+"""
+Commande Django : Vérification complète du fond commun Njangi+
+
+Rejoue tout l'historique des FundTransaction d'un ou plusieurs groupes et le
+compare aux soldes matérialisés (FundLedgerBalance) et au dernier point de
+contrôle + delta (FundLedgerCheckpoint).
+
+Usage :
+  # Tous les groupes
+  python manage.py verify_fund_ledger
+
+  # Groupe spécifique
+  python manage.py verify_fund_ledger --group mon-groupe
+
+  # Reconstruire les soldes et points de contrôle en cas d'écart
+  python manage.py verify_fund_ledger --fix
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Rejoue l'historique du fond commun et vérifie les soldes matérialisés Njangi+"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group",
+            type=str,
+            default=None,
+            metavar="SLUG",
+            help="Slug du groupe (défaut : tous les groupes)",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Reconstruit soldes matérialisés et points de contrôle des groupes en écart",
+        )
+
+    def handle(self, *args, **options):
+        from njangi.models import Group
+        from njangi.services import FundLedgerService
+
+        if options["group"]:
+            try:
+                groups = [Group.objects.get(slug=options["group"])]
+            except Group.DoesNotExist:
+                raise CommandError(f"Groupe introuvable : '{options['group']}'")
+        else:
+            groups = list(Group.objects.all())
+
+        mismatched = 0
+        for group in groups:
+            replayed = {t: v for t, v in FundLedgerService.replay(group).items() if v["count"]}
+            ledger   = {t: v for t, v in FundLedgerService.totals(group).items() if v["count"]}
+            state    = {t: v for t, v in FundLedgerService.state(group)["totals"].items() if v["count"]}
+
+            problems = []
+            if ledger != replayed:
+                problems.append(self._diff("Soldes matérialisés", ledger, replayed))
+            if state != replayed:
+                problems.append(self._diff("Point de contrôle + delta", state, replayed))
+
+            balance = sum(v["signed"] for v in replayed.values())
+            if not problems:
+                self.stdout.write(f"  ✓ {group.name:<30} {balance:>14,} FCFA")
+                continue
+
+            mismatched += 1
+            self.stdout.write(self.style.WARNING(f"  ✗ {group.name:<30} {balance:>14,} FCFA"))
+            for line in problems:
+                self.stdout.write(line)
+            if options["fix"]:
+                FundLedgerService.rebuild(group)
+                self.stdout.write(self.style.SUCCESS("    → soldes et point de contrôle reconstruits"))
+
+        style = self.style.SUCCESS if not mismatched else self.style.WARNING
+        self.stdout.write(style(f"\n  {len(groups)} groupe(s) vérifié(s) — {mismatched} en écart"))
+
+    def _diff(self, label, actual, expected):
+        lines = [f"    {label} :"]
+        for t in sorted(set(actual) | set(expected)):
+            a = actual.get(t, {"total": 0, "count": 0})
+            e = expected.get(t, {"total": 0, "count": 0})
+            if a != e:
+                lines.append(
+                    f"      {t:<14} {a['total']:>12,} FCFA ({a['count']}) "
+                    f"≠ historique {e['total']:>12,} FCFA ({e['count']})"
+                )
+        return "\n".join(lines)
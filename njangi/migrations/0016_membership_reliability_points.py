@@ -0,0 +1,26 @@
+# Generated by Django 6.0.2 on 2026-10-17 19:23
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def init_points(apps, schema_editor):
+    # Point de départ : le score actuel ; le balayage hebdomadaire recalcule les points exacts.
+    Membership = apps.get_model("njangi", "Membership")
+    Membership.objects.update(reliability_points=F("reliability_score"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('njangi', '0015_basefundwithdrawal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='reliability_points',
+            field=models.IntegerField(default=100, verbose_name='Points de fiabilité (bruts)'),
+        ),
+        migrations.RunPython(init_points, migrations.RunPython.noop),
+    ]
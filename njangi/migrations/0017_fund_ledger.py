@@ -0,0 +1,68 @@
+# Generated by Django 6.0.2 on 2026-10-17 19:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_ledger(apps, schema_editor):
+    FundTransaction = apps.get_model("njangi", "FundTransaction")
+    FundLedgerBalance = apps.get_model("njangi", "FundLedgerBalance")
+    rows = (
+        FundTransaction.objects.values("group_id", "type")
+        .annotate(total=Sum("amount"), signed_total=Sum("signed_amount"), count=Count("id"))
+        .order_by()
+    )
+    FundLedgerBalance.objects.bulk_create([
+        FundLedgerBalance(
+            group_id=r["group_id"], type=r["type"],
+            total=r["total"] or 0, signed_total=r["signed_total"] or 0, count=r["count"],
+        )
+        for r in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('njangi', '0016_membership_reliability_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FundLedgerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('deposit_in', 'Dépôt entrant'), ('deposit_out', 'Retrait dépôt'), ('loan_out', 'Prêt accordé'), ('repayment', 'Remboursement prêt'), ('interest_in', 'Intérêts prêt reçus'), ('interest_out', 'Intérêts dépôt versés'), ('penalty_in', 'Pénalités encaissées'), ('hand_paid', 'Main versée au bénéficiaire'), ('expense', 'Dépense du groupe'), ('adjustment', 'Ajustement manuel'), ('base_fund_in', 'Versement fond de caisse'), ('base_fund_out', 'Retrait fond de caisse')], max_length=15)),
+                ('total', models.DecimalField(decimal_places=0, default=0, max_digits=16, verbose_name='Total (FCFA)')),
+                ('signed_total', models.DecimalField(decimal_places=0, default=0, max_digits=16, verbose_name='Total signé (FCFA)')),
+                ('count', models.IntegerField(default=0, verbose_name='Nombre de transactions')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fund_ledger', to='njangi.group')),
+            ],
+            options={
+                'verbose_name': 'Solde fond commun (par type)',
+                'verbose_name_plural': 'Soldes fond commun (par type)',
+                'unique_together': {('group', 'type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='FundLedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_tx_id', models.BigIntegerField(default=0, verbose_name='Dernière transaction incluse')),
+                ('balance', models.DecimalField(decimal_places=0, default=0, max_digits=16, verbose_name='Solde (FCFA)')),
+                ('tx_count', models.IntegerField(default=0, verbose_name='Nombre de transactions')),
+                ('totals', models.JSONField(default=dict, verbose_name='Totaux par type')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fund_checkpoints', to='njangi.group')),
+            ],
+            options={
+                'verbose_name': 'Point de contrôle fond commun',
+                'verbose_name_plural': 'Points de contrôle fond commun',
+                'ordering': ['-last_tx_id'],
+                'indexes': [models.Index(fields=['group', '-last_tx_id'], name='njangi_fund_group_i_349064_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,6 @@
 from .group import Group, Membership
 from .session import Session, Contribution
-from .fund import FundDeposit, FundTransaction
+from .fund import FundDeposit, FundTransaction, FundLedgerBalance, FundLedgerCheckpoint
 from .loan import Loan, LoanRepayment
 from .notification import Notification, Document
 from .wallet import MonthlyGroupInterest, MemberMonthlyStatement
@@ -10,7 +10,7 @@ from .audit import AuditLog
 __all__ = [
     "Group", "Membership",
     "Session", "Contribution",
-    "FundDeposit", "FundTransaction",
+    "FundDeposit", "FundTransaction", "FundLedgerBalance", "FundLedgerCheckpoint",
     "Loan", "LoanRepayment",
     "Notification", "Document",
     "MonthlyGroupInterest", "MemberMonthlyStatement",
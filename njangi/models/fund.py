@@ -139,10 +139,11 @@ class FundTransaction(models.Model):
     def __str__(self):
         return f"{self.group.name} — {self.get_type_display()} {self.formatted_amount}"
 
+    OUTGOING_TYPES = {"deposit_out", "loan_out", "interest_out", "hand_paid", "expense"}
+
     def save(self, *args, **kwargs):
         # Définir le signe automatiquement
-        outgoing = {"deposit_out", "loan_out", "interest_out", "hand_paid", "expense"}
-        self.signed_amount = -self.amount if self.type in outgoing else self.amount
+        self.signed_amount = -self.amount if self.type in self.OUTGOING_TYPES else self.amount
         super().save(*args, **kwargs)
 
     @property
@@ -154,6 +155,55 @@ class FundTransaction(models.Model):
         return self.signed_amount > 0
 
 
+class FundLedgerBalance(models.Model):
+    """Solde matérialisé du fond commun par (groupe, type de transaction).
+
+    Mis à jour dans la même transaction que chaque FundTransaction créée,
+    modifiée ou supprimée (voir njangi.signals) : le solde et la répartition
+    par type se lisent sans rejouer l'historique.
+    """
+
+    group        = models.ForeignKey("njangi.Group", on_delete=models.CASCADE, related_name="fund_ledger")
+    type         = models.CharField(max_length=15, choices=FundTransaction.TYPE_CHOICES)
+    total        = models.DecimalField(max_digits=16, decimal_places=0, default=0, verbose_name="Total (FCFA)")
+    signed_total = models.DecimalField(max_digits=16, decimal_places=0, default=0, verbose_name="Total signé (FCFA)")
+    count        = models.IntegerField(default=0, verbose_name="Nombre de transactions")
+    updated_at   = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Solde fond commun (par type)"
+        verbose_name_plural = "Soldes fond commun (par type)"
+        unique_together = ("group", "type")
+
+    def __str__(self):
+        return f"{self.group.name} — {self.get_type_display()} : {int(self.total):,} FCFA ({self.count})"
+
+
+class FundLedgerCheckpoint(models.Model):
+    """Instantané périodique du fond commun, arrêté à la transaction last_tx_id.
+
+    La réconciliation part du dernier point de contrôle et n'agrège que les
+    transactions postérieures. Un point de contrôle est supprimé dès qu'une
+    transaction qu'il couvre est modifiée ou supprimée.
+    """
+
+    group      = models.ForeignKey("njangi.Group", on_delete=models.CASCADE, related_name="fund_checkpoints")
+    last_tx_id = models.BigIntegerField(default=0, verbose_name="Dernière transaction incluse")
+    balance    = models.DecimalField(max_digits=16, decimal_places=0, default=0, verbose_name="Solde (FCFA)")
+    tx_count   = models.IntegerField(default=0, verbose_name="Nombre de transactions")
+    totals     = models.JSONField(default=dict, verbose_name="Totaux par type")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Point de contrôle fond commun"
+        verbose_name_plural = "Points de contrôle fond commun"
+        ordering = ["-last_tx_id"]
+        indexes = [models.Index(fields=["group", "-last_tx_id"])]
+
+    def __str__(self):
+        return f"{self.group.name} — point de contrôle #{self.last_tx_id} ({int(self.balance):,} FCFA)"
+
+
 class BaseFundDeposit(models.Model):
     """Enregistre un versement d'un membre pour son fond de caisse (fonds de base obligatoire)."""
     membership   = models.ForeignKey("njangi.Membership", on_delete=models.CASCADE, related_name="base_fund_deposits")
@@ -122,11 +122,11 @@ class Group(models.Model):
 
     @property
     def fund_balance(self):
-        """Solde actuel du fond commun."""
-        from njangi.models.fund import FundTransaction
+        """Solde actuel du fond commun (lu depuis les soldes matérialisés)."""
+        from njangi.models.fund import FundLedgerBalance
         from django.db.models import Sum
-        result = FundTransaction.objects.filter(group=self).aggregate(
-            total=Sum("signed_amount")
+        result = FundLedgerBalance.objects.filter(group=self).aggregate(
+            total=Sum("signed_total")
         )
         return result["total"] or 0
 
@@ -228,6 +228,9 @@ class Membership(models.Model):
         verbose_name="Score de fiabilité",
         help_text="Score 0-100 basé sur les retards, absences et remboursements"
     )
+    # Points bruts (non bornés) : permettent d'appliquer les deltas incrémentaux
+    # des signaux sans perte due au bornage 0-100 du score affiché.
+    reliability_points = models.IntegerField(default=100, verbose_name="Points de fiabilité (bruts)")
 
     class Meta:
         verbose_name = "Membre"
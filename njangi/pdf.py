@@ -0,0 +1,366 @@
+"""
+Njangi+ — Documents PDF (relevés, état du fond, rapports de séance)
+
+Chaque document est construit en deux temps :
+  - collect_* : lit la base et retourne les données affichées (types simples,
+                déjà formatées) ;
+  - render_*  : construit le PDF reportlab à partir de ces seules données.
+
+PDFStatementService calcule une empreinte des données collectées et ne relance
+reportlab que lorsque cette empreinte change (voir njangi/services.py).
+"""
+from datetime import date, datetime
+from io import BytesIO
+
+MONTHS_FR = ["", "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
+             "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
+
+
+def _name(user):
+    return user.get_full_name() or user.username
+
+
+# ── Collecte des données ──────────────────────────────────────────────────────
+
+def collect_member_statement(membership, year, month):
+    """Données du relevé mensuel d'un membre (dépôts + intérêts)."""
+    from njangi.models.fund import FundDeposit
+    from njangi.models.wallet import MemberMonthlyStatement
+
+    stmt = MemberMonthlyStatement.objects.filter(
+        membership=membership,
+        monthly_record__group_id=membership.group_id,
+        monthly_record__year=year,
+        monthly_record__month=month,
+    ).first()
+
+    statement = None
+    if stmt is not None:
+        statement = [
+            ["Dépôt actif ce mois",       f"{int(stmt.deposit_balance):,} FCFA"],
+            ["Part dans le pool",          f"{float(stmt.pool_share_pct):.1f} %"],
+            ["Contribution aux prêts",     f"{int(stmt.contribution_to_loans):,} FCFA"],
+            ["Intérêts gagnés ce mois",    f"{int(stmt.interest_earned):,} FCFA"],
+            ["Intérêts cumulés (total)",   f"{int(stmt.cumulative_interest):,} FCFA"],
+            ["Avoirs totaux",              f"{int(stmt.wallet_balance):,} FCFA"],
+        ]
+
+    deposits = [
+        [
+            f"{int(d.amount):,} FCFA",
+            f"{d.interest_rate}%/mois",
+            d.deposited_at.strftime("%d/%m/%Y"),
+            f"{d.monthly_interest_potential:,} FCFA",
+        ]
+        for d in FundDeposit.objects.filter(membership=membership, status="active")
+    ]
+
+    return {
+        "group":     membership.group.name,
+        "member":    _name(membership.user),
+        "role":      membership.get_role_display(),
+        "year":      year,
+        "month":     month,
+        "statement": statement,
+        "deposits":  deposits,
+    }
+
+
+def collect_fund_statement(group):
+    """Données de l'état complet du fond commun d'un groupe."""
+    from njangi.models.fund import FundTransaction
+    from njangi.models.loan import Loan
+
+    active_loans = Loan.objects.filter(
+        membership__group=group, status="active"
+    ).select_related("membership__user").order_by("pk")
+    loans = [
+        [
+            _name(loan.membership.user),
+            f"{int(loan.amount_approved):,} FCFA",
+            f"{int(loan.balance_remaining):,} FCFA",
+            loan.due_date.strftime("%d/%m/%Y") if loan.due_date else "—",
+            "EN RETARD" if loan.is_overdue else "OK",
+        ]
+        for loan in active_loans
+    ]
+
+    transactions = [
+        [
+            tx.created_at.strftime("%d/%m/%Y"),
+            tx.get_type_display(),
+            f"{int(tx.amount):,} FCFA",
+            "+" if tx.is_credit else "−",
+            (tx.description or "")[:40],
+        ]
+        for tx in FundTransaction.objects.filter(group=group).order_by("-created_at", "-pk")[:30]
+    ]
+
+    return {
+        "group": group.name,
+        "kpis": [
+            ["Solde total du fond",            f"{int(group.fund_balance):,} FCFA"],
+            ["Disponible pour prêts",          f"{int(group.fund_available_for_loans):,} FCFA"],
+            ["Réserve obligatoire",            f"{group.fund_reserve_pct}%"],
+            ["Taux intérêt prêts",             f"{group.fund_loan_rate}%/mois"],
+            ["Taux intérêt dépôts",            f"{group.fund_deposit_rate}%/mois"],
+        ],
+        "loans":        loans,
+        "transactions": transactions,
+    }
+
+
+def collect_session_report(session):
+    """Données du rapport d'une séance clôturée."""
+    contributions = session.contributions.select_related("membership__user").order_by("membership__hand_order", "pk")
+    absentees = contributions.filter(presence="absent")
+    penalties = contributions.filter(penalty_amount__gt=0)
+    beneficiaries = session.session_beneficiaries.select_related("membership__user").order_by("pk")
+
+    return {
+        "group":         session.group.name,
+        "number":        session.session_number,
+        "date":          session.date.strftime("%d/%m/%Y"),
+        "cycle":         session.cycle,
+        "status":        session.get_status_display(),
+        "beneficiaries": ", ".join(_name(b.membership.user) for b in beneficiaries) or "—",
+        "hand_amount":   f"{int(session.hand_amount):,} FCFA",
+        "overview": [
+            ["Total collecté", f"{int(session.total_collected):,} FCFA"],
+            ["Main levée totale", f"{int(session.total_deposits):,} FCFA"],
+            ["Remboursements réels", f"{int(session.total_repayments):,} FCFA"],
+            ["Retour en caisse", f"{int(session.cash_returned_manual):,} FCFA"],
+            ["Fonds disponibles pour prêt", f"{int(session.loan_fund_available):,} FCFA"],
+            ["Pénalités collectées", f"{int(session.penalties_collected):,} FCFA"],
+        ],
+        "deposits": [
+            [_name(d.membership.user), f"{int(d.amount):,} FCFA", f"{d.interest_rate}%"]
+            for d in session.deposits.select_related("membership__user").order_by("pk")
+        ],
+        "base_funds": [
+            [_name(bf.membership.user), f"{int(bf.amount):,} FCFA"]
+            for bf in session.base_fund_deposits.select_related("membership__user").order_by("pk")
+        ],
+        "contributions": [
+            [
+                _name(c.membership.user),
+                f"{int(c.amount_due):,} FCFA",
+                f"{int(c.amount_paid):,} FCFA",
+                c.get_status_display(),
+                c.get_presence_display(),
+                c.payment_method or "—",
+            ]
+            for c in contributions
+        ],
+        "absentees": [
+            [_name(a.membership.user), a.get_presence_display()]
+            for a in absentees
+        ],
+        "penalties": [
+            [_name(p.membership.user), f"{int(p.penalty_amount):,} FCFA", "Payée" if p.penalty_paid else "Non payée"]
+            for p in penalties
+        ],
+        "repayments": [
+            [_name(r.loan.membership.user), f"{int(r.amount_paid):,} FCFA", r.paid_at.strftime("%d/%m/%Y")]
+            for r in session.repayments_made
+        ],
+        "loans": [
+            [
+                _name(l.membership.user),
+                f"{int(l.amount_approved):,} FCFA",
+                l.due_date.strftime("%d/%m/%Y") if l.due_date else "—",
+                f"{int(l.total_due):,} FCFA",
+            ]
+            for l in session.loans_granted.select_related("membership__user").order_by("pk")
+        ],
+    }
+
+
+# ── Rendu reportlab ───────────────────────────────────────────────────────────
+
+def _document():
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm,
+    )
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle("NjangiTitle", parent=styles["Title"], textColor=colors.HexColor("#1B6CA8"), fontSize=18))
+    return buffer, doc, styles
+
+
+def _table(rows, widths, font_size=9, padding=5, grid=None):
+    """Tableau aux couleurs Njangi+ (en-tête bleu, lignes alternées)."""
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Table, TableStyle
+
+    PRIMARY = colors.HexColor("#1B6CA8")
+    LIGHT   = colors.HexColor("#EFF6FF")
+
+    table = Table(rows, colWidths=[w*cm for w in widths])
+    table.setStyle(TableStyle([
+        ("BACKGROUND",     (0, 0), (-1, 0), PRIMARY),
+        ("TEXTCOLOR",      (0, 0), (-1, 0), colors.white),
+        ("FONTNAME",       (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
+        ("GRID",           (0, 0), (-1, -1), 0.5, grid or colors.grey),
+        ("FONTSIZE",       (0, 0), (-1, -1), font_size),
+        ("PADDING",        (0, 0), (-1, -1), padding),
+    ]))
+    return table
+
+
+def _section(story, styles, title, table, space_before=0.3, space_after=0.5):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    story.append(Paragraph(title, styles["Heading2"]))
+    story.append(Spacer(1, space_before*cm))
+    story.append(table)
+    if space_after:
+        story.append(Spacer(1, space_after*cm))
+
+
+def _footer(story, styles, suffix=""):
+    from reportlab.platypus import Paragraph
+
+    story.append(Paragraph(
+        f"<font color='grey' size='8'>Document généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')} "
+        f"— E-Shelle Njangi+{suffix}</font>",
+        styles["Normal"]
+    ))
+
+
+def render_member_statement(data):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    buffer, doc, styles = _document()
+    period = f"{MONTHS_FR[data['month']]} {data['year']}"
+    story = [
+        Paragraph("Relevé mensuel Njangi+", styles["NjangiTitle"]),
+        Spacer(1, 0.3*cm),
+        Paragraph(f"<b>{data['group']}</b> — {period}", styles["Normal"]),
+        Paragraph(f"Membre : <b>{data['member']}</b> | Rôle : {data['role']}", styles["Normal"]),
+        Spacer(1, 0.5*cm),
+    ]
+
+    if data["statement"]:
+        _section(story, styles, "Détail du mois",
+                 _table([["Indicateur", "Valeur"]] + data["statement"], [10, 7], font_size=10, padding=8),
+                 space_after=0)
+    else:
+        story.append(Paragraph(f"Aucun relevé disponible pour {period}.", styles["Normal"]))
+    story.append(Spacer(1, 0.5*cm))
+
+    if data["deposits"]:
+        _section(story, styles, "Dépôts actifs",
+                 _table([["Montant", "Taux", "Déposé le", "Intérêt potentiel/mois"]] + data["deposits"],
+                        [4, 3, 3.5, 4.5], padding=6),
+                 space_after=0)
+
+    story.append(Spacer(1, 1*cm))
+    _footer(story, styles)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_fund_statement(data):
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    buffer, doc, styles = _document()
+    story = [
+        Paragraph("État du Fond Commun — Njangi+", styles["NjangiTitle"]),
+        Spacer(1, 0.3*cm),
+        Paragraph(
+            f"Groupe : <b>{data['group']}</b> | "
+            f"Généré le : {datetime.now().strftime('%d/%m/%Y à %H:%M')}",
+            styles["Normal"]
+        ),
+        Spacer(1, 0.5*cm),
+    ]
+
+    _section(story, styles, "Situation du fond",
+             _table([["Indicateur", "Valeur"]] + data["kpis"], [10, 7], font_size=10, padding=8))
+    if data["loans"]:
+        _section(story, styles, "Prêts actifs",
+                 _table([["Membre", "Montant", "Reste dû", "Échéance", "Statut"]] + data["loans"],
+                        [4.5, 3.5, 3.5, 3, 2.5], padding=6))
+    if data["transactions"]:
+        _section(story, styles, "30 dernières transactions",
+                 _table([["Date", "Type", "Montant", "Sens", "Description"]] + data["transactions"],
+                        [2.5, 4, 3.5, 1.5, 5.5], font_size=8, grid=colors.lightgrey),
+                 space_after=0)
+
+    story.append(Spacer(1, 1*cm))
+    _footer(story, styles, f" | {data['group']}")
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_session_report(data):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer
+
+    buffer, doc, styles = _document()
+    story = [
+        Paragraph(f"Rapport de séance #{data['number']}", styles["NjangiTitle"]),
+        Spacer(1, 0.2*cm),
+        Paragraph(
+            f"Groupe : <b>{data['group']}</b> | Date : <b>{data['date']}</b> | Cycle : <b>{data['cycle']}</b>",
+            styles["Normal"],
+        ),
+        Paragraph(
+            f"Bénéficiaire(s) de la séance : <b>{data['beneficiaries']}</b> (Montant total : <b>{data['hand_amount']}</b>)",
+            styles["Normal"],
+        ),
+        Paragraph(f"Statut : <b>{data['status']}</b>", styles["Normal"]),
+        Spacer(1, 0.4*cm),
+        _table([["Indicateur", "Valeur"]] + data["overview"], [9, 8], font_size=10, padding=6),
+        Spacer(1, 0.5*cm),
+    ]
+
+    sections = [
+        ("deposits",      "Dépôts de main levée (Fonds mis à disposition)",
+         ["Membre", "Montant déposé", "Taux d'intérêt"], [7, 5, 5]),
+        ("base_funds",    "Versements au fond de caisse (Fonds de base)",
+         ["Membre", "Montant versé"], [9, 8]),
+        ("contributions", "Détail des cotisations",
+         ["Membre", "Dû", "Payé", "Statut", "Présence", "Méthode"], [5, 2.5, 2.5, 2.5, 2.5, 2]),
+        ("absentees",     "Membres absents",
+         ["Membre", "Statut présence"], [9, 8]),
+        ("penalties",     "Pénalités appliquées",
+         ["Membre", "Montant pénalité", "Statut paiement"], [7, 5, 5]),
+        ("repayments",    "Remboursements enregistrés",
+         ["Membre", "Montant", "Date"], [7, 4, 5]),
+        ("loans",         "Prêts accordés durant la séance",
+         ["Emprunteur", "Montant accordé", "Date butoire", "Total à rembourser"], [5, 4, 4, 4]),
+    ]
+    for key, title, header, widths in sections:
+        if data[key]:
+            _section(story, styles, title, _table([header] + data[key], widths), space_before=0.2)
+
+    _footer(story, styles)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def member_statement_filename(membership, year, month):
+    return f"releve_njangi_{membership.user.username}_{year}_{month:02d}.pdf"
+
+
+def fund_statement_filename(group):
+    return f"fond_commun_{group.slug}_{date.today().strftime('%Y%m%d')}.pdf"
+
+
+def session_report_filename(session):
+    return f"rapport_seance_{session.group.slug}_{session.session_number}_{session.date.strftime('%Y%m%d')}.pdf"
@@ -4,6 +4,8 @@ Njangi+ — Services métier
 InterestCalculationService  : Calcul des intérêts mensuels proportionnels
 DistributionCalculator      : Calcul de la "bouffe" avec déductions automatiques
 ReliabilityScoreService     : Calcul du score de fiabilité des membres
+FundLedgerService           : Soldes matérialisés et points de contrôle du fond commun
+PDFStatementService         : Relevés et rapports PDF mis en cache (ETag = version des données)
 """
 import logging
 from calendar import monthrange
@@ -44,145 +46,225 @@ class InterestCalculationService:
     """
 
     @classmethod
-    @transaction.atomic
     def calculate_month(cls, group, year: int, month: int):
         """
         Calcule et enregistre les intérêts du mois pour un groupe.
         Retourne le MonthlyGroupInterest créé ou mis à jour.
         """
+        return cls.calculate_months(group, [(year, month)])[0]
+
+    @classmethod
+    def calculate_all_months(cls, group, from_date: date = None):
+        """
+        Recalcule tous les mois depuis from_date (ou depuis le début du groupe).
+        """
+        start = from_date or group.start_date
+        today = date.today()
+
+        periods = []
+        year, month = start.year, start.month
+        while (year, month) <= (today.year, today.month):
+            periods.append((year, month))
+            month += 1
+            if month > 12:
+                month = 1
+                year += 1
+        return cls.calculate_months(group, periods)
+
+    @classmethod
+    def calculate_months(cls, group, periods):
+        """
+        Moteur batch : calcule une suite de mois (ordre chronologique) pour un groupe.
+
+        Chaque mois coûte deux agrégats SQL (dépôts par membre, prêts par taux) ;
+        le cumul des intérêts est reporté en mémoire d'un mois à l'autre au lieu
+        d'être ré-agrégé depuis l'historique. Les écritures sont faites en fin de
+        calcul par bulk_create / bulk_update dans une transaction courte.
+        """
+        from njangi.models.wallet import MonthlyGroupInterest, MemberMonthlyStatement
+
+        periods = sorted(set(periods))
+        if not periods:
+            return []
+
+        # Cumul des intérêts antérieurs au premier mois recalculé (une seule requête)
+        first_year, first_month = periods[0]
+        cumulative = {
+            row["membership_id"]: int(row["total"] or 0)
+            for row in MemberMonthlyStatement.objects.filter(
+                membership__group=group,
+            ).filter(
+                Q(monthly_record__year__lt=first_year) |
+                Q(monthly_record__year=first_year, monthly_record__month__lt=first_month)
+            ).values("membership_id").annotate(total=Sum("interest_earned")).order_by()
+        }
+
+        computed = []
+        for year, month in periods:
+            snapshot = cls._month_snapshot(group, year, month)
+            for mid, line in snapshot["members"].items():
+                cumulative[mid] = cumulative.get(mid, 0) + line["interest_earned"]
+                line["cumulative_interest"] = cumulative[mid]
+                line["wallet_balance"] = line["deposit_balance"] + cumulative[mid]
+            computed.append(snapshot)
+
+        now = timezone.now()
+        with transaction.atomic():
+            existing = {
+                (r.year, r.month): r
+                for r in MonthlyGroupInterest.objects.filter(group=group).filter(
+                    cls._periods_q(periods)
+                )
+            }
+            to_create, to_update = [], []
+            for snap in computed:
+                key = (snap["year"], snap["month"])
+                record = existing.get(key) or MonthlyGroupInterest(
+                    group=group, year=snap["year"], month=snap["month"]
+                )
+                for field in cls._RECORD_FIELDS:
+                    setattr(record, field, snap[field])
+                record.is_calculated = True
+                record.calculated_at = now
+                (to_update if record.pk else to_create).append(record)
+
+            if to_create:
+                MonthlyGroupInterest.objects.bulk_create(to_create)
+                # Relecture pour récupérer les PK sur tous les backends
+                existing = {
+                    (r.year, r.month): r
+                    for r in MonthlyGroupInterest.objects.filter(group=group).filter(
+                        cls._periods_q(periods)
+                    )
+                }
+            if to_update:
+                MonthlyGroupInterest.objects.bulk_update(
+                    to_update, cls._RECORD_FIELDS + ["is_calculated", "calculated_at"]
+                )
+
+            records = [existing[(s["year"], s["month"])] for s in computed]
+            statements = {
+                (s.monthly_record_id, s.membership_id): s
+                for s in MemberMonthlyStatement.objects.filter(
+                    monthly_record__in=records
+                )
+            }
+            stmt_create, stmt_update = [], []
+            for record, snap in zip(records, computed):
+                for mid, line in snap["members"].items():
+                    stmt = statements.get((record.pk, mid)) or MemberMonthlyStatement(
+                        membership_id=mid, monthly_record=record
+                    )
+                    for field, value in line.items():
+                        setattr(stmt, field, value)
+                    (stmt_update if stmt.pk else stmt_create).append(stmt)
+
+            MemberMonthlyStatement.objects.bulk_create(stmt_create, batch_size=500)
+            MemberMonthlyStatement.objects.bulk_update(
+                stmt_update, cls._STATEMENT_FIELDS, batch_size=500
+            )
+
+        for record, snap in zip(records, computed):
+            logger.info(
+                f"[Njangi] Intérêts calculés — {group.name} {record.month:02d}/{record.year} | "
+                f"Pool: {snap['total_pool']:,} FCFA | "
+                f"Prêts: {snap['nb_active_loans']} | "
+                f"Intérêts: {snap['total_interest_generated']:,} FCFA | "
+                f"Déposants: {len(snap['members'])}"
+            )
+        return records
+
+    _RECORD_FIELDS = [
+        "total_pool", "total_loans_outstanding", "total_interest_generated",
+        "nb_active_loans", "nb_depositors",
+    ]
+    _STATEMENT_FIELDS = [
+        "deposit_balance", "pool_share_pct", "contribution_to_loans",
+        "interest_earned", "cumulative_interest", "wallet_balance",
+    ]
+
+    @staticmethod
+    def _periods_q(periods):
+        q = Q()
+        for year, month in periods:
+            q |= Q(year=year, month=month)
+        return q
+
+    @classmethod
+    def _month_snapshot(cls, group, year: int, month: int) -> dict:
+        """
+        Agrégats d'un mois (sans écriture) : pool, prêts et part de chaque déposant.
+        """
         from njangi.models.fund import FundDeposit
         from njangi.models.loan import Loan
-        from njangi.models.wallet import MonthlyGroupInterest, MemberMonthlyStatement
 
         first = _first_day(year, month)
         last  = _last_day(year, month)
 
-        # ── 1. Dépôts actifs ce mois ──────────────────────────────────────────
+        # ── 1. Dépôts actifs ce mois, agrégés par membre ──────────────────────
         # Un dépôt est actif ce mois si :
         #   - il a été déposé avant ou pendant le mois
         #   - et il n'a pas été retiré avant le début du mois
-        active_deposits = FundDeposit.objects.filter(
+        deposit_rows = FundDeposit.objects.filter(
             membership__group=group,
             deposited_at__date__lte=last,
         ).filter(
             Q(status="active") | Q(withdrawn_at__date__gte=first)
-        ).select_related("membership__user")
+        ).values("membership_id").annotate(
+            total=Sum("amount"), nb=models.Count("id")
+        ).order_by()
 
-        pool_total = sum(d.amount for d in active_deposits)
+        deposits_by_member = {r["membership_id"]: Decimal(r["total"] or 0) for r in deposit_rows}
+        nb_deposits = sum(r["nb"] for r in deposit_rows)
+        pool_total = sum(deposits_by_member.values(), Decimal("0"))
 
-        # ── 2. Prêts actifs ce mois ───────────────────────────────────────────
+        # ── 2. Prêts actifs ce mois, agrégés par taux ─────────────────────────
         # Un prêt est actif ce mois si :
         #   - décaissé avant ou pendant le mois
         #   - et pas encore remboursé avant le début du mois
-        active_loans = Loan.objects.filter(
+        # Σ(montant × taux) = Σ_taux (taux × Σ montant) : calcul exact en Decimal
+        loan_rows = Loan.objects.filter(
             membership__group=group,
             disbursed_at__date__lte=last,
         ).filter(
             Q(status="active") |
             Q(status="completed", completed_at__date__gte=first) |
             Q(status="defaulted")
-        )
-
-        loans_outstanding = sum(l.amount_approved for l in active_loans)
-        nb_active_loans   = active_loans.count()
-
-        # ── 3. Intérêts générés ce mois ───────────────────────────────────────
-        # Chaque prêt génère : montant × taux_mensuel / 100
-        total_interest = sum(
-            Decimal(str(loan.amount_approved)) * Decimal(str(loan.interest_rate)) / Decimal("100")
-            for loan in active_loans
-        )
+        ).values("interest_rate").annotate(
+            total=Sum("amount_approved"), nb=models.Count("id")
+        ).order_by()
+
+        loans_outstanding = Decimal("0")
+        total_interest = Decimal("0")
+        nb_active_loans = 0
+        for row in loan_rows:
+            amount = Decimal(row["total"] or 0)
+            loans_outstanding += amount
+            total_interest += amount * Decimal(str(row["interest_rate"])) / Decimal("100")
+            nb_active_loans += row["nb"]
         total_interest = int(total_interest)
 
-        # ── 4. Enregistrement MonthlyGroupInterest ────────────────────────────
-        record, _ = MonthlyGroupInterest.objects.update_or_create(
-            group=group, year=year, month=month,
-            defaults={
-                "total_pool":               int(pool_total),
-                "total_loans_outstanding":  int(loans_outstanding),
-                "total_interest_generated": total_interest,
-                "nb_active_loans":          nb_active_loans,
-                "nb_depositors":            active_deposits.count(),
-                "is_calculated":            True,
-                "calculated_at":            timezone.now(),
-            }
-        )
-
-        # ── 5. Répartition par déposant ───────────────────────────────────────
-        # Regrouper les dépôts par membership (un membre peut avoir plusieurs dépôts)
-        deposits_by_member = {}
-        for deposit in active_deposits:
-            mid = deposit.membership_id
-            deposits_by_member[mid] = deposits_by_member.get(mid, Decimal("0")) + deposit.amount
-
-        nb_depositors = len(deposits_by_member)
-
+        # ── 3. Répartition par déposant ───────────────────────────────────────
+        members = {}
         for membership_id, deposit_amt in deposits_by_member.items():
-            pool_share_pct = (
-                Decimal(str(deposit_amt)) / Decimal(str(pool_total)) * 100
-                if pool_total else Decimal("0")
-            )
-            interest_earned = int(
-                Decimal(str(deposit_amt)) / Decimal(str(pool_total)) * total_interest
-                if pool_total else Decimal("0")
-            )
-            contribution_to_loans = int(
-                Decimal(str(deposit_amt)) / Decimal(str(pool_total)) * Decimal(str(loans_outstanding))
-                if pool_total else Decimal("0")
-            )
-
-            # Cumulatif des mois précédents
-            from njangi.models.wallet import MemberMonthlyStatement as MMS
-            prev_cumul = MMS.objects.filter(
-                membership_id=membership_id,
-                monthly_record__year__lte=year,
-            ).exclude(monthly_record=record).aggregate(
-                total=Sum("interest_earned")
-            )["total"] or 0
-
-            cumulative = int(prev_cumul) + interest_earned
-            wallet_balance = int(deposit_amt) + cumulative
-
-            MemberMonthlyStatement.objects.update_or_create(
-                membership_id=membership_id,
-                monthly_record=record,
-                defaults={
-                    "deposit_balance":       int(deposit_amt),
-                    "pool_share_pct":        round(float(pool_share_pct), 2),
-                    "contribution_to_loans": contribution_to_loans,
-                    "interest_earned":       interest_earned,
-                    "cumulative_interest":   cumulative,
-                    "wallet_balance":        wallet_balance,
-                }
-            )
-
-        logger.info(
-            f"[Njangi] Intérêts calculés — {group.name} {month:02d}/{year} | "
-            f"Pool: {int(pool_total):,} FCFA | "
-            f"Prêts: {nb_active_loans} | "
-            f"Intérêts: {total_interest:,} FCFA | "
-            f"Déposants: {nb_depositors}"
-        )
-        return record
-
-    @classmethod
-    def calculate_all_months(cls, group, from_date: date = None):
-        """
-        Recalcule tous les mois depuis from_date (ou depuis le début du groupe).
-        """
-        start = from_date or group.start_date
-        today = date.today()
+            share = deposit_amt / pool_total if pool_total else Decimal("0")
+            members[membership_id] = {
+                "deposit_balance":       int(deposit_amt),
+                "pool_share_pct":        round(float(share * 100), 2),
+                "contribution_to_loans": int(share * loans_outstanding),
+                "interest_earned":       int(share * total_interest),
+            }
 
-        year, month = start.year, start.month
-        records = []
-        while (year, month) <= (today.year, today.month):
-            record = cls.calculate_month(group, year, month)
-            records.append(record)
-            month += 1
-            if month > 12:
-                month = 1
-                year += 1
-        return records
+        return {
+            "year":                     year,
+            "month":                    month,
+            "total_pool":               int(pool_total),
+            "total_loans_outstanding":  int(loans_outstanding),
+            "total_interest_generated": total_interest,
+            "nb_active_loans":          nb_active_loans,
+            "nb_depositors":            nb_deposits,
+            "members":                  members,
+        }
 
     @classmethod
     def get_member_evolution(cls, membership, last_n_months: int = 12):
@@ -422,50 +504,143 @@ class ReliabilityScoreService:
       - Prêt en défaut :         -20 pts
       - Prêt en retard actif :   -10 pts
     Score de base = 100, minimum = 0.
+
+    Deux modes :
+      - complet : une requête annotée (Count conditionnels) par groupe, écrite
+        par bulk_update — utilisé par le balayage hebdomadaire (contrôle de cohérence)
+      - incrémental : les signaux Contribution/Loan appliquent le delta de points
+        de l'ancien vers le nouvel état (voir njangi.signals)
     """
 
-    @classmethod
-    def compute(cls, membership) -> int:
-        from njangi.models.session import Contribution
-        from njangi.models.loan import Loan
+    BASE_SCORE = 100
+
+    @staticmethod
+    def clamp(points: int) -> int:
+        return max(0, min(100, points))
+
+    @staticmethod
+    def contribution_points(status, is_late, session_date, today=None) -> int:
+        """Points apportés par une cotisation dans un état donné."""
+        today = today or date.today()
+        if status == "paid" and not is_late:
+            return 2
+        if status in ("late", "partial"):
+            return -5
+        if status == "pending" and session_date and session_date < today:
+            # Si la séance est passée et toujours pending → absent
+            return -10
+        return 0
+
+    @staticmethod
+    def loan_points(status, due_date, today=None) -> int:
+        """Points apportés par un prêt dans un état donné."""
+        today = today or timezone.now().date()
+        if status == "completed":
+            return 5
+        if status == "defaulted":
+            return -20
+        if status == "active" and due_date and today > due_date:
+            return -10
+        return 0
 
-        score = 100
+    @classmethod
+    def annotate_counts(cls, memberships):
+        """Annote un queryset de Membership avec les compteurs utiles au score."""
+        today = date.today()
+        loans_today = timezone.now().date()  # même référence que Loan.is_overdue
+        return memberships.annotate(
+            nb_on_time=models.Count(
+                "contributions", distinct=True,
+                filter=Q(contributions__status="paid", contributions__is_late=False),
+            ),
+            nb_late=models.Count(
+                "contributions", distinct=True,
+                filter=Q(contributions__status__in=("late", "partial")),
+            ),
+            nb_absent=models.Count(
+                "contributions", distinct=True,
+                filter=Q(contributions__status="pending", contributions__session__date__lt=today),
+            ),
+            nb_loans_completed=models.Count(
+                "loans", distinct=True, filter=Q(loans__status="completed"),
+            ),
+            nb_loans_defaulted=models.Count(
+                "loans", distinct=True, filter=Q(loans__status="defaulted"),
+            ),
+            nb_loans_overdue=models.Count(
+                "loans", distinct=True,
+                filter=Q(loans__status="active", loans__due_date__lt=loans_today),
+            ),
+        )
 
-        contributions = Contribution.objects.filter(membership=membership)
-        for c in contributions:
-            if c.status == "paid" and not c.is_late:
-                score += 2
-            elif c.status in ("late", "partial"):
-                score -= 5
-            elif c.status == "pending":
-                # Si la séance est passée et toujours pending → absent
-                if c.session.date < date.today():
-                    score -= 10
+    @classmethod
+    def points_from_counts(cls, m) -> int:
+        return (
+            cls.BASE_SCORE
+            + 2 * m.nb_on_time
+            - 5 * m.nb_late
+            - 10 * m.nb_absent
+            + 5 * m.nb_loans_completed
+            - 20 * m.nb_loans_defaulted
+            - 10 * m.nb_loans_overdue
+        )
 
-        loans = Loan.objects.filter(membership=membership)
-        for loan in loans:
-            if loan.status == "completed":
-                score += 5
-            elif loan.status == "defaulted":
-                score -= 20
-            elif loan.status == "active" and loan.is_overdue:
-                score -= 10
+    @classmethod
+    def compute_points(cls, membership) -> int:
+        from njangi.models.group import Membership
+        annotated = cls.annotate_counts(Membership.objects.filter(pk=membership.pk)).get()
+        return cls.points_from_counts(annotated)
 
-        return max(0, min(100, score))
+    @classmethod
+    def compute(cls, membership) -> int:
+        return cls.clamp(cls.compute_points(membership))
 
     @classmethod
     def update(cls, membership) -> int:
         """Calcule et sauvegarde le score."""
-        score = cls.compute(membership)
-        membership.reliability_score = score
-        membership.save(update_fields=["reliability_score"])
-        return score
+        points = cls.compute_points(membership)
+        membership.reliability_points = points
+        membership.reliability_score = cls.clamp(points)
+        membership.save(update_fields=["reliability_points", "reliability_score"])
+        return membership.reliability_score
 
     @classmethod
     def update_all(cls, group):
-        """Met à jour le score de tous les membres d'un groupe."""
-        for m in group.memberships.filter(is_active=True):
-            cls.update(m)
+        """
+        Recalcule le score de tous les membres actifs d'un groupe en une requête
+        et corrige par bulk_update les membres dont la valeur stockée a dérivé
+        (transitions temporelles : séance passée, échéance dépassée).
+        Retourne le nombre de membres contrôlés.
+        """
+        members = list(cls.annotate_counts(group.memberships.filter(is_active=True)))
+        drifted = []
+        for m in members:
+            points = cls.points_from_counts(m)
+            if (m.reliability_points, m.reliability_score) != (points, cls.clamp(points)):
+                m.reliability_points = points
+                m.reliability_score = cls.clamp(points)
+                drifted.append(m)
+
+        if drifted:
+            from njangi.models.group import Membership
+            Membership.objects.bulk_update(drifted, ["reliability_points", "reliability_score"])
+            logger.info(f"[Njangi] Scores fiabilité {group.name} — {len(drifted)} correction(s)")
+        return len(members)
+
+    @classmethod
+    def apply_delta(cls, membership_id, delta: int):
+        """Applique un delta de points en une seule requête UPDATE (mode incrémental)."""
+        from django.db.models import F, Value
+        from django.db.models.functions import Greatest, Least
+        from njangi.models.group import Membership
+
+        if not delta:
+            return
+        new_points = F("reliability_points") + delta
+        Membership.objects.filter(pk=membership_id).update(
+            reliability_points=new_points,
+            reliability_score=Greatest(Value(0), Least(Value(100), new_points)),
+        )
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -482,36 +657,39 @@ class FundReconciliationService:
     et les états réels des prêts, dépôts et séances.
 
     Retourne un rapport avec :
-      - Solde calculé depuis les transactions
+      - Solde calculé depuis les transactions (dernier point de contrôle + delta)
       - Encours prêts actifs vs sorties loan_out
       - Dépôts actifs vs entrées deposit_in
-      - Éventuels écarts (discrepancies)
+      - Éventuels écarts (discrepancies), y compris entre le solde matérialisé
+        et l'historique
     """
 
     @classmethod
     def reconcile(cls, group) -> dict:
-        from django.db.models import Sum
+        from django.db.models import Count, F, Sum, Value
+        from django.db.models.functions import Greatest
         from njangi.models.fund import FundDeposit, FundTransaction
         from njangi.models.loan import Loan
 
-        # ── 1. Solde réel depuis les transactions ─────────────────────────────
-        tx_balance = FundTransaction.objects.filter(group=group).aggregate(
-            total=Sum("signed_amount")
-        )["total"] or 0
-
-        # ── 2. Répartition par type ────────────────────────────────────────────
-        tx_by_type = {}
-        for row in FundTransaction.objects.filter(group=group).values("type").annotate(
-            total=Sum("amount"), count=models.Count("id")
-        ):
-            tx_by_type[row["type"]] = {"total": int(row["total"]), "count": row["count"]}
+        # ── 1-2. Solde et répartition par type : point de contrôle + delta ────
+        state = FundLedgerService.state(group)
+        tx_by_type = {
+            t: {"total": v["total"], "count": v["count"]}
+            for t, v in state["totals"].items() if v["count"]
+        }
+        tx_balance = state["balance"]
 
         # ── 3. Prêts actifs ───────────────────────────────────────────────────
-        active_loans = Loan.objects.filter(membership__group=group, status="active")
-        total_active_loans_balance = sum(int(l.balance_remaining) for l in active_loans)
-        total_active_loans_approved = int(
-            active_loans.aggregate(total=Sum("amount_approved"))["total"] or 0
+        loans_agg = Loan.objects.filter(membership__group=group, status="active").aggregate(
+            count=Count("id"),
+            approved=Sum("amount_approved"),
+            balance=Sum(Greatest(
+                F("total_due") - F("total_repaid"), Value(0),
+                output_field=models.DecimalField(max_digits=14, decimal_places=0),
+            )),
         )
+        total_active_loans_balance  = int(loans_agg["balance"] or 0)
+        total_active_loans_approved = int(loans_agg["approved"] or 0)
 
         # Sorties loan_out enregistrées
         loan_out_total = tx_by_type.get("loan_out", {}).get("total", 0)
@@ -521,10 +699,10 @@ class FundReconciliationService:
         loan_discrepancy = loan_out_total - repayment_total - total_active_loans_balance
 
         # ── 4. Dépôts actifs ──────────────────────────────────────────────────
-        active_deposits = FundDeposit.objects.filter(membership__group=group, status="active")
-        total_active_deposits = int(
-            active_deposits.aggregate(total=Sum("amount"))["total"] or 0
+        deposits_agg = FundDeposit.objects.filter(membership__group=group, status="active").aggregate(
+            count=Count("id"), total=Sum("amount"),
         )
+        total_active_deposits = int(deposits_agg["total"] or 0)
         deposit_in_total  = tx_by_type.get("deposit_in",  {}).get("total", 0)
         deposit_out_total = tx_by_type.get("deposit_out", {}).get("total", 0)
 
@@ -540,7 +718,7 @@ class FundReconciliationService:
         interest_in_total = tx_by_type.get("interest_in", {}).get("total", 0)
 
         # ── 6. Nombre de transactions & dernière transaction ──────────────────
-        tx_count = FundTransaction.objects.filter(group=group).count()
+        tx_count = state["tx_count"]
         last_tx  = FundTransaction.objects.filter(group=group).order_by("-created_at").first()
 
         # ── 7. Rapport final ──────────────────────────────────────────────────
@@ -559,6 +737,14 @@ class FundReconciliationService:
                 "amount":  deposit_discrepancy,
                 "detail":  f"Entrées: {deposit_in_total:,} FCFA | Sorties: {deposit_out_total:,} FCFA | Dépôts actifs: {total_active_deposits:,} FCFA",
             })
+        ledger_balance = FundLedgerService.balance(group)
+        if ledger_balance != tx_balance:
+            issues.append({
+                "type":    "ledger_mismatch",
+                "label":   "Écart solde matérialisé",
+                "amount":  ledger_balance - tx_balance,
+                "detail":  f"Solde matérialisé: {ledger_balance:,} FCFA | Historique: {tx_balance:,} FCFA — lancer verify_fund_ledger --fix",
+            })
 
         return {
             "group":                    group,
@@ -566,13 +752,13 @@ class FundReconciliationService:
             "tx_count":                 tx_count,
             "last_tx":                  last_tx,
             # Prêts
-            "active_loans_count":       active_loans.count(),
+            "active_loans_count":       loans_agg["count"],
             "active_loans_balance":     total_active_loans_balance,
             "loan_out_total":           loan_out_total,
             "repayment_total":          repayment_total,
             "loan_discrepancy":         loan_discrepancy,
             # Dépôts
-            "active_deposits_count":    active_deposits.count(),
+            "active_deposits_count":    deposits_agg["count"],
             "active_deposits_total":    total_active_deposits,
             "deposit_in_total":         deposit_in_total,
             "deposit_out_total":        deposit_out_total,
@@ -588,6 +774,158 @@ class FundReconciliationService:
         }
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICE 6 — Grand livre matérialisé du fond commun
+# ═══════════════════════════════════════════════════════════════════════════
+
+class FundLedgerService:
+    """
+    Soldes matérialisés du fond commun et points de contrôle.
+
+      - FundLedgerBalance : un compteur (total, total signé, nombre) par
+        (groupe, type), ajusté par F() à chaque transaction créée/modifiée/supprimée
+      - FundLedgerCheckpoint : instantané arrêté à une transaction ; l'état courant
+        = dernier point de contrôle + agrégat des transactions postérieures
+      - replay : rejoue tout l'historique (vérificateur verify_fund_ledger)
+
+    Les totaux sont des dicts {type: {"total", "signed", "count"}} en FCFA entiers.
+    """
+
+    @staticmethod
+    def _empty():
+        return {"total": 0, "signed": 0, "count": 0}
+
+    @classmethod
+    def apply(cls, group_id, tx_type, amount, signed_amount, count):
+        """Ajoute un delta au compteur (groupe, type) — dans la transaction courante."""
+        from django.db import IntegrityError
+        from django.db.models import F
+        from njangi.models.fund import FundLedgerBalance
+
+        deltas = {
+            "total":        F("total") + amount,
+            "signed_total": F("signed_total") + signed_amount,
+            "count":        F("count") + count,
+        }
+        with transaction.atomic():
+            rows = FundLedgerBalance.objects.filter(group_id=group_id, type=tx_type)
+            # Une suppression ne crée jamais de ligne (ex. groupe supprimé en cascade)
+            if rows.update(**deltas) or count < 0:
+                return
+            try:
+                with transaction.atomic():
+                    FundLedgerBalance.objects.create(
+                        group_id=group_id, type=tx_type,
+                        total=amount, signed_total=signed_amount, count=count,
+                    )
+            except IntegrityError:
+                rows.update(**deltas)  # créé en parallèle entre-temps
+
+    @classmethod
+    def totals(cls, group) -> dict:
+        """Totaux par type depuis les soldes matérialisés (une requête)."""
+        from njangi.models.fund import FundLedgerBalance
+        return {
+            row.type: {"total": int(row.total), "signed": int(row.signed_total), "count": row.count}
+            for row in FundLedgerBalance.objects.filter(group=group)
+        }
+
+    @classmethod
+    def balance(cls, group) -> int:
+        return sum(v["signed"] for v in cls.totals(group).values())
+
+    @classmethod
+    def replay(cls, group, after_tx_id=0, upto_tx_id=None) -> dict:
+        """Agrège les transactions d'id ∈ ]after_tx_id, upto_tx_id] par type."""
+        from njangi.models.fund import FundTransaction
+
+        qs = FundTransaction.objects.filter(group=group, pk__gt=after_tx_id)
+        if upto_tx_id is not None:
+            qs = qs.filter(pk__lte=upto_tx_id)
+        return {
+            row["type"]: {
+                "total":  int(row["total"] or 0),
+                "signed": int(row["signed"] or 0),
+                "count":  row["count"],
+            }
+            for row in qs.values("type").annotate(
+                total=Sum("amount"), signed=Sum("signed_amount"), count=models.Count("id"),
+            ).order_by()
+        }
+
+    @classmethod
+    def _merge(cls, base: dict, delta: dict) -> dict:
+        merged = {t: dict(v) for t, v in base.items()}
+        for t, v in delta.items():
+            row = merged.setdefault(t, cls._empty())
+            for k in ("total", "signed", "count"):
+                row[k] += v[k]
+        return merged
+
+    @classmethod
+    def latest_checkpoint(cls, group):
+        from njangi.models.fund import FundLedgerCheckpoint
+        return FundLedgerCheckpoint.objects.filter(group=group).order_by("-last_tx_id").first()
+
+    @classmethod
+    def state(cls, group) -> dict:
+        """État courant du fond : dernier point de contrôle + transactions postérieures."""
+        checkpoint = cls.latest_checkpoint(group)
+        base = checkpoint.totals if checkpoint else {}
+        totals = cls._merge(base, cls.replay(group, after_tx_id=checkpoint.last_tx_id if checkpoint else 0))
+        return {
+            "totals":     totals,
+            "balance":    sum(v["signed"] for v in totals.values()),
+            "tx_count":   sum(v["count"] for v in totals.values()),
+            "checkpoint": checkpoint,
+        }
+
+    @classmethod
+    def checkpoint(cls, group):
+        """Crée un point de contrôle à partir du précédent (agrège seulement le delta)."""
+        from django.db.models import Max
+        from njangi.models.fund import FundLedgerCheckpoint, FundTransaction
+
+        previous = cls.latest_checkpoint(group)
+        after = previous.last_tx_id if previous else 0
+        upto = FundTransaction.objects.filter(group=group).aggregate(m=Max("pk"))["m"] or 0
+        if previous and upto <= after:
+            return previous
+
+        totals = cls._merge(previous.totals if previous else {}, cls.replay(group, after, upto))
+        return FundLedgerCheckpoint.objects.create(
+            group=group,
+            last_tx_id=upto,
+            balance=sum(v["signed"] for v in totals.values()),
+            tx_count=sum(v["count"] for v in totals.values()),
+            totals=totals,
+        )
+
+    @classmethod
+    def invalidate_checkpoints(cls, group_id, tx_id):
+        """Supprime les points de contrôle couvrant une transaction modifiée/supprimée."""
+        from njangi.models.fund import FundLedgerCheckpoint
+        FundLedgerCheckpoint.objects.filter(group_id=group_id, last_tx_id__gte=tx_id).delete()
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls, group) -> dict:
+        """Rejoue tout l'historique, réécrit les soldes matérialisés et repart d'un point de contrôle neuf."""
+        from njangi.models.fund import FundLedgerBalance, FundLedgerCheckpoint
+
+        totals = cls.replay(group)
+        FundLedgerBalance.objects.filter(group=group).delete()
+        FundLedgerBalance.objects.bulk_create([
+            FundLedgerBalance(
+                group=group, type=t, total=v["total"], signed_total=v["signed"], count=v["count"],
+            )
+            for t, v in totals.items()
+        ])
+        FundLedgerCheckpoint.objects.filter(group=group).delete()
+        cls.checkpoint(group)
+        return totals
+
+
 class PenaltyService:
     """
     Calcule et applique les pénalités de retard sur les cotisations.
@@ -642,3 +980,138 @@ class PenaltyService:
         for session in past_sessions:
             total += cls.apply_penalties(session) or 0
         return total
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVICE 7 — Documents PDF en cache
+# ═══════════════════════════════════════════════════════════════════════════
+
+class PDFStatementService:
+    """
+    Rendu des PDF (relevé membre, état du fond, rapport de séance) avec cache
+    dans le stockage par défaut.
+
+    Chaque fichier est rangé sous njangi/pdf/<type>/<objet>/<période>_<version>.pdf
+    où la version est l'empreinte des données affichées (njangi/pdf.py collect_*) :
+    tant qu'aucune donnée ne change, le même fichier est resservi (ETag = version) ;
+    la première modification produit une nouvelle version et l'ancienne est purgée.
+    """
+
+    STORAGE_DIR = "njangi/pdf"
+    PENDING_TTL = 15 * 60   # marqueur « rendu en cours » d'un état du fond asynchrone
+
+    @staticmethod
+    def pending_key(group_id) -> str:
+        return f"njangi:pdf:fund:{group_id}:pending"
+
+    @staticmethod
+    def version(data) -> str:
+        import hashlib
+        import json
+        payload = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+    @classmethod
+    def _locate(cls, folder, period, data):
+        version = cls.version(data)
+        return f"{cls.STORAGE_DIR}/{folder}/{period}_{version}.pdf", version
+
+    @classmethod
+    def _stored(cls, name, version):
+        from django.core.files.storage import default_storage
+        return {
+            "name":          name,
+            "etag":          version,
+            "last_modified": default_storage.get_modified_time(name),
+        }
+
+    @classmethod
+    def _get_or_render(cls, folder, period, data, render):
+        """Retourne le document en cache, ou le rend puis l'enregistre."""
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        name, version = cls._locate(folder, period, data)
+        if default_storage.exists(name):
+            return cls._stored(name, version)
+
+        content = render(data)
+        saved = default_storage.save(name, ContentFile(content))
+        if saved != name:
+            # Rendu concurrent déjà enregistré : le stockage a renommé notre copie
+            default_storage.delete(saved)
+        cls._purge(folder, period, keep=name)
+        logger.info(f"[Njangi] PDF rendu — {name} ({len(content):,} octets)")
+        return cls._stored(name, version)
+
+    @classmethod
+    def _lookup(cls, folder, period, data):
+        from django.core.files.storage import default_storage
+        name, version = cls._locate(folder, period, data)
+        return cls._stored(name, version) if default_storage.exists(name) else None
+
+    @classmethod
+    def _purge(cls, folder, period, keep):
+        """Supprime les versions périmées du même document."""
+        from django.core.files.storage import default_storage
+
+        directory = f"{cls.STORAGE_DIR}/{folder}"
+        try:
+            _, files = default_storage.listdir(directory)
+        except (FileNotFoundError, NotImplementedError):
+            return
+        for filename in files:
+            path = f"{directory}/{filename}"
+            if filename.startswith(f"{period}_") and path != keep:
+                default_storage.delete(path)
+
+    # ── Documents ─────────────────────────────────────────────────────────────
+
+    @classmethod
+    def member_statement(cls, membership, year: int, month: int):
+        from njangi.pdf import collect_member_statement, render_member_statement
+        data = collect_member_statement(membership, year, month)
+        return cls._get_or_render(
+            f"member/{membership.pk}", f"{year}{month:02d}", data, render_member_statement,
+        )
+
+    @classmethod
+    def fund_statement(cls, group, render=True):
+        """État du fond ; render=False ne fait que chercher la version à jour en cache."""
+        from njangi.pdf import collect_fund_statement, render_fund_statement
+        data = collect_fund_statement(group)
+        if not render:
+            return cls._lookup(f"fund/{group.pk}", "etat", data)
+        return cls._get_or_render(f"fund/{group.pk}", "etat", data, render_fund_statement)
+
+    @classmethod
+    def session_report(cls, session):
+        from njangi.pdf import collect_session_report, render_session_report
+        data = collect_session_report(session)
+        return cls._get_or_render(f"session/{session.pk}", "rapport", data, render_session_report)
+
+    @classmethod
+    def is_large_fund_statement(cls, group) -> bool:
+        """Un état du fond est rendu en tâche de fond au-delà de NJANGI_PDF_ASYNC_MIN_LOANS prêts actifs."""
+        from django.conf import settings
+        from njangi.models.loan import Loan
+        threshold = getattr(settings, "NJANGI_PDF_ASYNC_MIN_LOANS", 150)
+        return Loan.objects.filter(membership__group=group, status="active").count() >= threshold
+
+    @classmethod
+    def prerender_month(cls, group, year: int, month: int) -> int:
+        """Pré-rend les relevés du mois de tous les membres ayant un relevé calculé."""
+        from njangi.models.group import Membership
+
+        memberships = Membership.objects.filter(
+            group=group,
+            monthly_statements__monthly_record__year=year,
+            monthly_statements__monthly_record__month=month,
+        ).select_related("user", "group").distinct()
+
+        rendered = 0
+        for membership in memberships:
+            cls.member_statement(membership, year, month)
+            rendered += 1
+        logger.info(f"[Njangi] Relevés pré-rendus — {group.name} {month:02d}/{year}: {rendered}")
+        return rendered
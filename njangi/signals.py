@@ -4,10 +4,17 @@ Njangi+ — Signaux Django
 Responsabilités :
   1. Notifications in-app aux membres (contribution payée, prêt approuvé…)
   2. Audit trail automatique (qui a fait quoi et quand)
+  3. Score de fiabilité incrémental (delta de points à chaque changement d'état)
+  4. Soldes matérialisés du fond commun (FundLedgerBalance)
 """
-from django.db.models.signals import post_save
+import logging
+
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+logger = logging.getLogger("njangi")
+
 
 # ── Helpers audit ─────────────────────────────────────────────────────────────
 
@@ -225,3 +232,126 @@ def audit_loan_repayment(sender, instance, created, **kwargs):
                 "balance_after": int(instance.balance_after),
             },
         )
+
+
+# ── Signal 6 — Score de fiabilité incrémental ────────────────────────────────
+# pre_save mémorise les points de l'état précédent, post_save applique le delta.
+# Les transitions purement temporelles (séance passée, échéance dépassée) sont
+# rattrapées par le balayage hebdomadaire ReliabilityScoreService.update_all.
+
+def _contribution_points(status, is_late, session_date):
+    from njangi.services import ReliabilityScoreService
+    return ReliabilityScoreService.contribution_points(status, is_late, session_date)
+
+
+def _loan_points(status, due_date):
+    from njangi.services import ReliabilityScoreService
+    return ReliabilityScoreService.loan_points(status, due_date)
+
+
+def _apply_reliability_delta(membership_id, delta):
+    from njangi.services import ReliabilityScoreService
+
+    # Savepoint : un échec de l'UPDATE ne doit pas casser la transaction de l'écriture en cours
+    try:
+        with transaction.atomic():
+            ReliabilityScoreService.apply_delta(membership_id, delta)
+    except DatabaseError:
+        logger.exception(
+            "Delta de fiabilité %+d non appliqué au membre %s (rattrapé par le balayage hebdomadaire)",
+            delta, membership_id,
+        )
+
+
+@receiver(pre_save, sender="njangi.Contribution")
+def remember_contribution_points(sender, instance, **kwargs):
+    instance._reliability_prev = (None, 0)
+    if instance.pk:
+        old = sender.objects.filter(pk=instance.pk).values(
+            "membership_id", "status", "is_late", "session__date"
+        ).first()
+        if old:
+            instance._reliability_prev = (
+                old["membership_id"],
+                _contribution_points(old["status"], old["is_late"], old["session__date"]),
+            )
+
+
+@receiver(post_save, sender="njangi.Contribution")
+def update_reliability_on_contribution(sender, instance, **kwargs):
+    prev_membership, prev_points = getattr(instance, "_reliability_prev", (None, 0))
+    points = _contribution_points(instance.status, instance.is_late, instance.session.date)
+    if prev_membership and prev_membership != instance.membership_id:
+        _apply_reliability_delta(prev_membership, -prev_points)
+        prev_points = 0
+    _apply_reliability_delta(instance.membership_id, points - prev_points)
+
+
+@receiver(post_delete, sender="njangi.Contribution")
+def update_reliability_on_contribution_delete(sender, instance, **kwargs):
+    try:
+        session_date = instance.session.date
+    except Exception:
+        return  # Séance supprimée en cascade
+    points = _contribution_points(instance.status, instance.is_late, session_date)
+    _apply_reliability_delta(instance.membership_id, -points)
+
+
+@receiver(pre_save, sender="njangi.Loan")
+def remember_loan_points(sender, instance, **kwargs):
+    instance._reliability_prev = (None, 0)
+    if instance.pk:
+        old = sender.objects.filter(pk=instance.pk).values(
+            "membership_id", "status", "due_date"
+        ).first()
+        if old:
+            instance._reliability_prev = (
+                old["membership_id"], _loan_points(old["status"], old["due_date"]),
+            )
+
+
+@receiver(post_save, sender="njangi.Loan")
+def update_reliability_on_loan(sender, instance, **kwargs):
+    prev_membership, prev_points = getattr(instance, "_reliability_prev", (None, 0))
+    points = _loan_points(instance.status, instance.due_date)
+    if prev_membership and prev_membership != instance.membership_id:
+        _apply_reliability_delta(prev_membership, -prev_points)
+        prev_points = 0
+    _apply_reliability_delta(instance.membership_id, points - prev_points)
+
+
+@receiver(post_delete, sender="njangi.Loan")
+def update_reliability_on_loan_delete(sender, instance, **kwargs):
+    _apply_reliability_delta(instance.membership_id, -_loan_points(instance.status, instance.due_date))
+
+
+# ── Signal 7 — Soldes matérialisés du fond commun ────────────────────────────
+# Exécutés dans la transaction de l'écriture : le solde ne peut pas diverger
+# d'une FundTransaction validée.
+
+@receiver(pre_save, sender="njangi.FundTransaction")
+def remember_fund_transaction(sender, instance, **kwargs):
+    instance._ledger_prev = None
+    if instance.pk:
+        instance._ledger_prev = sender.objects.filter(pk=instance.pk).values(
+            "group_id", "type", "amount", "signed_amount"
+        ).first()
+
+
+@receiver(post_save, sender="njangi.FundTransaction")
+def update_fund_ledger(sender, instance, created, **kwargs):
+    from njangi.services import FundLedgerService
+
+    prev = getattr(instance, "_ledger_prev", None)
+    if prev:
+        FundLedgerService.apply(prev["group_id"], prev["type"], -prev["amount"], -prev["signed_amount"], -1)
+        FundLedgerService.invalidate_checkpoints(prev["group_id"], instance.pk)
+    FundLedgerService.apply(instance.group_id, instance.type, instance.amount, instance.signed_amount, 1)
+
+
+@receiver(post_delete, sender="njangi.FundTransaction")
+def update_fund_ledger_on_delete(sender, instance, **kwargs):
+    from njangi.services import FundLedgerService
+
+    FundLedgerService.apply(instance.group_id, instance.type, -instance.amount, -instance.signed_amount, -1)
+    FundLedgerService.invalidate_checkpoints(instance.group_id, instance.pk)
@@ -6,79 +6,161 @@ Planification automatique :
   - Chaque jour à 6h    → application des pénalités de retard
   - Chaque jour à 7h    → vérification des défauts de prêts
   - Chaque dimanche 3h  → mise à jour scores de fiabilité
+  - Chaque jour à 1h    → points de contrôle du fond commun
+
+Les tâches planifiées « *_all » ne traitent plus les groupes en série : elles
+répartissent le travail en sous-tâches par groupe, toutes mises en file d'un coup
+(un seul chord Celery dont le résumé collecte les résultats). Aucun groupe n'attend
+un autre : un groupe qui se relance n'occupe que sa propre sous-tâche. Le
+parallélisme est borné par la file dédiée NJANGI_FANOUT_QUEUE (worker lancé avec
+-c N) et par NJANGI_FANOUT_RATE_LIMIT. Chaque sous-tâche porte une clé
+d'idempotence (tâche, groupe, période) et se relance seule en cas d'erreur.
+
+Après le calcul mensuel des intérêts, les relevés PDF de tous les membres sont
+pré-rendus (un sous-job par groupe) pour que les téléchargements du mois soient
+servis depuis le cache.
 """
-from celery import shared_task
+from collections import Counter
+from datetime import date
+
+from celery import chord, shared_task
 from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
 
 logger = get_task_logger(__name__)
 
+FANOUT_QUEUE = getattr(settings, "NJANGI_FANOUT_QUEUE", "")
+FANOUT_RATE_LIMIT = getattr(settings, "NJANGI_FANOUT_RATE_LIMIT", "") or None
+IDEMPOTENCY_RUNNING_TTL = 60 * 60        # verrou « en cours » (1h) si un worker meurt
+IDEMPOTENCY_DONE_TTL    = 60 * 60 * 24 * 35
+
+
+# ── Helpers fan-out ───────────────────────────────────────────────────────────
+
+def _idempotency_key(job, group_id, period):
+    return f"njangi:task:{job}:{group_id}:{period}"
+
+
+def _run_group_job(task, job, group_id, period, func, once=True):
+    """
+    Exécute func(group) pour un groupe, au plus une fois par (job, groupe, période).
+
+    Retourne un dict de résultat sérialisable ; relance la sous-tâche (et elle
+    seule) en cas d'erreur, puis renvoie un statut « failed » une fois les
+    tentatives épuisées pour ne pas bloquer le résumé du chord.
+    """
+    from njangi.models import Group
+
+    key = _idempotency_key(job, group_id, period)
+    result = {"job": job, "group_id": group_id, "period": period}
+
+    if once and not cache.add(key, "running", IDEMPOTENCY_RUNNING_TTL):
+        logger.info(f"[Njangi] {job} déjà traité — groupe {group_id} ({period})")
+        return {**result, "status": "skipped"}
+
+    try:
+        group = Group.objects.get(pk=group_id)
+        detail = func(group)
+    except Group.DoesNotExist:
+        logger.error(f"[Njangi] Groupe introuvable: pk={group_id}")
+        cache.delete(key)
+        return {**result, "status": "missing"}
+    except Exception as exc:
+        cache.delete(key)
+        logger.error(f"[Njangi] Erreur {job} groupe {group_id} ({period}): {exc}", exc_info=True)
+        if task.request.retries < task.max_retries:
+            raise task.retry(exc=exc)
+        logger.critical(f"[Njangi] Échec définitif {job} groupe {group_id} ({period})")
+        return {**result, "status": "failed", "error": str(exc)}
+
+    if once:
+        cache.set(key, "done", IDEMPOTENCY_DONE_TTL)
+    return {**result, "status": "ok", "group": group.name, **(detail or {})}
+
+
+def _fan_out(job, group_ids, period):
+    """Met en file les sous-tâches de tous les groupes ; le résumé part quand toutes ont fini."""
+    logger.info(f"[Njangi] {job} {period} — {len(group_ids)} groupe(s) à traiter")
+    if not group_ids:
+        summarize_fanout.delay([], job, period)
+        return {"job": job, "period": period, "groups": 0}
+    signatures = [_job_signature(job, gid, period) for gid in group_ids]
+    if FANOUT_QUEUE:
+        signatures = [sig.set(queue=FANOUT_QUEUE) for sig in signatures]
+    chord(signatures)(summarize_fanout.s(job, period))
+    return {"job": job, "period": period, "groups": len(group_ids)}
+
+
+def _active_group_ids():
+    from njangi.models import Group
+    return list(Group.objects.filter(status="active").order_by("pk").values_list("pk", flat=True))
+
+
+def _job_signature(job, group_id, period):
+    if job == "interests":
+        year, month = (int(x) for x in period.split("-"))
+        return calculate_monthly_interests_group.si(group_id, year, month, once=True)
+    if job == "penalties":
+        return apply_penalties_group.si(group_id, period)
+    if job == "reliability":
+        return update_reliability_scores_group.si(group_id, period)
+    if job == "ledger_checkpoint":
+        return checkpoint_fund_ledger_group.si(group_id, period)
+    raise ValueError(f"Job Njangi inconnu : {job}")
+
+
+@shared_task(name="njangi.tasks.summarize_fanout")
+def summarize_fanout(results, job, period):
+    """Résumé final d'un job planifié : compte les statuts et signale les échecs."""
+    counts = Counter(r.get("status") for r in results)
+    for r in results:
+        if r.get("status") == "failed":
+            logger.critical(f"[Njangi] {job} {period} — groupe {r['group_id']} en échec : {r.get('error')}")
+    logger.info(
+        f"[Njangi] {job} {period} terminé — {counts['ok']} ok, "
+        f"{counts['skipped']} déjà traités, {counts['failed']} échec(s)"
+    )
+    if job == "interests":
+        # Relevés de fin de mois : pré-rendus en PDF pour chaque groupe calculé
+        year, month = (int(x) for x in period.split("-"))
+        for r in results:
+            if r.get("status") == "ok":
+                prerender_member_statements_group.delay(r["group_id"], year, month)
+    return {
+        "job":     job,
+        "period":  period,
+        "ok":      counts["ok"],
+        "skipped": counts["skipped"],
+        "failed":  counts["failed"],
+        "missing": counts["missing"],
+        "results": results,
+    }
+
+
+# ── Jobs planifiés ────────────────────────────────────────────────────────────
 
 @shared_task(
     name="njangi.tasks.calculate_monthly_interests_all",
-    bind=True,
-    max_retries=3,
-    default_retry_delay=300,
 )
-def calculate_monthly_interests_all(self):
+def calculate_monthly_interests_all():
     """
-    Calcule les intérêts mensuels pour tous les groupes actifs.
+    Calcule les intérêts mensuels pour tous les groupes actifs (un sous-job par groupe).
     Déclenché le 1er de chaque mois à 2h00.
     """
-    from datetime import date
-    from njangi.models import Group
-    from njangi.services import InterestCalculationService
-
     today = date.today()
-    groups = Group.objects.filter(status="active")
-    results = []
-
-    for group in groups:
-        try:
-            record = InterestCalculationService.calculate_month(group, today.year, today.month)
-            msg = f"{group.name}: {record.formatted_interest} générés ({record.nb_depositors} déposants)"
-            results.append(msg)
-            logger.info(f"[Njangi] {msg}")
-        except Exception as exc:
-            logger.error(f"[Njangi] Erreur calcul intérêts {group.name}: {exc}", exc_info=True)
-            try:
-                self.retry(exc=exc)
-            except self.MaxRetriesExceededError:
-                logger.critical(f"[Njangi] Échec définitif calcul intérêts {group.name}")
-
-    logger.info(f"[Njangi] Calcul mensuel terminé — {len(results)} groupes traités")
-    return results
+    return _fan_out("interests", _active_group_ids(), f"{today.year}-{today.month:02d}")
 
 
 @shared_task(
     name="njangi.tasks.apply_penalties_all",
-    bind=True,
-    max_retries=2,
-    default_retry_delay=120,
 )
-def apply_penalties_all(self):
+def apply_penalties_all():
     """
-    Applique les pénalités de retard sur toutes les cotisations impayées.
+    Applique les pénalités de retard sur toutes les cotisations impayées (un sous-job par groupe).
     Déclenché chaque jour à 6h00.
     """
-    from njangi.models import Group
-    from njangi.services import PenaltyService
-
-    groups = Group.objects.filter(status="active")
-    total_penalties = 0
-    affected_groups = 0
-
-    for group in groups:
-        try:
-            penalties = PenaltyService.apply_all_pending(group) or 0
-            if penalties > 0:
-                total_penalties += penalties
-                affected_groups += 1
-                logger.info(f"[Njangi] Pénalités {group.name}: {penalties:,} FCFA")
-        except Exception as exc:
-            logger.error(f"[Njangi] Erreur pénalités {group.name}: {exc}", exc_info=True)
-
-    logger.info(f"[Njangi] Pénalités appliquées — {affected_groups} groupes — total: {total_penalties:,} FCFA")
-    return {"total_fcfa": total_penalties, "groups_affected": affected_groups}
+    return _fan_out("penalties", _active_group_ids(), date.today().isoformat())
 
 
 @shared_task(
@@ -113,53 +195,165 @@ def check_loan_defaults(self):
 )
 def update_reliability_scores():
     """
-    Recalcule les scores de fiabilité de tous les membres actifs.
+    Recalcule les scores de fiabilité de tous les membres actifs (un sous-job par groupe).
     Déclenché chaque dimanche à 3h00.
     """
-    from njangi.models import Group
-    from njangi.services import ReliabilityScoreService
+    iso = date.today().isocalendar()
+    return _fan_out("reliability", _active_group_ids(), f"{iso.year}-W{iso.week:02d}")
 
-    groups = Group.objects.filter(status="active")
-    updated = 0
 
-    for group in groups:
-        try:
-            members = group.memberships.filter(is_active=True)
-            for membership in members:
-                ReliabilityScoreService.update(membership)
-                updated += 1
-        except Exception as exc:
-            logger.error(f"[Njangi] Erreur scores fiabilité {group.name}: {exc}", exc_info=True)
+@shared_task(
+    name="njangi.tasks.checkpoint_fund_ledgers",
+)
+def checkpoint_fund_ledgers():
+    """
+    Crée un point de contrôle du fond commun pour chaque groupe actif.
+    Déclenché chaque jour à 1h00.
+    """
+    return _fan_out("ledger_checkpoint", _active_group_ids(), date.today().isoformat())
 
-    logger.info(f"[Njangi] Scores fiabilité mis à jour — {updated} membres")
-    return updated
 
+# ── Sous-tâches par groupe ────────────────────────────────────────────────────
 
 @shared_task(
     name="njangi.tasks.calculate_monthly_interests_group",
+    bind=True,
+    rate_limit=FANOUT_RATE_LIMIT,
+    max_retries=3,
+    default_retry_delay=300,
 )
-def calculate_monthly_interests_group(group_id, year, month):
+def calculate_monthly_interests_group(self, group_id, year, month, once=False):
     """
     Calcule les intérêts mensuels pour UN groupe spécifique.
-    Peut être déclenché manuellement depuis l'interface bureau.
+    Peut être déclenché manuellement depuis l'interface bureau (once=False :
+    pas de clé d'idempotence, le recalcul est toujours exécuté).
     """
-    from njangi.models import Group
     from njangi.services import InterestCalculationService
 
-    try:
-        group = Group.objects.get(pk=group_id)
+    def run(group):
         record = InterestCalculationService.calculate_month(group, year, month)
-        logger.info(f"[Njangi] Intérêts calculés (manuel) — {group.name} {month:02d}/{year}: {record.formatted_interest}")
+        logger.info(f"[Njangi] Intérêts calculés — {group.name} {month:02d}/{year}: {record.formatted_interest}")
         return {
-            "group": group.name,
             "year": year,
             "month": month,
             "interest": int(record.total_interest_generated),
             "depositors": record.nb_depositors,
         }
+
+    return _run_group_job(self, "interests", group_id, f"{year}-{month:02d}", run, once=once)
+
+
+@shared_task(
+    name="njangi.tasks.apply_penalties_group",
+    bind=True,
+    rate_limit=FANOUT_RATE_LIMIT,
+    max_retries=2,
+    default_retry_delay=120,
+)
+def apply_penalties_group(self, group_id, period):
+    """Applique les pénalités de retard d'UN groupe (période = jour ISO)."""
+    from njangi.services import PenaltyService
+
+    def run(group):
+        penalties = PenaltyService.apply_all_pending(group) or 0
+        if penalties > 0:
+            logger.info(f"[Njangi] Pénalités {group.name}: {penalties:,} FCFA")
+        return {"penalties": int(penalties)}
+
+    return _run_group_job(self, "penalties", group_id, period, run)
+
+
+@shared_task(
+    name="njangi.tasks.update_reliability_scores_group",
+    bind=True,
+    rate_limit=FANOUT_RATE_LIMIT,
+    max_retries=2,
+    default_retry_delay=300,
+)
+def update_reliability_scores_group(self, group_id, period):
+    """
+    Recalcule les scores de fiabilité des membres actifs d'UN groupe (période = semaine ISO).
+    Les scores sont tenus à jour en continu par les signaux ; ce balayage sert
+    de contrôle de cohérence et rattrape les transitions temporelles.
+    """
+    from njangi.services import ReliabilityScoreService
+
+    def run(group):
+        return {"updated": ReliabilityScoreService.update_all(group)}
+
+    return _run_group_job(self, "reliability", group_id, period, run)
+
+
+@shared_task(
+    name="njangi.tasks.checkpoint_fund_ledger_group",
+    bind=True,
+    rate_limit=FANOUT_RATE_LIMIT,
+    max_retries=2,
+    default_retry_delay=120,
+)
+def checkpoint_fund_ledger_group(self, group_id, period):
+    """Point de contrôle du fond commun d'UN groupe (période = jour ISO)."""
+    from njangi.services import FundLedgerService
+
+    def run(group):
+        checkpoint = FundLedgerService.checkpoint(group)
+        return {"last_tx_id": checkpoint.last_tx_id, "balance": int(checkpoint.balance)}
+
+    return _run_group_job(self, "ledger_checkpoint", group_id, period, run)
+
+
+# ── Documents PDF ─────────────────────────────────────────────────────────────
+
+@shared_task(
+    name="njangi.tasks.prerender_member_statements_group",
+    bind=True,
+    max_retries=2,
+    default_retry_delay=300,
+)
+def prerender_member_statements_group(self, group_id, year, month):
+    """Pré-rend les relevés PDF du mois de tous les membres d'UN groupe."""
+    from njangi.services import PDFStatementService
+
+    def run(group):
+        return {"rendered": PDFStatementService.prerender_month(group, year, month)}
+
+    return _run_group_job(self, "statements_pdf", group_id, f"{year}-{month:02d}", run)
+
+
+@shared_task(
+    name="njangi.tasks.render_fund_statement_pdf",
+    bind=True,
+    max_retries=2,
+    default_retry_delay=60,
+)
+def render_fund_statement_pdf(self, group_id, membership_id=None):
+    """
+    Rend l'état du fond d'un groupe volumineux hors requête HTTP, puis notifie
+    le membre du bureau qui l'a demandé.
+    """
+    from njangi.models import Group, Notification
+    from njangi.services import PDFStatementService
+
+    try:
+        group = Group.objects.get(pk=group_id)
+        stored = PDFStatementService.fund_statement(group)
     except Group.DoesNotExist:
         logger.error(f"[Njangi] Groupe introuvable: pk={group_id}")
-        return None
+        cache.delete(PDFStatementService.pending_key(group_id))
+        return {"group_id": group_id, "status": "missing"}
     except Exception as exc:
-        logger.error(f"[Njangi] Erreur calcul intérêts groupe {group_id}: {exc}", exc_info=True)
-        raise
+        logger.error(f"[Njangi] Erreur rendu état du fond groupe {group_id}: {exc}", exc_info=True)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc)
+        cache.delete(PDFStatementService.pending_key(group_id))
+        return {"group_id": group_id, "status": "failed", "error": str(exc)}
+
+    cache.delete(PDFStatementService.pending_key(group_id))
+    if membership_id:
+        Notification.objects.create(
+            membership_id=membership_id,
+            type="general",
+            title="État du fond prêt",
+            body=f"L'état du fond commun de {group.name} est prêt : téléchargez-le depuis la page Fond commun.",
+        )
+    return {"group_id": group_id, "status": "ok", "name": stored["name"]}
@@ -2,16 +2,19 @@
 Njangi+ — Tests unitaires & d'intégration
 
 Couverture :
-  - InterestCalculationService  : calcul standard, pool vide, multi-déposants
+  - InterestCalculationService  : calcul standard, pool vide, multi-déposants, moteur batch
   - DistributionCalculator      : cas sans déductions, avec prêt, pénalités, fonds de base
   - PenaltyService              : application pénalités séances passées
-  - ReliabilityScoreService     : score initial, avec cotisations et prêts
+  - ReliabilityScoreService     : score initial, avec cotisations et prêts, mode incrémental
+  - FundLedgerService           : soldes matérialisés, points de contrôle, réconciliation
+  - Tâches Celery               : fan-out par groupe, idempotence par période
+  - PDFStatementService         : cache par version des données, ETag, rendu asynchrone
 """
 from datetime import date, timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -261,6 +264,37 @@ class InterestCalculationServiceTest(TestCase):
             self.assertIn("interest", entry)
             self.assertIn("wallet", entry)
 
+    def test_calculate_months_carries_cumulative_forward(self):
+        """Le moteur batch reporte le cumul mois par mois et reste idempotent."""
+        import datetime as dt
+
+        today = date.today()
+        prev_month = today.month - 1 if today.month > 1 else 12
+        prev_year  = today.year if today.month > 1 else today.year - 1
+
+        deposit = make_deposit(self.m_bob, 100_000)
+        FundDeposit.objects.filter(pk=deposit.pk).update(
+            deposited_at=dt.datetime(prev_year, prev_month, 1, tzinfo=dt.timezone.utc)
+        )
+        loan = make_active_loan(self.m_alice, 50_000)
+        Loan.objects.filter(pk=loan.pk).update(
+            disbursed_at=dt.datetime(prev_year, prev_month, 2, tzinfo=dt.timezone.utc)
+        )
+
+        periods = [(prev_year, prev_month), (today.year, today.month)]
+        for _ in range(2):
+            records = InterestCalculationService.calculate_months(self.group, periods)
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(MemberMonthlyStatement.objects.filter(membership=self.m_bob).count(), 2)
+        first, last = (
+            MemberMonthlyStatement.objects.get(membership=self.m_bob, monthly_record=r)
+            for r in records
+        )
+        self.assertEqual(int(first.cumulative_interest), 5_000)
+        self.assertEqual(int(last.cumulative_interest), 10_000)
+        self.assertEqual(int(last.wallet_balance), 110_000)
+
     def test_session_repayment_members_display_property(self):
         """La propriété de session renvoie la liste formatée des membres remboursant."""
         session = Session.objects.create(
@@ -819,6 +853,78 @@ class ReliabilityScoreServiceTest(TestCase):
         self.assertEqual(self.m_grace.reliability_score, score)
         self.assertEqual(score, 95)
 
+    def test_update_all_matches_compute(self):
+        """update_all (requête annotée + bulk_update) donne le même score que compute()."""
+        other = make_membership(make_user("hugo"), self.group, hand_order=2)
+        for i, status in enumerate(("paid", "late", "pending")):
+            session = self._make_session(days_ago=10 + i, number=i + 1)
+            Contribution.objects.create(
+                membership=self.m_grace, session=session, amount_due=10_000, status=status,
+            )
+            Contribution.objects.create(
+                membership=other, session=session, amount_due=10_000, status="paid",
+            )
+        Membership.objects.filter(pk__in=[self.m_grace.pk, other.pk]).update(
+            reliability_score=0, reliability_points=0
+        )
+
+        self.assertEqual(ReliabilityScoreService.update_all(self.group), 2)
+
+        self.m_grace.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.m_grace.reliability_score, 87)   # 100 + 2 - 5 - 10
+        self.assertEqual(other.reliability_score, 100)
+        self.assertEqual(other.reliability_points, 106)
+        self.assertEqual(self.m_grace.reliability_score, ReliabilityScoreService.compute(self.m_grace))
+
+    def test_incremental_signals_adjust_stored_score(self):
+        """Les changements de statut cotisation/prêt ajustent le score stocké par delta."""
+        session = self._make_session()
+        contribution = Contribution.objects.create(
+            membership=self.m_grace, session=session, amount_due=10_000, status="late", is_late=True,
+        )
+        self.m_grace.refresh_from_db()
+        self.assertEqual(self.m_grace.reliability_score, 95)
+
+        contribution.status, contribution.is_late = "paid", False
+        contribution.save()
+        self.m_grace.refresh_from_db()
+        self.assertEqual(self.m_grace.reliability_points, 102)
+        self.assertEqual(self.m_grace.reliability_score, 100)
+
+        loan = Loan.objects.create(
+            membership=self.m_grace, amount_requested=50_000, amount_approved=50_000,
+            interest_rate=10, duration_months=3, status="active",
+            due_date=date.today() + timedelta(days=30),
+        )
+        loan.status = "defaulted"
+        loan.save()
+        self.m_grace.refresh_from_db()
+        self.assertEqual(self.m_grace.reliability_points, 82)
+        self.assertEqual(self.m_grace.reliability_score, ReliabilityScoreService.compute(self.m_grace))
+
+        contribution.delete()
+        self.m_grace.refresh_from_db()
+        self.assertEqual(self.m_grace.reliability_points, 80)
+
+    def test_incremental_delta_error_is_logged_not_fatal(self):
+        """Un UPDATE de score en échec est journalisé ; la cotisation est quand même enregistrée."""
+        from unittest import mock
+        from django.db import DatabaseError
+
+        session = self._make_session()
+        with mock.patch.object(ReliabilityScoreService, "apply_delta", side_effect=DatabaseError("verrou")):
+            with self.assertLogs("njangi", level="ERROR") as logs:
+                Contribution.objects.create(
+                    membership=self.m_grace, session=session, amount_due=10_000, status="late", is_late=True,
+                )
+        self.assertIn("Delta de fiabilité -5", logs.output[0])
+        self.assertEqual(Contribution.objects.filter(membership=self.m_grace).count(), 1)
+
+        with mock.patch.object(ReliabilityScoreService, "apply_delta", side_effect=TypeError("bug")):
+            with self.assertRaises(TypeError):
+                Contribution.objects.filter(membership=self.m_grace).get().delete()
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # SUITE 5 — Modèles (Group, Loan)
@@ -886,3 +992,240 @@ class LoanModelTest(TestCase):
     def test_is_overdue_true_when_past_due(self):
         loan = Loan(status="active", due_date=date.today() - timedelta(days=1))
         self.assertTrue(loan.is_overdue)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SUITE 6 — Grand livre matérialisé & réconciliation
+# ═══════════════════════════════════════════════════════════════════════════
+
+class FundLedgerServiceTest(TestCase):
+
+    def setUp(self):
+        from njangi.services import FundLedgerService
+
+        self.ledger = FundLedgerService
+        self.user = make_user("kevin")
+        self.group = make_group(self.user)
+        self.m = make_membership(self.user, self.group, role="treasurer")
+
+    def _tx(self, tx_type, amount):
+        return FundTransaction.objects.create(group=self.group, type=tx_type, amount=amount)
+
+    def test_ledger_follows_create_update_delete(self):
+        """Les soldes matérialisés suivent créations, modifications et suppressions."""
+        self._tx("deposit_in", 100_000)
+        loan_tx = self._tx("loan_out", 40_000)
+        self.assertEqual(self.group.fund_balance, 60_000)
+
+        loan_tx.amount = 30_000
+        loan_tx.save()
+        self.assertEqual(self.group.fund_balance, 70_000)
+
+        FundTransaction.objects.filter(pk=loan_tx.pk).delete()
+        self.assertEqual(self.group.fund_balance, 100_000)
+        self.assertEqual(
+            {t: v for t, v in self.ledger.totals(self.group).items() if v["count"]},
+            self.ledger.replay(self.group),
+        )
+
+    def test_checkpoint_plus_delta_and_invalidation(self):
+        """L'état = dernier point de contrôle + delta ; modifier une transaction couverte l'invalide."""
+        from njangi.models import FundLedgerCheckpoint
+
+        first = self._tx("deposit_in", 50_000)
+        checkpoint = self.ledger.checkpoint(self.group)
+        self.assertEqual(int(checkpoint.balance), 50_000)
+
+        self._tx("expense", 5_000)
+        state = self.ledger.state(self.group)
+        self.assertEqual(state["checkpoint"], checkpoint)
+        self.assertEqual(state["balance"], 45_000)
+        self.assertEqual(state["tx_count"], 2)
+
+        first.delete()
+        self.assertFalse(FundLedgerCheckpoint.objects.filter(group=self.group).exists())
+        self.assertEqual(self.ledger.state(self.group)["balance"], -5_000)
+
+    def test_reconcile_reads_ledger_and_flags_drift(self):
+        """La réconciliation utilise point de contrôle + delta et signale un solde matérialisé divergent."""
+        from njangi.models import FundLedgerBalance
+        from njangi.services import FundReconciliationService
+
+        make_deposit(self.m, 80_000)
+        make_active_loan(self.m, 30_000)
+        self.ledger.checkpoint(self.group)
+
+        report = FundReconciliationService.reconcile(self.group)
+        self.assertEqual(report["tx_balance"], 50_000)
+        self.assertEqual(report["tx_count"], 2)
+        self.assertEqual(report["active_loans_count"], 1)
+        self.assertEqual(report["active_deposits_total"], 80_000)
+        self.assertFalse(any(i["type"] == "ledger_mismatch" for i in report["issues"]))
+
+        FundLedgerBalance.objects.filter(group=self.group, type="deposit_in").update(signed_total=1)
+        report = FundReconciliationService.reconcile(self.group)
+        self.assertTrue(any(i["type"] == "ledger_mismatch" for i in report["issues"]))
+
+        self.ledger.rebuild(self.group)
+        self.assertEqual(self.group.fund_balance, 50_000)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SUITE 7 — Tâches Celery (fan-out par groupe)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class NjangiTasksFanOutTest(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        from edu_cm.celery import app
+
+        cache.clear()
+        self._eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", self._eager)
+
+        self.user = make_user("jules")
+        self.groups = [make_group(self.user, name=f"Tontine {i}") for i in range(3)]
+        for g in self.groups:
+            make_membership(self.user, g, role="president", hand_order=1)
+
+    def test_fanout_processes_every_group(self):
+        """Chaque groupe actif est traité par sa propre sous-tâche, toutes mises en file d'un coup."""
+        from njangi import tasks
+
+        result = tasks.calculate_monthly_interests_all.delay().get()
+
+        today = date.today()
+        self.assertEqual(result["groups"], 3)
+        self.assertEqual(
+            MonthlyGroupInterest.objects.filter(year=today.year, month=today.month).count(), 3
+        )
+
+    def test_fanout_enqueues_all_groups_in_one_chord(self):
+        """Pas de vagues : toutes les sous-tâches partent ensemble, sur la file dédiée si configurée."""
+        from unittest import mock
+
+        from njangi import tasks
+
+        with mock.patch.object(tasks, "FANOUT_QUEUE", "njangi"), mock.patch.object(tasks, "chord") as chord:
+            tasks.apply_penalties_all()
+
+        header = list(chord.call_args.args[0])
+        self.assertEqual(chord.call_count, 1)
+        self.assertEqual(sorted(sig.args[0] for sig in header), sorted(g.pk for g in self.groups))
+        self.assertEqual({sig.options.get("queue") for sig in header}, {"njangi"})
+
+    def test_group_subtask_is_idempotent_per_period(self):
+        """Une sous-tâche déjà exécutée pour (groupe, période) est ignorée ; le résumé compte les statuts."""
+        from njangi import tasks
+
+        gid = self.groups[0].pk
+        first  = tasks.update_reliability_scores_group.apply(args=(gid, "2026-W01")).get()
+        second = tasks.update_reliability_scores_group.apply(args=(gid, "2026-W01")).get()
+        other  = tasks.update_reliability_scores_group.apply(args=(gid, "2026-W02")).get()
+
+        self.assertEqual(first["status"], "ok")
+        self.assertEqual(first["updated"], 1)
+        self.assertEqual(second["status"], "skipped")
+        self.assertEqual(other["status"], "ok")
+
+        summary = tasks.summarize_fanout([first, second, other], "reliability", "2026-W01")
+        self.assertEqual((summary["ok"], summary["skipped"], summary["failed"]), (2, 1, 0))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SUITE 8 — Documents PDF en cache
+# ═══════════════════════════════════════════════════════════════════════════
+
+@override_settings(STORAGES={
+    "default":     {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class PDFStatementServiceTest(TestCase):
+
+    def setUp(self):
+        from django.core.cache import cache
+        from edu_cm.celery import app
+
+        cache.clear()
+        self._eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", self._eager)
+
+        self.president = make_user("pdf_president")
+        self.member    = make_user("pdf_member")
+        self.group     = make_group(self.president)
+        self.ms_pres   = make_membership(self.president, self.group, role="president", hand_order=1)
+        self.ms_member = make_membership(self.member, self.group, hand_order=2)
+        make_deposit(self.ms_member, 100000)
+        make_active_loan(self.ms_pres, 50000)
+        self.today = date.today()
+        InterestCalculationService.calculate_month(self.group, self.today.year, self.today.month)
+
+    def _stored_files(self, folder):
+        from django.core.files.storage import default_storage
+        return default_storage.listdir(f"njangi/pdf/{folder}")[1]
+
+    def test_member_statement_served_from_cache_with_etag(self):
+        """Le relevé est rendu une fois ; les téléchargements suivants sont servis du cache (304 si à jour)."""
+        from unittest import mock
+        from njangi import pdf
+
+        self.client.force_login(self.member)
+        url = reverse("njangi:member_statement_pdf") + (
+            f"?group={self.group.slug}&year={self.today.year}&month={self.today.month}"
+        )
+
+        with mock.patch.object(pdf, "render_member_statement", wraps=pdf.render_member_statement) as render:
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(b"".join(first.streaming_content)[:4], b"%PDF")
+            etag = first["ETag"]
+            self.assertTrue(first["Last-Modified"])
+
+            second = self.client.get(url)
+            self.assertEqual(second["ETag"], etag)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(render.call_count, 1)
+
+        # Nouvelle donnée → nouvelle version, l'ancienne est purgée
+        make_deposit(self.ms_member, 25000)
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third["ETag"], etag)
+        self.assertEqual(len(self._stored_files(f"member/{self.ms_member.pk}")), 1)
+
+    def test_large_fund_statement_renders_in_background(self):
+        """Un état du fond volumineux est rendu par Celery, notifié, puis téléchargeable."""
+        from njangi.models import Notification
+
+        self.client.force_login(self.president)
+        url = reverse("njangi:fund_statement_pdf", kwargs={"slug": self.group.slug})
+        status_url = reverse("njangi:fund_statement_pdf_status", kwargs={"slug": self.group.slug})
+
+        with self.settings(NJANGI_PDF_ASYNC_MIN_LOANS=1):
+            self.assertEqual(self.client.get(status_url).json()["status"], "missing")
+            response = self.client.get(url)
+            self.assertRedirects(response, reverse("njangi:fund", kwargs={"slug": self.group.slug}),
+                                 fetch_redirect_response=False)
+            self.assertTrue(Notification.objects.filter(membership=self.ms_pres, title="État du fond prêt").exists())
+            self.assertEqual(self.client.get(status_url).json()["status"], "ready")
+
+            download = self.client.get(url)
+            self.assertEqual(download.status_code, 200)
+            self.assertEqual(download["Content-Type"], "application/pdf")
+
+    def test_statements_prerendered_after_monthly_interests(self):
+        """Le résumé du calcul mensuel pré-rend les relevés de chaque membre ayant un relevé."""
+        from njangi import tasks
+
+        period = f"{self.today.year}-{self.today.month:02d}"
+        tasks.summarize_fanout(
+            [{"job": "interests", "group_id": self.group.pk, "period": period, "status": "ok"}],
+            "interests", period,
+        )
+
+        self.assertEqual(len(self._stored_files(f"member/{self.ms_member.pk}")), 1)
+        self.assertEqual(self.ms_pres.monthly_statements.count(), 0)
@@ -73,6 +73,7 @@ urlpatterns = [
     # ── Export PDF ────────────────────────────────────────────────────────────
     path("mon-espace/releve-pdf/",            views.MemberStatementPDFView.as_view(),   name="member_statement_pdf"),
     path("bureau/<slug:slug>/fond/pdf/",      views.FundStatementPDFView.as_view(),     name="fund_statement_pdf"),
+    path("bureau/<slug:slug>/fond/pdf/statut/", views.FundStatementPDFStatusView.as_view(), name="fund_statement_pdf_status"),
 
     # ── Réconciliation ────────────────────────────────────────────────────────
     path("bureau/<slug:slug>/reconciliation/", views.FundReconciliationView.as_view(),  name="fund_reconciliation"),
@@ -1130,6 +1130,30 @@ class SubscriptionRequestView(MembershipRequiredMixin, View):
 
 # ── Export PDF ────────────────────────────────────────────────────────────────
 
+def _pdf_response(request, stored, filename):
+    """
+    Sert un PDF mis en cache par PDFStatementService (lecture en flux depuis le
+    stockage) avec ETag/Last-Modified ; répond 304 si le client est à jour.
+    """
+    from django.core.files.storage import default_storage
+    from django.http import FileResponse
+    from django.utils.cache import get_conditional_response
+    from django.utils.http import http_date, quote_etag
+
+    etag = quote_etag(stored["etag"])
+    last_modified = int(stored["last_modified"].timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            default_storage.open(stored["name"], "rb"),
+            as_attachment=True, filename=filename, content_type="application/pdf",
+        )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 class MemberStatementPDFView(LoginRequiredMixin, View):
     """
     Génère un relevé PDF mensuel pour un membre (dépôts + intérêts).
@@ -1137,263 +1161,79 @@ class MemberStatementPDFView(LoginRequiredMixin, View):
     """
 
     def get(self, request):
-        from io import BytesIO
         from datetime import date
-        from njangi.models.wallet import MemberMonthlyStatement, MonthlyGroupInterest
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.units import cm
+        from njangi.pdf import member_statement_filename
+        from njangi.services import PDFStatementService
 
         slug  = request.GET.get("group")
         year  = int(request.GET.get("year",  date.today().year))
         month = int(request.GET.get("month", date.today().month))
 
         group      = get_object_or_404(Group, slug=slug)
-        membership = get_object_or_404(Membership, group=group, user=request.user, is_active=True)
-
-        MONTHS_FR = ["", "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
-                     "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
-
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, pagesize=A4,
-            rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm,
+        membership = get_object_or_404(
+            Membership.objects.select_related("user", "group"), group=group, user=request.user, is_active=True,
         )
-        styles = getSampleStyleSheet()
-        PRIMARY = colors.HexColor("#1B6CA8")
-        LIGHT   = colors.HexColor("#EFF6FF")
-
-        story = []
-
-        # En-tête
-        title_style = ParagraphStyle("title", parent=styles["Title"], textColor=PRIMARY, fontSize=18)
-        story.append(Paragraph("Relevé mensuel Njangi+", title_style))
-        story.append(Spacer(1, 0.3*cm))
-        story.append(Paragraph(f"<b>{group.name}</b> — {MONTHS_FR[month]} {year}", styles["Normal"]))
-        story.append(Paragraph(
-            f"Membre : <b>{request.user.get_full_name() or request.user.username}</b> | "
-            f"Rôle : {membership.get_role_display()}",
-            styles["Normal"]
-        ))
-        story.append(Spacer(1, 0.5*cm))
-
-        # Relevé mensuel
-        try:
-            record = MonthlyGroupInterest.objects.get(group=group, year=year, month=month)
-            stmt   = MemberMonthlyStatement.objects.get(membership=membership, monthly_record=record)
-
-            stmt_data = [
-                ["Indicateur", "Valeur"],
-                ["Dépôt actif ce mois",       f"{int(stmt.deposit_balance):,} FCFA"],
-                ["Part dans le pool",          f"{float(stmt.pool_share_pct):.1f} %"],
-                ["Contribution aux prêts",     f"{int(stmt.contribution_to_loans):,} FCFA"],
-                ["Intérêts gagnés ce mois",    f"{int(stmt.interest_earned):,} FCFA"],
-                ["Intérêts cumulés (total)",   f"{int(stmt.cumulative_interest):,} FCFA"],
-                ["Avoirs totaux",              f"{int(stmt.wallet_balance):,} FCFA"],
-            ]
-            t = Table(stmt_data, colWidths=[10*cm, 7*cm])
-            t.setStyle(TableStyle([
-                ("BACKGROUND",   (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR",    (0, 0), (-1, 0), colors.white),
-                ("FONTNAME",     (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("BACKGROUND",   (0, 1), (-1, -1), LIGHT),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID",         (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE",     (0, 0), (-1, -1), 10),
-                ("PADDING",      (0, 0), (-1, -1), 8),
-            ]))
-            story.append(Paragraph("Détail du mois", styles["Heading2"]))
-            story.append(Spacer(1, 0.3*cm))
-            story.append(t)
-        except (MonthlyGroupInterest.DoesNotExist, MemberMonthlyStatement.DoesNotExist):
-            story.append(Paragraph(
-                f"Aucun relevé disponible pour {MONTHS_FR[month]} {year}.",
-                styles["Normal"]
-            ))
-
-        story.append(Spacer(1, 0.5*cm))
-
-        # Dépôts actifs
-        deposits = FundDeposit.objects.filter(membership=membership, status="active")
-        if deposits.exists():
-            story.append(Paragraph("Dépôts actifs", styles["Heading2"]))
-            story.append(Spacer(1, 0.3*cm))
-            dep_data = [["Montant", "Taux", "Déposé le", "Intérêt potentiel/mois"]]
-            for d in deposits:
-                dep_data.append([
-                    f"{int(d.amount):,} FCFA",
-                    f"{d.interest_rate}%/mois",
-                    d.deposited_at.strftime("%d/%m/%Y"),
-                    f"{d.monthly_interest_potential:,} FCFA",
-                ])
-            t2 = Table(dep_data, colWidths=[4*cm, 3*cm, 3.5*cm, 4.5*cm])
-            t2.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR",  (0, 0), (-1, 0), colors.white),
-                ("FONTNAME",   (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID",       (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE",   (0, 0), (-1, -1), 9),
-                ("PADDING",    (0, 0), (-1, -1), 6),
-            ]))
-            story.append(t2)
-
-        story.append(Spacer(1, 1*cm))
-        from datetime import datetime
-        story.append(Paragraph(
-            f"<font color='grey' size='8'>Document généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')} "
-            f"— E-Shelle Njangi+</font>",
-            styles["Normal"]
-        ))
-
-        doc.build(story)
-        buffer.seek(0)
-        filename = f"releve_njangi_{membership.user.username}_{year}_{month:02d}.pdf"
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+
+        stored = PDFStatementService.member_statement(membership, year, month)
+        return _pdf_response(request, stored, member_statement_filename(membership, year, month))
 
 
 class FundStatementPDFView(BureauRequiredMixin, View):
     """
     Génère un état complet du fond commun en PDF.
     URL: /njangi/bureau/<slug>/fond/pdf/
+
+    Au-delà de NJANGI_PDF_ASYNC_MIN_LOANS prêts actifs, le rendu part en tâche
+    Celery : le membre est redirigé vers la page du fond, puis notifié ; l'URL
+    fond/pdf/statut/ permet de suivre l'avancement.
     """
 
     def get(self, request, slug):
-        from io import BytesIO
-        from datetime import datetime
-        from njangi.models.fund import FundTransaction
-        from njangi.models.loan import Loan
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.units import cm
+        from django.core.cache import cache
+        from njangi.pdf import fund_statement_filename
+        from njangi.services import PDFStatementService
 
         group = self.group
-        PRIMARY = colors.HexColor("#1B6CA8")
-        LIGHT   = colors.HexColor("#EFF6FF")
-        GREEN   = colors.HexColor("#dcfce7")
-        RED     = colors.HexColor("#fee2e2")
-
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, pagesize=A4,
-            rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm,
-        )
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle("title", parent=styles["Title"], textColor=PRIMARY, fontSize=18)
-
-        story = []
-
-        # En-tête
-        story.append(Paragraph("État du Fond Commun — Njangi+", title_style))
-        story.append(Spacer(1, 0.3*cm))
-        story.append(Paragraph(
-            f"Groupe : <b>{group.name}</b> | "
-            f"Généré le : {datetime.now().strftime('%d/%m/%Y à %H:%M')}",
-            styles["Normal"]
-        ))
-        story.append(Spacer(1, 0.5*cm))
-
-        # KPIs fond
-        balance   = int(group.fund_balance)
-        available = int(group.fund_available_for_loans)
-        kpi_data = [
-            ["Indicateur", "Valeur"],
-            ["Solde total du fond",            f"{balance:,} FCFA"],
-            ["Disponible pour prêts",          f"{available:,} FCFA"],
-            ["Réserve obligatoire",            f"{group.fund_reserve_pct}%"],
-            ["Taux intérêt prêts",             f"{group.fund_loan_rate}%/mois"],
-            ["Taux intérêt dépôts",            f"{group.fund_deposit_rate}%/mois"],
-        ]
-        t_kpi = Table(kpi_data, colWidths=[10*cm, 7*cm])
-        t_kpi.setStyle(TableStyle([
-            ("BACKGROUND",     (0, 0), (-1, 0), PRIMARY),
-            ("TEXTCOLOR",      (0, 0), (-1, 0), colors.white),
-            ("FONTNAME",       (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-            ("GRID",           (0, 0), (-1, -1), 0.5, colors.grey),
-            ("FONTSIZE",       (0, 0), (-1, -1), 10),
-            ("PADDING",        (0, 0), (-1, -1), 8),
-        ]))
-        story.append(Paragraph("Situation du fond", styles["Heading2"]))
-        story.append(Spacer(1, 0.3*cm))
-        story.append(t_kpi)
-        story.append(Spacer(1, 0.5*cm))
-
-        # Prêts actifs
-        active_loans = Loan.objects.filter(
-            membership__group=group, status="active"
-        ).select_related("membership__user")
-        if active_loans.exists():
-            story.append(Paragraph("Prêts actifs", styles["Heading2"]))
-            story.append(Spacer(1, 0.3*cm))
-            loan_data = [["Membre", "Montant", "Reste dû", "Échéance", "Statut"]]
-            for loan in active_loans:
-                overdue = "EN RETARD" if loan.is_overdue else "OK"
-                loan_data.append([
-                    loan.membership.user.get_full_name() or loan.membership.user.username,
-                    f"{int(loan.amount_approved):,} FCFA",
-                    f"{int(loan.balance_remaining):,} FCFA",
-                    loan.due_date.strftime("%d/%m/%Y") if loan.due_date else "—",
-                    overdue,
-                ])
-            t_loans = Table(loan_data, colWidths=[4.5*cm, 3.5*cm, 3.5*cm, 3*cm, 2.5*cm])
-            t_loans.setStyle(TableStyle([
-                ("BACKGROUND",     (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR",      (0, 0), (-1, 0), colors.white),
-                ("FONTNAME",       (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID",           (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE",       (0, 0), (-1, -1), 9),
-                ("PADDING",        (0, 0), (-1, -1), 6),
-            ]))
-            story.append(t_loans)
-            story.append(Spacer(1, 0.5*cm))
-
-        # 30 dernières transactions
-        transactions = FundTransaction.objects.filter(group=group).order_by("-created_at")[:30]
-        if transactions:
-            story.append(Paragraph("30 dernières transactions", styles["Heading2"]))
-            story.append(Spacer(1, 0.3*cm))
-            tx_data = [["Date", "Type", "Montant", "Sens", "Description"]]
-            for tx in transactions:
-                tx_data.append([
-                    tx.created_at.strftime("%d/%m/%Y"),
-                    tx.get_type_display(),
-                    f"{int(tx.amount):,} FCFA",
-                    "+" if tx.is_credit else "−",
-                    (tx.description or "")[:40],
-                ])
-            t_tx = Table(tx_data, colWidths=[2.5*cm, 4*cm, 3.5*cm, 1.5*cm, 5.5*cm])
-            t_tx.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR",  (0, 0), (-1, 0), colors.white),
-                ("FONTNAME",   (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("GRID",       (0, 0), (-1, -1), 0.5, colors.lightgrey),
-                ("FONTSIZE",   (0, 0), (-1, -1), 8),
-                ("PADDING",    (0, 0), (-1, -1), 5),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-            ]))
-            story.append(t_tx)
-
-        story.append(Spacer(1, 1*cm))
-        story.append(Paragraph(
-            f"<font color='grey' size='8'>Document généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')} "
-            f"— E-Shelle Njangi+ | {group.name}</font>",
-            styles["Normal"]
-        ))
-
-        doc.build(story)
-        buffer.seek(0)
-        filename = f"fond_commun_{group.slug}_{datetime.now().strftime('%Y%m%d')}.pdf"
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+        if not PDFStatementService.is_large_fund_statement(group):
+            stored = PDFStatementService.fund_statement(group)
+        else:
+            stored = PDFStatementService.fund_statement(group, render=False)
+            if stored is None:
+                from njangi.tasks import render_fund_statement_pdf
+                if cache.add(PDFStatementService.pending_key(group.pk), "pending", PDFStatementService.PENDING_TTL):
+                    render_fund_statement_pdf.delay(group.pk, self.membership.pk)
+                messages.info(
+                    request,
+                    "L'état du fond est en cours de génération. "
+                    "Vous recevrez une notification dès qu'il sera prêt au téléchargement."
+                )
+                return redirect("njangi:fund", slug=slug)
+
+        return _pdf_response(request, stored, fund_statement_filename(group))
+
+
+class FundStatementPDFStatusView(BureauRequiredMixin, View):
+    """
+    Suivi du rendu asynchrone de l'état du fond (JSON).
+    status : ready (téléchargeable) | pending (en cours) | missing (à relancer)
+    """
+
+    def get(self, request, slug):
+        from django.core.cache import cache
+        from django.http import JsonResponse
+        from django.urls import reverse
+        from njangi.services import PDFStatementService
+
+        if PDFStatementService.fund_statement(self.group, render=False) is not None:
+            status = "ready"
+        elif cache.get(PDFStatementService.pending_key(self.group.pk)):
+            status = "pending"
+        else:
+            status = "missing"
+        return JsonResponse({
+            "status":       status,
+            "download_url": reverse("njangi:fund_statement_pdf", kwargs={"slug": slug}),
+        })
 
 
 class SessionReportPDFView(BureauRequiredMixin, View):
@@ -1403,249 +1243,16 @@ class SessionReportPDFView(BureauRequiredMixin, View):
     """
 
     def get(self, request, slug, pk):
-        from io import BytesIO
-        from datetime import datetime
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib import colors
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib.units import cm
+        from njangi.pdf import session_report_filename
+        from njangi.services import PDFStatementService
 
-        session = get_object_or_404(Session, pk=pk, group=self.group)
+        session = get_object_or_404(Session.objects.select_related("group"), pk=pk, group=self.group)
         if session.status != "completed":
             messages.error(request, "Le rapport PDF n'est disponible qu'après clôture de la séance.")
             return redirect("njangi:session_detail", slug=slug, pk=pk)
 
-        contributions = session.contributions.select_related("membership__user").order_by("membership__hand_order")
-        absentees = session.contributions.filter(presence="absent").select_related("membership__user")
-        penalties = session.contributions.filter(penalty_amount__gt=0).select_related("membership__user")
-        repayments = session.repayments_made
-        loans_disbursed = session.loans_granted.select_related("membership__user").all()
-        deposits = session.deposits.select_related("membership__user").all()
-        session_beneficiaries = session.session_beneficiaries.select_related("membership__user").all()
-        base_funds = session.base_fund_deposits.select_related("membership__user").all()
-
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer, pagesize=A4,
-            rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm,
-        )
-        styles = getSampleStyleSheet()
-        PRIMARY = colors.HexColor("#1B6CA8")
-        LIGHT = colors.HexColor("#EFF6FF")
-
-        story = []
-        title_style = ParagraphStyle("title", parent=styles["Title"], textColor=PRIMARY, fontSize=18)
-        story.append(Paragraph(f"Rapport de séance #{session.session_number}", title_style))
-        story.append(Spacer(1, 0.2*cm))
-        story.append(Paragraph(
-            f"Groupe : <b>{self.group.name}</b> | Date : <b>{session.date.strftime('%d/%m/%Y')}</b> | Cycle : <b>{session.cycle}</b>",
-            styles["Normal"],
-        ))
-        beneficiary_names = ", ".join(b.membership.user.get_full_name() or b.membership.user.username for b in session_beneficiaries) or "—"
-        story.append(Paragraph(
-            f"Bénéficiaire(s) de la séance : <b>{beneficiary_names}</b> (Montant total : <b>{int(session.hand_amount):,} FCFA</b>)",
-            styles["Normal"],
-        ))
-        story.append(Paragraph(f"Statut : <b>{session.get_status_display()}</b>", styles["Normal"]))
-        story.append(Spacer(1, 0.4*cm))
-
-        overview_data = [
-            ["Indicateur", "Valeur"],
-            ["Total collecté", f"{int(session.total_collected):,} FCFA"],
-            ["Main levée totale", f"{int(session.total_deposits):,} FCFA"],
-            ["Remboursements réels", f"{int(session.total_repayments):,} FCFA"],
-            ["Retour en caisse", f"{int(session.cash_returned_manual):,} FCFA"],
-            ["Fonds disponibles pour prêt", f"{int(session.loan_fund_available):,} FCFA"],
-            ["Pénalités collectées", f"{int(session.penalties_collected):,} FCFA"],
-        ]
-        table = Table(overview_data, colWidths=[9*cm, 8*cm])
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("PADDING", (0, 0), (-1, -1), 6),
-        ]))
-        story.append(table)
-        story.append(Spacer(1, 0.5*cm))
-
-        if deposits.exists():
-            story.append(Paragraph("Dépôts de main levée (Fonds mis à disposition)", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            dep_data = [["Membre", "Montant déposé", "Taux d'intérêt"]]
-            for d in deposits:
-                dep_data.append([
-                    d.membership.user.get_full_name() or d.membership.user.username,
-                    f"{int(d.amount):,} FCFA",
-                    f"{d.interest_rate}%",
-                ])
-            t_dep = Table(dep_data, colWidths=[7*cm, 5*cm, 5*cm])
-            t_dep.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_dep)
-            story.append(Spacer(1, 0.5*cm))
-
-        if base_funds.exists():
-            story.append(Paragraph("Versements au fond de caisse (Fonds de base)", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            bf_data = [["Membre", "Montant versé"]]
-            for bf in base_funds:
-                bf_data.append([
-                    bf.membership.user.get_full_name() or bf.membership.user.username,
-                    f"{int(bf.amount):,} FCFA",
-                ])
-            t_bf = Table(bf_data, colWidths=[9*cm, 8*cm])
-            t_bf.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_bf)
-            story.append(Spacer(1, 0.5*cm))
-
-        if contributions.exists():
-            story.append(Paragraph("Détail des cotisations", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            contrib_data = [["Membre", "Dû", "Payé", "Statut", "Présence", "Méthode"]]
-            for c in contributions:
-                contrib_data.append([
-                    c.membership.user.get_full_name() or c.membership.user.username,
-                    f"{int(c.amount_due):,} FCFA",
-                    f"{int(c.amount_paid):,} FCFA",
-                    c.get_status_display(),
-                    c.get_presence_display(),
-                    c.payment_method or "—",
-                ])
-            t_contrib = Table(contrib_data, colWidths=[5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2.5*cm, 2*cm])
-            t_contrib.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_contrib)
-            story.append(Spacer(1, 0.5*cm))
-
-        if absentees.exists():
-            story.append(Paragraph("Membres absents", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            absent_data = [["Membre", "Statut présence"]]
-            for a in absentees:
-                absent_data.append([
-                    a.membership.user.get_full_name() or a.membership.user.username,
-                    a.get_presence_display(),
-                ])
-            t_absent = Table(absent_data, colWidths=[9*cm, 8*cm])
-            t_absent.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_absent)
-            story.append(Spacer(1, 0.5*cm))
-
-        if penalties.exists():
-            story.append(Paragraph("Pénalités appliquées", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            penalty_data = [["Membre", "Montant pénalité", "Statut paiement"]]
-            for p in penalties:
-                penalty_data.append([
-                    p.membership.user.get_full_name() or p.membership.user.username,
-                    f"{int(p.penalty_amount):,} FCFA",
-                    "Payée" if p.penalty_paid else "Non payée",
-                ])
-            t_penalty = Table(penalty_data, colWidths=[7*cm, 5*cm, 5*cm])
-            t_penalty.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_penalty)
-            story.append(Spacer(1, 0.5*cm))
-
-        if repayments.exists():
-            story.append(Paragraph("Remboursements enregistrés", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            repay_data = [["Membre", "Montant", "Date"]]
-            for r in repayments:
-                repay_data.append([
-                    r.loan.membership.user.get_full_name() or r.loan.membership.user.username,
-                    f"{int(r.amount_paid):,} FCFA",
-                    r.paid_at.strftime("%d/%m/%Y"),
-                ])
-            t_repay = Table(repay_data, colWidths=[7*cm, 4*cm, 5*cm])
-            t_repay.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_repay)
-            story.append(Spacer(1, 0.5*cm))
-
-        if loans_disbursed.exists():
-            story.append(Paragraph("Prêts accordés durant la séance", styles["Heading2"]))
-            story.append(Spacer(1, 0.2*cm))
-            loan_data = [["Emprunteur", "Montant accordé", "Date butoire", "Total à rembourser"]]
-            for l in loans_disbursed:
-                loan_data.append([
-                    l.membership.user.get_full_name() or l.membership.user.username,
-                    f"{int(l.amount_approved):,} FCFA",
-                    l.due_date.strftime("%d/%m/%Y") if l.due_date else "—",
-                    f"{int(l.total_due):,} FCFA",
-                ])
-            t_loan = Table(loan_data, colWidths=[5*cm, 4*cm, 4*cm, 4*cm])
-            t_loan.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), PRIMARY),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, LIGHT]),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("PADDING", (0, 0), (-1, -1), 5),
-            ]))
-            story.append(t_loan)
-            story.append(Spacer(1, 0.5*cm))
-
-        story.append(Paragraph(
-            f"<font color='grey' size='8'>Document généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')} — E-Shelle Njangi+</font>",
-            styles["Normal"],
-        ))
-
-        doc.build(story)
-        buffer.seek(0)
-        filename = f"rapport_seance_{self.group.slug}_{session.session_number}_{session.date.strftime('%Y%m%d')}.pdf"
-        response = HttpResponse(buffer, content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+        stored = PDFStatementService.session_report(session)
+        return _pdf_response(request, stored, session_report_filename(session))
 
 
 # ── Réconciliation fond commun ─────────────────────────────────────────────────
@@ -1,9 +1,15 @@
 """pharma/views.py — E-Shelle Pharma"""
+
 from django.shortcuts import render, get_object_or_404
 from django.db.models import Q, Count, Min
+from core.cache import cached_view
 from .models import (VillePharma, QuartierPharma, CategorieMedicament,
                      Medicament, Pharmacie, StockPharmacie, AvisPharmacie)
 
+LANDING_CACHE_TAG = "pharma:landing"
+LANDING_CACHE_TIMEOUT = 60 * 10
+
+
 TAILLES_CHOICES = []  # unused here, kept for consistency
 
 
@@ -13,6 +19,7 @@ def _pharmacies_actives():
 
 # ─── Accueil ──────────────────────────────────────────────────────────────────
 
+@cached_view("pharma", timeout=LANDING_CACHE_TIMEOUT, tags=LANDING_CACHE_TAG)
 def accueil(request):
     villes      = VillePharma.objects.filter(active=True)
     categories  = CategorieMedicament.objects.filter(active=True)
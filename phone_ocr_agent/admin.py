@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import OCRJob
+
+
+@admin.register(OCRJob)
+class OCRJobAdmin(admin.ModelAdmin):
+    list_display = ["filename", "kind", "status", "frames_done", "created_at", "finished_at"]
+    list_filter = ["kind", "status", "created_at"]
+    search_fields = ["filename", "content_hash"]
+    readonly_fields = ["content_hash", "numbers", "text", "error", "created_at", "finished_at"]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-17 21:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('kind', models.CharField(choices=[('image', 'Image'), ('video', 'Video')], max_length=10)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('media', models.FileField(blank=True, upload_to='phone_ocr/uploads/')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Termine'), ('failed', 'Echec')], default='pending', max_length=10)),
+                ('frames_done', models.PositiveIntegerField(default=0)),
+                ('numbers', models.JSONField(blank=True, default=list)),
+                ('text', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Analyse OCR',
+                'verbose_name_plural': 'Analyses OCR',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,3 +1,50 @@
 from django.db import models
 
-# Create your models here.
+
+class OCRJob(models.Model):
+    """
+    Analyse OCR d'un fichier, identifiee par l'empreinte de son contenu.
+
+    Les videos sont traitees en tache de fond : numbers se remplit au fil des
+    frames lues. Un job termine sert de cache : re-envoyer le meme fichier
+    reutilise son resultat sans refaire d'OCR.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUSES = [
+        (STATUS_PENDING, "En attente"),
+        (STATUS_RUNNING, "En cours"),
+        (STATUS_DONE, "Termine"),
+        (STATUS_FAILED, "Echec"),
+    ]
+
+    KIND_IMAGE = "image"
+    KIND_VIDEO = "video"
+    KINDS = [(KIND_IMAGE, "Image"), (KIND_VIDEO, "Video")]
+
+    content_hash = models.CharField(max_length=64, db_index=True)
+    kind = models.CharField(max_length=10, choices=KINDS)
+    filename = models.CharField(max_length=255, blank=True)
+    media = models.FileField(upload_to="phone_ocr/uploads/", blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING)
+    frames_done = models.PositiveIntegerField(default=0)
+    numbers = models.JSONField(default=list, blank=True)
+    text = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Analyse OCR"
+        verbose_name_plural = "Analyses OCR"
+
+    def __str__(self):
+        return f"{self.filename or self.content_hash[:12]} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
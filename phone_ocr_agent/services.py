@@ -1,9 +1,17 @@
+import hashlib
 import os
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cache
 from pathlib import Path
 from dataclasses import dataclass
 
+from django.conf import settings
+
+# Distance de Hamming (sur 64 bits) sous laquelle deux frames sont considerees identiques
+FRAME_DUPLICATE_DISTANCE = 6
+
 
 class OCRError(RuntimeError):
     pass
@@ -130,14 +138,21 @@ def _ensure_pillow_and_tesseract():
         ) from exc
 
 
-def _text_from_pil_image(image) -> str:
-    from PIL import ImageOps
+@cache
+def _configure_tesseract() -> None:
+    """Resout le binaire Tesseract une seule fois par processus."""
     import pytesseract
 
     default_windows_cmd = Path("C:/Program Files/Tesseract-OCR/tesseract.exe")
     if default_windows_cmd.exists():
         pytesseract.pytesseract.tesseract_cmd = str(default_windows_cmd)
 
+
+def _text_from_pil_image(image) -> str:
+    from PIL import ImageOps
+    import pytesseract
+
+    _configure_tesseract()
     image = ImageOps.exif_transpose(image)
     image = image.convert("L")
     return pytesseract.image_to_string(image, lang="eng+fra")
@@ -160,57 +175,142 @@ def image_to_text(image_file) -> str:
         raise OCRError(f"OCR impossible sur cette image: {exc}") from exc
 
 
-def video_to_text(video_file) -> str:
-    """Extrait des images d'une vidéo puis applique OCR local sur les frames."""
-    _ensure_pillow_and_tesseract()
-
+def content_hash(uploaded_file) -> str:
+    """Empreinte SHA-256 du contenu envoye : cle du cache des resultats OCR."""
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+# ── Frames video : echantillonnage, dedoublonnage, OCR parallele ─────────────
+
+def frame_hash(image) -> int:
+    """Hash perceptuel (dHash 64 bits) : stable entre deux frames quasi identiques."""
+    small = image.convert("L").resize((9, 8))
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def distinct_frames(frames, max_distance: int = FRAME_DUPLICATE_DISTANCE):
+    """
+    Ne garde que les frames qui different visiblement de la derniere frame gardee
+    (video d'un repertoire qui defile : les pauses produisent des frames identiques).
+    """
+    last_hash = None
+    for image in frames:
+        current = frame_hash(image)
+        if last_hash is not None and (current ^ last_hash).bit_count() <= max_distance:
+            continue
+        last_hash = current
+        yield image
+
+
+def _video_timestamps(duration: float) -> list[float]:
+    interval = 1.0 if duration <= 30 else 2.0
+    timestamps = []
+    t = 0.0
+    while t < duration:
+        timestamps.append(t)
+        t += interval
+    if duration - max(t - interval, 0) > 0.5:
+        timestamps.append(max(duration - 0.5, 0))
+    return timestamps
+
+
+def video_frames(path: str):
+    """Genere les frames echantillonnees d'une video (PIL.Image), decodees a la demande."""
     try:
         from moviepy.editor import VideoFileClip
     except ImportError as exc:
         raise OCRError(
             "MoviePy n'est pas installe. Installe-le avec: pip install moviepy[ffmpeg]"
         ) from exc
+    from PIL import Image
 
-    temp_path = None
-    clip = None
+    clip = VideoFileClip(path)
     try:
-        suffix = os.path.splitext(getattr(video_file, "name", ""))[1] or ".mp4"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            temp_path = tmp.name
-            for chunk in video_file.chunks():
-                tmp.write(chunk)
-
-        clip = VideoFileClip(temp_path)
         duration = float(clip.duration or 0)
         if duration <= 0:
             raise OCRError("Durée vidéo invalide ou vidéo corrompue.")
+        for t in _video_timestamps(duration):
+            yield Image.fromarray(clip.get_frame(t))
+    finally:
+        clip.close()
+
+
+def ocr_frames(frames, on_text=None, workers: int | None = None) -> list[str]:
+    """
+    OCR des frames en parallele. Tesseract tourne dans un sous-processus par
+    appel : un pool de threads suffit a occuper plusieurs coeurs. on_text(text)
+    est appele des qu'une frame est lue ; le resultat suit l'ordre des frames.
+    """
+    workers = workers or getattr(settings, "PHONE_OCR_WORKERS", 4)
+    if workers > 1:
+        # Un seul thread par processus Tesseract, sinon les workers se concurrencent
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    texts = {}
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            text = future.result()
+            texts[pending.pop(future)] = text
+            if on_text is not None:
+                on_text(text)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for index, image in enumerate(frames):
+            # Fenetre bornee : le decodage avance pendant l'OCR sans garder toute la video en memoire
+            if len(pending) >= workers * 2:
+                collect([next(as_completed(pending))])
+            pending[pool.submit(_text_from_pil_image, image)] = index
+        for future in as_completed(list(pending)):
+            collect([future])
+    return [texts[index] for index in sorted(texts)]
+
+
+def _video_path(video_file):
+    """Chemin local de la video ; copie temporaire si l'upload est en memoire."""
+    path = getattr(video_file, "temporary_file_path", None)
+    if callable(path):
+        return path(), False
+    suffix = os.path.splitext(getattr(video_file, "name", ""))[1] or ".mp4"
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        for chunk in video_file.chunks():
+            tmp.write(chunk)
+    return tmp.name, True
+
+
+def video_to_text(video_file, on_text=None) -> str:
+    """Extrait des images d'une vidéo puis applique OCR local sur les frames distinctes."""
+    _ensure_pillow_and_tesseract()
 
-        interval = 1.0 if duration <= 30 else 2.0
-        texts = []
-        t = 0.0
-        while t < duration:
-            frame = clip.get_frame(t)
-            from PIL import Image
-            image = Image.fromarray(frame)
-            texts.append(_text_from_pil_image(image))
-            t += interval
-
-        if duration - max(t - interval, 0) > 0.5:
-            frame = clip.get_frame(max(duration - 0.5, 0))
-            from PIL import Image
-            image = Image.fromarray(frame)
-            texts.append(_text_from_pil_image(image))
-
+    temp_path = None
+    try:
+        path, is_temp = _video_path(video_file)
+        temp_path = path if is_temp else None
+        texts = ocr_frames(distinct_frames(video_frames(path)), on_text=on_text)
         return "\n".join(texts)
     except OCRError:
         raise
     except Exception as exc:
+        if "TesseractNotFoundError" in type(exc).__name__:
+            raise OCRError(
+                "Tesseract OCR est introuvable sur cette machine. Installe Tesseract puis redemarre le serveur Django."
+            ) from exc
         raise OCRError(
             "Impossible d'extraire le contenu de la vidéo. Vérifie que ffmpeg est installé et que le format est pris en charge."
         ) from exc
     finally:
-        if clip is not None:
-            clip.close()
         if temp_path and os.path.exists(temp_path):
             os.unlink(temp_path)
 
@@ -0,0 +1,66 @@
+import logging
+
+from celery import shared_task
+from django.utils import timezone
+
+from .models import OCRJob
+from .services import OCRError, extract_phone_numbers, normalize_numbers_for_whatsapp, video_to_text
+
+logger = logging.getLogger(__name__)
+
+
+def _fail(job, error):
+    OCRJob.objects.filter(pk=job.pk).update(status=OCRJob.STATUS_FAILED, error=error, finished_at=timezone.now())
+
+
+def run_ocr_job(job_id: int) -> None:
+    """Analyse une video en publiant les numeros trouves au fur et a mesure."""
+
+    job = OCRJob.objects.get(pk=job_id)
+    if job.is_finished:
+        return
+    OCRJob.objects.filter(pk=job.pk).update(status=OCRJob.STATUS_RUNNING)
+
+    found = list(job.numbers)
+    frames_done = 0
+
+    def on_text(text):
+        nonlocal frames_done
+        frames_done += 1
+        new_numbers = [
+            number
+            for number in normalize_numbers_for_whatsapp(extract_phone_numbers(text))
+            if number not in found
+        ]
+        found.extend(new_numbers)
+        OCRJob.objects.filter(pk=job.pk).update(frames_done=frames_done, numbers=found)
+
+    try:
+        with job.media.open("rb") as media:
+            text = video_to_text(media, on_text=on_text)
+        numbers = normalize_numbers_for_whatsapp(extract_phone_numbers(text))
+        OCRJob.objects.filter(pk=job.pk).update(
+            status=OCRJob.STATUS_DONE,
+            text=text,
+            numbers=numbers,
+            frames_done=frames_done,
+            finished_at=timezone.now(),
+        )
+    except OCRError as exc:
+        _fail(job, str(exc))
+        return
+    except Exception as exc:
+        # Jamais de job bloque en cours : le meme fichier pourra etre relance
+        logger.exception(f"[phone_ocr] Job {job.pk} interrompu : {exc}")
+        _fail(job, "Erreur inattendue pendant l'analyse de la video. Reessaie.")
+        return
+
+    # La video n'est plus utile une fois le resultat en cache
+    job.media.delete(save=False)
+    OCRJob.objects.filter(pk=job.pk).update(media="")
+    logger.info(f"[phone_ocr] Job {job.pk} : {len(numbers)} numero(s), {frames_done} frame(s) lues")
+
+
+@shared_task
+def run_ocr_job_task(job_id: int):
+    run_ocr_job(job_id)
@@ -1,3 +1,106 @@
+import random
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import services
+from .models import OCRJob
+from .services import OCRResult, distinct_frames, ocr_frames
+from .tasks import run_ocr_job
+from .views import _cached_job, job_token
+
+
+def _frame(label: str, shift: int = 0):
+    """Motif aleatoire propre au label ; shift simule un leger bruit de compression."""
+    rng = random.Random(label)
+    pattern = Image.new("L", (9, 8))
+    pattern.putdata([min(255, rng.randrange(0, 240) + shift) for _ in range(72)])
+    image = pattern.resize((360, 320), Image.NEAREST).convert("RGB")
+    image.info["label"] = label
+    return image
+
+
+class VideoPipelineTests(TestCase):
+    def test_frames_quasi_identiques_ignorees(self):
+        frames = [_frame("abc"), _frame("abc", shift=1), _frame("xyz"), _frame("xyz"), _frame("abc")]
+        kept = [frame.info["label"] for frame in distinct_frames(frames)]
+        self.assertEqual(kept, ["abc", "xyz", "abc"])
+
+    def test_ocr_parallele_conserve_l_ordre_et_publie_au_fil_de_l_eau(self):
+        frames = [_frame(label) for label in ("a", "b", "c", "d", "e")]
+        seen = []
+        with mock.patch.object(services, "_text_from_pil_image", side_effect=lambda image: image.info["label"]):
+            texts = ocr_frames(iter(frames), on_text=seen.append, workers=2)
+        self.assertEqual(texts, ["a", "b", "c", "d", "e"])
+        self.assertEqual(sorted(seen), texts)
+
+    def test_job_video_publie_les_numeros_partiels(self):
+        job = OCRJob.objects.create(
+            content_hash="f" * 64,
+            kind=OCRJob.KIND_VIDEO,
+            media=SimpleUploadedFile("contacts.mp4", b"fake-video"),
+        )
+        partial = []
+
+        def fake_video_to_text(media, on_text):
+            on_text("Alice 677 12 34 56")
+            partial.append(list(OCRJob.objects.get(pk=job.pk).numbers))
+            on_text("Bob 699 00 11 22")
+            return "Alice 677 12 34 56\nBob 699 00 11 22"
+
+        with mock.patch("phone_ocr_agent.tasks.video_to_text", side_effect=fake_video_to_text):
+            run_ocr_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(partial, [["+237677123456"]])
+        self.assertEqual(job.status, OCRJob.STATUS_DONE)
+        self.assertEqual(job.numbers, ["+237677123456", "+237699001122"])
+        self.assertFalse(job.media)
+
+        status = self.client.get(reverse("phone_ocr_agent:job_status", args=[job_token(job)])).json()
+        self.assertTrue(status["finished"])
+        self.assertEqual(status["frames_done"], 2)
+
+        # Sans le jeton remis par le tableau de bord, pas d'acces par id
+        for token in (str(job.pk), job_token(job)[:-2] + "xx"):
+            response = self.client.get(reverse("phone_ocr_agent:job_status", args=[token]))
+            self.assertEqual(response.status_code, 404)
+
+    def test_reenvoi_du_meme_fichier_reutilise_le_resultat(self):
+        result = OCRResult(text="Tel 677 12 34 56", numbers=["677123456"], whatsapp_numbers=["+237677123456"])
+        with mock.patch("phone_ocr_agent.views.extract_from_image", return_value=result) as extract:
+            for _ in range(2):
+                upload = SimpleUploadedFile("capture.png", b"same-bytes", content_type="image/png")
+                response = self.client.post(reverse("phone_ocr_agent:dashboard"), {"media": upload})
+                self.assertEqual(response.context["numbers"], ["+237677123456"])
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(OCRJob.objects.count(), 1)
+
+    def test_erreur_inattendue_marque_le_job_en_echec(self):
+        job = OCRJob.objects.create(
+            content_hash="e" * 64,
+            kind=OCRJob.KIND_VIDEO,
+            media=SimpleUploadedFile("contacts.mp4", b"fake-video"),
+        )
+        with mock.patch("phone_ocr_agent.tasks.video_to_text", side_effect=RuntimeError("ffmpeg a plante")):
+            run_ocr_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, OCRJob.STATUS_FAILED)
+        self.assertIsNone(_cached_job(job.content_hash))
+
+    def test_job_bloque_en_cours_est_abandonne(self):
+        stale = OCRJob.objects.create(content_hash="d" * 64, kind=OCRJob.KIND_VIDEO, status=OCRJob.STATUS_RUNNING)
+        fresh = OCRJob.objects.create(content_hash="c" * 64, kind=OCRJob.KIND_VIDEO, status=OCRJob.STATUS_RUNNING)
+        OCRJob.objects.filter(pk=stale.pk).update(created_at=timezone.now() - timedelta(hours=1))
 
-# Create your tests here.
+        with self.settings(PHONE_OCR_JOB_TIMEOUT=600):
+            self.assertIsNone(_cached_job(stale.content_hash))
+            self.assertEqual(_cached_job(fresh.content_hash), fresh)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, OCRJob.STATUS_FAILED)
@@ -7,4 +7,5 @@ app_name = "phone_ocr_agent"
 urlpatterns = [
     path("", views.dashboard, name="dashboard"),
     path("export/", views.export_csv, name="export_csv"),
+    path("jobs/<str:token>/", views.job_status, name="job_status"),
 ]
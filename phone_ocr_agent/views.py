@@ -1,12 +1,17 @@
 import csv
-from datetime import datetime
+import os
+from datetime import datetime, timedelta
 
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.conf import settings
+from django.core import signing
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
+from django.utils import timezone
 from django.views.decorators.http import require_POST
 
-from .services import OCRError, extract_from_image, extract_from_video
+from .models import OCRJob
+from .services import OCRError, content_hash, extract_from_image
 from whatsapp_agent.models import Campagne, ContactWhatsApp
 
 
@@ -23,6 +28,15 @@ ALLOWED_CONTENT_TYPES = {
 }
 
 
+JOB_TOKEN_SALT = "phone_ocr_agent.job"
+JOB_TOKEN_MAX_AGE = 24 * 3600
+
+
+def job_token(job):
+    """Jeton signe du job pour le suivi en direct : l'id seul permettrait d'enumerer les resultats."""
+    return signing.dumps(job.pk, salt=JOB_TOKEN_SALT)
+
+
 def _dedupe_numbers(numbers):
     deduped = []
     seen = set()
@@ -35,6 +49,41 @@ def _dedupe_numbers(numbers):
     return deduped
 
 
+def _cached_job(digest):
+    """
+    Dernier job non echoue pour ce contenu (termine = cache, sinon analyse en cours).
+    Un job en attente ou en cours depuis plus de PHONE_OCR_JOB_TIMEOUT secondes
+    (worker tue, redemarrage) est marque en echec : un nouveau job sera lance.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, "PHONE_OCR_JOB_TIMEOUT", 1800))
+    OCRJob.objects.filter(
+        content_hash=digest,
+        status__in=[OCRJob.STATUS_PENDING, OCRJob.STATUS_RUNNING],
+        created_at__lt=cutoff,
+    ).update(status=OCRJob.STATUS_FAILED, error="Analyse interrompue, relance automatique.", finished_at=timezone.now())
+    return (
+        OCRJob.objects.filter(content_hash=digest)
+        .exclude(status=OCRJob.STATUS_FAILED)
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def _start_video_job(media, digest):
+    from .tasks import run_ocr_job, run_ocr_job_task
+
+    job = OCRJob(content_hash=digest, kind=OCRJob.KIND_VIDEO, filename=media.name[:255])
+    extension = os.path.splitext(media.name)[1].lower() or ".mp4"
+    job.media.save(f"{digest}{extension}", media, save=True)
+    try:
+        run_ocr_job_task.delay(job.pk)
+    except Exception:
+        # Sans broker Celery : analyse immediate, comme avant
+        run_ocr_job(job.pk)
+        job.refresh_from_db()
+    return job
+
+
 def _save_whatsapp_contacts(request, numbers, ville, groupe, note, module, consentement, sync_commercial, only_new=False):
     if not consentement:
         return {
@@ -108,6 +157,7 @@ def dashboard(request):
         "campaign_message": "",
         "campaign_detail_url": "",
         "recent_imports": [],
+        "pending_jobs": [],
     }
 
     history_groupe = request.GET.get("history_groupe", "").strip()
@@ -141,21 +191,51 @@ def dashboard(request):
         else:
             extracted_numbers = []
             raw_texts = []
+            pending_jobs = []
             for media in files:
                 if media.content_type not in ALLOWED_CONTENT_TYPES:
                     context["error"] = f"Format refuse pour {media.name}. Utilise PNG, JPG, JPEG, MP4, MOV, WEBM ou AVI."
                     break
                 try:
-                    if media.content_type.startswith("video/"):
-                        result = extract_from_video(media)
-                    else:
-                        result = extract_from_image(media)
+                    # Meme contenu deja analyse : resultat reutilise sans OCR
+                    digest = content_hash(media)
+                    job = _cached_job(digest)
+                    if job is None and media.content_type.startswith("video/"):
+                        job = _start_video_job(media, digest)
+                    if job is not None:
+                        if job.status == OCRJob.STATUS_FAILED:
+                            raise OCRError(job.error)
+                        if job.status != OCRJob.STATUS_DONE:
+                            job.status_token = job_token(job)
+                            pending_jobs.append(job)
+                            continue
+                        extracted_numbers.extend(job.numbers)
+                        raw_texts.append(job.text)
+                        continue
+
+                    result = extract_from_image(media)
+                    OCRJob.objects.create(
+                        content_hash=digest,
+                        kind=OCRJob.KIND_IMAGE,
+                        filename=media.name[:255],
+                        status=OCRJob.STATUS_DONE,
+                        numbers=result.whatsapp_numbers,
+                        text=result.text,
+                        finished_at=timezone.now(),
+                    )
                     extracted_numbers.extend(result.whatsapp_numbers)
                     raw_texts.append(result.text)
                 except OCRError as exc:
                     context["error"] = str(exc)
                     break
 
+            context["pending_jobs"] = pending_jobs
+            if pending_jobs and action != "extract" and not context["error"]:
+                context["error"] = (
+                    "Analyse video en cours : relance l'action une fois terminee, "
+                    "le resultat sera reutilise instantanement."
+                )
+
             if not context["error"]:
                 all_numbers = _dedupe_numbers(extracted_numbers)
                 context["numbers"] = all_numbers
@@ -236,6 +316,22 @@ def dashboard(request):
     return render(request, "phone_ocr_agent/dashboard.html", context)
 
 
+def job_status(request, token):
+    """Progression d'une analyse video : numeros deja trouves, pour l'affichage en direct."""
+    try:
+        pk = signing.loads(token, salt=JOB_TOKEN_SALT, max_age=JOB_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        raise Http404("Analyse introuvable")
+    job = get_object_or_404(OCRJob, pk=pk)
+    return JsonResponse({
+        "status": job.status,
+        "finished": job.is_finished,
+        "frames_done": job.frames_done,
+        "numbers": job.numbers,
+        "error": job.error,
+    })
+
+
 @require_POST
 def export_csv(request):
     numbers = [line.strip() for line in request.POST.get("numbers", "").splitlines() if line.strip()]
@@ -3,92 +3,73 @@ from __future__ import annotations
 from django.core.management.base import BaseCommand
 from django.db.models import Q
 
-from ai_engine.services.tts_service import generate_audio
-from preparation_tests.models import Asset, CourseExercise
+from ai_engine.services.tts_service import TTSBatchResult, synthesize_batch
+from preparation_tests.models import CourseExercise
+from preparation_tests.services.audio_assets import audio_assets_for
 
 
-def _build_asset(rel_audio_path: str, language: str, title: str = "") -> Asset:
-    """
-    Création Asset robuste selon les champs réellement présents.
-    """
-    field_names = {f.name for f in Asset._meta.concrete_fields}
-    kwargs = {}
-
-    if "type" in field_names:
-        kwargs["type"] = "audio"
-    if "locale" in field_names:
-        kwargs["locale"] = language
-    if "title" in field_names and title:
-        kwargs["title"] = title
-
-    asset = Asset.objects.create(**kwargs)
-
-    # Affectation du chemin fichier selon le modèle
-    if "file" in field_names:
-        setattr(asset, "file", rel_audio_path)
-        asset.save(update_fields=["file"])
-    elif "path" in field_names:
-        setattr(asset, "path", rel_audio_path)
-        asset.save(update_fields=["path"])
-    else:
-        # Pas de champ fichier connu
-        asset.save()
-
-    return asset
+def _source_text(ex) -> str:
+    return (getattr(ex, "instruction", None) or "").strip() or (getattr(ex, "question_text", None) or "").strip()
 
 
 class Command(BaseCommand):
-    help = "Génère audio pour les exercices CO et lie chaque audio à CourseExercise.audio"
+    help = "Génère audio pour les exercices CO et lie chaque audio à CourseExercise.audio (par lots)"
 
     def add_arguments(self, parser):
         parser.add_argument("--language", type=str, default="fr")
         parser.add_argument("--limit", type=int, default=0)
         parser.add_argument("--all", action="store_true", help="Traiter tous les exercices, même ceux ayant déjà un audio")
+        parser.add_argument("--batch-size", type=int, default=200, help="Exercices par lot TTS (défaut : 200)")
 
     def handle(self, *args, **options):
         language = (options["language"] or "fr").strip().lower()
         limit = int(options["limit"] or 0)
         process_all = bool(options["all"])
+        batch_size = max(1, int(options["batch_size"] or 200))
 
-        qs = CourseExercise.objects.select_related("lesson", "audio").all()
+        qs = CourseExercise.objects.only("id", "instruction", "question_text", "audio_id").order_by("pk")
         if not process_all:
             qs = qs.filter(Q(audio__isnull=True))
-
         if limit > 0:
             qs = qs[:limit]
 
-        total = 0
-        ok = 0
-        skipped = 0
-        failed = 0
-
-        for ex in qs:
-            total += 1
-            try:
-                source_text = (getattr(ex, "instruction", None) or "").strip()
-                if not source_text:
-                    source_text = (getattr(ex, "question_text", None) or "").strip()
-
-                if not source_text:
-                    skipped += 1
-                    self.stdout.write(self.style.WARNING(f"[skip] ex#{ex.id}: empty text"))
-                    continue
-
-                rel_audio = generate_audio(source_text, language=language)
-
-                title = f"Exercice {ex.id} audio"
-                asset = _build_asset(rel_audio, language=language, title=title)
-
-                ex.audio = asset
-                ex.save(update_fields=["audio"])
-
-                ok += 1
-                self.stdout.write(self.style.SUCCESS(f"[ok] ex#{ex.id} -> {rel_audio}"))
-
-            except Exception as e:
-                failed += 1
-                self.stderr.write(self.style.ERROR(f"[fail] ex#{ex.id}: {e}"))
-
-        self.stdout.write(
-            self.style.SUCCESS(f"Done total={total} ok={ok} skipped={skipped} failed={failed}")
-        )
\ No newline at end of file
+        totals = TTSBatchResult()
+        linked = skipped = 0
+        batch = []
+        for ex in qs.iterator(chunk_size=batch_size):
+            if not _source_text(ex):
+                skipped += 1
+                self.stdout.write(self.style.WARNING(f"[skip] ex#{ex.id}: empty text"))
+                continue
+            batch.append(ex)
+            if len(batch) >= batch_size:
+                linked += self._process(batch, language, totals)
+                batch = []
+        if batch:
+            linked += self._process(batch, language, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done total={totals.requested + skipped} ok={linked} skipped={skipped} failed={len(totals.errors)}"
+        ))
+        self.stdout.write(f"TTS : {totals.summary()}")
+
+    def _process(self, exercises, language, totals) -> int:
+        result = synthesize_batch([(_source_text(ex), language) for ex in exercises])
+        for name in ("requested", "unique", "cached", "generated", "elapsed"):
+            setattr(totals, name, getattr(totals, name) + getattr(result, name))
+        totals.errors.update(result.errors)
+
+        assets = audio_assets_for({path: language for path in result.paths.values()})
+        updated = []
+        for ex in exercises:
+            key = (_source_text(ex), language)
+            path = result.paths.get(key)
+            if not path:
+                self.stderr.write(self.style.ERROR(f"[fail] ex#{ex.id}: {result.errors.get(key, 'TTS error')}"))
+                continue
+            ex.audio = assets[path]
+            updated.append(ex)
+        CourseExercise.objects.bulk_update(updated, ["audio"], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f"[lot] {len(updated)} exercice(s) liés — {result.summary()}"))
+        return len(updated)
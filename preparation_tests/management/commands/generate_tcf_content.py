@@ -461,7 +461,7 @@ class Command(BaseCommand):
                             # Génération audio TTS en français
                             audio_text = exo_data["audio_text"]
                             try:
-                                rel_audio = generate_audio(audio_text, language="fr", output_dir="assets")
+                                rel_audio = generate_audio(audio_text, language="fr")
                                 asset = _build_asset(rel_audio, language="fr", title=f"Audio TCF CO {level} L{lesson_order} Ex{idx+1}")
                             except Exception as tts_err:
                                 self.stdout.write(self.style.WARNING(f"TTS Fail: {tts_err}"))
@@ -0,0 +1,29 @@
+"""
+Assets audio issus du service TTS partagé.
+
+Un fichier TTS (identifié par son contenu) correspond à un seul Asset : les
+Assets existants sont réutilisés et les manquants créés en un bulk_create.
+"""
+from preparation_tests.models import Asset
+
+
+def audio_assets_for(paths_by_lang: dict) -> dict:
+    """
+    paths_by_lang : {chemin relatif: langue}
+    Retourne {chemin relatif: Asset} (kind="audio").
+    """
+    if not paths_by_lang:
+        return {}
+
+    assets = {}
+    for asset in Asset.objects.filter(kind="audio", file__in=list(paths_by_lang)).order_by("pk"):
+        assets.setdefault(asset.file.name, asset)
+
+    missing = [
+        Asset(kind="audio", lang=lang, file=path)
+        for path, lang in paths_by_lang.items()
+        if path not in assets
+    ]
+    for asset in Asset.objects.bulk_create(missing, batch_size=500):
+        assets[asset.file.name] = asset
+    return assets
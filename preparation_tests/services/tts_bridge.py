@@ -1,13 +1,10 @@
-import subprocess
-from pathlib import Path
+"""
+Pont TTS historique : délègue au service partagé ai_engine.services.tts_service
+(pool de synthèse persistant, fichiers dédupliqués par contenu) au lieu de lancer
+un sous-processus ai_env par texte.
+"""
+from ai_engine.services.tts_service import generate_audio as _generate_audio
 
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-AI_PYTHON = BASE_DIR / "ai_env" / "bin" / "python"
-SCRIPT = BASE_DIR / "ai_engine" / "run_tts.py"
 
 def generate_audio(text, lang):
-    result = subprocess.check_output(
-        [str(AI_PYTHON), str(SCRIPT), text, lang],
-        text=True
-    )
-    return result.strip()
+    return _generate_audio(text, language=lang)
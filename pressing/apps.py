@@ -5,3 +5,10 @@ class PressingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pressing"
     verbose_name = "E-Shelle Pressing"
+
+    def ready(self):
+        from core.cache import invalidate_on
+
+        from .views import LANDING_CACHE_TAG
+
+        invalidate_on(LANDING_CACHE_TAG, *self.get_models())
@@ -1,4 +1,5 @@
 """pressing/views.py — E-Shelle Pressing"""
+
 import json
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
@@ -6,9 +7,13 @@ from django.contrib import messages
 from django.db.models import Q, Count, Sum
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
+from core.cache import cached_view
 from .models import (VillePressing, QuartierPressing, CategoriePressing,
                      Pressing, ServicePressing, CommandePressing, AvisPressing)
 
+LANDING_CACHE_TAG = "pressing:landing"
+LANDING_CACHE_TIMEOUT = 60 * 10
+
 
 def _actifs():
     return Pressing.objects.filter(is_active=True, abonnement_actif=True)
@@ -16,6 +21,7 @@ def _actifs():
 
 # ─── Accueil ──────────────────────────────────────────────────────────────────
 
+@cached_view("pressing", timeout=LANDING_CACHE_TIMEOUT, tags=LANDING_CACHE_TAG)
 def accueil(request):
     villes     = VillePressing.objects.filter(active=True)
     categories = CategoriePressing.objects.filter(active=True)
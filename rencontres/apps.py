@@ -8,3 +8,6 @@ class RencontresConfig(AppConfig):
 
     def ready(self):
         import rencontres.signals  # noqa
+        from core.events import enregistrer_instantane
+        from rencontres.utils.notifications import instantane_notifications
+        enregistrer_instantane(instantane_notifications)
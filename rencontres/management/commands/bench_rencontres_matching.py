@@ -0,0 +1,112 @@
+"""
+Benchmark du classement de compatibilité sur des profils synthétiques.
+
+Compare, sans base de données :
+  - le chemin historique : 100 premiers candidats notés en Python puis triés ;
+  - le même score Python appliqué à tout le vivier ;
+  - le moteur vectorisé (MatriceProfils) sur tout le vivier.
+
+Usage :
+  python manage.py bench_rencontres_matching --profils 10000 100000
+"""
+import random
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from rencontres.models import ProfilRencontre
+from rencontres.utils.matching_algo import ENFANTS_COMPAT, NIVEAUX_ETUDE, calculer_score_compatibilite
+from rencontres.utils.moteur_decouverte import CHAMPS, MatriceProfils, _plage_naissance
+
+VILLES = [(3.848, 11.502), (4.051, 9.768), (5.478, 10.417), (48.857, 2.352), (45.501, -73.567), (6.524, 3.379)]
+LANGUES = ['Français', 'Anglais', 'Ewondo', 'Douala', 'Bamiléké', 'Fulfulde', 'Espagnol', 'Allemand']
+INTERETS = ['Voyage', 'Cuisine', 'Sport', 'Musique', 'Lecture', 'Cinéma', 'Danse', 'Mode', 'Tech', 'Foi',
+            'Nature', 'Photo', 'Art', 'Business', 'Jeux', 'Football']
+RELIGIONS = ['', 'chretien', 'musulman', 'aucune', 'autre', 'spirituel']
+ENFANTS = sorted({cle for paire in ENFANTS_COMPAT for cle in paire})
+
+
+def profil_synthetique(rng, profil_id):
+    lat, lon = rng.choice(VILLES)
+    age_min = rng.randint(18, 35)
+    return ProfilRencontre(
+        id=profil_id,
+        est_actif=True,
+        genre=rng.choice(['homme', 'femme']),
+        latitude=None if rng.random() < 0.05 else lat + rng.uniform(-1, 1),
+        longitude=lon + rng.uniform(-1, 1),
+        date_naissance=date(rng.randint(1966, 2006), rng.randint(1, 12), rng.randint(1, 28)),
+        recherche_age_min=age_min,
+        recherche_age_max=age_min + rng.randint(5, 25),
+        recherche_genre=rng.choice(['homme', 'femme']),
+        religion=rng.choice(RELIGIONS),
+        veut_des_enfants=rng.choice(ENFANTS),
+        niveau_etude=rng.choice(NIVEAUX_ETUDE),
+        langues=rng.sample(LANGUES, rng.randint(1, 3)),
+        interets=rng.sample(INTERETS, rng.randint(0, 6)),
+    )
+
+
+def ligne(profil):
+    return {champ: getattr(profil, champ) for champ in CHAMPS}
+
+
+class Command(BaseCommand):
+    help = "Compare le classement historique (100 candidats) et le moteur vectorisé sur des profils synthétiques."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profils', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--requetes', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        for total in options['profils']:
+            self._bench(total, options['requetes'], random.Random(options['seed']))
+
+    def _bench(self, total, requetes, rng):
+        profils = [profil_synthetique(rng, i) for i in range(1, total + 1)]
+        aujourd_hui = date.today()
+
+        debut = time.perf_counter()
+        matrice = MatriceProfils()
+        for profil in profils:
+            matrice.ecrire(ligne(profil), True)
+        construction = time.perf_counter() - debut
+
+        temps = {'historique': 0.0, 'python': 0.0, 'numpy': 0.0}
+        manques = 0
+        for moi in rng.sample(profils, min(requetes, total)):
+            naissance_min, naissance_max = _plage_naissance(moi, aujourd_hui)
+            vivier = [
+                p for p in profils
+                if p.id != moi.id and p.genre == moi.recherche_genre
+                and naissance_min <= p.date_naissance.toordinal() <= naissance_max
+            ]
+
+            debut = time.perf_counter()
+            echantillon = sorted(
+                (calculer_score_compatibilite(moi, p)['score_total'] for p in vivier[:100]), reverse=True
+            )[:20]
+            temps['historique'] += time.perf_counter() - debut
+
+            debut = time.perf_counter()
+            complet = sorted(
+                (calculer_score_compatibilite(moi, p)['score_total'] for p in vivier), reverse=True
+            )[:20]
+            temps['python'] += time.perf_counter() - debut
+
+            debut = time.perf_counter()
+            vectorise = [score for _, score, _ in matrice.classer(moi, 20, {moi.id}, aujourd_hui=aujourd_hui)]
+            temps['numpy'] += time.perf_counter() - debut
+
+            if vectorise != complet:
+                raise AssertionError(f"Classement divergent pour le profil {moi.id}")
+            manques += sum(1 for a, b in zip(echantillon, complet) if a < b)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{total} profils — matrice construite en {construction:.2f}s"))
+        for nom, duree in temps.items():
+            self.stdout.write(f"  {nom:<11} {duree / requetes * 1000:>9.1f} ms/requête")
+        self.stdout.write(
+            f"  top-20 : {manques} rang(s) sur {requetes * 20} moins bien notés avec l'échantillon de 100"
+        )
@@ -0,0 +1,82 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+CHAMPS = [
+    'dernier_message_at', 'dernier_message_apercu', 'dernier_expediteur',
+    'non_lus_profil_1', 'non_lus_profil_2',
+]
+
+
+def remplir_resumes(apps, schema_editor):
+    Conversation = apps.get_model('rencontres', 'Conversation')
+    Message = apps.get_model('rencontres', 'Message')
+
+    derniers = Message.objects.filter(conversation=OuterRef('pk')).order_by('-date_envoi', '-id')
+
+    def non_lus(lecteur):
+        return Coalesce(Subquery(
+            Message.objects.filter(conversation=OuterRef('pk'), est_lu=False)
+            .exclude(expediteur=OuterRef(lecteur))
+            .values('conversation').annotate(n=Count('id')).values('n')
+        ), Value(0))
+
+    conversations = Conversation.objects.annotate(
+        _contenu=Subquery(derniers.values('contenu')[:1]),
+        _date=Subquery(derniers.values('date_envoi')[:1]),
+        _expediteur=Subquery(derniers.values('expediteur')[:1]),
+        _non_lus_1=non_lus('match__profil_1'),
+        _non_lus_2=non_lus('match__profil_2'),
+    )
+    lot = []
+    for conv in conversations.iterator(chunk_size=500):
+        if conv._date is not None:
+            conv.dernier_message_at = conv._date
+            conv.dernier_message_apercu = (conv._contenu or '')[:120]
+            conv.dernier_expediteur_id = conv._expediteur
+        conv.non_lus_profil_1 = conv._non_lus_1
+        conv.non_lus_profil_2 = conv._non_lus_2
+        lot.append(conv)
+        if len(lot) >= 500:
+            Conversation.objects.bulk_update(lot, CHAMPS)
+            lot = []
+    if lot:
+        Conversation.objects.bulk_update(lot, CHAMPS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rencontres', '0005_alter_planpremiumrencontre_nom'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='dernier_expediteur',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='rencontres.profilrencontre'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='dernier_message_apercu',
+            field=models.CharField(blank=True, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='non_lus_profil_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='non_lus_profil_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['-dernier_message_at', '-id'], name='rencontres_conv_inbox_idx'),
+        ),
+        migrations.RunPython(remplir_resumes, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,14 @@
+from collections import namedtuple
+
 from django.db import models
+from django.db.models import F
+
+ApercuMessage = namedtuple('ApercuMessage', 'contenu date_envoi de_moi')
+
+LIBELLES_APERCU = {
+    'image': '📷 Photo',
+    'audio': '🎤 Message vocal',
+}
 
 
 class Conversation(models.Model):
@@ -11,9 +21,23 @@ class Conversation(models.Model):
     dernier_message_at = models.DateTimeField(null=True, blank=True)
     est_archivee = models.BooleanField(default=False)
 
+    # Résumé dénormalisé (boîte de réception sans lire les messages)
+    dernier_message_apercu = models.CharField(max_length=120, blank=True)
+    dernier_expediteur = models.ForeignKey(
+        'rencontres.ProfilRencontre',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+'
+    )
+    non_lus_profil_1 = models.PositiveIntegerField(default=0)
+    non_lus_profil_2 = models.PositiveIntegerField(default=0)
+
     class Meta:
         verbose_name = "Conversation"
         ordering = ['-dernier_message_at']
+        indexes = [
+            models.Index(fields=['-dernier_message_at', '-id'], name='rencontres_conv_inbox_idx'),
+        ]
 
     def get_derniers_messages(self, n=20):
         return self.messages.order_by('-date_envoi')[:n]
@@ -21,8 +45,38 @@ class Conversation(models.Model):
     def get_other_profil(self, profil):
         return self.match.get_other_profil(profil)
 
+    def _champ_non_lus(self, profil_id):
+        return 'non_lus_profil_1' if profil_id == self.match.profil_1_id else 'non_lus_profil_2'
+
     def nb_non_lus(self, profil):
-        return self.messages.filter(est_lu=False).exclude(expediteur=profil).count()
+        return getattr(self, self._champ_non_lus(profil.id))
+
+    def apercu(self, profil):
+        """Dernier message vu par `profil`, sans requête ; None si la conversation est vide."""
+        if self.dernier_message_at is None:
+            return None
+        return ApercuMessage(
+            self.dernier_message_apercu, self.dernier_message_at, self.dernier_expediteur_id == profil.id
+        )
+
+    def enregistrer_message(self, message):
+        """Nouveau message : résumé et compteur non lu du destinataire, en un UPDATE atomique."""
+        destinataire_id = (
+            self.match.profil_2_id if message.expediteur_id == self.match.profil_1_id else self.match.profil_1_id
+        )
+        champ = self._champ_non_lus(destinataire_id)
+        apercu = (message.contenu or LIBELLES_APERCU.get(message.type_message, ''))[:120]
+        Conversation.objects.filter(pk=self.pk).update(
+            dernier_message_at=message.date_envoi,
+            dernier_message_apercu=apercu,
+            dernier_expediteur_id=message.expediteur_id,
+            **{champ: F(champ) + 1},
+        )
+
+    def marquer_lu(self, profil):
+        champ = self._champ_non_lus(profil.id)
+        Conversation.objects.filter(pk=self.pk).update(**{champ: 0})
+        setattr(self, champ, 0)
 
     def __str__(self):
         return f"Conv — {self.match}"
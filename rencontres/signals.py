@@ -1,7 +1,7 @@
 """
 Signaux Django pour l'app rencontres.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 
@@ -18,3 +18,56 @@ def update_profil_premium_status(sender, instance, **kwargs):
     if profil.est_premium != is_premium:
         profil.est_premium = is_premium
         profil.save(update_fields=['est_premium'])
+
+
+# ── Matrice de découverte : mise à jour incrémentale ────────────────────────
+
+@receiver(post_save, sender='rencontres.ProfilRencontre')
+def maj_matrice_profil(sender, instance, **kwargs):
+    from rencontres.utils.moteur_decouverte import profil_modifie
+    profil_modifie(instance)
+
+
+@receiver(post_delete, sender='rencontres.ProfilRencontre')
+def retirer_profil_matrice(sender, instance, **kwargs):
+    from rencontres.utils.moteur_decouverte import profil_supprime
+    profil_supprime(instance.pk)
+
+
+@receiver([post_save, post_delete], sender='rencontres.PhotoProfil')
+def maj_matrice_photos(sender, instance, **kwargs):
+    from rencontres.utils.moteur_decouverte import photos_modifiees
+    photos_modifiees(instance.profil_id)
+
+
+# ── Résumé de conversation (boîte de réception) ─────────────────────────────
+
+@receiver(post_save, sender='rencontres.Message')
+def maj_resume_conversation(sender, instance, created, **kwargs):
+    if created:
+        instance.conversation.enregistrer_message(instance)
+
+
+# ── Compteurs de notifications : mise à jour à l'écriture ───────────────────
+
+@receiver(post_save, sender='rencontres.Message')
+def notifier_nouveau_message(sender, instance, created, **kwargs):
+    if created:
+        from rencontres.utils.notifications import notifier_message
+        notifier_message(instance)
+
+
+@receiver(post_save, sender='rencontres.Like')
+def notifier_nouveau_like(sender, instance, created, **kwargs):
+    if created:
+        from rencontres.utils.notifications import notifier_like
+        notifier_like(instance)
+
+
+@receiver(post_save, sender='rencontres.Match')
+def notifier_match_modifie(sender, instance, created, **kwargs):
+    from rencontres.utils.notifications import invalider_notifications, notifier_match
+    if created:
+        notifier_match(instance)
+    elif not instance.est_actif:
+        invalider_notifications(instance.profil_1, instance.profil_2)
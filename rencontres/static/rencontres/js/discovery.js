@@ -138,7 +138,7 @@ class DiscoveryManager {
     init() {
         this.renderCurrentCard();
         this.bindButtons();
-        this.startNotifPolling();
+        this.startNotifStream();
     }
 
     getCurrentProfil() {
@@ -352,8 +352,24 @@ class DiscoveryManager {
         }
     }
 
+    startNotifStream() {
+        // Compteurs poussés par le serveur (SSE) ; EventSource gère seul la reconnexion
+        if (window.EventSource) {
+            const source = new EventSource('/evenements/');
+            source.addEventListener('notifications', (e) => updateNotifBadges(JSON.parse(e.data)));
+            ['message', 'like', 'match'].forEach((type) => {
+                source.addEventListener(type, (e) => {
+                    const data = JSON.parse(e.data);
+                    if (data.notifications) updateNotifBadges(data.notifications);
+                });
+            });
+            return;
+        }
+        this.startNotifPolling();
+    }
+
     startNotifPolling() {
-        // Vérifier les notifications toutes les 30 secondes
+        // Secours sans EventSource : vérifier les notifications toutes les 30 secondes
         setInterval(async () => {
             try {
                 const resp = await fetch('/rencontres/ajax/notifications/');
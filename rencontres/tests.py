@@ -0,0 +1,324 @@
+import random
+import threading
+from datetime import date, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rencontres.management.commands.bench_rencontres_matching import ligne, profil_synthetique
+from core import events
+from rencontres.models import Conversation, Like, Match, Message, PhotoProfil, ProfilRencontre
+from rencontres.utils import moteur_decouverte
+from rencontres.utils.matching_algo import calculer_score_compatibilite, get_profils_compatibles
+from rencontres.utils.moteur_decouverte import MatriceProfils
+from rencontres.utils.notifications import get_stats_notifications, messages_lus
+from rencontres.views import messaging_views
+
+
+def creer_profil(nom, **champs):
+    user = get_user_model().objects.create_user(username=nom, password=None)
+    valeurs = {
+        'prenom_affiche': nom, 'date_naissance': date(1995, 5, 1), 'genre': 'femme',
+        'pays': 'Cameroun', 'ville': 'Yaoundé', 'nationalite': 'Camerounaise',
+        'situation_matrimoniale': 'celibataire', 'veut_des_enfants': 'non',
+        'niveau_etude': 'primaire', 'latitude': 48.85, 'longitude': 2.35,
+    }
+    valeurs.update(champs)
+    profil = ProfilRencontre.objects.create(user=user, **valeurs)
+    PhotoProfil.objects.create(profil=profil, image='rencontres/photos/x.jpg', est_approuvee=True)
+    return profil
+
+
+class ScoreVectoriseTests(SimpleTestCase):
+    def test_scores_identiques_au_calcul_python(self):
+        rng = random.Random(3)
+        profils = [profil_synthetique(rng, i) for i in range(1, 401)]
+        matrice = MatriceProfils()
+        for profil in profils:
+            matrice.ecrire(ligne(profil), True)
+        rangs = [matrice.index[p.id] for p in profils]
+
+        for moi in profils[:8]:
+            scores, distances = matrice.scores(moi, rangs)
+            attendus = [calculer_score_compatibilite(moi, p) for p in profils]
+            self.assertEqual(list(scores), [r['score_total'] for r in attendus])
+            self.assertEqual([round(d) for d in distances], [r['distance_km'] for r in attendus])
+
+    def test_filtre_par_rayon(self):
+        rng = random.Random(5)
+        profils = [profil_synthetique(rng, i) for i in range(1, 301)]
+        matrice = MatriceProfils()
+        for profil in profils:
+            matrice.ecrire(ligne(profil), True)
+        moi = profils[0]
+        moi.latitude, moi.longitude = 3.848, 11.502
+
+        classement = matrice.classer(moi, limit=300, exclusions={moi.id}, rayon_km=150)
+
+        self.assertTrue(classement)
+        self.assertTrue(all(distance <= 150 for _, _, distance in classement))
+
+
+class ProfilsCompatiblesTests(TestCase):
+    def setUp(self):
+        moteur_decouverte._matrice._reinitialiser()
+        self.addCleanup(moteur_decouverte._matrice._reinitialiser)
+
+    def _profil(self, nom, **champs):
+        return creer_profil(nom, **champs)
+
+    def test_meilleur_profil_trouve_au_dela_des_100_premiers(self):
+        moi = self._profil(
+            'moi', genre='homme', recherche_genre='femme', latitude=3.85, longitude=11.5,
+            religion='chretien', veut_des_enfants='oui', niveau_etude='master',
+            langues=['Français'], interets=['Voyage', 'Cuisine'],
+        )
+        ideal = self._profil(
+            'ideale', latitude=3.86, longitude=11.51, religion='chretien', veut_des_enfants='oui',
+            niveau_etude='master', langues=['Français'], interets=['Voyage', 'Cuisine'],
+        )
+        for numero in range(110):
+            self._profil(f'p{numero}')
+
+        resultats = get_profils_compatibles(moi, limit=5)
+
+        self.assertEqual(resultats[0][0], ideal)
+        self.assertEqual(len(resultats), 5)
+
+    def test_reconstruction_perimee_faite_en_fond(self):
+        moi = self._profil('moi', genre='homme', recherche_genre='femme')
+        autre = self._profil('autre')
+        matrice = moteur_decouverte.get_matrice()
+        perimee = matrice.construite_a - timedelta(seconds=moteur_decouverte.RECONSTRUCTION_TTL + 1)
+        matrice.construite_a = perimee
+
+        neuve = matrice._charger()
+        chargement_libere = threading.Event()
+
+        def charger():
+            chargement_libere.wait(5)
+            return neuve
+
+        with mock.patch.object(matrice, '_charger', side_effect=charger):
+            # Chargement bloqué : la requête n'attend pas et l'ancienne matrice sert
+            self.assertIs(moteur_decouverte.get_matrice(), matrice)
+            self.assertEqual([i for i, _, _ in matrice.classer(moi, exclusions={moi.id})], [autre.id])
+            self.assertEqual(matrice.construite_a, perimee)
+            moteur_decouverte.get_matrice()  # pas de second thread
+            chargement_libere.set()
+            matrice._thread.join(5)
+
+        self.assertEqual(matrice.construite_a, neuve.construite_a)
+        self.assertEqual([i for i, _, _ in matrice.classer(moi, exclusions={moi.id})], [autre.id])
+
+    def test_matrice_suit_les_modifications_de_profil(self):
+        moi = self._profil('moi', genre='homme', recherche_genre='femme')
+        autre = self._profil('autre')
+        exclue = self._profil('exclue')
+        Like.objects.create(envoyeur=moi, recepteur=exclue)
+
+        self.assertEqual([p for p, _, _ in get_profils_compatibles(moi)], [autre])
+
+        nouvelle = self._profil('nouvelle')
+        autre.est_actif = False
+        autre.save()
+
+        self.assertEqual([p for p, _, _ in get_profils_compatibles(moi)], [nouvelle])
+
+
+class FluxEvenementsTests(SimpleTestCase):
+    def setUp(self):
+        for patcher in (
+            mock.patch.object(events, '_broker', events._MemoryBroker()),
+            mock.patch.object(events, '_instantanes', []),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        events.enregistrer_instantane(lambda user: ('notifications', {'total': 3}))
+
+    async def test_instantane_puis_evenements_publies(self):
+        flux = events._flux(SimpleNamespace(pk=7), duree_max=5, keepalive=0.05, retry_ms=3000)
+
+        self.assertEqual(await anext(flux), 'retry: 3000\n\n')
+        self.assertEqual(await anext(flux), 'event: notifications\ndata: {"total":3}\n\n')
+        self.assertEqual(await anext(flux), ': ping\n\n')  # abonné, rien de publié
+
+        events.publier(7, 'match', match_id=12)
+        events.publier(8, 'match', match_id=13)  # autre utilisateur
+        self.assertEqual(await anext(flux), 'event: match\ndata: {"match_id":12}\n\n')
+        self.assertEqual(await anext(flux), ': ping\n\n')
+        await flux.aclose()
+
+    async def test_connexions_base_fermees_avant_l_attente(self):
+        journal = []
+        events.enregistrer_instantane(lambda user: journal.append(('instantane', threading.get_ident())))
+        broker = events.get_broker()
+        abonnement = broker.abonnement
+
+        def abonner(nom):
+            journal.append(('abonnement', None))
+            return abonnement(nom)
+
+        with (
+            mock.patch('django.db.connections.close_all', side_effect=lambda: journal.append(('fermeture', threading.get_ident()))),
+            mock.patch.object(broker, 'abonnement', side_effect=abonner),
+        ):
+            flux = events._flux(SimpleNamespace(pk=7), duree_max=5, keepalive=0.05, retry_ms=3000)
+            for _ in range(3):  # retry, instantané, ping : le flux est en attente d'événements
+                await anext(flux)
+            await flux.aclose()
+
+        # Fermées dans le thread de la requête (celui de l'instantané), avant l'abonnement
+        self.assertEqual([etape for etape, _ in journal], ['instantane', 'fermeture', 'abonnement'])
+        self.assertEqual(journal[0][1], journal[1][1])
+
+    def test_compteurs_non_initialises_ne_sont_pas_crees(self):
+        events.ajuster_compteur(7, 'messages', 1)
+        self.assertIsNone(events.lire_compteurs(7))
+
+        events.initialiser_compteurs(7, {})
+        events.ajuster_compteur(7, 'messages', -2)
+        self.assertEqual(events.lire_compteurs(7), {'messages': 0})
+
+    def test_recalcul_concurrent_n_ecrase_pas_les_increments(self):
+        # Deux lectures recalculent le même agrégat ; un message arrive entre les deux
+        self.assertTrue(events.initialiser_compteurs(7, {'messages': 0}))
+        events.ajuster_compteur(7, 'messages', 1)
+        self.assertFalse(events.initialiser_compteurs(7, {'messages': 0}))
+        self.assertEqual(events.lire_compteurs(7), {'messages': 1})
+
+    def test_ecriture_pendant_le_recalcul_raccourcit_sa_duree(self):
+        broker = events.get_broker()
+        events.ajuster_compteur(7, 'messages', 1)  # compteurs absents : agrégat en cours périmé
+        events.initialiser_compteurs(7, {'messages': 0})
+        expiration = broker._hashes[events._cle_compteurs(7)][0]
+        self.assertLessEqual(expiration - events.time.monotonic(), events.COMPTEURS_TTL_RECALCUL)
+
+        events.invalider_compteurs(8)
+        events.initialiser_compteurs(8, {'messages': 0})
+        self.assertLessEqual(
+            broker._hashes[events._cle_compteurs(8)][0] - events.time.monotonic(), events.COMPTEURS_TTL_RECALCUL,
+        )
+
+        events.initialiser_compteurs(9, {'messages': 0})
+        self.assertGreater(broker._hashes[events._cle_compteurs(9)][0] - events.time.monotonic(), 3600)
+
+
+class CompteursNotificationsTests(TestCase):
+    def setUp(self):
+        moteur_decouverte._matrice._reinitialiser()
+        self.addCleanup(moteur_decouverte._matrice._reinitialiser)
+        patcher = mock.patch.object(events, '_broker', events._MemoryBroker())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.moi = creer_profil('moi', genre='homme')
+        self.autre = creer_profil('autre')
+
+    def test_compteurs_tenus_a_jour_sans_requete(self):
+        self.assertEqual(get_stats_notifications(self.moi)['total'], 0)
+
+        match = Match.objects.create(profil_1=self.moi, profil_2=self.autre)
+        conversation = Conversation.objects.create(match=match)
+        Message.objects.create(conversation=conversation, expediteur=self.autre, contenu='Salut')
+        Message.objects.create(conversation=conversation, expediteur=self.moi, contenu='Bonjour')
+        Like.objects.create(envoyeur=self.autre, recepteur=self.moi)
+
+        with self.assertNumQueries(0):
+            stats = get_stats_notifications(self.moi)
+        self.assertEqual(stats, {'nouveaux_messages': 1, 'nouveaux_matchs': 1, 'nouveaux_likes': 0, 'total': 2})
+
+        messages_lus(self.moi, 1)
+        self.assertEqual(get_stats_notifications(self.moi)['nouveaux_messages'], 0)
+
+    def test_match_desactive_force_le_recalcul(self):
+        match = Match.objects.create(profil_1=self.moi, profil_2=self.autre)
+        conversation = Conversation.objects.create(match=match)
+        Message.objects.create(conversation=conversation, expediteur=self.autre, contenu='Salut')
+        self.assertEqual(get_stats_notifications(self.moi)['nouveaux_messages'], 1)
+
+        match.est_actif = False
+        match.save()
+
+        self.assertIsNone(events.lire_compteurs(self.moi.user_id))
+        self.assertEqual(get_stats_notifications(self.moi)['nouveaux_messages'], 0)
+
+    def test_flux_wsgi_envoie_l_instantane(self):
+        Like.objects.create(envoyeur=self.autre, recepteur=self.moi)
+        self.client.force_login(self.moi.user)
+
+        response = self.client.get('/evenements/')
+        contenu = b''.join(response.streaming_content).decode()
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('retry: 30000', contenu)
+        self.assertIn('event: notifications\ndata: {"nouveaux_messages":0', contenu)
+
+
+class BoiteReceptionTests(TestCase):
+    def setUp(self):
+        moteur_decouverte._matrice._reinitialiser()
+        self.addCleanup(moteur_decouverte._matrice._reinitialiser)
+        patcher = mock.patch.object(events, '_broker', events._MemoryBroker())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.moi = creer_profil('moi', genre='homme')
+        get_stats_notifications(self.moi)  # compteurs initialisés : hors du décompte de requêtes
+        self.client.force_login(self.moi.user)
+
+    def _conversation(self, nom, message=True):
+        autre = creer_profil(nom)
+        conversation = Conversation.objects.create(match=Match.objects.create(profil_1=autre, profil_2=self.moi))
+        if message:
+            Message.objects.create(conversation=conversation, expediteur=autre, contenu=f'Salut de {nom}')
+        return conversation
+
+    def _inbox(self, **params):
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.get(reverse('rencontres:inbox'), params)
+        return response, len(requetes)
+
+    def test_resume_maintenu_a_l_ecriture_et_a_la_lecture(self):
+        conversation = self._conversation('autre')
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.nb_non_lus(self.moi), 1)
+        self.assertEqual(conversation.apercu(self.moi).contenu, 'Salut de autre')
+        self.assertFalse(conversation.apercu(self.moi).de_moi)
+
+        Message.objects.create(conversation=conversation, expediteur=self.moi, type_message='image')
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.apercu(self.moi), ('📷 Photo', conversation.dernier_message_at, True))
+        self.assertEqual(conversation.non_lus_profil_1, 1)
+
+        self.client.get(reverse('rencontres:conversation', args=[conversation.pk]))
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.nb_non_lus(self.moi), 0)
+
+    def test_inbox_en_requetes_constantes(self):
+        for numero in range(3):
+            self._conversation(f'a{numero}')
+        response, avant = self._inbox()
+        self.assertContains(response, 'Salut de a2')
+
+        for numero in range(6):
+            self._conversation(f'b{numero}')
+        _, apres = self._inbox()
+        self.assertEqual(avant, apres)
+
+    def test_pagination_par_curseur(self):
+        attendues = [self._conversation(f'p{numero}').pk for numero in range(5)][::-1]
+        attendues.append(self._conversation('vide', message=False).pk)
+
+        vues, curseur = [], None
+        with mock.patch.object(messaging_views, 'INBOX_PAR_PAGE', 2):
+            while True:
+                response, _ = self._inbox(**({'apres': curseur} if curseur else {}))
+                vues += [item['conv'].pk for item in response.context['conversations']]
+                curseur = response.context['curseur_suivant']
+                if not curseur:
+                    break
+        self.assertEqual(vues, attendues)
@@ -4,6 +4,22 @@ Facteurs : géographie, religion, âge, enfants, langues, intérêts, niveau d'
 """
 import math
 
+# Points "vision des enfants" par couple de réponses (symétrique, 5 par défaut)
+ENFANTS_COMPAT = {
+    ('oui', 'oui'): 15,
+    ('non', 'non'): 15,
+    ('peut_etre', 'peut_etre'): 12,
+    ('oui', 'peut_etre'): 10,
+    ('peut_etre', 'oui'): 10,
+    ('non', 'peut_etre'): 5,
+    ('peut_etre', 'non'): 5,
+    ('deja_assez', 'deja_assez'): 15,
+    ('oui', 'non'): 0,
+    ('non', 'oui'): 0,
+}
+
+NIVEAUX_ETUDE = ['primaire', 'secondaire', 'bac2', 'licence', 'master', 'doctorat']
+
 
 def calculer_distance_km(lat1, lon1, lat2, lon2):
     """Formule de Haversine pour calculer la distance entre deux points GPS."""
@@ -73,20 +89,8 @@ def calculer_score_compatibilite(profil_a, profil_b):
     details['religion'] = {'pts': rel_pts}
 
     # 4. Vision des enfants (15 pts)
-    enfants_compat = {
-        ('oui', 'oui'): 15,
-        ('non', 'non'): 15,
-        ('peut_etre', 'peut_etre'): 12,
-        ('oui', 'peut_etre'): 10,
-        ('peut_etre', 'oui'): 10,
-        ('non', 'peut_etre'): 5,
-        ('peut_etre', 'non'): 5,
-        ('deja_assez', 'deja_assez'): 15,
-        ('oui', 'non'): 0,
-        ('non', 'oui'): 0,
-    }
     key = (profil_a.veut_des_enfants, profil_b.veut_des_enfants)
-    enf_pts = enfants_compat.get(key, enfants_compat.get((key[1], key[0]), 5))
+    enf_pts = ENFANTS_COMPAT.get(key, ENFANTS_COMPAT.get((key[1], key[0]), 5))
     score += enf_pts
     details['enfants'] = {'pts': enf_pts}
 
@@ -107,11 +111,10 @@ def calculer_score_compatibilite(profil_a, profil_b):
     details['interets'] = {'pts': int_pts, 'communs': list(interets_communs)}
 
     # 7. Niveau d'étude (10 pts)
-    niveaux = ['primaire', 'secondaire', 'bac2', 'licence', 'master', 'doctorat']
     try:
         diff_niveau = abs(
-            niveaux.index(profil_a.niveau_etude) -
-            niveaux.index(profil_b.niveau_etude)
+            NIVEAUX_ETUDE.index(profil_a.niveau_etude) -
+            NIVEAUX_ETUDE.index(profil_b.niveau_etude)
         )
         etude_pts = max(0, 10 - diff_niveau * 3)
     except ValueError:
@@ -134,12 +137,17 @@ def calculer_score_compatibilite(profil_a, profil_b):
     }
 
 
-def get_profils_compatibles(profil, limit=20, exclude_ids=None):
+def get_profils_compatibles(profil, limit=20, exclude_ids=None, rayon_km=None):
     """
     Retourne les profils compatibles triés par score décroissant.
     Exclut les profils déjà likés, bloqués ou passés.
+
+    Tout le vivier filtré est noté par le moteur vectorisé (moteur_decouverte) ;
+    seuls les `limit` meilleurs sont chargés depuis la base. `rayon_km` limite
+    optionnellement la recherche autour du profil.
     """
     from rencontres.models import ProfilRencontre, Like, Blocage
+    from rencontres.utils.moteur_decouverte import get_matrice
     from django.db.models import Q
 
     if exclude_ids is None:
@@ -157,33 +165,17 @@ def get_profils_compatibles(profil, limit=20, exclude_ids=None):
 
     exclusions = set(exclude_ids) | set(likes_envoyes) | bloques_ids | {profil.id}
 
-    # Filtrer par critères de base
-    qs = ProfilRencontre.objects.filter(
+    # Petite marge : un profil désactivé ailleurs peut encore figurer dans la matrice
+    classement = get_matrice().classer(profil, limit + 5, exclusions, rayon_km)
+
+    profils = ProfilRencontre.objects.filter(
+        id__in=[profil_id for profil_id, _, _ in classement],
         est_actif=True,
         photos__est_approuvee=True,
-    ).exclude(id__in=exclusions).select_related('user').distinct()
-
-    # Filtrer par genre recherché
-    if profil.recherche_genre:
-        qs = qs.filter(genre=profil.recherche_genre.lower())
-
-    # Filtrer par tranche d'âge recherchée
-    from datetime import date
-    today = date.today()
-
-    # Calculer les dates de naissance correspondant aux âges min/max
-    from datetime import timedelta
-    date_max = today.replace(year=today.year - profil.recherche_age_min)
-    date_min = today.replace(year=today.year - profil.recherche_age_max)
-    qs = qs.filter(date_naissance__gte=date_min, date_naissance__lte=date_max)
-
-    # Calculer les scores et trier
-    profils_scores = []
-    for p in qs[:100]:  # Limiter le calcul à 100 candidats max
-        result = calculer_score_compatibilite(profil, p)
-        profils_scores.append((p, result['score_total'], result['distance_km']))
-
-    # Trier par score décroissant
-    profils_scores.sort(key=lambda x: x[1], reverse=True)
+    ).select_related('user').distinct().in_bulk()
 
-    return profils_scores[:limit]
+    return [
+        (profils[profil_id], score, distance)
+        for profil_id, score, distance in classement
+        if profil_id in profils
+    ][:limit]
@@ -0,0 +1,462 @@
+"""
+Moteur de découverte vectorisé : tout le vivier filtré est noté d'un seul coup.
+
+Chaque processus garde une matrice compacte des profils actifs (une ligne par
+profil, une colonne NumPy par critère). Les scores reproduisent
+calculer_score_compatibilite critère par critère ; seuls les top-k sont ensuite
+chargés depuis la base.
+
+Fraîcheur de la matrice :
+  - signaux post_save / post_delete → la ligne du profil est mise à jour aussitôt ;
+  - derniere_connexion (auto_now) → les profils modifiés par un autre processus
+    sont relus à la requête suivante ;
+  - reconstruction complète toutes les RECONSTRUCTION_TTL secondes (suppressions
+    et photos validées ailleurs), dans un thread de fond : la nouvelle matrice est
+    construite hors verrou puis substituée d'un coup ; l'ancienne sert en attendant.
+"""
+import logging
+import math
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from rencontres.utils.matching_algo import ENFANTS_COMPAT, NIVEAUX_ETUDE
+
+RAYON_TERRE_KM = 6371
+DISTANCE_INCONNUE_KM = 9999
+RECONSTRUCTION_TTL = 600
+INTERVALLE_RAFRAICHISSEMENT = 2.0
+CHEVAUCHEMENT = timedelta(seconds=5)
+CAPACITE_INITIALE = 1024
+
+logger = logging.getLogger(__name__)
+
+CHAMPS = (
+    'id', 'est_actif', 'genre', 'latitude', 'longitude', 'date_naissance',
+    'recherche_age_min', 'recherche_age_max', 'religion', 'veut_des_enfants',
+    'niveau_etude', 'langues', 'interets',
+)
+
+
+class Vocabulaire:
+    """Valeur texte → code entier stable (0 réservé à la valeur vide)."""
+
+    def __init__(self, premier=1):
+        self.codes = {}
+        self.premier = premier
+
+    def code(self, valeur):
+        if not valeur:
+            return 0
+        if valeur not in self.codes:
+            self.codes[valeur] = len(self.codes) + self.premier
+        return self.codes[valeur]
+
+    def __len__(self):
+        return len(self.codes) + self.premier
+
+
+def _bits(vocabulaire, valeurs, mots):
+    """Ensemble de valeurs → bitset sur `mots` entiers de 64 bits."""
+    bitset = [0] * mots
+    for valeur in set(filter(None, valeurs or ())):
+        rang = vocabulaire.code(valeur)
+        bitset[rang // 64] |= 1 << (rang % 64)
+    return bitset
+
+
+def _age(naissance, aujourd_hui):
+    return aujourd_hui.year - naissance.year - (
+        (aujourd_hui.month, aujourd_hui.day) < (naissance.month, naissance.day)
+    )
+
+
+def _plage_naissance(profil, aujourd_hui):
+    """Mêmes bornes que le filtre SQL historique de get_profils_compatibles."""
+    date_max = aujourd_hui.replace(year=aujourd_hui.year - profil.recherche_age_min)
+    date_min = aujourd_hui.replace(year=aujourd_hui.year - profil.recherche_age_max)
+    return date_min.toordinal(), date_max.toordinal()
+
+
+class MatriceProfils:
+    COLONNES = (
+        'ids', 'presents', 'actifs', 'photos', 'genre', 'lat', 'lon', 'cos_lat',
+        'naissance', 'annee', 'mois_jour', 'age_min', 'age_max', 'religion',
+        'enfant', 'etude', 'bits_langues', 'bits_interets',
+    )
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # Tenu pendant toute une construction : une seule à la fois par processus
+        self._construction = threading.Lock()
+        self._thread = None
+        self._reinitialiser()
+
+    def _reinitialiser(self):
+        self.index = {}
+        self.libres = []
+        self.taille = 0
+        self.genres = Vocabulaire()
+        self.religions = Vocabulaire()
+        self.enfants = Vocabulaire()
+        self.langues = Vocabulaire(premier=0)
+        self.interets = Vocabulaire(premier=0)
+        self.table_enfants = None
+        self.construite_a = None
+        self.synchro = None
+        self.verifiee_a = 0.0
+        self._allouer(CAPACITE_INITIALE)
+
+    # ── Stockage ────────────────────────────────────────────────────────────
+
+    def _allouer(self, capacite, mots_langues=1, mots_interets=1):
+        self.capacite = capacite
+        self.ids = np.zeros(capacite, dtype=np.int64)
+        self.presents = np.zeros(capacite, dtype=bool)
+        self.actifs = np.zeros(capacite, dtype=bool)
+        self.photos = np.zeros(capacite, dtype=bool)
+        self.genre = np.zeros(capacite, dtype=np.int16)
+        self.lat = np.full(capacite, np.nan)
+        self.lon = np.full(capacite, np.nan)
+        self.cos_lat = np.full(capacite, np.nan)
+        self.naissance = np.zeros(capacite, dtype=np.int32)
+        self.annee = np.zeros(capacite, dtype=np.int16)
+        self.mois_jour = np.zeros(capacite, dtype=np.int16)
+        self.age_min = np.zeros(capacite, dtype=np.int16)
+        self.age_max = np.zeros(capacite, dtype=np.int16)
+        self.religion = np.zeros(capacite, dtype=np.int16)
+        self.enfant = np.zeros(capacite, dtype=np.int16)
+        self.etude = np.full(capacite, -1, dtype=np.int8)
+        self.bits_langues = np.zeros((capacite, mots_langues), dtype=np.uint64)
+        self.bits_interets = np.zeros((capacite, mots_interets), dtype=np.uint64)
+
+    def _agrandir(self):
+        anciennes = {name: getattr(self, name) for name in self.COLONNES}
+        self._allouer(
+            self.capacite * 2,
+            anciennes['bits_langues'].shape[1],
+            anciennes['bits_interets'].shape[1],
+        )
+        for name, valeurs in anciennes.items():
+            getattr(self, name)[:len(valeurs)] = valeurs
+
+    def _elargir(self, attribut, mots):
+        actuel = getattr(self, attribut)
+        if actuel.shape[1] < mots:
+            elargi = np.zeros((self.capacite, mots), dtype=np.uint64)
+            elargi[:, :actuel.shape[1]] = actuel
+            setattr(self, attribut, elargi)
+
+    def _mots(self, vocabulaire, valeurs, attribut):
+        for valeur in set(filter(None, valeurs or ())):
+            vocabulaire.code(valeur)
+        mots = max(1, math.ceil(len(vocabulaire) / 64))
+        self._elargir(attribut, mots)
+        return mots
+
+    # ── Mise à jour ─────────────────────────────────────────────────────────
+
+    def ecrire(self, ligne, photo_ok):
+        """Insère ou remplace la ligne d'un profil (dict de CHAMPS)."""
+        with self.lock:
+            rang = self.index.get(ligne['id'])
+            if rang is None:
+                if self.libres:
+                    rang = self.libres.pop()
+                else:
+                    if self.taille == self.capacite:
+                        self._agrandir()
+                    rang = self.taille
+                    self.taille += 1
+                self.index[ligne['id']] = rang
+
+            naissance = ligne['date_naissance']
+            latitude, longitude = ligne['latitude'], ligne['longitude']
+            self.ids[rang] = ligne['id']
+            self.presents[rang] = True
+            self.actifs[rang] = bool(ligne['est_actif'])
+            self.photos[rang] = bool(photo_ok)
+            self.genre[rang] = self.genres.code(ligne['genre'])
+            if latitude is None or longitude is None:
+                self.lat[rang] = self.lon[rang] = self.cos_lat[rang] = np.nan
+            else:
+                self.lat[rang] = math.radians(latitude)
+                self.lon[rang] = math.radians(longitude)
+                self.cos_lat[rang] = math.cos(self.lat[rang])
+            self.naissance[rang] = naissance.toordinal()
+            self.annee[rang] = naissance.year
+            self.mois_jour[rang] = naissance.month * 100 + naissance.day
+            self.age_min[rang] = ligne['recherche_age_min']
+            self.age_max[rang] = ligne['recherche_age_max']
+            self.religion[rang] = self.religions.code(ligne['religion'])
+            self.enfant[rang] = self.enfants.code(ligne['veut_des_enfants'])
+            etude = ligne['niveau_etude']
+            self.etude[rang] = NIVEAUX_ETUDE.index(etude) if etude in NIVEAUX_ETUDE else -1
+
+            mots = self._mots(self.langues, ligne['langues'], 'bits_langues')
+            self.bits_langues[rang] = _bits(self.langues, ligne['langues'], mots)
+            mots = self._mots(self.interets, ligne['interets'], 'bits_interets')
+            self.bits_interets[rang] = _bits(self.interets, ligne['interets'], mots)
+
+    def retirer(self, profil_id):
+        with self.lock:
+            rang = self.index.pop(profil_id, None)
+            if rang is not None:
+                self.presents[rang] = False
+                self.libres.append(rang)
+
+    def marquer_photo(self, profil_id, photo_ok):
+        with self.lock:
+            rang = self.index.get(profil_id)
+            if rang is not None:
+                self.photos[rang] = photo_ok
+
+    # ── Synchronisation avec la base ────────────────────────────────────────
+
+    @staticmethod
+    def _requete():
+        from django.db.models import Exists, OuterRef
+        from rencontres.models import PhotoProfil, ProfilRencontre
+
+        photo_ok = Exists(PhotoProfil.objects.filter(profil=OuterRef('pk'), est_approuvee=True))
+        return ProfilRencontre.objects.annotate(photo_ok=photo_ok).values(*CHAMPS, 'photo_ok').order_by()
+
+    def _charger(self):
+        """Nouvelle matrice lue depuis la base, sans toucher à celle-ci (aucun verrou pris)."""
+        from django.utils import timezone
+
+        neuve = MatriceProfils()
+        debut = timezone.now()
+        for ligne in neuve._requete().filter(est_actif=True).iterator(chunk_size=2000):
+            neuve.ecrire(ligne, ligne['photo_ok'])
+        neuve.construite_a = neuve.synchro = debut
+        neuve.verifiee_a = time.monotonic()
+        return neuve
+
+    def _remplacer(self, neuve):
+        # Les profils écrits pendant le chargement ont derniere_connexion >= synchro :
+        # la relecture incrémentale suivante les reprend.
+        etat = {nom: valeur for nom, valeur in vars(neuve).items() if nom not in ('lock', '_construction', '_thread')}
+        with self.lock:
+            self.__dict__.update(etat)
+
+    def construire(self):
+        with self._construction:
+            self._remplacer(self._charger())
+
+    def _reconstruire_en_fond(self):
+        """Lance la reconstruction dans un thread si aucune n'est en cours ; retour immédiat."""
+        if not self._construction.acquire(blocking=False):
+            return
+        self._thread = threading.Thread(target=self._reconstruire, name='rencontres-matrice', daemon=True)
+        self._thread.start()
+
+    def _reconstruire(self):
+        from django.db import connection
+
+        try:
+            self._remplacer(self._charger())
+        except Exception:
+            logger.exception("Reconstruction de la matrice de découverte impossible")
+        finally:
+            connection.close()
+            self._construction.release()
+
+    def rafraichir(self):
+        """Reconstruction si la matrice est périmée, sinon relecture des seuls profils modifiés."""
+        from django.utils import timezone
+
+        if self.construite_a is None:
+            # Premier chargement : rien à servir en attendant
+            with self._construction:
+                if self.construite_a is None:
+                    self._remplacer(self._charger())
+            return
+        maintenant = timezone.now()
+        if maintenant - self.construite_a > timedelta(seconds=RECONSTRUCTION_TTL):
+            self._reconstruire_en_fond()
+        with self.lock:
+            if time.monotonic() - self.verifiee_a < INTERVALLE_RAFRAICHISSEMENT:
+                return
+            modifies = self._requete().filter(derniere_connexion__gte=self.synchro - CHEVAUCHEMENT)
+            for ligne in modifies:
+                self.ecrire(ligne, ligne['photo_ok'])
+            self.synchro = maintenant
+            self.verifiee_a = time.monotonic()
+
+    @property
+    def est_construite(self):
+        return self.construite_a is not None
+
+    # ── Score vectorisé ─────────────────────────────────────────────────────
+
+    def _table_enfants(self):
+        taille = len(self.enfants)
+        if self.table_enfants is None or self.table_enfants.shape[0] != taille:
+            valeurs = {code: valeur for valeur, code in self.enfants.codes.items()}
+            table = np.full((taille, taille), 5, dtype=np.int16)
+            for a in range(taille):
+                for b in range(taille):
+                    cle = (valeurs.get(a, ''), valeurs.get(b, ''))
+                    table[a, b] = ENFANTS_COMPAT.get(cle, ENFANTS_COMPAT.get((cle[1], cle[0]), 5))
+            self.table_enfants = table
+        return self.table_enfants
+
+    def _bitset_requete(self, vocabulaire, valeurs, attribut):
+        mots = getattr(self, attribut).shape[1]
+        connus = [v for v in set(valeurs or ()) if v in vocabulaire.codes]
+        return np.array(_bits(vocabulaire, connus, mots), dtype=np.uint64)
+
+    def candidats(self, profil, exclusions=(), rayon_km=None, aujourd_hui=None):
+        """Rangs des profils du vivier filtré (genre, âge, exclusions, boîte géographique)."""
+        aujourd_hui = aujourd_hui or date.today()
+        n = self.taille
+        masque = self.presents[:n] & self.actifs[:n] & self.photos[:n]
+
+        if profil.recherche_genre:
+            code = self.genres.codes.get(profil.recherche_genre.lower())
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            masque &= self.genre[:n] == code
+
+        naissance_min, naissance_max = _plage_naissance(profil, aujourd_hui)
+        masque &= (self.naissance[:n] >= naissance_min) & (self.naissance[:n] <= naissance_max)
+
+        exclus = [self.index[i] for i in exclusions if i in self.index]
+        if exclus:
+            masque[exclus] = False
+
+        if rayon_km and profil.latitude is not None and profil.longitude is not None:
+            # Boîte englobante : élimine l'essentiel du vivier avant tout calcul trigonométrique
+            lat0, lon0 = math.radians(profil.latitude), math.radians(profil.longitude)
+            dlat = rayon_km / RAYON_TERRE_KM
+            dlon = dlat / max(math.cos(lat0), 1e-6)
+            masque &= np.abs(self.lat[:n] - lat0) <= dlat
+            if dlon < math.pi:
+                ecart = np.abs((self.lon[:n] - lon0 + math.pi) % (2 * math.pi) - math.pi)
+                masque &= ecart <= dlon
+        return np.flatnonzero(masque)
+
+    def scores(self, profil, rangs, aujourd_hui=None):
+        """(scores sur 100, distances en km) des rangs donnés face à `profil`."""
+        aujourd_hui = aujourd_hui or date.today()
+
+        # 1. Géographie (20 pts)
+        if profil.latitude is None or profil.longitude is None:
+            distance = np.full(len(rangs), float(DISTANCE_INCONNUE_KM))
+        else:
+            lat0, lon0 = math.radians(profil.latitude), math.radians(profil.longitude)
+            lat, lon = self.lat[rangs], self.lon[rangs]
+            a = np.sin((lat - lat0) / 2) ** 2 + math.cos(lat0) * self.cos_lat[rangs] * np.sin((lon - lon0) / 2) ** 2
+            distance = RAYON_TERRE_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+            distance = np.where(np.isnan(distance), DISTANCE_INCONNUE_KM, distance)
+        score = np.select(
+            [distance <= 50, distance <= 200, distance <= 1000, distance <= 5000],
+            [20, 15, 10, 7],
+            default=4,
+        ).astype(np.int16)
+
+        # 2. Âge (15 pts)
+        age_a = _age(profil.date_naissance, aujourd_hui)
+        mois_jour = aujourd_hui.month * 100 + aujourd_hui.day
+        age_b = aujourd_hui.year - self.annee[rangs] - (mois_jour < self.mois_jour[rangs])
+        in_range_a = (profil.recherche_age_min <= age_b) & (age_b <= profil.recherche_age_max)
+        in_range_b = (self.age_min[rangs] <= age_a) & (age_a <= self.age_max[rangs])
+        score += np.where(in_range_a & in_range_b, 15, np.where(in_range_a | in_range_b, 8, 0)).astype(np.int16)
+
+        # 3. Religion (15 pts)
+        religion = self.religion[rangs]
+        if profil.religion:
+            code = self.religions.codes.get(profil.religion, -1)
+            if profil.religion == 'aucune':
+                autre = 7
+            else:
+                autre = np.where(religion == self.religions.codes.get('aucune', -1), 7, 3)
+            score += np.where(religion == 0, 8, np.where(religion == code, 15, autre)).astype(np.int16)
+        else:
+            score += 8
+
+        # 4. Enfants (15 pts)
+        table = self._table_enfants()
+        code = self.enfants.codes.get(profil.veut_des_enfants)
+        if code is None:
+            ligne = np.array([
+                ENFANTS_COMPAT.get((profil.veut_des_enfants, v), ENFANTS_COMPAT.get((v, profil.veut_des_enfants), 5))
+                for v in [''] + list(self.enfants.codes)
+            ], dtype=np.int16)
+        else:
+            ligne = table[code]
+        score += ligne[self.enfant[rangs]]
+
+        # 5. Langues (10 pts) et 6. intérêts (15 pts) : popcount des bitsets
+        langues = self._bitset_requete(self.langues, profil.langues, 'bits_langues')
+        communes = np.bitwise_count(self.bits_langues[rangs] & langues).sum(axis=1)
+        score += np.minimum(10, communes * 5).astype(np.int16)
+        interets = self._bitset_requete(self.interets, profil.interets, 'bits_interets')
+        communs = np.bitwise_count(self.bits_interets[rangs] & interets).sum(axis=1)
+        score += np.minimum(15, communs * 3).astype(np.int16)
+
+        # 7. Niveau d'étude (10 pts)
+        etude = self.etude[rangs].astype(np.int16)
+        if profil.niveau_etude in NIVEAUX_ETUDE:
+            ecart = np.abs(etude - NIVEAUX_ETUDE.index(profil.niveau_etude))
+            score += np.where(etude < 0, 5, np.maximum(0, 10 - ecart * 3)).astype(np.int16)
+        else:
+            score += 5
+
+        return np.minimum(score, 100), distance
+
+    def classer(self, profil, limit=20, exclusions=(), rayon_km=None, aujourd_hui=None):
+        """Top-`limit` [(id, score, distance_km)] du vivier entier, score décroissant."""
+        with self.lock:
+            rangs = self.candidats(profil, exclusions, rayon_km, aujourd_hui)
+            if not len(rangs):
+                return []
+            score, distance = self.scores(profil, rangs, aujourd_hui)
+            if rayon_km and profil.latitude is not None and profil.longitude is not None:
+                dans_rayon = distance <= rayon_km
+                rangs, score, distance = rangs[dans_rayon], score[dans_rayon], distance[dans_rayon]
+            if len(rangs) > limit:
+                top = np.argpartition(-score, limit - 1)[:limit]
+            else:
+                top = np.arange(len(rangs))
+            top = top[np.argsort(-score[top], kind='stable')]
+            return [
+                (int(self.ids[rangs[i]]), int(score[i]), round(float(distance[i])))
+                for i in top
+            ]
+
+
+_matrice = MatriceProfils()
+
+
+def get_matrice():
+    _matrice.rafraichir()
+    return _matrice
+
+
+def profil_modifie(profil):
+    """Signal post_save : met à jour la ligne si la matrice est déjà construite dans ce processus."""
+    if not _matrice.est_construite:
+        return
+    if not profil.est_actif:
+        _matrice.retirer(profil.pk)
+        return
+    ligne = {champ: getattr(profil, champ) for champ in CHAMPS}
+    _matrice.ecrire(ligne, profil.photos.filter(est_approuvee=True).exists())
+
+
+def profil_supprime(profil_id):
+    if _matrice.est_construite:
+        _matrice.retirer(profil_id)
+
+
+def photos_modifiees(profil_id):
+    if _matrice.est_construite:
+        from rencontres.models import PhotoProfil
+
+        _matrice.marquer_photo(
+            profil_id, PhotoProfil.objects.filter(profil_id=profil_id, est_approuvee=True).exists()
+        )
@@ -1,14 +1,28 @@
 """
 Utilitaires de notifications pour l'app rencontres.
-Utilise le polling AJAX (sans Django Channels).
+
+Les compteurs non lus (messages, likes, matchs des dernières 24h) sont tenus dans
+core.events et mis à jour à l'écriture (signaux, vues qui marquent comme lu) ;
+chaque changement est poussé au navigateur par le flux SSE /evenements/.
+La base n'est interrogée que si les compteurs d'un utilisateur sont absents.
 """
 from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 
+from core.events import (
+    ajuster_compteur, definir_compteur, initialiser_compteurs, invalider_compteurs,
+    lire_compteurs, publier,
+)
 
-def get_stats_notifications(profil):
-    """Retourne les compteurs de notifications pour le polling AJAX."""
+CHAMP_MESSAGES = 'rencontres_messages'
+CHAMP_LIKES = 'rencontres_likes'
+PREFIXE_MATCH = 'rencontres_match:'
+FENETRE_MATCHS = timedelta(hours=24)
+
+
+def _compteurs_depuis_base(profil):
+    """Recalcul complet (compteurs absents ou invalidés)."""
     from rencontres.models import Message, Match, Like
 
     nouveaux_messages = Message.objects.filter(
@@ -16,17 +30,28 @@ def get_stats_notifications(profil):
         est_lu=False
     ).exclude(expediteur=profil).count()
 
-    nouveaux_matchs = Match.objects.filter(
+    matchs_recents = Match.objects.filter(
         Q(profil_1=profil) | Q(profil_2=profil),
-        date_match__gte=timezone.now() - timedelta(hours=24)
-    ).count()
+        date_match__gte=timezone.now() - FENETRE_MATCHS
+    ).values_list('id', 'date_match')
+
+    likes_non_lus = Like.objects.filter(recepteur=profil, est_lu=False).count()
+
+    valeurs = {CHAMP_MESSAGES: nouveaux_messages, CHAMP_LIKES: likes_non_lus}
+    for match_id, date_match in matchs_recents:
+        valeurs[f'{PREFIXE_MATCH}{match_id}'] = int(date_match.timestamp())
+    return valeurs
 
-    nouveaux_likes = 0
-    if profil.est_premium:
-        nouveaux_likes = Like.objects.filter(
-            recepteur=profil, est_lu=False
-        ).count()
 
+def _formater(valeurs, est_premium):
+    seuil = (timezone.now() - FENETRE_MATCHS).timestamp()
+    nouveaux_messages = valeurs.get(CHAMP_MESSAGES, 0)
+    nouveaux_matchs = sum(
+        1 for champ, horodatage in valeurs.items()
+        if champ.startswith(PREFIXE_MATCH) and horodatage >= seuil
+    )
+    # Le nombre de likes reçus n'est révélé qu'aux membres premium
+    nouveaux_likes = valeurs.get(CHAMP_LIKES, 0) if est_premium else 0
     return {
         'nouveaux_messages': nouveaux_messages,
         'nouveaux_matchs': nouveaux_matchs,
@@ -35,6 +60,81 @@ def get_stats_notifications(profil):
     }
 
 
+def get_stats_notifications(profil):
+    """Retourne les compteurs de notifications (badges, instantané SSE, polling de secours)."""
+    valeurs = lire_compteurs(profil.user_id)
+    if valeurs is None:
+        valeurs = _compteurs_depuis_base(profil)
+        if not initialiser_compteurs(profil.user_id, valeurs):
+            # Posés entre-temps (autre requête, déjà mis à jour) : ils font foi
+            valeurs = lire_compteurs(profil.user_id) or valeurs
+    return _formater(valeurs, profil.est_premium)
+
+
+def instantane_notifications(user):
+    """État initial envoyé à l'ouverture du flux SSE (aucun agrégat si les compteurs existent)."""
+    from rencontres.models import ProfilRencontre
+
+    profil = ProfilRencontre.objects.filter(user=user).only('id', 'user_id', 'est_premium').first()
+    if profil is None:
+        return None
+    return 'notifications', get_stats_notifications(profil)
+
+
+def _pousser(user_id, est_premium, type_evenement, **data):
+    valeurs = lire_compteurs(user_id)
+    if valeurs is not None:
+        data['notifications'] = _formater(valeurs, est_premium)
+    publier(user_id, type_evenement, **data)
+
+
+# ── Mises à jour à l'écriture ────────────────────────────────────────────────
+
+def notifier_message(message):
+    """Nouveau message : +1 non lu chez le destinataire."""
+    from rencontres.models import Conversation
+
+    participants = Conversation.objects.filter(pk=message.conversation_id).values_list(
+        'match__profil_1_id', 'match__profil_1__user_id', 'match__profil_1__est_premium',
+        'match__profil_2_id', 'match__profil_2__user_id', 'match__profil_2__est_premium',
+    ).first()
+    if not participants:
+        return
+    for profil_id, user_id, est_premium in (participants[:3], participants[3:]):
+        if profil_id != message.expediteur_id:
+            ajuster_compteur(user_id, CHAMP_MESSAGES, 1)
+            _pousser(user_id, est_premium, 'message', conversation_id=message.conversation_id)
+
+
+def notifier_like(like):
+    recepteur = like.recepteur
+    ajuster_compteur(recepteur.user_id, CHAMP_LIKES, 1)
+    _pousser(recepteur.user_id, recepteur.est_premium, 'like')
+
+
+def notifier_match(match):
+    horodatage = int((match.date_match or timezone.now()).timestamp())
+    for profil in (match.profil_1, match.profil_2):
+        definir_compteur(profil.user_id, f'{PREFIXE_MATCH}{match.pk}', horodatage)
+        _pousser(profil.user_id, profil.est_premium, 'match', match_id=match.pk)
+
+
+def invalider_notifications(*profils):
+    """Match désactivé, blocage… : recalcul depuis la base à la prochaine lecture."""
+    invalider_compteurs(*(profil.user_id for profil in profils))
+
+
+def messages_lus(profil, nombre):
+    if nombre:
+        ajuster_compteur(profil.user_id, CHAMP_MESSAGES, -nombre)
+        _pousser(profil.user_id, profil.est_premium, 'notifications')
+
+
+def likes_lus(profil):
+    definir_compteur(profil.user_id, CHAMP_LIKES, 0)
+    _pousser(profil.user_id, profil.est_premium, 'notifications')
+
+
 def verifier_limite_likes(profil, type_like='like'):
     """
     Vérifie si le profil peut encore liker aujourd'hui.
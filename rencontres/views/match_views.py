@@ -3,7 +3,7 @@ from django.http import JsonResponse
 from django.db.models import Q
 
 from rencontres.models import Match, Like
-from rencontres.utils.notifications import get_stats_notifications
+from rencontres.utils.notifications import get_stats_notifications, likes_lus
 from rencontres.views.profile_views import profil_requis
 
 
@@ -28,7 +28,7 @@ def liste_matchs(request):
         nb_non_lus = 0
         if hasattr(m, 'conversation'):
             conv = m.conversation
-            dernier_msg = conv.messages.order_by('-date_envoi').first()
+            dernier_msg = conv.apercu(profil)
             nb_non_lus = conv.nb_non_lus(profil)
 
         matchs_avec_info.append({
@@ -94,6 +94,7 @@ def qui_maime(request):
         ).select_related('envoyeur').order_by('-date_like')
         # Marquer comme lus
         likes_recus.filter(est_lu=False).update(est_lu=True)
+        likes_lus(profil)
     else:
         # Juste le nombre, pas les détails
         likes_recus = None
@@ -4,47 +4,73 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
 
 from rencontres.models import Conversation, Message, Match
 from rencontres.utils.notifications import (
-    get_stats_notifications, verifier_limite_messages, verifier_spam
+    get_stats_notifications, messages_lus, verifier_limite_messages, verifier_spam
 )
 from rencontres.views.profile_views import profil_requis
 
 
+INBOX_PAR_PAGE = 30
+
+
+def _curseur_inbox(conv):
+    date = conv.dernier_message_at.isoformat() if conv.dernier_message_at else ''
+    return f"{date}~{conv.pk}"
+
+
+def _apres_curseur(conversations, curseur):
+    """Keyset sur (dernier_message_at DESC NULLS LAST, id DESC) : pas d'OFFSET."""
+    date_txt, _, pk = (curseur or '').rpartition('~')
+    if not pk.isdigit():
+        return conversations
+    if not date_txt:
+        return conversations.filter(dernier_message_at__isnull=True, pk__lt=int(pk))
+    date = parse_datetime(date_txt)
+    if date is None:
+        return conversations
+    return conversations.filter(
+        Q(dernier_message_at__lt=date)
+        | Q(dernier_message_at=date, pk__lt=int(pk))
+        | Q(dernier_message_at__isnull=True)
+    )
+
+
 @profil_requis
 def inbox(request):
-    """Boîte de réception des messages."""
+    """Boîte de réception : une requête par page, rendue depuis les résumés dénormalisés."""
     profil = request.user.profil_rencontre
     notifs = get_stats_notifications(profil)
 
     conversations = Conversation.objects.filter(
-        match__in=Match.objects.filter(
-            Q(profil_1=profil) | Q(profil_2=profil),
-            est_actif=True
-        ),
+        Q(match__profil_1=profil) | Q(match__profil_2=profil),
+        match__est_actif=True,
         est_archivee=False
     ).select_related(
         'match__profil_1', 'match__profil_2'
-    ).prefetch_related('messages').order_by('-dernier_message_at')
+    ).order_by(F('dernier_message_at').desc(nulls_last=True), '-pk')
+
+    page = list(_apres_curseur(conversations, request.GET.get('apres'))[:INBOX_PAR_PAGE + 1])
+    curseur_suivant = _curseur_inbox(page[INBOX_PAR_PAGE - 1]) if len(page) > INBOX_PAR_PAGE else None
 
-    convs_avec_info = []
-    for conv in conversations:
-        autre = conv.get_other_profil(profil)
-        dernier = conv.messages.order_by('-date_envoi').first()
-        convs_avec_info.append({
+    convs_avec_info = [
+        {
             'conv': conv,
-            'autre': autre,
-            'dernier_message': dernier,
+            'autre': conv.get_other_profil(profil),
+            'dernier_message': conv.apercu(profil),
             'nb_non_lus': conv.nb_non_lus(profil),
-        })
+        }
+        for conv in page[:INBOX_PAR_PAGE]
+    ]
 
     # Matchs récents pour la barre horizontale
     matchs_recents = Match.objects.filter(
         Q(profil_1=profil) | Q(profil_2=profil),
         est_actif=True
-    ).select_related('profil_1', 'profil_2').order_by('-date_match')[:10]
+    ).select_related('profil_1', 'profil_2', 'conversation').order_by('-date_match')[:10]
 
     matchs_info = [
         {'profil': m.get_other_profil(profil), 'match': m}
@@ -54,6 +80,7 @@ def inbox(request):
     return render(request, 'rencontres/messages/inbox.html', {
         'profil': profil,
         'conversations': convs_avec_info,
+        'curseur_suivant': curseur_suivant,
         'matchs_recents': matchs_info,
         'notifs': notifs,
     })
@@ -75,13 +102,15 @@ def conversation(request, conversation_id):
     notifs = get_stats_notifications(profil)
 
     # Marquer les messages comme lus
-    Message.objects.filter(
+    lus = Message.objects.filter(
         conversation=conv,
         est_lu=False
     ).exclude(expediteur=profil).update(
         est_lu=True,
         date_lecture=timezone.now()
     )
+    conv.marquer_lu(profil)
+    messages_lus(profil, lus)
 
     messages_list = conv.messages.filter(
         est_supprime_expediteur=False,
@@ -178,10 +207,6 @@ def ajax_envoyer_message(request):
         type_message='texte'
     )
 
-    # Mettre à jour le timestamp de la conversation
-    conv.dernier_message_at = msg.date_envoi
-    conv.save(update_fields=['dernier_message_at'])
-
     return JsonResponse({
         'success': True,
         'message': {
@@ -213,12 +238,14 @@ def ajax_marquer_lu(request, conv_id):
     ).exclude(expediteur=profil).update(
         est_lu=True, date_lecture=timezone.now()
     )
+    conv.marquer_lu(profil)
+    messages_lus(profil, updated)
     return JsonResponse({'success': True, 'marqués': updated})
 
 
 @login_required
 def ajax_check_notifications(request):
-    """Polling AJAX pour vérifier les nouvelles notifications."""
+    """Lecture ponctuelle des compteurs (secours si EventSource indisponible)."""
     if not hasattr(request.user, 'profil_rencontre'):
         return JsonResponse({'total': 0})
 
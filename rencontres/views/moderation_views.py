@@ -28,6 +28,8 @@ def bloquer_profil(request, profil_id):
             Q(profil_1=mon_profil, profil_2=profil_a_bloquer) |
             Q(profil_1=profil_a_bloquer, profil_2=mon_profil)
         ).update(est_actif=False)
+        from rencontres.utils.notifications import invalider_notifications
+        invalider_notifications(mon_profil, profil_a_bloquer)
 
         messages.success(request, f"{profil_a_bloquer.prenom_affiche} a été bloqué(e).")
         return redirect('rencontres:decouverte')
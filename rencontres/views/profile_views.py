@@ -49,7 +49,7 @@ def accueil_rencontre(request):
     matchs = Match.objects.filter(
         Q(profil_1=profil) | Q(profil_2=profil),
         est_actif=True
-    ).select_related('profil_1', 'profil_2').order_by('-date_match')[:6]
+    ).select_related('profil_1', 'profil_2', 'conversation').order_by('-date_match')[:6]
 
     matchs_recents = []
     for match in matchs:
@@ -58,7 +58,7 @@ def accueil_rencontre(request):
         dernier_message = None
         nb_non_lus = 0
         if conversation:
-            dernier_message = conversation.messages.order_by('-date_envoi').first()
+            dernier_message = conversation.apercu(profil)
             nb_non_lus = conversation.nb_non_lus(profil)
         matchs_recents.append({
             'match': match,
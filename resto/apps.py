@@ -8,3 +8,9 @@ class RestoConfig(AppConfig):
 
     def ready(self):
         import resto.signals  # noqa
+        from core.cache import invalidate_on
+
+        from .models import Dish, Restaurant, Subscription
+        from .views import HOME_SAMPLING_TAG
+
+        invalidate_on(HOME_SAMPLING_TAG, Restaurant, Dish, Subscription)
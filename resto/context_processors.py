@@ -1,25 +1,47 @@
 """
 E-Shelle Resto — Context Processors
 Injects cities and food categories globally into all resto templates.
+
+Values are lazy: a page that does not display them runs no query. Cities and
+categories live in a versioned shared cache (bumped by resto.signals); the
+owner's unread count is cached per user for a short TTL.
 """
+from core.context_cache import lazy, per_user, shared
+
 from .models import City, FoodCategory, Notification, Restaurant
 
+CITIES_CACHE = "resto:cities"
+CATEGORIES_CACHE = "resto:categories"
+UNREAD_CACHE = "resto:unread_notifications"
+
+
+def _active_cities():
+    return list(City.objects.filter(is_active=True).order_by("name"))
+
+
+def _categories():
+    return list(FoodCategory.objects.all().order_by("order", "name"))
+
+
+def _unread_notifications_count(user):
+    restaurant = Restaurant.objects.filter(owner=user, is_active=True).order_by("name").first()
+    if not restaurant:
+        return 0
+    return Notification.objects.filter(restaurant=restaurant, is_read=False).count()
+
 
 def resto_globals(request):
     """Inject global resto data into all templates."""
     ctx = {
-        "resto_cities": City.objects.filter(is_active=True).order_by("name"),
-        "resto_categories": FoodCategory.objects.all().order_by("order", "name"),
+        "resto_cities": lazy(lambda: shared(CITIES_CACHE, _active_cities)),
+        "resto_categories": lazy(lambda: shared(CATEGORIES_CACHE, _categories)),
     }
 
     # Unread notification count for logged-in restaurant owners (used in dashboard sidebar)
     if request.user.is_authenticated:
-        restaurant = Restaurant.objects.filter(owner=request.user, is_active=True).order_by("name").first()
-        if restaurant:
-            ctx["unread_notifications_count"] = Notification.objects.filter(
-                restaurant=restaurant, is_read=False
-            ).count()
-        else:
-            ctx["unread_notifications_count"] = 0
+        user = request.user
+        ctx["unread_notifications_count"] = lazy(
+            lambda: per_user(user.pk, UNREAD_CACHE, lambda: _unread_notifications_count(user))
+        )
 
     return ctx
@@ -0,0 +1,103 @@
+"""
+E-Shelle Resto — Benchmark des tirages aléatoires de la page d'accueil.
+
+Compare ORDER BY RANDOM() (ancien HomeView) et core.sampling (ids en cache + in_bulk).
+Avec --synthetic N, N restaurants et 10×N plats sont créés dans une transaction
+annulée en fin de commande (la base n'est pas modifiée).
+
+Usage:
+    python manage.py bench_resto_home
+    python manage.py bench_resto_home --synthetic 5000 --iterations 50
+"""
+import random
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.cache import invalidate
+from resto.models import City, Dish, Restaurant, Subscription
+from resto.views import AFFORDABLE_DISHES_POOL, HOME_SAMPLING_TAG, OPEN_NOW_POOL, POPULAR_DISHES_POOL
+
+
+def _random_home():
+    approved = Restaurant.objects.filter(is_approved=True, is_active=True).select_related("city", "neighborhood")
+    dishes = Dish.objects.filter(
+        is_active=True, restaurant__is_approved=True, restaurant__is_active=True,
+    ).select_related("restaurant", "restaurant__city")
+    list(approved.filter(status="open").prefetch_related("categories").order_by("?")[:6])
+    list(dishes.filter(is_popular=True).order_by("?")[:8])
+    list(dishes.filter(price__lte=1500).order_by("?")[:6])
+
+
+def _sampled_home():
+    OPEN_NOW_POOL.sample(6)
+    POPULAR_DISHES_POOL.sample(8)
+    AFFORDABLE_DISHES_POOL.sample(6)
+
+
+class Command(BaseCommand):
+    help = "Compare ORDER BY RANDOM() et les viviers échantillonnés de la page d'accueil Resto."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--synthetic", type=int, default=0, help="Restaurants synthétiques (transaction annulée)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["synthetic"]:
+                self._seed(options["synthetic"])
+            self._bench(options["iterations"])
+            transaction.set_rollback(True)
+        # bulk_create n'envoie pas de signaux : viviers reconstruits explicitement
+        invalidate(HOME_SAMPLING_TAG)
+
+    def _seed(self, total):
+        rng = random.Random(7)
+        owner = get_user_model().objects.create_user(username="bench_resto_owner", password=None)
+        city = City.objects.create(name="Bench City", slug="bench-city")
+        restaurants = Restaurant.objects.bulk_create([
+            Restaurant(
+                owner=owner, name=f"Bench {i}", slug=f"bench-{i}", city=city, address="-",
+                phone="+237600000000", whatsapp="+237600000000",
+                status=rng.choice(["open", "closed"]), opening_time=dtime(8), closing_time=dtime(22),
+                is_approved=True, is_featured=rng.random() < 0.05,
+            )
+            for i in range(total)
+        ], batch_size=1000)
+        Subscription.objects.bulk_create([
+            Subscription(restaurant=r, plan=rng.choice(["free_trial", "basic", "premium"]),
+                         expiry_date=date.today() + timedelta(days=30))
+            for r in restaurants
+        ], batch_size=1000)
+        Dish.objects.bulk_create([
+            Dish(restaurant=r, name=f"Plat {j}", price=rng.choice([500, 1000, 1500, 2500, 5000]),
+                 is_popular=rng.random() < 0.2)
+            for r in restaurants for j in range(10)
+        ], batch_size=2000)
+
+    def _bench(self, iterations):
+        counts = (
+            Restaurant.objects.filter(is_approved=True, is_active=True).count(),
+            Dish.objects.filter(is_active=True).count(),
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{counts[0]} restaurants, {counts[1]} plats"))
+
+        invalidate(HOME_SAMPLING_TAG)
+        start = time.perf_counter()
+        for pool in (OPEN_NOW_POOL, POPULAR_DISHES_POOL, AFFORDABLE_DISHES_POOL):
+            pool.pool()
+        build = time.perf_counter() - start
+
+        timings = {}
+        for label, run in (("order_by('?')", _random_home), ("sampling", _sampled_home)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                run()
+            timings[label] = (time.perf_counter() - start) / iterations * 1000
+
+        self.stdout.write(f"  construction des viviers : {build * 1000:.1f} ms (une fois par invalidation)")
+        for label, ms in timings.items():
+            self.stdout.write(f"  {label:<14} {ms:>8.2f} ms/page")
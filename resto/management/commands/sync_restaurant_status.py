@@ -0,0 +1,21 @@
+"""
+E-Shelle Resto — Aligne le statut ouvert/fermé des restaurants sur leurs horaires.
+
+Usage:
+    python manage.py sync_restaurant_status          # bornes passées depuis le dernier passage
+    python manage.py sync_restaurant_status --all    # réconciliation complète (déploiement)
+"""
+from django.core.management.base import BaseCommand
+
+from resto.tasks import reconcile_opening_status, sync_opening_status
+
+
+class Command(BaseCommand):
+    help = "Bascule le statut des restaurants aux heures d'ouverture et de fermeture."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Réconcilier tous les restaurants")
+
+    def handle(self, *args, **options):
+        result = reconcile_opening_status() if options["all"] else sync_opening_status()
+        self.stdout.write(self.style.SUCCESS(f"{result['opened']} ouvert(s), {result['closed']} fermé(s)"))
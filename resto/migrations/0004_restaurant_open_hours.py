@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-17 22:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resto', '0003_notification_review'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='overnight',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('opening_time__gt', models.F('closing_time'))), output_field=models.BooleanField(), verbose_name='Ouvert après minuit'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['overnight', 'opening_time', 'closing_time'], name='resto_open_hours_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['opening_time'], name='resto_opening_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=models.Index(fields=['closing_time'], name='resto_closing_time_idx'),
+        ),
+    ]
@@ -82,6 +82,37 @@ class FoodCategory(models.Model):
 # Restaurant
 # ──────────────────────────────────────────────────────────────────────────────
 
+def open_at_q(at, prefix=""):
+    """
+    Condition SQL « ouvert à l'heure `at` » (horaires locaux, sans date).
+    Créneau normal : ouverture ≤ at ≤ fermeture ; créneau de nuit
+    (overnight, ouverture > fermeture) : at ≥ ouverture ou at ≤ fermeture.
+    """
+    return (
+        models.Q(**{
+            f"{prefix}overnight": False,
+            f"{prefix}opening_time__lte": at,
+            f"{prefix}closing_time__gte": at,
+        })
+        | models.Q(**{f"{prefix}overnight": True, f"{prefix}opening_time__lte": at})
+        | models.Q(**{f"{prefix}overnight": True, f"{prefix}closing_time__gte": at})
+    )
+
+
+class RestaurantQuerySet(models.QuerySet):
+    def open_at(self, at):
+        return self.filter(open_at_q(at))
+
+    def open_now(self):
+        return self.open_at(timezone.localtime().time())
+
+    def with_open_now(self):
+        """Annote is_open_hours (booléen calculé par la base, sans charger les lignes en Python)."""
+        return self.annotate(is_open_hours=models.ExpressionWrapper(
+            open_at_q(timezone.localtime().time()), output_field=models.BooleanField(),
+        ))
+
+
 class Restaurant(models.Model):
     STATUS_CHOICES = [
         ("open", "Ouvert"),
@@ -123,6 +154,12 @@ class Restaurant(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="closed", verbose_name="Statut")
     opening_time = models.TimeField(verbose_name="Heure d'ouverture")
     closing_time = models.TimeField(verbose_name="Heure de fermeture")
+    overnight = models.GeneratedField(
+        expression=models.Q(opening_time__gt=models.F("closing_time")),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        verbose_name="Ouvert après minuit",
+    )
     is_approved = models.BooleanField(default=False, verbose_name="Approuvé")
     is_featured = models.BooleanField(default=False, verbose_name="Mis en avant")
     is_active = models.BooleanField(default=True, verbose_name="Actif")
@@ -130,10 +167,18 @@ class Restaurant(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RestaurantQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Restaurant"
         verbose_name_plural = "Restaurants"
         ordering = ["-is_featured", "-views_count", "name"]
+        indexes = [
+            models.Index(fields=["overnight", "opening_time", "closing_time"], name="resto_open_hours_idx"),
+            # Bornes d'ouverture / fermeture : tâche sync_opening_status
+            models.Index(fields=["opening_time"], name="resto_opening_time_idx"),
+            models.Index(fields=["closing_time"], name="resto_closing_time_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -149,6 +194,7 @@ class Restaurant(models.Model):
         super().save(*args, **kwargs)
 
     def is_open_now(self) -> bool:
+        # Même règle que open_at_q, pour une instance déjà chargée
         now = timezone.localtime(timezone.now()).time()
         if self.opening_time <= self.closing_time:
             return self.opening_time <= now <= self.closing_time
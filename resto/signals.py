@@ -1,10 +1,13 @@
 """
 E-Shelle Resto — Signals
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Restaurant, MenuCategory, ContactLog, Review, Notification
+from core.context_cache import bump, forget_user
+
+from .context_processors import CATEGORIES_CACHE, CITIES_CACHE, UNREAD_CACHE
+from .models import City, FoodCategory, Restaurant, MenuCategory, ContactLog, Review, Notification
 
 
 @receiver(post_save, sender=Restaurant)
@@ -72,3 +75,26 @@ def notify_restaurant_on_review(sender, instance, created, **kwargs):
         type="new_review",
         message=message,
     )
+
+
+# ── Invalidation du cache des context processors ──────────────────────────────
+
+@receiver([post_save, post_delete], sender=City)
+def invalidate_cities_context(sender, **kwargs):
+    bump(CITIES_CACHE)
+
+
+@receiver([post_save, post_delete], sender=FoodCategory)
+def invalidate_categories_context(sender, **kwargs):
+    bump(CATEGORIES_CACHE)
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def invalidate_unread_notifications_context(sender, instance, **kwargs):
+    owner_id = Restaurant.objects.filter(pk=instance.restaurant_id).values_list("owner_id", flat=True).first()
+    forget_user(owner_id, UNREAD_CACHE)
+
+
+@receiver(post_save, sender=Restaurant)
+def invalidate_owner_context(sender, instance, **kwargs):
+    forget_user(instance.owner_id, UNREAD_CACHE)
@@ -0,0 +1,86 @@
+"""
+E-Shelle Resto — Celery tasks
+
+Statut « open » / « closed » tenu à jour aux heures d'ouverture et de fermeture :
+seuls les restaurants dont une borne horaire est tombée depuis le dernier passage
+sont basculés (UPDATE en masse), ce qui laisse intacte une fermeture manuelle
+décidée par le restaurateur entre deux bornes. « Bientôt ouvert » n'est jamais touché.
+"""
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LAST_SYNC_CACHE = "resto:opening-status:last-sync"
+FIRST_SYNC_LOOKBACK = timedelta(minutes=15)
+FULL_RECONCILE_AFTER = timedelta(hours=23)
+
+
+def _time_window(field, start, end, include_start=False):
+    """Q « field dans (start, end] » (ou [start, end)) sur des heures, à cheval sur minuit si start > end."""
+    low = f"{field}__gte" if include_start else f"{field}__gt"
+    high = f"{field}__lt" if include_start else f"{field}__lte"
+    if start <= end:
+        return Q(**{low: start, high: end})
+    return Q(**{low: start}) | Q(**{high: end})
+
+
+def _invalidate_home():
+    from core.cache import invalidate
+    from .views import HOME_SAMPLING_TAG
+
+    invalidate(HOME_SAMPLING_TAG)
+
+
+def reconcile_opening_status(now=None) -> dict:
+    """Aligne le statut de tous les restaurants sur leurs horaires (déploiement, longue interruption)."""
+    from .models import Restaurant, open_at_q
+
+    now = timezone.localtime(now)
+    at = now.time()
+    opened = Restaurant.objects.filter(status="closed").filter(open_at_q(at)).update(status="open", updated_at=now)
+    closed = Restaurant.objects.filter(status="open").exclude(open_at_q(at)).update(status="closed", updated_at=now)
+    cache.set(LAST_SYNC_CACHE, now, None)
+    if opened or closed:
+        _invalidate_home()
+    return {"opened": opened, "closed": closed}
+
+
+def sync_opening_status(now=None) -> dict:
+    """Bascule les restaurants dont l'heure d'ouverture ou de fermeture est passée depuis le dernier appel."""
+    from .models import Restaurant, open_at_q
+
+    now = timezone.localtime(now)
+    since = cache.get(LAST_SYNC_CACHE) or now - FIRST_SYNC_LOOKBACK
+    if now - since >= FULL_RECONCILE_AFTER:
+        return reconcile_opening_status(now)
+    start, end = timezone.localtime(since).time(), now.time()
+
+    # Ouvert sur [ouverture, fermeture] : ouverture dans (start, end], fermeture dans [start, end)
+    opened = (
+        Restaurant.objects.filter(status="closed")
+        .filter(_time_window("opening_time", start, end))
+        .filter(open_at_q(end))
+        .update(status="open", updated_at=now)
+    )
+    closed = (
+        Restaurant.objects.filter(status="open")
+        .filter(_time_window("closing_time", start, end, include_start=True))
+        .exclude(open_at_q(end))
+        .update(status="closed", updated_at=now)
+    )
+    cache.set(LAST_SYNC_CACHE, now, None)
+    if opened or closed:
+        _invalidate_home()
+        logger.info("Statuts restaurants : %s ouverts, %s fermés", opened, closed)
+    return {"opened": opened, "closed": closed}
+
+
+@shared_task
+def sync_opening_status_task():
+    return sync_opening_status()
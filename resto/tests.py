@@ -0,0 +1,148 @@
+import random
+from collections import Counter
+from datetime import datetime, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.listing import KeysetPaginator
+
+from .models import City, Dish, Restaurant
+from .tasks import LAST_SYNC_CACHE, sync_opening_status
+from .views import OPEN_NOW_POOL
+
+
+class RestaurantTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.owner = get_user_model().objects.create_user(username="owner", password=None)
+        self.city = City.objects.create(name="Yaoundé", slug="yaounde")
+
+    def _restaurant(self, number, **fields):
+        values = {
+            "owner": self.owner, "name": f"R{number}", "slug": f"r-{number}", "city": self.city,
+            "address": "-", "phone": "+237600000000", "whatsapp": "+237600000000",
+            "status": "open", "opening_time": time(8), "closing_time": time(22), "is_approved": True,
+        }
+        values.update(fields)
+        return Restaurant.objects.create(**values)
+
+
+class HomeSamplingTests(RestaurantTestMixin, TestCase):
+    def test_tirage_distinct_en_une_requete(self):
+        restaurants = [self._restaurant(n) for n in range(20)]
+        self._restaurant(99, status="closed")
+        OPEN_NOW_POOL.pool()
+
+        with self.assertNumQueries(2):  # in_bulk + prefetch des catégories
+            sample = OPEN_NOW_POOL.sample(6)
+
+        self.assertEqual(len(sample), 6)
+        self.assertEqual(len({r.pk for r in sample}), 6)
+        self.assertTrue(set(sample) <= set(restaurants))
+
+    def test_vivier_invalide_au_changement_de_modele(self):
+        first = self._restaurant(1)
+        self.assertEqual(OPEN_NOW_POOL.sample(6), [first])
+
+        second = self._restaurant(2)
+        first.status = "closed"
+        first.save()
+
+        self.assertEqual(OPEN_NOW_POOL.sample(6), [second])
+
+    def test_mise_en_avant_plus_souvent_tiree(self):
+        featured = self._restaurant(0, is_featured=True)
+        for number in range(1, 10):
+            self._restaurant(number)
+
+        rng = random.Random(1)
+        draws = Counter(pk for _ in range(3000) for pk in OPEN_NOW_POOL.sample_ids(1, rng))
+
+        # Poids 3 contre 1 : ~25 % des tirages contre ~8 % pour chacun des autres
+        self.assertGreater(draws[featured.pk], 600)
+        self.assertLess(max(n for pk, n in draws.items() if pk != featured.pk), 400)
+
+
+def local(hour, minute=0):
+    return timezone.make_aware(datetime(2026, 10, 17, hour, minute))
+
+
+class OpeningHoursTests(RestaurantTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.day = self._restaurant(1, status="closed", opening_time=time(8), closing_time=time(22))
+        self.night = self._restaurant(2, status="closed", opening_time=time(18), closing_time=time(2))
+
+    def test_creneaux_evalues_par_la_base(self):
+        def open_at(hour):
+            return set(Restaurant.objects.open_at(time(hour)).values_list("name", flat=True))
+
+        self.assertEqual(open_at(12), {"R1"})
+        self.assertEqual(open_at(20), {"R1", "R2"})
+        self.assertEqual(open_at(23), {"R2"})
+        self.assertEqual(open_at(1), {"R2"})
+        self.assertEqual(open_at(5), set())
+
+    def test_statut_bascule_aux_bornes_horaires(self):
+        manual = self._restaurant(3, status="closed", opening_time=time(7), closing_time=time(23))
+
+        cache.set(LAST_SYNC_CACHE, local(7, 55))
+        self.assertEqual(sync_opening_status(local(8, 5)), {"opened": 1, "closed": 0})
+
+        cache.set(LAST_SYNC_CACHE, local(1, 58))
+        Restaurant.objects.filter(pk=self.night.pk).update(status="open")
+        self.assertEqual(sync_opening_status(local(2, 3)), {"opened": 0, "closed": 1})
+
+        statuses = dict(Restaurant.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[self.day.pk], "open")
+        self.assertEqual(statuses[self.night.pk], "closed")
+        # Fermé à la main entre deux bornes : laissé tel quel
+        self.assertEqual(statuses[manual.pk], "closed")
+
+
+class KeysetListingTests(RestaurantTestMixin, TestCase):
+    def test_parcours_par_curseur_avec_valeurs_nulles(self):
+        restaurant = self._restaurant(1)
+        for minutes in (None, 5, 5, 10, None, 3, 5):
+            Dish.objects.create(restaurant=restaurant, name="Plat", price=1000, available_in_minutes=minutes)
+        paginator = KeysetPaginator(Dish.objects.all(), ["-available_in_minutes"], per_page=3)
+        expected = sorted(
+            Dish.objects.values_list("pk", "available_in_minutes"),
+            key=lambda row: (row[1] is None, -(row[1] or 0), -row[0]),
+        )
+        expected = [pk for pk, _ in expected]
+
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+        self.assertEqual([d.pk for page in pages for d in page], expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+        back = [pages[-1]]
+        while back[-1].has_previous:
+            back.append(paginator.page(before=back[-1].previous_cursor))
+        self.assertEqual([d.pk for page in reversed(back) for d in page], expected)
+        self.assertFalse(back[-1].has_previous)
+
+    def test_liste_restaurants_par_curseur(self):
+        for number in range(15):
+            self._restaurant(number, views_count=number % 3)
+        url = reverse("resto:restaurant_list")
+
+        first = self.client.get(url).context["page_obj"]
+        self.assertEqual(len(first), 12)
+        self.assertEqual(first.count_display, "15")
+
+        second = self.client.get(url, {"apres": first.next_cursor}).context["page_obj"]
+        self.assertEqual(len(second), 3)
+        self.assertFalse(second.has_next)
+        self.assertEqual(len({r.pk for r in [*first, *second]}), 15)
+
+        # Curseur altéré : première page
+        tampered = self.client.get(url, {"apres": first.next_cursor[:-2] + "xx"}).context["page_obj"]
+        self.assertEqual([r.pk for r in tampered], [r.pk for r in first])
@@ -9,13 +9,16 @@ from django.contrib import messages
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.core.paginator import Paginator
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Case, Count, IntegerField, Q, Value, When
 from django.http import JsonResponse, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.views import View
 from django.views.generic import TemplateView, ListView, DetailView, FormView
+from core.context_cache import forget_user
+from core.listing import KeysetPaginator
+from core.sampling import SamplePool
+from search.services import filter_queryset
 
 from .forms import (
     DishAvailabilityForm, DishForm, MenuCategoryForm,
@@ -26,6 +29,7 @@ from .models import (
     HeroBanner, MenuCategory, Neighborhood, Notification, Restaurant,
     Review, Subscription,
 )
+from .context_processors import UNREAD_CACHE
 
 User = get_user_model()
 
@@ -45,6 +49,51 @@ def _is_staff(user):
     return user.is_staff
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Tirages aléatoires de la page d'accueil (core.sampling, pas d'ORDER BY RANDOM())
+# ──────────────────────────────────────────────────────────────────────────────
+
+HOME_SAMPLING_TAG = "resto:home-sampling"
+
+
+def _boost(prefix=""):
+    """Poids de mise en avant : 1 de base, +2 si « mis en avant », +2 premium / +1 basic."""
+    return (
+        Case(When(**{f"{prefix}is_featured": True}, then=Value(2)), default=Value(0), output_field=IntegerField())
+        + Case(
+            When(**{f"{prefix}subscription__is_active": True, f"{prefix}subscription__plan": "premium"}, then=Value(2)),
+            When(**{f"{prefix}subscription__is_active": True, f"{prefix}subscription__plan": "basic"}, then=Value(1)),
+            default=Value(0), output_field=IntegerField(),
+        )
+        + Value(1)
+    )
+
+
+_home_dishes = Dish.objects.filter(
+    is_active=True, restaurant__is_approved=True, restaurant__is_active=True,
+).select_related("restaurant", "restaurant__city")
+
+OPEN_NOW_POOL = SamplePool(
+    "resto:open_now",
+    Restaurant.objects.filter(is_approved=True, is_active=True, status="open")
+    .select_related("city", "neighborhood").prefetch_related("categories"),
+    weight=_boost(),
+    tags=(HOME_SAMPLING_TAG,),
+)
+POPULAR_DISHES_POOL = SamplePool(
+    "resto:popular_dishes",
+    _home_dishes.filter(is_popular=True),
+    weight=_boost("restaurant__"),
+    tags=(HOME_SAMPLING_TAG,),
+)
+AFFORDABLE_DISHES_POOL = SamplePool(
+    "resto:affordable_dishes",
+    _home_dishes.filter(price__lte=1500),
+    weight=_boost("restaurant__"),
+    tags=(HOME_SAMPLING_TAG,),
+)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Public Views
 # ──────────────────────────────────────────────────────────────────────────────
@@ -64,27 +113,9 @@ class HomeView(TemplateView):
             .prefetch_related("categories")
             .order_by("-views_count")[:8]
         )
-        ctx["open_now"] = (
-            approved_qs.filter(status="open")
-            .prefetch_related("categories")
-            .order_by("?")[:6]
-        )
-        ctx["popular_dishes"] = (
-            Dish.objects.filter(
-                is_popular=True, is_active=True,
-                restaurant__is_approved=True, restaurant__is_active=True,
-            )
-            .select_related("restaurant", "restaurant__city")
-            .order_by("?")[:8]
-        )
-        ctx["affordable_dishes"] = (
-            Dish.objects.filter(
-                price__lte=1500, is_active=True,
-                restaurant__is_approved=True, restaurant__is_active=True,
-            )
-            .select_related("restaurant", "restaurant__city")
-            .order_by("?")[:6]
-        )
+        ctx["open_now"] = OPEN_NOW_POOL.sample(6)
+        ctx["popular_dishes"] = POPULAR_DISHES_POOL.sample(8)
+        ctx["affordable_dishes"] = AFFORDABLE_DISHES_POOL.sample(6)
         ctx["food_categories"] = FoodCategory.objects.all().order_by("order")
         ctx["cities"] = City.objects.filter(is_active=True)
         ctx["hero_banners"] = HeroBanner.objects.filter(
@@ -98,6 +129,7 @@ class RestaurantListView(View):
     template_name = "resto/restaurant_list.html"
     partial_template = "resto/partials/restaurant_grid.html"
     per_page = 12
+    ordering = ("-is_featured", "-views_count", "name")
 
     def get(self, request, *args, **kwargs):
         qs = (
@@ -118,18 +150,15 @@ class RestaurantListView(View):
             qs = qs.filter(neighborhood__slug=neighborhood_slug)
         if category_slug:
             qs = qs.filter(categories__slug=category_slug)
-        if status in ("open", "closed", "opening_soon"):
+        if status == "open":
+            # Statut du restaurateur et horaires vérifiés par la base (créneaux de nuit compris)
+            qs = qs.filter(status="open").open_now()
+        elif status in ("closed", "opening_soon"):
             qs = qs.filter(status=status)
         if q:
-            qs = qs.filter(
-                Q(name__icontains=q) |
-                Q(description__icontains=q) |
-                Q(address__icontains=q)
-            )
+            qs = filter_queryset(qs, q)
 
-        qs = qs.distinct().order_by("-is_featured", "-views_count", "name")
-        paginator = Paginator(qs, self.per_page)
-        page_obj = paginator.get_page(request.GET.get("page", 1))
+        page_obj = KeysetPaginator(qs.distinct(), self.ordering, self.per_page).page_for(request)
 
         ctx = {
             "page_obj": page_obj,
@@ -663,6 +692,7 @@ class DashboardNotificationsView(DashboardMixin, View):
         }
         if unread_ids:
             Notification.objects.filter(pk__in=unread_ids).update(is_read=True)
+            forget_user(restaurant.owner_id, UNREAD_CACHE)
         return render(request, self.template_name, ctx)
 
 
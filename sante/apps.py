@@ -5,3 +5,10 @@ class SanteConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sante"
     verbose_name = "E-Shelle Santé"
+
+    def ready(self):
+        from core.cache import invalidate_on
+
+        from .views import LANDING_CACHE_TAG
+
+        invalidate_on(LANDING_CACHE_TAG, *self.get_models())
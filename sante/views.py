@@ -3,6 +3,8 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.cache import cached_view
+
 from .forms import DemandeSanteForm, ProduitSanteForm, ProfessionnelSanteForm, RendezVousSanteForm
 from .models import (
     CategorieSante,
@@ -14,6 +16,9 @@ from .models import (
     VilleSante,
 )
 
+LANDING_CACHE_TAG = "sante:landing"
+LANDING_CACHE_TIMEOUT = 60 * 10
+
 
 def _produits_actifs():
     return ProduitSante.objects.filter(is_active=True)
@@ -23,6 +28,7 @@ def _pros_actifs():
     return ProfessionnelSante.objects.filter(is_active=True)
 
 
+@cached_view("sante", timeout=LANDING_CACHE_TIMEOUT, tags=LANDING_CACHE_TAG)
 def accueil(request):
     produits_vedette = _produits_actifs().filter(is_featured=True).select_related("ville", "categorie")[:8]
     pros_vedette = _pros_actifs().filter(is_featured=True).select_related("ville")[:6]
@@ -0,0 +1,5 @@
+"""
+E-Shelle Search — Index plein texte unifié des modules marketplace.
+
+API publique : voir search.services (search, filter_queryset, is_indexed).
+"""
@@ -0,0 +1,289 @@
+"""
+E-Shelle Search — Sources indexées
+
+Chaque source déclare :
+  - label        : "app_label.ModelName" du modèle indexé
+  - kind/module  : type de source et module E-Shelle du document
+  - build(obj)   : dict des champs du SearchDocument, ou None si l'objet n'est
+                   pas public (le document est alors retiré de l'index)
+  - queryset()   : objets à (ré)indexer par rebuild_search_index
+  - parents      : [(label parent, chemin FK)] — une sauvegarde du parent
+                   réindexe ses enfants (ex. restaurant désactivé → ses plats)
+  - counters     : champs de compteurs ; un save(update_fields=…) limité à ces
+                   champs ne réindexe pas l'objet
+"""
+import re
+import unicodedata
+
+REGISTRY = {}
+
+
+def normalize(*values) -> str:
+    """Minuscules, sans accents, ponctuation remplacée par des espaces."""
+    text = " ".join(str(v) for v in values if v)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+class Source:
+    def __init__(self, label, kind, build, queryset, parents=(), counters=()):
+        self.label = label
+        self.kind = kind
+        self.build = build
+        self.queryset = queryset
+        self.parents = list(parents)
+        self.counters = set(counters)
+
+    @property
+    def model(self):
+        from django.apps import apps
+        try:
+            return apps.get_model(self.label)
+        except LookupError:
+            return None
+
+
+def register(label, kind, queryset, parents=(), counters=()):
+    def decorator(build):
+        REGISTRY[label] = Source(label, kind, build, queryset, parents, counters)
+        return build
+    return decorator
+
+
+def source_for(model):
+    return REGISTRY.get(model._meta.label)
+
+
+def _document(module, title, body=(), location=(), city="", url="", summary="", boost=0):
+    location_text = normalize(*location)
+    return {
+        "module":      module,
+        "title":       (title or "")[:255],
+        "summary":     (summary or "")[:300],
+        "url":         url or "",
+        "city":        normalize(city)[:100],
+        "search_text": normalize(title, *body, location_text),
+        "location":    location_text,
+        "boost":       boost,
+    }
+
+
+def _name(obj, attr="nom"):
+    return getattr(obj, attr, "") if obj is not None else ""
+
+
+# ── Business ──────────────────────────────────────────────────────────────────
+
+def _business_qs():
+    from business.models import BusinessProfile
+    return BusinessProfile.objects.filter(is_active=True)
+
+
+@register("business.BusinessProfile", "business", _business_qs,
+          counters=("views_count", "whatsapp_clicks", "phone_clicks", "detail_clicks", "leads_count"))
+def build_business(business):
+    if not business.is_active:
+        return None
+    boost = {"premium": 3, "business": 2, "pro": 1}.get(business.plan, 0)
+    return _document(
+        business.module,
+        business.name,
+        body=(business.description, business.promo_headline, business.promo_offer, business.get_module_display()),
+        location=(business.city, business.district),
+        city=business.city,
+        url=business.get_absolute_url(),
+        summary=business.promo_headline or business.description,
+        boost=boost,
+    )
+
+
+def _catalog_qs():
+    from business.models import BusinessCatalogItem
+    return BusinessCatalogItem.objects.filter(is_active=True, business__is_active=True).select_related("business")
+
+
+@register("business.BusinessCatalogItem", "catalog", _catalog_qs,
+          parents=[("business.BusinessProfile", "business")], counters=("views_count",))
+def build_catalog_item(item):
+    business = item.business
+    if not (item.is_active and business.is_active):
+        return None
+    return _document(
+        business.module,
+        item.title,
+        body=(item.description, item.get_item_type_display(), business.name),
+        location=(business.city, business.district),
+        city=business.city,
+        url=business.get_absolute_url(),
+        summary=item.price_label or item.description,
+        boost=1 if business.plan in ("premium", "business") else 0,
+    )
+
+
+# ── Resto ─────────────────────────────────────────────────────────────────────
+
+def _restaurant_qs():
+    from resto.models import Restaurant
+    return Restaurant.objects.filter(is_active=True).select_related("city", "neighborhood")
+
+
+@register("resto.Restaurant", "restaurant", _restaurant_qs, counters=("views_count",))
+def build_restaurant(resto):
+    if not resto.is_active:
+        return None
+    return _document(
+        "resto",
+        resto.name,
+        body=(resto.description,),
+        location=(_name(resto.city, "name"), _name(resto.neighborhood, "name"), resto.address),
+        city=_name(resto.city, "name"),
+        url=f"/resto/r/{resto.slug}/",
+        summary=resto.description,
+        boost=1 if resto.is_featured else 0,
+    )
+
+
+def _dish_qs():
+    from resto.models import Dish
+    return Dish.objects.filter(is_active=True, restaurant__is_active=True).select_related(
+        "restaurant", "restaurant__city", "restaurant__neighborhood",
+    )
+
+
+@register("resto.Dish", "dish", _dish_qs, parents=[("resto.Restaurant", "restaurant")])
+def build_dish(dish):
+    resto = dish.restaurant
+    if not (dish.is_active and resto.is_active):
+        return None
+    return _document(
+        "resto",
+        dish.name,
+        body=(dish.description, resto.name),
+        location=(_name(resto.city, "name"), _name(resto.neighborhood, "name")),
+        city=_name(resto.city, "name"),
+        url=f"/resto/r/{resto.slug}/",
+        summary=f"{dish.formatted_price} - {resto.name}",
+        boost=1 if dish.is_popular else 0,
+    )
+
+
+# ── Gaz ───────────────────────────────────────────────────────────────────────
+
+def _depot_qs():
+    from gaz.models import DepotGaz
+    return DepotGaz.objects.filter(is_active=True).select_related("ville", "quartier")
+
+
+@register("gaz.DepotGaz", "depot", _depot_qs)
+def build_depot(depot):
+    if not depot.is_active:
+        return None
+    return _document(
+        "gaz",
+        depot.nom,
+        body=(depot.description, depot.autres_services),
+        location=(_name(depot.ville), _name(depot.quartier), depot.adresse, depot.zone_livraison),
+        city=_name(depot.ville),
+        url=f"/gaz/depot/{depot.slug}/",
+        summary=depot.adresse,
+        boost=int(depot.is_featured) + int(depot.is_verified),
+    )
+
+
+# ── Pharma ────────────────────────────────────────────────────────────────────
+
+def _stock_qs():
+    from pharma.models import StockPharmacie
+    return StockPharmacie.objects.filter(
+        disponible=True, pharmacie__is_active=True, pharmacie__abonnement_actif=True,
+    ).select_related("medicament", "medicament__categorie", "pharmacie", "pharmacie__ville", "pharmacie__quartier")
+
+
+@register("pharma.StockPharmacie", "stock", _stock_qs,
+          parents=[("pharma.Pharmacie", "pharmacie"), ("pharma.Medicament", "medicament")])
+def build_stock(stock):
+    pharmacie, med = stock.pharmacie, stock.medicament
+    if not (stock.disponible and pharmacie.is_active and pharmacie.abonnement_actif):
+        return None
+    return _document(
+        "sante",
+        med.nom,
+        body=(med.description, _name(med.categorie), pharmacie.nom),
+        location=(_name(pharmacie.ville), _name(pharmacie.quartier), pharmacie.adresse),
+        city=_name(pharmacie.ville),
+        url=f"/pharma/medicament/{med.slug}/",
+        summary=pharmacie.nom,
+        boost=int(pharmacie.is_featured) + int(pharmacie.is_verified),
+    )
+
+
+# ── Immobilier ────────────────────────────────────────────────────────────────
+
+def _bien_qs():
+    from immobilier_cameroun.models import Bien, StatutBien
+    return Bien.objects.filter(statut=StatutBien.PUBLIE)
+
+
+@register("immobilier_cameroun.Bien", "bien", _bien_qs, counters=("vues",))
+def build_bien(bien):
+    from immobilier_cameroun.models import StatutBien
+
+    if bien.statut != StatutBien.PUBLIE:
+        return None
+    return _document(
+        "immobilier",
+        bien.titre,
+        body=(bien.description, bien.get_type_bien_display(), bien.get_type_transaction_display()),
+        location=(bien.ville, bien.quartier, bien.adresse_complete),
+        city=bien.ville,
+        url=bien.get_absolute_url(),
+        summary=bien.description,
+        boost=int(bien.est_mis_en_avant) + int(bien.est_coup_de_coeur),
+    )
+
+
+# ── Annonces ──────────────────────────────────────────────────────────────────
+
+def _annonce_qs():
+    from annonces_cam.models import Annonce
+    return Annonce.objects.filter(statut="PUBLIEE").select_related("categorie")
+
+
+@register("annonces_cam.Annonce", "annonce", _annonce_qs, counters=("vues",))
+def build_annonce(annonce):
+    if annonce.statut != "PUBLIEE":
+        return None
+    return _document(
+        "annonces",
+        annonce.titre,
+        body=(annonce.description, _name(annonce.categorie)),
+        location=(annonce.ville, annonce.quartier),
+        city=annonce.ville,
+        url=annonce.get_absolute_url(),
+        summary=annonce.description,
+        boost=int(annonce.est_mise_en_avant) + int(annonce.est_urgente),
+    )
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+def _offre_qs():
+    from jobs.models import OffreJob
+    return OffreJob.objects.filter(is_active=True).select_related("ville", "secteur")
+
+
+@register("jobs.OffreJob", "offre", _offre_qs)
+def build_offre(offre):
+    if not offre.is_active:
+        return None
+    return _document(
+        "jobs",
+        offre.titre,
+        body=(offre.entreprise, offre.description, _name(offre.secteur)),
+        location=(_name(offre.ville), offre.quartier),
+        city=_name(offre.ville),
+        url=offre.get_absolute_url(),
+        summary=offre.entreprise,
+        boost=int(offre.is_featured) + int(offre.is_verified),
+    )
@@ -0,0 +1,37 @@
+"""
+Commande Django : reconstruction de l'index de recherche unifié
+
+À lancer après la migration initiale, puis après toute mise à jour en masse
+(QuerySet.update, import…) qui contourne les signaux d'indexation.
+
+Usage :
+  python manage.py rebuild_search_index
+  python manage.py rebuild_search_index --source resto.Dish --source resto.Restaurant
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche unifié (toutes les sources ou celles demandées)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source", action="append", dest="sources", default=[],
+            help="Source à réindexer (app_label.ModelName), répétable",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Taille des lots (défaut : 500)")
+
+    def handle(self, *args, **options):
+        from search.indexers import REGISTRY
+        from search.services import rebuild
+
+        unknown = [s for s in options["sources"] if s not in REGISTRY]
+        if unknown:
+            raise CommandError(
+                f"Source(s) inconnue(s) : {', '.join(unknown)}. Disponibles : {', '.join(sorted(REGISTRY))}"
+            )
+
+        counts = rebuild(options["sources"] or None, batch_size=options["batch_size"])
+        for label, count in counts.items():
+            self.stdout.write(f"  {label:<32} {count:>8,} document(s)")
+        self.stdout.write(self.style.SUCCESS(f"Index reconstruit : {sum(counts.values()):,} document(s)."))
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.2 on 2026-10-17 19:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('module', models.CharField(db_index=True, help_text='Module E-Shelle (resto, gaz, immobilier…)', max_length=30)),
+                ('kind', models.CharField(help_text='Type de source (business, catalog, dish…)', max_length=30)),
+                ('title', models.CharField(max_length=255)),
+                ('summary', models.CharField(blank=True, max_length=300)),
+                ('url', models.CharField(blank=True, max_length=500)),
+                ('city', models.CharField(blank=True, db_index=True, help_text='Ville normalisée', max_length=100)),
+                ('search_text', models.TextField(help_text='Titre + description + localisation, normalisés')),
+                ('location', models.TextField(blank=True, help_text='Ville, quartier, adresse normalisés')),
+                ('boost', models.SmallIntegerField(default=0, help_text='Bonus de classement (Premium, mis en avant…)')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Document de recherche',
+                'verbose_name_plural': 'Documents de recherche',
+                'indexes': [models.Index(fields=['module', 'city'], name='search_doc_module_city')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id'), name='search_document_unique_object')],
+            },
+        ),
+    ]
@@ -0,0 +1,116 @@
+"""
+Index plein texte propres au moteur SQL (voir search.models).
+
+  - PostgreSQL : extensions unaccent + pg_trgm, configuration « search_fr »,
+                 index GIN tsvector (search_text, location) et trigramme
+  - SQLite     : table FTS5 externe + triggers de synchronisation
+
+Après migration : python manage.py rebuild_search_index
+"""
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'search_fr') THEN
+            CREATE TEXT SEARCH CONFIGURATION search_fr (COPY = french);
+            ALTER TEXT SEARCH CONFIGURATION search_fr
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS search_doc_text_fts
+    ON search_searchdocument USING GIN (to_tsvector('search_fr'::regconfig, search_text))
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS search_doc_location_fts
+    ON search_searchdocument USING GIN (to_tsvector('search_fr'::regconfig, location))
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS search_doc_text_trgm
+    ON search_searchdocument USING GIN (search_text gin_trgm_ops)
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS search_doc_text_trgm",
+    "DROP INDEX IF EXISTS search_doc_location_fts",
+    "DROP INDEX IF EXISTS search_doc_text_fts",
+    "DROP TEXT SEARCH CONFIGURATION IF EXISTS search_fr",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_searchdocument_fts USING fts5(
+        search_text, location,
+        content='search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_ai AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(rowid, search_text, location)
+        VALUES (new.id, new.search_text, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_ad AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, search_text, location)
+        VALUES ('delete', old.id, old.search_text, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_au AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, search_text, location)
+        VALUES ('delete', old.id, old.search_text, old.location);
+        INSERT INTO search_searchdocument_fts(rowid, search_text, location)
+        VALUES (new.id, new.search_text, new.location);
+    END
+    """,
+    "INSERT INTO search_searchdocument_fts(search_searchdocument_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS search_searchdocument_au",
+    "DROP TRIGGER IF EXISTS search_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS search_searchdocument_ai",
+    "DROP TABLE IF EXISTS search_searchdocument_fts",
+]
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as c:
+        for sql in statements:
+            c.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_FORWARD)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_REVERSE)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,44 @@
+"""
+E-Shelle Search — Document de recherche dénormalisé
+
+Une ligne par objet public indexé (fiche business, article catalogue, plat,
+médicament en stock, bien immobilier, annonce, offre d'emploi…). Les textes sont
+stockés normalisés (minuscules, sans accents) ; les index plein texte propres
+au moteur SQL sont créés par la migration 0002 :
+  - PostgreSQL : configuration « search_fr » (french + unaccent), index GIN
+    tsvector sur search_text et location, index trigramme sur search_text
+  - SQLite     : table FTS5 search_searchdocument_fts synchronisée par triggers
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id    = models.PositiveBigIntegerField()
+    module       = models.CharField(max_length=30, db_index=True, help_text="Module E-Shelle (resto, gaz, immobilier…)")
+    kind         = models.CharField(max_length=30, help_text="Type de source (business, catalog, dish…)")
+
+    title        = models.CharField(max_length=255)
+    summary      = models.CharField(max_length=300, blank=True)
+    url          = models.CharField(max_length=500, blank=True)
+    city         = models.CharField(max_length=100, blank=True, db_index=True, help_text="Ville normalisée")
+
+    search_text  = models.TextField(help_text="Titre + description + localisation, normalisés")
+    location     = models.TextField(blank=True, help_text="Ville, quartier, adresse normalisés")
+    boost        = models.SmallIntegerField(default=0, help_text="Bonus de classement (Premium, mis en avant…)")
+
+    updated_at   = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Document de recherche"
+        verbose_name_plural = "Documents de recherche"
+        constraints = [
+            models.UniqueConstraint(fields=["content_type", "object_id"], name="search_document_unique_object"),
+        ]
+        indexes = [
+            models.Index(fields=["module", "city"], name="search_doc_module_city"),
+        ]
+
+    def __str__(self):
+        return f"[{self.module}] {self.title}"
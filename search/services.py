@@ -0,0 +1,253 @@
+"""
+E-Shelle Search — Indexation et recherche classée
+
+API publique :
+  search(query, modules=None, city=None, kinds=None, limit=20, match="any")
+      → documents classés (attribut .rank), partagé par l'agent central et les vues
+  filter_queryset(qs, query, match="all", field="text")
+      → restreint un queryset d'un modèle indexé aux objets qui correspondent
+  is_indexed(model_or_qs)
+  index_instance(obj) / remove_instance(obj) / rebuild(labels=None)
+
+Moteurs :
+  - PostgreSQL : to_tsquery("search_fr") préfixée + similarité trigramme
+  - SQLite     : table FTS5 (bm25)
+  - autres     : repli icontains sur le texte normalisé
+"""
+import logging
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from .indexers import REGISTRY, normalize, source_for
+
+logger = logging.getLogger(__name__)
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+
+
+def terms_for(query) -> list:
+    """Termes normalisés d'une requête (chaîne libre ou liste de termes déjà extraits)."""
+    if isinstance(query, (list, tuple)):
+        query = " ".join(query)
+    seen, terms = set(), []
+    for term in normalize(query or "").split():
+        if len(term) >= 2 and term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+# ── Moteurs SQL ───────────────────────────────────────────────────────────────
+
+class _SQLiteBackend:
+    TABLE = "search_searchdocument_fts"
+
+    def match(self, terms, match, field):
+        joiner = " AND " if match == MATCH_ALL else " OR "
+        expr = joiner.join(f'"{t}"*' for t in terms)
+        if field == "location":
+            expr = f"location : ({expr})"
+        return (
+            f"SELECT rowid FROM {self.TABLE} WHERE {self.TABLE} MATCH %s",
+            [expr],
+        )
+
+    def ranked(self, terms, match, where, params, limit):
+        joiner = " AND " if match == MATCH_ALL else " OR "
+        expr = joiner.join(f'"{t}"*' for t in terms)
+        sql = (
+            f"SELECT d.id, (-bm25({self.TABLE}) + d.boost) AS score "
+            f"FROM {self.TABLE} JOIN search_searchdocument d ON d.id = {self.TABLE}.rowid "
+            f"WHERE {self.TABLE} MATCH %s{where} "
+            f"ORDER BY score DESC, d.id LIMIT %s"
+        )
+        return sql, [expr, *params, limit]
+
+
+class _PostgresBackend:
+    CONFIG = "search_fr"
+
+    def _tsquery(self, terms, match):
+        joiner = " & " if match == MATCH_ALL else " | "
+        return joiner.join(f"{t}:*" for t in terms)
+
+    def match(self, terms, match, field):
+        column = "location" if field == "location" else "search_text"
+        return (
+            f"SELECT id FROM search_searchdocument "
+            f"WHERE to_tsvector('{self.CONFIG}'::regconfig, {column}) @@ to_tsquery('{self.CONFIG}'::regconfig, %s)",
+            [self._tsquery(terms, match)],
+        )
+
+    def ranked(self, terms, match, where, params, limit):
+        tsquery = self._tsquery(terms, match)
+        phrase = " ".join(terms)
+        sql = (
+            f"SELECT d.id, ts_rank_cd(to_tsvector('{self.CONFIG}'::regconfig, d.search_text), q) "
+            f"+ word_similarity(%s, d.search_text) * 0.5 + d.boost * 0.1 AS score "
+            f"FROM search_searchdocument d, to_tsquery('{self.CONFIG}'::regconfig, %s) q "
+            f"WHERE (to_tsvector('{self.CONFIG}'::regconfig, d.search_text) @@ q OR %s <%% d.search_text){where} "
+            f"ORDER BY score DESC, d.id LIMIT %s"
+        )
+        return sql, [phrase, tsquery, phrase, *params, limit]
+
+
+class _FallbackBackend:
+    def _where(self, terms, match, column):
+        joiner = " AND " if match == MATCH_ALL else " OR "
+        clause = joiner.join(f"{column} LIKE %s" for _ in terms)
+        return f"({clause})", [f"%{t}%" for t in terms]
+
+    def match(self, terms, match, field):
+        clause, params = self._where(terms, match, "location" if field == "location" else "search_text")
+        return f"SELECT id FROM search_searchdocument WHERE {clause}", params
+
+    def ranked(self, terms, match, where, params, limit):
+        clause, like_params = self._where(terms, match, "d.search_text")
+        sql = (
+            f"SELECT d.id, d.boost AS score FROM search_searchdocument d "
+            f"WHERE {clause}{where} ORDER BY score DESC, d.id LIMIT %s"
+        )
+        return sql, [*like_params, *params, limit]
+
+
+def _backend():
+    if connection.vendor == "postgresql":
+        return _PostgresBackend()
+    if connection.vendor == "sqlite":
+        return _SQLiteBackend()
+    return _FallbackBackend()
+
+
+# ── Recherche ─────────────────────────────────────────────────────────────────
+
+def is_indexed(model_or_qs) -> bool:
+    model = getattr(model_or_qs, "model", model_or_qs)
+    return source_for(model) is not None
+
+
+def _content_type_id(model):
+    from django.contrib.contenttypes.models import ContentType
+    return ContentType.objects.get_for_model(model, for_concrete_model=False).pk
+
+
+def filter_queryset(qs, query, match=MATCH_ALL, field="text"):
+    """
+    Restreint qs (modèle indexé) aux objets dont le document correspond à la requête.
+    L'ordre et les autres filtres du queryset sont conservés ; sans terme, qs est
+    retourné tel quel.
+    """
+    terms = terms_for(query)
+    if not terms:
+        return qs
+    doc_sql, params = _backend().match(terms, match, field)
+    sql = (
+        f"SELECT object_id FROM search_searchdocument "
+        f"WHERE content_type_id = %s AND id IN ({doc_sql})"
+    )
+    return qs.filter(pk__in=RawSQL(sql, [_content_type_id(qs.model), *params]))
+
+
+def search(query, modules=None, city=None, kinds=None, limit=20, match=MATCH_ANY) -> list:
+    """
+    Recherche classée dans tout l'index (ou les modules/types demandés).
+    Retourne des SearchDocument avec un attribut .rank (plus grand = plus pertinent).
+    """
+    from .models import SearchDocument
+
+    terms = terms_for(query)
+    if not terms:
+        return []
+
+    where, params = "", []
+    if modules:
+        where += f" AND d.module IN ({', '.join(['%s'] * len(modules))})"
+        params += list(modules)
+    if kinds:
+        where += f" AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+        params += list(kinds)
+    if city:
+        where += " AND d.city = %s"
+        params.append(normalize(city))
+
+    sql, sql_params = _backend().ranked(terms, match, where, params, limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, sql_params)
+        scores = {row[0]: float(row[1] or 0) for row in cursor.fetchall()}
+
+    documents = SearchDocument.objects.in_bulk(list(scores))
+    ranked = []
+    for doc_id, score in scores.items():
+        doc = documents.get(doc_id)
+        if doc is not None:
+            doc.rank = score
+            ranked.append(doc)
+    return ranked
+
+
+# ── Indexation ────────────────────────────────────────────────────────────────
+
+def index_instance(obj):
+    """Crée/met à jour le document d'un objet, ou le retire s'il n'est plus public."""
+    from .models import SearchDocument
+
+    src = source_for(type(obj))
+    if src is None:
+        return None
+    fields = src.build(obj)
+    if fields is None:
+        remove_instance(obj)
+        return None
+    doc, _ = SearchDocument.objects.update_or_create(
+        content_type_id=_content_type_id(type(obj)),
+        object_id=obj.pk,
+        defaults={"kind": src.kind, **fields},
+    )
+    return doc
+
+
+def remove_instance(obj):
+    from .models import SearchDocument
+    SearchDocument.objects.filter(
+        content_type_id=_content_type_id(type(obj)), object_id=obj.pk,
+    ).delete()
+
+
+def reindex_children(parent):
+    """Réindexe les objets dont la visibilité dépend de parent (ex. plats d'un restaurant)."""
+    label = parent._meta.label
+    for src in REGISTRY.values():
+        model = src.model
+        if model is None:
+            continue
+        for parent_label, path in src.parents:
+            if parent_label == label:
+                for child in model._default_manager.filter(**{path: parent}):
+                    index_instance(child)
+
+
+def rebuild(labels=None, batch_size=500) -> dict:
+    """Reconstruit l'index des sources demandées (toutes par défaut)."""
+    from .models import SearchDocument
+
+    counts = {}
+    for label, src in REGISTRY.items():
+        if labels and label not in labels:
+            continue
+        model = src.model
+        if model is None:
+            continue
+        ct_id = _content_type_id(model)
+        docs = []
+        for obj in src.queryset().iterator(chunk_size=batch_size):
+            fields = src.build(obj)
+            if fields is not None:
+                docs.append(SearchDocument(content_type_id=ct_id, object_id=obj.pk, kind=src.kind, **fields))
+        with transaction.atomic():
+            SearchDocument.objects.filter(content_type_id=ct_id).delete()
+            SearchDocument.objects.bulk_create(docs, batch_size=batch_size)
+        counts[label] = len(docs)
+        logger.info("Search index rebuilt for %s: %s document(s)", label, len(docs))
+    return counts
@@ -0,0 +1,61 @@
+"""
+E-Shelle Search — Synchronisation de l'index
+
+Chaque source du REGISTRY est réindexée à la sauvegarde et retirée à la suppression.
+La sauvegarde d'un modèle parent (ex. Restaurant → Dish) réindexe ses enfants.
+Les erreurs d'indexation sont journalisées sans jamais bloquer la sauvegarde métier ;
+les mises à jour en masse (QuerySet.update) passent par rebuild_search_index.
+"""
+import logging
+
+from django.db.models.signals import post_delete, post_save
+
+from .indexers import REGISTRY, source_for
+
+logger = logging.getLogger(__name__)
+
+
+def _counters_only(sender, update_fields):
+    src = source_for(sender)
+    return bool(src and update_fields and set(update_fields) <= src.counters)
+
+
+def index_on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or _counters_only(sender, update_fields):
+        return
+    from .services import index_instance, reindex_children
+    try:
+        if source_for(sender):
+            index_instance(instance)
+        reindex_children(instance)
+    except Exception as exc:
+        logger.error("Search indexing failed for %s #%s: %s", sender._meta.label, instance.pk, exc)
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    from .services import remove_instance
+    try:
+        remove_instance(instance)
+    except Exception as exc:
+        logger.error("Search removal failed for %s #%s: %s", sender._meta.label, instance.pk, exc)
+
+
+def connect():
+    from django.apps import apps
+
+    labels = set(REGISTRY)
+    for src in REGISTRY.values():
+        labels.update(parent for parent, _ in src.parents)
+
+    for label in sorted(labels):
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            continue
+        uid = label.lower().replace(".", "_")
+        post_save.connect(index_on_save, sender=model, dispatch_uid=f"search_index_{uid}")
+        if label in REGISTRY:
+            post_delete.connect(remove_on_delete, sender=model, dispatch_uid=f"search_remove_{uid}")
+
+
+connect()
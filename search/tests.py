@@ -0,0 +1,63 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from gaz.models import DepotGaz, QuartierGaz, VilleGaz
+
+from .models import SearchDocument
+from .services import filter_queryset, rebuild, search
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.douala = VilleGaz.objects.create(nom="Douala")
+        self.yaounde = VilleGaz.objects.create(nom="Yaoundé")
+        self.akwa = QuartierGaz.objects.create(ville=self.douala, nom="Akwa")
+        self.depot_douala = DepotGaz.objects.create(
+            nom="Dépôt Énergie Plus", ville=self.douala, quartier=self.akwa,
+            adresse="Boulevard de la Liberté", telephone="699000001", is_active=True,
+        )
+        self.depot_yaounde = DepotGaz.objects.create(
+            nom="Gaz Express Bastos", ville=self.yaounde, telephone="699000002",
+            description="Livraison de bouteilles", is_active=True,
+        )
+
+    def _depot_docs(self):
+        return SearchDocument.objects.filter(kind="depot")
+
+    def test_save_signal_indexes_and_unpublishes(self):
+        self.assertEqual(self._depot_docs().count(), 2)
+
+        self.depot_yaounde.is_active = False
+        self.depot_yaounde.save()
+        self.assertEqual(list(self._depot_docs().values_list("object_id", flat=True)), [self.depot_douala.pk])
+
+        self.depot_douala.delete()
+        self.assertFalse(self._depot_docs().exists())
+
+    def test_search_is_accent_insensitive_and_prefix_based(self):
+        results = search("energie liberte", modules=["gaz"])
+        self.assertEqual([doc.object_id for doc in results if doc.kind == "depot"], [self.depot_douala.pk])
+
+        results = search("bouteil", modules=["gaz"], city="yaounde", kinds=["depot"])
+        self.assertEqual([doc.object_id for doc in results], [self.depot_yaounde.pk])
+        self.assertTrue(hasattr(results[0], "rank"))
+
+    def test_filter_queryset_keeps_queryset_filters(self):
+        qs = DepotGaz.objects.filter(is_active=True).order_by("nom")
+        self.assertEqual(list(filter_queryset(qs, "akwa")), [self.depot_douala])
+        self.assertEqual(list(filter_queryset(qs, "akwa", field="location")), [self.depot_douala])
+        self.assertEqual(list(filter_queryset(qs, "gaz bastos", match="all")), [self.depot_yaounde])
+        self.assertEqual(list(filter_queryset(qs, "")), [self.depot_douala, self.depot_yaounde])
+
+    def test_rebuild_restores_documents_after_bulk_update(self):
+        DepotGaz.objects.filter(pk=self.depot_yaounde.pk).update(nom="Station Mokolo")
+        self.assertFalse(search("mokolo"))
+
+        counts = rebuild(["gaz.DepotGaz"])
+        self.assertEqual(counts["gaz.DepotGaz"], 2)
+        self.assertEqual([doc.object_id for doc in search("mokolo")], [self.depot_yaounde.pk])
+
+    def test_list_view_uses_index(self):
+        response = self.client.get(reverse("gaz:catalogue"), {"q": "energie"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["depots"]), [self.depot_douala])
@@ -505,8 +505,8 @@ async function runGenerateVideo(prompt) {
     messagesList.appendChild(row);
     scrollToBottom();
 
-    // Lancer le polling
-    pollVideoStatus(data.operation_name, data.conversation_id, prompt, row, btn);
+    // Attendre la fin (evenement SSE pousse par le serveur, polling en secours)
+    watchVideo(data, prompt, row, btn);
 
   } catch (err) {
     showToast("Erreur réseau.", "error");
@@ -515,6 +515,78 @@ async function runGenerateVideo(prompt) {
   }
 }
 
+function watchVideo(data, prompt, rowElement, btnElement) {
+  if (!data.server_watch || !window.EventSource) {
+    pollVideoStatus(data.operation_name, data.conversation_id, prompt, rowElement, btnElement);
+    return;
+  }
+  const pollUrl = `${DJANGO_DATA.videoPollUrl}?operation_name=${encodeURIComponent(data.operation_name)}&conversation_id=${data.conversation_id || ""}&prompt=${encodeURIComponent(prompt)}`;
+  const source = new EventSource("/evenements/");
+  let finished = false;
+  const finish = (payload) => {
+    if (finished || !renderVideoResult(payload, rowElement, btnElement)) return;
+    finished = true;
+    clearTimeout(timeout);
+    source.close();
+  };
+  // Delai depasse cote flux : bascule sur le polling classique
+  const timeout = setTimeout(() => {
+    source.close();
+    if (!finished) pollVideoStatus(data.operation_name, data.conversation_id, prompt, rowElement, btnElement);
+  }, 240000);
+
+  source.addEventListener("video", (e) => {
+    const payload = JSON.parse(e.data);
+    if (payload.operation_name === data.operation_name) finish(payload);
+  });
+  // A chaque (re)connexion, une verification unique couvre un evenement publie hors connexion
+  source.addEventListener("open", async () => {
+    try {
+      const resp = await fetch(pollUrl);
+      finish(await resp.json());
+    } catch (err) {
+      console.error("Error checking video:", err);
+    }
+  });
+}
+
+function renderVideoResult(data, rowElement, btnElement) {
+  if (data.error) {
+    rowElement.innerHTML = `
+      <div class="message-avatar">✦</div>
+      <div class="message-bubble assistant">
+        <div style="color: #EF4444; font-weight: 700; font-size: 13px;">⚠️ Échec de la génération</div>
+        <div style="font-size: 11px; color: var(--text-2); margin-top: 2px;">${data.error}</div>
+      </div>`;
+    btnElement.disabled = false;
+    btnElement.textContent = "✦ Générer la vidéo";
+    return true;
+  }
+
+  if (!data.done) return false;
+
+  rowElement.innerHTML = `
+    <div class="message-avatar">✦</div>
+    <div class="message-bubble assistant">
+      <div class="message-video-container">
+        <video src="${data.video_url}" controls class="generated-video" style="max-width:100%; border-radius:12px; margin-top:8px; border:1px solid rgba(255,255,255,0.1); display:block;"></video>
+        <a href="${data.video_url}" download class="img-download-btn" style="margin-top:8px; display:inline-flex;">⬇ Télécharger la vidéo</a>
+      </div>
+      <div class="message-actions">
+        <span class="message-time">${new Date().toLocaleTimeString("fr-FR",{hour:"2-digit",minute:"2-digit"})}</span>
+      </div>
+    </div>`;
+  scrollToBottom();
+
+  btnElement.disabled = false;
+  btnElement.textContent = "✦ Générer la vidéo";
+
+  if (data.quota) {
+    updateQuotaUI(data.quota.messages, data.quota.msg_used, data.quota.msg_limit);
+  }
+  return true;
+}
+
 function pollVideoStatus(operationName, conversationId, prompt, rowElement, btnElement) {
   const pollUrl = `${DJANGO_DATA.videoPollUrl}?operation_name=${encodeURIComponent(operationName)}&conversation_id=${conversationId || ""}&prompt=${encodeURIComponent(prompt)}`;
   
@@ -539,41 +611,8 @@ function pollVideoStatus(operationName, conversationId, prompt, rowElement, btnE
     try {
       const resp = await fetch(pollUrl);
       const data = await resp.json();
-
-      if (data.error) {
-        clearInterval(interval);
-        rowElement.innerHTML = `
-          <div class="message-avatar">✦</div>
-          <div class="message-bubble assistant">
-            <div style="color: #EF4444; font-weight: 700; font-size: 13px;">⚠️ Échec de la génération</div>
-            <div style="font-size: 11px; color: var(--text-2); margin-top: 2px;">${data.error}</div>
-          </div>`;
-        btnElement.disabled = false;
-        btnElement.textContent = "✦ Générer la vidéo";
-        return;
-      }
-
-      if (data.done) {
+      if (renderVideoResult(data, rowElement, btnElement)) {
         clearInterval(interval);
-        rowElement.innerHTML = `
-          <div class="message-avatar">✦</div>
-          <div class="message-bubble assistant">
-            <div class="message-video-container">
-              <video src="${data.video_url}" controls class="generated-video" style="max-width:100%; border-radius:12px; margin-top:8px; border:1px solid rgba(255,255,255,0.1); display:block;"></video>
-              <a href="${data.video_url}" download class="img-download-btn" style="margin-top:8px; display:inline-flex;">⬇ Télécharger la vidéo</a>
-            </div>
-            <div class="message-actions">
-              <span class="message-time">${new Date().toLocaleTimeString("fr-FR",{hour:"2-digit",minute:"2-digit"})}</span>
-            </div>
-          </div>`;
-        scrollToBottom();
-
-        btnElement.disabled = false;
-        btnElement.textContent = "✦ Générer la vidéo";
-
-        if (data.quota) {
-          updateQuotaUI(data.quota.messages, data.quota.msg_used, data.quota.msg_limit);
-        }
       }
     } catch (err) {
       console.error("Error polling video:", err);
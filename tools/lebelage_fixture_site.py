@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+Faux site LEBELAGE local pour tester et mesurer le crawler sans reseau.
+
+Usage:
+  python tools/lebelage_fixture_site.py --port 8765          # sert le site
+  python tools/lebelage_fixture_site.py --bench --latency 0.05
+
+Le site genere des categories paginees et des fiches produit au format lu par
+scrape_product, avec ETag et reponses 304 sur If-None-Match.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FixtureSite:
+    def __init__(self, categories: int = 4, products_per_category: int = 12, per_page: int = 6,
+                 latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.categories = categories
+        self.products_per_category = products_per_category
+        self.per_page = per_page
+        self.latency = latency
+        self.versions: dict[str, int] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def product_slugs(self) -> list[str]:
+        return [f"p{c}-{n}" for c in range(self.categories) for n in range(self.products_per_category)]
+
+    def touch(self, slug: str) -> None:
+        """Modifie une fiche produit (nouveau prix, nouvel ETag)."""
+        with self._lock:
+            self.versions[slug] = self.versions.get(slug, 0) + 1
+
+    # ── Pages ──────────────────────────────────────────────────────────────
+
+    def _home(self) -> str:
+        links = "".join(f'<a href="/category/c{c}">Category {c}</a>' for c in range(self.categories))
+        return f"<html><head><title>LEBELAGE</title></head><body>{links}</body></html>"
+
+    def _category(self, category: int, page: int) -> str:
+        start = (page - 1) * self.per_page
+        numbers = range(start, min(start + self.per_page, self.products_per_category))
+        links = "".join(f'<a href="/product/p{category}-{n}">Product {category}-{n}</a>' for n in numbers)
+        return f"<html><head><title>Category {category}</title></head><body>{links}</body></html>"
+
+    def _product(self, slug: str) -> str:
+        version = self.versions.get(slug, 0)
+        price = 10 + version + int(slug.split("-")[-1])
+        return (
+            "<html><head>"
+            f"<title>Serum {slug} - LEBELAGE</title>"
+            f'<meta property="og:title" content="Serum {slug}">'
+            f'<meta property="og:image" content="/web/product/{slug}.jpg">'
+            f'<meta name="description" content="Hypoallergenic serum {slug} for sensitive skin, version {version}.">'
+            "</head><body>"
+            f"<p>Product Name Serum {slug}</p><p>Price ${price}.00</p><p>Domestic shipping</p>"
+            "</body></html>"
+        )
+
+    def _render(self, path: str, query: dict) -> str | None:
+        if path == "/":
+            return self._home()
+        if path.startswith("/category/c"):
+            page = int(query.get("page", ["1"])[0])
+            return self._category(int(path.rsplit("c", 1)[1]), page)
+        if path.startswith("/product/"):
+            slug = path.rsplit("/", 1)[1]
+            if slug in self.product_slugs():
+                return self._product(slug)
+        return None
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if site.latency:
+                    time.sleep(site.latency)
+                body = site._render(parsed.path, parse_qs(parsed.query))
+                with site._lock:
+                    site.requests += 1
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with site._lock:
+                        site.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def bench(latency: float, workers: int, categories: int, products: int) -> None:
+    try:
+        from tools.lebelage_shopify_agent import CrawlerEngine
+    except ImportError:  # lance comme script depuis tools/
+        from lebelage_shopify_agent import CrawlerEngine
+
+    with FixtureSite(categories=categories, products_per_category=products, latency=latency) as site, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        limit = categories * products
+        runs = [
+            ("sequentiel", 1, None),
+            (f"{workers} workers", workers, None),
+            (f"{workers} workers + cache", workers, cache_dir),
+            (f"{workers} workers, re-crawl", workers, cache_dir),
+        ]
+        for label, run_workers, run_cache in runs:
+            before = site.requests, site.not_modified
+            started = time.monotonic()
+            engine = CrawlerEngine(
+                site.url, max_pages=3, limit=limit, workers=run_workers,
+                delay=0.0, per_host=run_workers, cache_dir=run_cache,
+            )
+            found = engine.run()
+            elapsed = time.monotonic() - started
+            print(
+                f"{label:<28} {len(found):>4} produits {elapsed:>6.2f}s "
+                f"{site.requests - before[0]:>4} requetes {site.not_modified - before[1]:>4} x 304"
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Faux site LEBELAGE local (tests et benchmark du crawler).")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--products", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.latency, args.workers, args.categories, args.products)
+        return 0
+
+    with FixtureSite(categories=args.categories, products_per_category=args.products,
+                     latency=args.latency, port=args.port) as site:
+        print(f"Site LEBELAGE local : {site.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
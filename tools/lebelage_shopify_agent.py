@@ -5,6 +5,11 @@ Agent local LEBELAGE -> Shopify.
 Usage rapide:
   python tools/lebelage_shopify_agent.py --limit 10
   python tools/lebelage_shopify_agent.py --limit 10 --import-shopify
+  python tools/lebelage_shopify_agent.py --limit 200 --workers 8 --fresh
+
+Crawl: un crawl interrompu reprend depuis --state ; les pages inchangees
+(ETag / Last-Modified) sont relues depuis --cache-dir. Benchmark local:
+  python tools/lebelage_fixture_site.py --bench
 
 Variables Shopify:
   SHOPIFY_SHOP_DOMAIN=ma-boutique.myshopify.com
@@ -21,13 +26,18 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
 import html
 import json
 import logging
 import os
 import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass
 from html.parser import HTMLParser
 from pathlib import Path
@@ -35,6 +45,7 @@ from typing import Iterable
 from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
 BASE_URL = "https://en.lebelage.co.kr/"
@@ -174,52 +185,9 @@ def discover_product_urls(page_url: str, html_text: str) -> list[str]:
 
 
 def crawl_product_urls(start_url: str, max_pages: int, limit: int, sleep: float) -> list[str]:
-    home = fetch(start_url)
-    candidates = discover_category_urls(start_url, home)
-    logging.info("Candidates URL initiales: %s", len(candidates))
-
-    seen_products: list[str] = []
-    seen_set = set()
-    visited = set()
-    queue = list(candidates)
-
-    while queue:
-        page_url = queue.pop(0)
-        if page_url in visited:
-            continue
-        visited.add(page_url)
-
-        try:
-            text = fetch(page_url)
-        except Exception as exc:
-            logging.warning("Skip page %s: %s", page_url, exc)
-            continue
-
-        found = discover_product_urls(page_url, text)
-        for url in found:
-            if url in seen_set:
-                continue
-            seen_set.add(url)
-            seen_products.append(url)
-            if limit and len(seen_products) >= limit:
-                return seen_products
-
-        if len(seen_products) >= limit:
-            return seen_products
-
-        for candidate in discover_category_urls(page_url, text):
-            if candidate not in visited and candidate not in queue:
-                queue.append(candidate)
-
-        if looks_like_listing_url(page_url):
-            for page in range(2, max_pages + 1):
-                page_url_with_num = with_page(page_url, page)
-                if page_url_with_num not in visited and page_url_with_num not in queue:
-                    queue.append(page_url_with_num)
-
-        time.sleep(sleep)
-
-    return seen_products
+    """Decouverte simple (un seul fetch a la fois), via CrawlerEngine."""
+    engine = CrawlerEngine(start_url, max_pages=max_pages, limit=limit, workers=1, delay=sleep)
+    return engine.discover()
 
 
 def text_from_html(raw_html: str) -> str:
@@ -283,7 +251,10 @@ def choose_main_image(product_url: str, parser: LinkImageParser) -> str:
 
 
 def scrape_product(product_url: str) -> Product:
-    raw = fetch(product_url)
+    return parse_product(product_url, fetch(product_url))
+
+
+def parse_product(product_url: str, raw: str) -> Product:
     parser = parse_html(raw)
     text = text_from_html(raw)
 
@@ -325,6 +296,311 @@ def scrape_product(product_url: str) -> Product:
     )
 
 
+# ── Moteur de crawl concurrent et reprenable ─────────────────────────────────
+#
+#   HostLimiter    → politesse par hote : requetes simultanees bornees et espacees
+#   HttpCache      → cache conditionnel sur disque (ETag / Last-Modified → 304)
+#   CrawlState     → frontiere, pages visitees et produits lus, sauvegardes apres
+#                    chaque lot : un crawl interrompu reprend ou il s'etait arrete
+#   CrawlerEngine  → decouverte des URLs produit puis scraping, en pool de threads
+
+
+class HostLimiter:
+    """Au plus `concurrency` requetes simultanees par hote, demarrees a `delay` s d'intervalle."""
+
+    def __init__(self, delay: float = 0.5, concurrency: int = 2):
+        self.delay = max(0.0, delay)
+        self.concurrency = max(1, concurrency)
+        self._lock = threading.Lock()
+        self._next_at: dict[str, float] = {}
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.concurrency)
+            return self._slots[host]
+
+    @contextmanager
+    def acquire(self, url: str):
+        host = urlparse(url).netloc
+        with self._slot(host):
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_at.get(host, 0.0))
+                self._next_at[host] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def _write_json_atomic(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class HttpCache:
+    """Une entree JSON par URL : validateurs HTTP, corps de page et produit deja extrait."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def load(self, url: str) -> dict | None:
+        try:
+            return json.loads(self._path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, entry: dict) -> None:
+        _write_json_atomic(self._path(url), entry)
+
+
+class CrawlState:
+    """Etat d'un crawl sur disque, lie a son URL de depart."""
+
+    def __init__(self, path: str | Path, start_url: str):
+        self.path = Path(path)
+        self.start_url = start_url
+
+    def load(self) -> dict | None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if data.get("start_url") == self.start_url else None
+
+    def save(self, data: dict) -> None:
+        _write_json_atomic(self.path, {"start_url": self.start_url, **data})
+
+    def clear(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    products_scraped: int = 0
+    products_reused: int = 0
+    resumed: bool = False
+
+
+class CrawlerEngine:
+    def __init__(
+        self,
+        start_url: str,
+        max_pages: int = 3,
+        limit: int = 20,
+        workers: int = 4,
+        delay: float = 0.5,
+        per_host: int = 2,
+        state_path: str | Path | None = None,
+        cache_dir: str | Path | None = None,
+        timeout: float = 30,
+    ):
+        self.start_url = start_url
+        self.max_pages = max_pages
+        self.limit = limit
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.limiter = HostLimiter(delay, per_host)
+        self.cache = HttpCache(cache_dir) if cache_dir else None
+        self.state = CrawlState(state_path, start_url) if state_path else None
+        self.stats = CrawlStats()
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers * 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Frontiere : file FIFO + ensemble des URLs deja vues (dedoublonnage O(1))
+        self.queue: deque[str] = deque()
+        self.seen: set[str] = set()
+        self.product_urls: list[str] = []
+        self._product_set: set[str] = set()
+        self.scraped: dict[str, dict] = {}
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+    # ── HTTP ───────────────────────────────────────────────────────────────
+
+    def fetch(self, url: str) -> tuple[str, bool]:
+        """Retourne (html, modifie). Une page inchangee (304) est relue depuis le cache."""
+        entry = self.cache.load(url) if self.cache else None
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self.limiter.acquire(url):
+            logging.info("GET %s", url)
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        self._count("pages")
+
+        if response.status_code == 304 and entry:
+            self._count("not_modified")
+            return entry["body"], False
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag", "")
+        last_modified = response.headers.get("Last-Modified", "")
+        if self.cache and (etag or last_modified):
+            self.cache.store(url, {"etag": etag, "last_modified": last_modified, "body": response.text})
+        return response.text, True
+
+    def scrape(self, url: str) -> Product:
+        raw, changed = self.fetch(url)
+        if not changed and self.cache:
+            cached = (self.cache.load(url) or {}).get("product")
+            if cached:
+                self._count("products_reused")
+                return Product(**cached)
+        product = parse_product(url, raw)
+        self._count("products_scraped")
+        if self.cache:
+            entry = self.cache.load(url)
+            if entry:
+                entry["product"] = asdict(product)
+                self.cache.store(url, entry)
+        return product
+
+    # ── Etat ───────────────────────────────────────────────────────────────
+
+    def _enqueue(self, url: str) -> None:
+        if url not in self.seen:
+            self.seen.add(url)
+            self.queue.append(url)
+
+    def _add_products(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            if url not in self._product_set and not self._limit_reached():
+                self._product_set.add(url)
+                self.product_urls.append(url)
+
+    def _limit_reached(self) -> bool:
+        return bool(self.limit) and len(self.product_urls) >= self.limit
+
+    def _restore(self) -> bool:
+        data = self.state.load() if self.state else None
+        if not data:
+            return False
+        self.queue = deque(data.get("queue", []))
+        self.seen = set(data.get("seen", []))
+        self.product_urls = list(data.get("product_urls", []))
+        self._product_set = set(self.product_urls)
+        self.scraped = dict(data.get("scraped", {}))
+        self.stats.resumed = True
+        logging.info(
+            "Reprise du crawl: %s page(s) en file, %s produit(s) connus, %s deja lus",
+            len(self.queue), len(self.product_urls), len(self.scraped),
+        )
+        return True
+
+    def _checkpoint(self) -> None:
+        if self.state:
+            self.state.save({
+                "queue": list(self.queue),
+                "seen": sorted(self.seen),
+                "product_urls": self.product_urls,
+                "scraped": self.scraped,
+            })
+
+    # ── Phases ─────────────────────────────────────────────────────────────
+
+    def _fetch_page(self, url: str) -> str | None:
+        try:
+            return self.fetch(url)[0]
+        except Exception as exc:
+            self._count("errors")
+            logging.warning("Skip page %s: %s", url, exc)
+            return None
+
+    def discover(self) -> list[str]:
+        """Parcours en largeur des listings, par lots de `workers` pages en parallele."""
+        if not self._restore():
+            self._enqueue(self.start_url)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while self.queue and not self._limit_reached():
+                batch = [self.queue.popleft() for _ in range(min(self.workers, len(self.queue)))]
+                # Les resultats sont traites dans l'ordre du lot : decouverte deterministe
+                for page_url, text in zip(batch, pool.map(self._fetch_page, batch)):
+                    if text is None:
+                        continue
+                    self._add_products(discover_product_urls(page_url, text))
+                    if page_url in self._product_set and page_url not in self.scraped:
+                        # Fiche produit deja telechargee pendant la decouverte : pas de second GET
+                        try:
+                            self.scraped[page_url] = asdict(parse_product(page_url, text))
+                            self._count("products_scraped")
+                        except ValueError:
+                            pass
+                    if self._limit_reached():
+                        break
+                    for candidate in discover_category_urls(page_url, text):
+                        self._enqueue(candidate)
+                    if looks_like_listing_url(page_url):
+                        for page in range(2, self.max_pages + 1):
+                            self._enqueue(with_page(page_url, page))
+                self._checkpoint()
+        return list(self.product_urls)
+
+    def scrape_products(self, urls: list[str]) -> list[Product]:
+        pending = [url for url in urls if url not in self.scraped]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.scrape, url): url for url in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                url = futures[future]
+                try:
+                    product = future.result()
+                except Exception as exc:
+                    self._count("errors")
+                    logging.warning("Product scrape failed for %s: %s", url, exc)
+                    continue
+                self.scraped[url] = asdict(product)
+                logging.info("Scraped: %s | %s | %s", product.title, product.price, product.image_url)
+                if done % self.workers == 0:
+                    self._checkpoint()
+        self._checkpoint()
+
+        products = []
+        seen_titles = set()
+        for url in urls:
+            if url not in self.scraped:
+                continue
+            product = Product(**self.scraped[url])
+            key = product.title.lower()
+            if key in seen_titles:
+                continue
+            seen_titles.add(key)
+            products.append(product)
+        return products
+
+    def run(self) -> list[Product]:
+        """Decouverte puis scraping ; l'etat est efface une fois le crawl complet."""
+        products = self.scrape_products(self.discover())
+        if self.state:
+            self.state.clear()
+        return products
+
+
+
 class ShopifyClient:
     def __init__(self, shop_domain: str, access_token: str, api_version: str = "2026-01"):
         if not shop_domain or not access_token:
@@ -688,7 +964,12 @@ def main(argv=None) -> int:
     parser.add_argument("--source-url", default=BASE_URL)
     parser.add_argument("--max-pages", type=int, default=3)
     parser.add_argument("--limit", type=int, default=20)
-    parser.add_argument("--sleep", type=float, default=0.5)
+    parser.add_argument("--sleep", type=float, default=0.5, help="Intervalle minimal entre deux requetes au meme hote")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-host", type=int, default=2, help="Requetes simultanees max par hote")
+    parser.add_argument("--state", default="tmp/lebelage_crawl_state.json", help="Etat du crawl (reprise)")
+    parser.add_argument("--cache-dir", default="tmp/lebelage_http_cache", help="Cache HTTP conditionnel")
+    parser.add_argument("--fresh", action="store_true", help="Ignore l'etat d'un crawl interrompu")
     parser.add_argument("--shipping", type=float, default=0.0)
     parser.add_argument("--margin", type=float, default=0.0)
     parser.add_argument("--out", default="tmp/lebelage_products.json")
@@ -716,24 +997,27 @@ def main(argv=None) -> int:
         )
         return 0
 
-    product_urls = crawl_product_urls(args.source_url, args.max_pages, args.limit, args.sleep)
-    logging.info("Discovered %s product URLs", len(product_urls))
-
-    products: list[Product] = []
-    seen_titles = set()
-    for url in product_urls:
-        try:
-            product = scrape_product(url)
-        except Exception as exc:
-            logging.exception("Product scrape failed for %s: %s", url, exc)
-            continue
-        key = product.title.lower()
-        if key in seen_titles:
-            continue
-        seen_titles.add(key)
-        products.append(product)
-        logging.info("Scraped: %s | %s | %s", product.title, product.price, product.image_url)
-        time.sleep(args.sleep)
+    if args.fresh:
+        CrawlState(args.state, args.source_url).clear()
+    engine = CrawlerEngine(
+        args.source_url,
+        max_pages=args.max_pages,
+        limit=args.limit,
+        workers=args.workers,
+        delay=args.sleep,
+        per_host=args.per_host,
+        state_path=args.state,
+        cache_dir=args.cache_dir,
+    )
+    products = engine.run()
+    logging.info(
+        "Crawl: %s page(s), %s inchangee(s) (304), %s produit(s) relus du cache, %s erreur(s)%s",
+        engine.stats.pages,
+        engine.stats.not_modified,
+        engine.stats.products_reused,
+        engine.stats.errors,
+        " [reprise]" if engine.stats.resumed else "",
+    )
 
     products = enrich_products(products, shipping=args.shipping, margin=args.margin)
     save_json(products, Path(args.out))
@@ -17,7 +17,7 @@ class CampagneAdmin(admin.ModelAdmin):
     list_display = ["nom", "statut", "total_destinataires", "total_envoyes", "total_livres", "total_echecs", "cree_le"]
     list_filter = ["statut", "cree_le"]
     search_fields = ["nom", "description", "message_template"]
-    readonly_fields = ["total_destinataires", "total_envoyes", "total_livres", "total_lus", "total_echecs", "cree_le", "lance_le", "termine_le"]
+    readonly_fields = ["total_destinataires", "total_en_attente", "total_envoyes", "total_livres", "total_lus", "total_echecs", "cree_le", "lance_le", "termine_le"]
     actions = ["lancer_campagnes_selectionnees"]
 
     @admin.action(description="Lancer les campagnes selectionnees")
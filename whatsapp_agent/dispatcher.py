@@ -0,0 +1,291 @@
+# whatsapp_agent/dispatcher.py — Envoi des campagnes sous limite de debit Meta
+#
+#   TokenBucket(rate, burst)             → seau a jetons ; ralentir() / accelerer() (AIMD)
+#   DebitExpediteur(phone_id, rate)      → budget par seconde du numero expediteur, partage (cache)
+#   DispatcherCampagne(campagne_id)      → envoie les messages en attente par lots
+#   dispatcher_campagne(campagne_id)     → une tranche d'envoi, un seul dispatcher par campagne
+#   progression(campagne_id)             → debit en direct du dispatcher (cache partage)
+#
+# Un seul worker tire les messages en attente par lots (pagination par id) et les
+# envoie sur une session HTTP persistante au rythme du seau a jetons. Un 429/5xx
+# divise le debit par deux (et respecte Retry-After), chaque succes le remonte
+# progressivement ; le message concerne est reessaye localement, sans re-enfiler
+# de tache Celery.
+#
+# Le palier de debit Meta s'applique au numero expediteur, pas a la campagne : en plus
+# de son seau local, chaque dispatcher preleve ses envois sur le budget partage du
+# numero (compteur par seconde dans le cache partage), si bien que plusieurs campagnes
+# simultanees, sur un ou plusieurs workers, restent ensemble sous WHATSAPP_RATE_PER_SECOND.
+# Un Retry-After recu par l'une met en pause toutes les autres.
+
+import heapq
+import logging
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import key
+
+from .models import Campagne, MessageEnvoi
+from .services import WhatsAppService
+
+logger = logging.getLogger(__name__)
+
+PROGRESSION_TIMEOUT = 300
+PUBLICATION_SECONDES = 1.0
+RELANCE_MAX_SECONDES = 60
+
+
+class TokenBucket:
+    """Limiteur de debit : rate jetons par seconde, au plus burst en reserve."""
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic, sleep=time.sleep):
+        self.rate_max = float(rate)
+        self.rate_min = min(1.0, self.rate_max)
+        self.rate = self.rate_max
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.clock = clock
+        self.sleep = sleep
+        self._dernier = clock()
+
+    def _remplir(self) -> None:
+        maintenant = self.clock()
+        ecoule = maintenant - self._dernier
+        if ecoule > 0:
+            self.tokens = min(self.burst, self.tokens + ecoule * self.rate)
+            self._dernier = maintenant
+
+    def acquire(self) -> None:
+        """Bloque jusqu'a disposer d'un jeton."""
+        while True:
+            self._remplir()
+            # Tolerance : les arrondis flottants ne doivent pas faire boucler sur 0.999...
+            if self.tokens >= 1 - 1e-9:
+                self.tokens = max(0.0, self.tokens - 1)
+                return
+            attente = (1 - self.tokens) / self.rate + max(0.0, self._dernier - self.clock())
+            self.sleep(attente)
+
+    def ralentir(self, pause: float = 0.0) -> None:
+        """Limite atteinte cote Meta : debit divise par deux, reserve videe, pause eventuelle."""
+        self.rate = max(self.rate_min, self.rate / 2)
+        self.tokens = 0.0
+        self._dernier = self.clock() + max(0.0, pause)
+
+    def accelerer(self) -> None:
+        self.rate = min(self.rate_max, self.rate + self.rate_max / 50)
+
+
+class DebitExpediteur:
+    """Budget d'envoi par seconde d'un numero expediteur, partage par tous les dispatchers."""
+
+    def __init__(self, phone_id: str, rate: float, horloge=time.time, sleep=time.sleep):
+        self.phone_id = phone_id
+        self.rate = max(1, int(rate))
+        self.horloge = horloge
+        self.sleep = sleep
+
+    def _pause_key(self) -> str:
+        return key("whatsapp", "debit", self.phone_id, "pause")
+
+    def acquire(self) -> None:
+        """Bloque jusqu'a obtenir une place dans la seconde courante du numero."""
+        reprise = cache.get(self._pause_key())
+        if reprise and reprise > self.horloge():
+            self.sleep(reprise - self.horloge())
+        while True:
+            maintenant = self.horloge()
+            seconde = int(maintenant)
+            compteur = key("whatsapp", "debit", self.phone_id, seconde)
+            cache.add(compteur, 0, 5)
+            try:
+                envois = cache.incr(compteur)
+            except ValueError:  # expire entre add et incr
+                continue
+            if envois <= self.rate:
+                return
+            self.sleep(seconde + 1 - maintenant)
+
+    def ralentir(self, pause: float = 0.0) -> None:
+        if pause > 0:
+            cache.set(self._pause_key(), self.horloge() + pause, int(pause) + 1)
+
+
+def _progression_key(campagne_id: int) -> str:
+    return key("whatsapp", "dispatch", campagne_id)
+
+
+def _verrou_key(campagne_id: int) -> str:
+    return key("whatsapp", "dispatch", campagne_id, "verrou")
+
+
+def progression(campagne_id: int):
+    """Etat du dispatcher en cours pour la campagne (None si aucun envoi actif)."""
+    return cache.get(_progression_key(campagne_id))
+
+
+class DispatcherCampagne:
+    """Envoie les messages en attente d'une campagne, par lots, sous limite de debit."""
+
+    def __init__(
+        self,
+        campagne_id: int,
+        bucket: TokenBucket | None = None,
+        expediteur: DebitExpediteur | None = None,
+        batch_size: int | None = None,
+        max_tentatives: int | None = None,
+        envoyer=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.campagne_id = campagne_id
+        self.bucket = bucket or TokenBucket(
+            settings.WHATSAPP_RATE_PER_SECOND, settings.WHATSAPP_RATE_BURST, clock=clock, sleep=sleep
+        )
+        self.expediteur = expediteur or DebitExpediteur(
+            settings.WHATSAPP_PHONE_ID, settings.WHATSAPP_RATE_PER_SECOND, sleep=sleep
+        )
+        self.batch_size = batch_size or settings.WHATSAPP_DISPATCH_BATCH
+        self.max_tentatives = max_tentatives or settings.WHATSAPP_DISPATCH_MAX_ATTEMPTS
+        self.envoyer = envoyer or WhatsAppService.envoyer_message
+        self.clock = clock
+        self.sleep = sleep
+
+        self.envoyes = 0
+        self.echecs = 0
+        self.relances = 0
+        self._tentatives = {}
+        self._a_relancer = []
+        self._demarre = clock()
+        self._publie_a = self._demarre
+        self._traites_publies = 0
+
+    # ── Boucle principale ─────────────────────────────────────────────────
+
+    def _lot_suivant(self, dernier_id: int) -> deque:
+        if not Campagne.objects.filter(pk=self.campagne_id, statut=Campagne.STATUT_EN_COURS).exists():
+            # Campagne annulee ou terminee : on abandonne aussi les relances prevues
+            self._a_relancer.clear()
+            return deque()
+        return deque(
+            MessageEnvoi.objects.filter(
+                campagne_id=self.campagne_id,
+                statut=MessageEnvoi.STATUT_EN_ATTENTE,
+                id__gt=dernier_id,
+            )
+            .order_by("id")
+            .only("id", "statut", "campagne_id", "numero_whatsapp", "message_final")[: self.batch_size]
+        )
+
+    def executer(self, duree_max: float | None = None) -> dict:
+        """Envoie jusqu'a epuisement des messages en attente ou expiration de duree_max."""
+
+        echeance = self._demarre + duree_max if duree_max else None
+        dernier_id = 0
+        lot = deque()
+        while echeance is None or self.clock() < echeance:
+            if self._a_relancer and self._a_relancer[0][0] <= self.clock():
+                _, _, msg = heapq.heappop(self._a_relancer)
+            else:
+                if not lot:
+                    lot = self._lot_suivant(dernier_id)
+                if not lot:
+                    if not self._a_relancer:
+                        break
+                    attente = self._a_relancer[0][0] - self.clock()
+                    if echeance is not None:
+                        attente = min(attente, echeance - self.clock())
+                    self.sleep(max(0.0, attente))
+                    continue
+                msg = lot.popleft()
+                dernier_id = msg.id
+            self._envoyer(msg)
+            self._publier()
+
+        self._publier(force=True)
+        return self.bilan()
+
+    def _envoyer(self, msg: MessageEnvoi) -> None:
+        from .tasks import enregistrer_resultat_envoi
+
+        self.bucket.acquire()
+        self.expediteur.acquire()
+        result = self.envoyer(msg.numero_whatsapp, msg.message_final)
+        if result["success"]:
+            self.bucket.accelerer()
+            enregistrer_resultat_envoi(msg, result)
+            self.envoyes += 1
+            return
+
+        if result.get("temporaire"):
+            self.bucket.ralentir(result.get("retry_after", 0.0))
+            self.expediteur.ralentir(result.get("retry_after", 0.0))
+            tentatives = self._tentatives.get(msg.id, 0) + 1
+            self._tentatives[msg.id] = tentatives
+            if tentatives < self.max_tentatives:
+                delai = min(RELANCE_MAX_SECONDES, 2**tentatives)
+                heapq.heappush(self._a_relancer, (self.clock() + delai, msg.id, msg))
+                self.relances += 1
+                return
+
+        enregistrer_resultat_envoi(msg, result)
+        self.echecs += 1
+
+    # ── Suivi en direct ───────────────────────────────────────────────────
+
+    def bilan(self) -> dict:
+        restants = (
+            Campagne.objects.filter(pk=self.campagne_id, statut=Campagne.STATUT_EN_COURS)
+            .values_list("total_en_attente", flat=True)
+            .first()
+        )
+        return {
+            "envoyes": self.envoyes,
+            "echecs": self.echecs,
+            "relances": self.relances,
+            "restants": restants or 0,
+            "debit_cible": round(self.bucket.rate, 1),
+        }
+
+    def _publier(self, force: bool = False) -> None:
+        maintenant = self.clock()
+        ecoule = maintenant - self._publie_a
+        if not force and ecoule < PUBLICATION_SECONDES:
+            return
+        traites = self.envoyes + self.echecs
+        debit = (traites - self._traites_publies) / ecoule if ecoule > 0 else 0.0
+        cache.set(
+            _progression_key(self.campagne_id),
+            {
+                "envoyes": self.envoyes,
+                "echecs": self.echecs,
+                "relances": self.relances,
+                "debit": round(debit, 1),
+                "debit_cible": round(self.bucket.rate, 1),
+                "duree": round(maintenant - self._demarre, 1),
+            },
+            PROGRESSION_TIMEOUT,
+        )
+        self._publie_a = maintenant
+        self._traites_publies = traites
+
+
+def dispatcher_campagne(campagne_id: int, duree_max: float | None = None):
+    """
+    Execute une tranche d'envoi pour la campagne. Retourne le bilan, ou None si
+    un autre dispatcher travaille deja sur cette campagne.
+    """
+
+    duree_max = duree_max or settings.WHATSAPP_DISPATCH_MAX_SECONDS
+    verrou = _verrou_key(campagne_id)
+    if not cache.add(verrou, True, int(duree_max) + 60):
+        return None
+    try:
+        bilan = DispatcherCampagne(campagne_id).executer(duree_max=duree_max)
+    finally:
+        cache.delete(verrou)
+    logger.info(f"[whatsapp] Campagne {campagne_id} : {bilan}")
+    return bilan
@@ -0,0 +1,90 @@
+# whatsapp_agent/fake_meta.py — Faux endpoint Meta WhatsApp (tests et benchmarks hors ligne)
+#
+#   with FakeMetaServer(latence=0.02, taux_429=0.05) as meta:
+#       settings.WHATSAPP_API_URL = meta.url
+#
+# Repond comme /{phone_id}/messages : 200 + {"messages": [{"id": "wamid..."}]}, ou
+# les codes d'erreur programmes (erreurs=[429, 503]) puis un taux aleatoire de 429.
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeMetaServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latence: float = 0.0,
+                 taux_429: float = 0.0, erreurs=None, retry_after: int = 0):
+        self.latence = latence
+        self.taux_429 = taux_429
+        self.erreurs = list(erreurs or [])
+        self.retry_after = retry_after
+        self.requetes = 0
+        self.refus = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v19.0/fake/messages"
+
+    def _reponse(self):
+        with self._lock:
+            self.requetes += 1
+            numero = self.requetes
+            if self.erreurs:
+                code = self.erreurs.pop(0)
+            elif self.taux_429 and random.random() < self.taux_429:
+                code = 429
+            else:
+                code = 200
+            if code != 200:
+                self.refus += 1
+        if code == 200:
+            return code, {"messages": [{"id": f"wamid.fake-{numero}"}]}
+        return code, {"error": {"code": 130429 if code == 429 else code, "message": "fake meta error"}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                longueur = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(longueur)
+                if server.latence:
+                    time.sleep(server.latence)
+                code, data = server._reponse()
+                body = json.dumps(data).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if code == 429 and server.retry_after:
+                    self.send_header("Retry-After", str(server.retry_after))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,73 @@
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from whatsapp_agent.dispatcher import TokenBucket
+from whatsapp_agent.fake_meta import FakeMetaServer
+from whatsapp_agent.services import WhatsAppService
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le debit d'envoi WhatsApp contre un faux endpoint Meta local "
+        "(aucun appel reel, aucune ecriture en base). --serve lance seulement le faux endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=300)
+        parser.add_argument("--rate", type=float, default=settings.WHATSAPP_RATE_PER_SECOND)
+        parser.add_argument("--latence", type=float, default=0.02, help="Latence simulee par requete (s)")
+        parser.add_argument("--taux-429", type=float, default=0.0, help="Proportion de reponses 429")
+        parser.add_argument("--comparer", action="store_true", help="Compare avec une connexion par message")
+        parser.add_argument("--serve", action="store_true", help="Lance le faux endpoint et attend (Ctrl+C)")
+        parser.add_argument("--port", type=int, default=0)
+
+    def handle(self, *args, **options):
+        meta = FakeMetaServer(port=options["port"], latence=options["latence"], taux_429=options["taux_429"])
+        with meta:
+            if options["serve"]:
+                self.stdout.write(f"Faux endpoint Meta : {meta.url} (WHATSAPP_API_URL)")
+                try:
+                    while True:
+                        time.sleep(1)
+                except KeyboardInterrupt:
+                    return
+
+            with override_settings(
+                WHATSAPP_DRY_RUN=False,
+                WHATSAPP_TOKEN="bench",
+                WHATSAPP_PHONE_ID="bench",
+                WHATSAPP_API_URL=meta.url,
+            ):
+                self._mesurer("session persistante", WhatsAppService.envoyer_message, meta, options)
+                if options["comparer"]:
+                    self._mesurer("connexion par message", self._envoi_sans_pool(meta.url), meta, options)
+
+    def _envoi_sans_pool(self, url):
+        def envoyer(numero, message):
+            response = requests.post(url, json={"to": numero, "text": {"body": message}}, timeout=10)
+            return {"success": response.status_code == 200, "temporaire": response.status_code == 429}
+
+        return envoyer
+
+    def _mesurer(self, libelle, envoyer, meta, options):
+        bucket = TokenBucket(options["rate"], int(options["rate"]))
+        refus_avant = meta.refus
+        envoyes = 0
+        debut = time.monotonic()
+        while envoyes < options["messages"]:
+            bucket.acquire()
+            result = envoyer("+237690000000", "Message de test")
+            if result["success"]:
+                bucket.accelerer()
+                envoyes += 1
+            elif result.get("temporaire"):
+                bucket.ralentir(result.get("retry_after", 0.0))
+        duree = time.monotonic() - debut
+        self.stdout.write(
+            f"{libelle:<24} {envoyes} messages en {duree:.2f}s "
+            f"= {envoyes / duree:.1f} msg/s ({meta.refus - refus_avant} refus 429)"
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-17 21:28
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def initialiser_total_en_attente(apps, schema_editor):
+    Campagne = apps.get_model("whatsapp_agent", "Campagne")
+    MessageEnvoi = apps.get_model("whatsapp_agent", "MessageEnvoi")
+    en_attente = (
+        MessageEnvoi.objects.filter(campagne=OuterRef("pk"), statut="en_attente")
+        .order_by()
+        .values("campagne")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Campagne.objects.update(
+        total_en_attente=Coalesce(Subquery(en_attente, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('whatsapp_agent', '0005_campagne_destinataires_contacts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campagne',
+            name='total_en_attente',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(initialiser_total_en_attente, migrations.RunPython.noop),
+    ]
@@ -71,7 +71,9 @@ class Campagne(models.Model):
         help_text="Contacts WhatsApp selectionnes manuellement pour cette campagne.",
     )
 
+    # Compteurs tenus a jour par delta a chaque transition de statut (voir tasks.appliquer_statut)
     total_destinataires = models.IntegerField(default=0)
+    total_en_attente = models.IntegerField(default=0)
     total_envoyes = models.IntegerField(default=0)
     total_livres = models.IntegerField(default=0)
     total_lus = models.IntegerField(default=0)
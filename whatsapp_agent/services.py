@@ -1,25 +1,60 @@
 import re
+import threading
 import time
 
 import anthropic
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 
 
+# Codes HTTP Meta a reessayer (limite de debit, indisponibilite) plutot qu'a marquer en echec
+CODES_TEMPORAIRES = {429, 500, 502, 503, 504}
+
+_session_locale = threading.local()
+
+
+def _session_http() -> requests.Session:
+    """Session HTTP reutilisee par thread : connexions TLS gardees ouvertes (keep-alive)."""
+
+    session = getattr(_session_locale, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session_locale.session = session
+    return session
+
+
+def _retry_after(response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
 class WhatsAppService:
     """Services metier pour l'agent WhatsApp E-Shelle."""
 
     @staticmethod
     def envoyer_message(numero: str, message: str) -> dict:
-        """Envoie un message texte via l'API Meta WhatsApp Business."""
+        """
+        Envoie un message texte via l'API Meta WhatsApp Business.
+
+        Le resultat indique aussi si l'echec est temporaire (429/5xx, reseau) :
+        le dispatcher reessaie alors le message et ralentit son debit.
+        """
 
         if getattr(settings, "WHATSAPP_DRY_RUN", True):
             return {
                 "success": True,
                 "message_id": f"dryrun-{int(time.time() * 1000)}",
                 "erreur": "Simulation: aucun appel Meta effectue.",
+                "temporaire": False,
+                "retry_after": 0.0,
             }
 
         if not settings.WHATSAPP_TOKEN or not settings.WHATSAPP_PHONE_ID:
@@ -27,6 +62,8 @@ class WhatsAppService:
                 "success": False,
                 "message_id": "",
                 "erreur": "Configuration Meta incomplete: WHATSAPP_TOKEN ou WHATSAPP_PHONE_ID manquant.",
+                "temporaire": False,
+                "retry_after": 0.0,
             }
 
         payload = {
@@ -41,13 +78,34 @@ class WhatsAppService:
         }
 
         try:
-            response = requests.post(settings.WHATSAPP_API_URL, json=payload, headers=headers, timeout=10)
+            response = _session_http().post(
+                settings.WHATSAPP_API_URL,
+                json=payload,
+                headers=headers,
+                timeout=getattr(settings, "WHATSAPP_HTTP_TIMEOUT", 10),
+            )
+        except requests.RequestException as exc:
+            return {"success": False, "message_id": "", "erreur": str(exc), "temporaire": True, "retry_after": 0.0}
+
+        try:
             data = response.json()
-            if response.status_code == 200 and data.get("messages"):
-                return {"success": True, "message_id": data["messages"][0]["id"], "erreur": ""}
-            return {"success": False, "message_id": "", "erreur": str(data)}
-        except Exception as exc:
-            return {"success": False, "message_id": "", "erreur": str(exc)}
+        except ValueError:
+            data = {"http_status": response.status_code, "body": response.text[:300]}
+        if response.status_code == 200 and data.get("messages"):
+            return {
+                "success": True,
+                "message_id": data["messages"][0]["id"],
+                "erreur": "",
+                "temporaire": False,
+                "retry_after": 0.0,
+            }
+        return {
+            "success": False,
+            "message_id": "",
+            "erreur": str(data),
+            "temporaire": response.status_code in CODES_TEMPORAIRES,
+            "retry_after": _retry_after(response),
+        }
 
     @staticmethod
     def generer_message_ia(segment: str, contexte: str, prenom: str = "") -> str:
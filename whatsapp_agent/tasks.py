@@ -1,126 +1,248 @@
+import logging
+from datetime import timedelta
+
 from celery import shared_task
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
 
 from .models import Campagne, MessageEnvoi
 from .services import WhatsAppService
 
+logger = logging.getLogger(__name__)
+
+# Statuts de message comptes par chaque compteur de Campagne
+COMPTEURS_PAR_STATUT = {
+    "total_en_attente": (MessageEnvoi.STATUT_EN_ATTENTE,),
+    "total_envoyes": (MessageEnvoi.STATUT_ENVOYE, MessageEnvoi.STATUT_LIVRE, MessageEnvoi.STATUT_LU),
+    "total_livres": (MessageEnvoi.STATUT_LIVRE, MessageEnvoi.STATUT_LU),
+    "total_lus": (MessageEnvoi.STATUT_LU,),
+    "total_echecs": (MessageEnvoi.STATUT_ECHEC,),
+}
+
+# Progression d'un message : un accuse de reception plus ancien (arrive en retard)
+# ne doit jamais faire reculer un statut deja atteint.
+_RANG_STATUT = {
+    MessageEnvoi.STATUT_EN_ATTENTE: 0,
+    MessageEnvoi.STATUT_ENVOYE: 1,
+    MessageEnvoi.STATUT_LIVRE: 2,
+    MessageEnvoi.STATUT_LU: 3,
+}
+
+# Campagnes terminees encore reconciliees (accuses de lecture tardifs)
+RECONCILIATION_FENETRE = timedelta(days=2)
+
 
 def recalculer_stats_campagne(campagne: Campagne):
-    """Met a jour les compteurs a partir des messages reels."""
+    """
+    Recalcule tous les compteurs a partir des messages reels.
+
+    Utilise a la creation d'une campagne et par la reconciliation periodique ;
+    le chemin d'envoi et le webhook tiennent les compteurs a jour par delta.
+    """
 
     stats = campagne.messages.aggregate(
         total=Count("id"),
-        envoyes=Count("id", filter=Q(statut__in=["envoye", "livre", "lu"])),
-        livres=Count("id", filter=Q(statut__in=["livre", "lu"])),
-        lus=Count("id", filter=Q(statut="lu")),
-        echecs=Count("id", filter=Q(statut="echec")),
+        **{
+            champ: Count("id", filter=Q(statut__in=statuts))
+            for champ, statuts in COMPTEURS_PAR_STATUT.items()
+        },
     )
     campagne.total_destinataires = stats["total"] or 0
-    campagne.total_envoyes = stats["envoyes"] or 0
-    campagne.total_livres = stats["livres"] or 0
-    campagne.total_lus = stats["lus"] or 0
-    campagne.total_echecs = stats["echecs"] or 0
-    campagne.save(
-        update_fields=[
-            "total_destinataires",
-            "total_envoyes",
-            "total_livres",
-            "total_lus",
-            "total_echecs",
-        ]
+    for champ in COMPTEURS_PAR_STATUT:
+        setattr(campagne, champ, stats[champ] or 0)
+    campagne.save(update_fields=["total_destinataires", *COMPTEURS_PAR_STATUT])
+
+
+# ── Transitions de statut et compteurs incrementaux ─────────────────────────
+
+def transition_autorisee(ancien: str, nouveau: str) -> bool:
+    if ancien == nouveau:
+        return False
+    if nouveau == MessageEnvoi.STATUT_ECHEC:
+        return ancien in (MessageEnvoi.STATUT_EN_ATTENTE, MessageEnvoi.STATUT_ENVOYE)
+    if ancien not in _RANG_STATUT or nouveau not in _RANG_STATUT:
+        return False
+    return _RANG_STATUT[nouveau] > _RANG_STATUT[ancien]
+
+
+def _deltas(ancien: str, nouveau: str) -> dict:
+    deltas = {}
+    for champ, statuts in COMPTEURS_PAR_STATUT.items():
+        delta = (nouveau in statuts) - (ancien in statuts)
+        if delta:
+            deltas[champ] = delta
+    return deltas
+
+
+def appliquer_statut(msg: MessageEnvoi, nouveau: str, **champs) -> bool:
+    """
+    Passe msg au statut nouveau et ajuste les compteurs de sa campagne par delta.
+
+    La mise a jour du message est conditionnee a son statut courant : deux
+    accuses concurrents pour le meme message ne comptent qu'une fois. Retourne
+    False si la transition est refusee (doublon, accuse en retard).
+    """
+
+    for _ in range(2):
+        ancien = msg.statut
+        if not transition_autorisee(ancien, nouveau):
+            return False
+        maintenant = timezone.now()
+        with transaction.atomic():
+            modifie = MessageEnvoi.objects.filter(pk=msg.pk, statut=ancien).update(
+                statut=nouveau, mis_a_jour_le=maintenant, **champs
+            )
+            if modifie:
+                deltas = _deltas(ancien, nouveau)
+                if deltas:
+                    Campagne.objects.filter(pk=msg.campagne_id).update(
+                        **{champ: F(champ) + delta for champ, delta in deltas.items()}
+                    )
+        if modifie:
+            msg.statut = nouveau
+            msg.mis_a_jour_le = maintenant
+            for champ, valeur in champs.items():
+                setattr(msg, champ, valeur)
+            return True
+        # Statut modifie entre-temps : on relit et on reevalue la transition une fois
+        msg.statut = MessageEnvoi.objects.filter(pk=msg.pk).values_list("statut", flat=True).first()
+        if msg.statut is None:
+            return False
+    return False
+
+
+def terminer_campagne_si_complete(campagne_id: int) -> bool:
+    """Termine la campagne si plus aucun message n'est en attente (une seule requete)."""
+
+    return bool(
+        Campagne.objects.filter(
+            pk=campagne_id,
+            statut=Campagne.STATUT_EN_COURS,
+            total_en_attente__lte=0,
+        ).update(statut=Campagne.STATUT_TERMINEE, termine_le=timezone.now())
     )
 
 
-def _traiter_message_direct(msg: MessageEnvoi):
-    """Traite un message sans Celery, utile en local et en simulation."""
+def enregistrer_resultat_envoi(msg: MessageEnvoi, result: dict) -> None:
+    """Applique le resultat d'un envoi Meta (succes ou echec definitif) au message."""
 
-    result = WhatsAppService.envoyer_message(msg.numero_whatsapp, msg.message_final)
     if result["success"]:
-        msg.statut = MessageEnvoi.STATUT_ENVOYE
-        msg.whatsapp_message_id = result["message_id"]
-        msg.erreur = ""
-        msg.envoye_le = timezone.now()
-        msg.save(update_fields=["statut", "whatsapp_message_id", "erreur", "envoye_le", "mis_a_jour_le"])
+        appliquer_statut(
+            msg,
+            MessageEnvoi.STATUT_ENVOYE,
+            whatsapp_message_id=result["message_id"],
+            erreur="",
+            envoye_le=timezone.now(),
+        )
     else:
-        msg.statut = MessageEnvoi.STATUT_ECHEC
-        msg.erreur = result["erreur"]
-        msg.save(update_fields=["statut", "erreur", "mis_a_jour_le"])
-
+        appliquer_statut(msg, MessageEnvoi.STATUT_ECHEC, erreur=result["erreur"])
 
-def lancer_campagne_direct(campagne_id: int):
-    """Lance une campagne sans broker Celery, pour les tests locaux."""
 
+def _demarrer_campagne(campagne_id: int):
     campagne = Campagne.objects.get(id=campagne_id)
     if campagne.statut not in [Campagne.STATUT_VALIDEE, Campagne.STATUT_EN_COURS]:
-        return
+        return None
+    if campagne.statut == Campagne.STATUT_VALIDEE:
+        campagne.statut = Campagne.STATUT_EN_COURS
+        campagne.lance_le = timezone.now()
+        campagne.save(update_fields=["statut", "lance_le"])
+    return campagne
 
-    campagne.statut = Campagne.STATUT_EN_COURS
-    campagne.lance_le = timezone.now()
-    campagne.save(update_fields=["statut", "lance_le"])
 
-    messages = list(campagne.messages.filter(statut=MessageEnvoi.STATUT_EN_ATTENTE).order_by("id"))
-    for msg in messages:
-        _traiter_message_direct(msg)
+def lancer_campagne_direct(campagne_id: int):
+    """Lance une campagne sans broker Celery, pour les tests locaux et la simulation."""
+    from .dispatcher import DispatcherCampagne
+
+    if _demarrer_campagne(campagne_id) is None:
+        return
+    DispatcherCampagne(campagne_id).executer()
+    terminer_campagne_si_complete(campagne_id)
 
-    recalculer_stats_campagne(campagne)
-    campagne.refresh_from_db()
-    if not campagne.messages.filter(statut=MessageEnvoi.STATUT_EN_ATTENTE).exists():
-        campagne.statut = Campagne.STATUT_TERMINEE
-        campagne.termine_le = timezone.now()
-        campagne.save(update_fields=["statut", "termine_le"])
 
 
 @shared_task(bind=True, max_retries=2)
 def envoyer_message_task(self, message_envoi_id: int):
-    """Envoie un seul message et reessaie deux fois en cas d'echec temporaire."""
+    """
+    Envoie un seul message et reessaie deux fois en cas d'echec temporaire.
 
-    msg = MessageEnvoi.objects.select_related("campagne").get(id=message_envoi_id)
-    result = WhatsAppService.envoyer_message(msg.numero_whatsapp, msg.message_final)
+    Les campagnes passent par dispatcher_campagne_task ; cette tache reste pour
+    les envois unitaires deja planifies.
+    """
 
-    if result["success"]:
-        msg.statut = MessageEnvoi.STATUT_ENVOYE
-        msg.whatsapp_message_id = result["message_id"]
-        msg.erreur = ""
-        msg.envoye_le = timezone.now()
-        msg.save(update_fields=["statut", "whatsapp_message_id", "erreur", "envoye_le", "mis_a_jour_le"])
-    else:
+    msg = MessageEnvoi.objects.get(id=message_envoi_id)
+    if msg.statut != MessageEnvoi.STATUT_EN_ATTENTE:
+        # Deja traite (tache rejouee) : ne pas renvoyer ni recompter
+        return
+
+    result = WhatsAppService.envoyer_message(msg.numero_whatsapp, msg.message_final)
+    if not result["success"] and self.request.retries < self.max_retries:
         msg.erreur = result["erreur"]
-        if self.request.retries < self.max_retries:
-            msg.save(update_fields=["erreur", "mis_a_jour_le"])
-            raise self.retry(countdown=60)
-        msg.statut = MessageEnvoi.STATUT_ECHEC
-        msg.save(update_fields=["statut", "erreur", "mis_a_jour_le"])
+        msg.save(update_fields=["erreur", "mis_a_jour_le"])
+        raise self.retry(countdown=60)
 
-    recalculer_stats_campagne(msg.campagne)
-    campagne = Campagne.objects.get(pk=msg.campagne_id)
-    restants = campagne.messages.filter(statut=MessageEnvoi.STATUT_EN_ATTENTE).exists()
-    if not restants and campagne.statut == Campagne.STATUT_EN_COURS:
-        campagne.statut = Campagne.STATUT_TERMINEE
-        campagne.termine_le = timezone.now()
-        campagne.save(update_fields=["statut", "termine_le"])
+    enregistrer_resultat_envoi(msg, result)
+    terminer_campagne_si_complete(msg.campagne_id)
 
 
 @shared_task
 def lancer_campagne_task(campagne_id: int):
-    """Lance l'envoi de toute la campagne par lots controles."""
+    """Passe la campagne en cours et confie l'envoi au dispatcher."""
 
-    campagne = Campagne.objects.get(id=campagne_id)
-    if campagne.statut not in [Campagne.STATUT_VALIDEE, Campagne.STATUT_EN_COURS]:
+    campagne = _demarrer_campagne(campagne_id)
+    if campagne is None:
+        return
+    if terminer_campagne_si_complete(campagne_id):
         return
+    dispatcher_campagne_task.delay(campagne_id)
 
-    campagne.statut = Campagne.STATUT_EN_COURS
-    campagne.lance_le = timezone.now()
-    campagne.save(update_fields=["statut", "lance_le"])
 
-    messages = campagne.messages.filter(statut=MessageEnvoi.STATUT_EN_ATTENTE).order_by("id")
-    if not messages.exists():
-        campagne.statut = Campagne.STATUT_TERMINEE
-        campagne.termine_le = timezone.now()
-        campagne.save(update_fields=["statut", "termine_le"])
-        return
+@shared_task
+def dispatcher_campagne_task(campagne_id: int):
+    """
+    Envoie une tranche de la campagne (WHATSAPP_DISPATCH_MAX_SECONDS au plus)
+    sous limite de debit, puis se replanifie tant qu'il reste des messages.
+    """
+    from .dispatcher import dispatcher_campagne
+
+    bilan = dispatcher_campagne(campagne_id)
+    if bilan is None:
+        return "deja_en_cours"
+    if bilan["restants"] and (bilan["envoyes"] or bilan["echecs"] or bilan["relances"]):
+        dispatcher_campagne_task.apply_async(args=[campagne_id], countdown=1)
+        return bilan
+    if bilan["restants"]:
+        # Compteur en attente derive (aucun message trouve) : recalcul avant cloture
+        recalculer_stats_campagne(Campagne.objects.get(pk=campagne_id))
+    terminer_campagne_si_complete(campagne_id)
+    return bilan
 
-    for index, msg in enumerate(messages):
-        # Le countdown espace l'envoi sans bloquer le worker pendant une minute.
-        countdown = (index // 80) * 60
-        envoyer_message_task.apply_async(args=[msg.id], countdown=countdown)
+
+@shared_task
+def reconcilier_stats_campagnes_task():
+    """
+    Filet de securite des compteurs incrementaux : recalcule les campagnes en
+    cours et celles terminees recemment, puis termine celles qui sont completes.
+
+    Relance aussi le dispatcher des campagnes en cours qui ont encore des messages
+    en attente (worker tue en pleine tranche) ; le verrou de dispatcher_campagne
+    ecarte les doublons si une tranche tourne deja.
+    """
+
+    depuis = timezone.now() - RECONCILIATION_FENETRE
+    campagnes = Campagne.objects.filter(
+        Q(statut=Campagne.STATUT_EN_COURS)
+        | Q(statut=Campagne.STATUT_TERMINEE, termine_le__gte=depuis)
+    )
+    total = 0
+    for campagne in campagnes:
+        recalculer_stats_campagne(campagne)
+        terminer_campagne_si_complete(campagne.id)
+        campagne.refresh_from_db(fields=["statut"])
+        if campagne.statut == Campagne.STATUT_EN_COURS and campagne.total_en_attente > 0:
+            try:
+                dispatcher_campagne_task.delay(campagne.id)
+            except Exception as exc:
+                logger.warning(f"Relance du dispatcher impossible (campagne {campagne.id}) : {exc}")
+        total += 1
+    return total
@@ -0,0 +1,195 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .dispatcher import DebitExpediteur, DispatcherCampagne, TokenBucket, progression
+from .fake_meta import FakeMetaServer
+from .models import Campagne, MessageEnvoi
+from .tasks import (
+    appliquer_statut,
+    lancer_campagne_direct,
+    recalculer_stats_campagne,
+    reconcilier_stats_campagnes_task,
+)
+
+
+@override_settings(WHATSAPP_DRY_RUN=True)
+class CompteursCampagneTests(TestCase):
+    def setUp(self):
+        self.campagne = Campagne.objects.create(
+            nom="Relance", message_template="Bonjour", statut=Campagne.STATUT_VALIDEE
+        )
+        MessageEnvoi.objects.bulk_create(
+            MessageEnvoi(campagne=self.campagne, numero_whatsapp=f"23769000000{i}", message_final="Bonjour")
+            for i in range(3)
+        )
+        recalculer_stats_campagne(self.campagne)
+
+    def _compteurs(self):
+        self.campagne.refresh_from_db()
+        return (
+            self.campagne.total_en_attente,
+            self.campagne.total_envoyes,
+            self.campagne.total_livres,
+            self.campagne.total_lus,
+            self.campagne.total_echecs,
+        )
+
+    def _webhook(self, message_id, wa_status):
+        payload = {"entry": [{"changes": [{"value": {"statuses": [{"id": message_id, "status": wa_status}]}}]}]}
+        return self.client.post(reverse("whatsapp_agent:wa_webhook"), json.dumps(payload), content_type="application/json")
+
+    def test_envoi_et_accuses_ajustent_les_compteurs_par_delta(self):
+        resultats = [
+            {"success": True, "message_id": "wamid-1", "erreur": ""},
+            {"success": True, "message_id": "wamid-2", "erreur": ""},
+            {"success": False, "message_id": "", "erreur": "numero invalide"},
+        ]
+        with mock.patch("whatsapp_agent.tasks.WhatsAppService.envoyer_message", side_effect=resultats):
+            lancer_campagne_direct(self.campagne.id)
+
+        self.assertEqual(self._compteurs(), (0, 2, 0, 0, 1))
+        self.assertEqual(self.campagne.statut, Campagne.STATUT_TERMINEE)
+
+        self._webhook("wamid-1", "delivered")
+        self._webhook("wamid-1", "read")
+        self.assertEqual(self._compteurs(), (0, 2, 1, 1, 1))
+
+    def test_accuse_en_retard_ou_duplique_ignore(self):
+        msg = self.campagne.messages.first()
+        appliquer_statut(msg, MessageEnvoi.STATUT_ENVOYE, whatsapp_message_id="wamid-9")
+        self._webhook("wamid-9", "read")
+        self._webhook("wamid-9", "delivered")
+        self._webhook("wamid-9", "read")
+
+        msg.refresh_from_db()
+        self.assertEqual(msg.statut, MessageEnvoi.STATUT_LU)
+        self.assertEqual(self._compteurs(), (2, 1, 1, 1, 0))
+
+    def test_reconciliation_corrige_la_derive(self):
+        Campagne.objects.filter(pk=self.campagne.pk).update(statut=Campagne.STATUT_EN_COURS, total_en_attente=7)
+        MessageEnvoi.objects.filter(campagne=self.campagne).update(statut=MessageEnvoi.STATUT_ENVOYE)
+
+        reconcilier_stats_campagnes_task()
+
+        self.assertEqual(self._compteurs(), (0, 3, 0, 0, 0))
+        self.assertEqual(self.campagne.statut, Campagne.STATUT_TERMINEE)
+
+    def test_reconciliation_relance_le_dispatcher_interrompu(self):
+        # Worker tue en pleine tranche : campagne en cours, messages encore en attente
+        Campagne.objects.filter(pk=self.campagne.pk).update(statut=Campagne.STATUT_EN_COURS)
+
+        with mock.patch("whatsapp_agent.tasks.dispatcher_campagne_task.delay") as relance:
+            reconcilier_stats_campagnes_task()
+
+        relance.assert_called_once_with(self.campagne.id)
+        self.assertEqual(self._compteurs(), (3, 0, 0, 0, 0))
+
+
+class HorlogeFactice:
+    def __init__(self):
+        self.maintenant = 1000.0
+        self.attendu = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+    def sleep(self, secondes):
+        self.attendu += secondes
+        self.maintenant += secondes
+
+
+class DispatcherTests(TestCase):
+    def setUp(self):
+        self.horloge = HorlogeFactice()
+        self.campagne = Campagne.objects.create(
+            nom="Dispatch", message_template="Bonjour", statut=Campagne.STATUT_EN_COURS
+        )
+        MessageEnvoi.objects.bulk_create(
+            MessageEnvoi(campagne=self.campagne, numero_whatsapp=f"23767000000{i}", message_final="Bonjour")
+            for i in range(4)
+        )
+        recalculer_stats_campagne(self.campagne)
+
+    def _dispatcher(self, **kwargs):
+        bucket = TokenBucket(10, 1, clock=self.horloge, sleep=self.horloge.sleep)
+        return DispatcherCampagne(
+            self.campagne.id, bucket=bucket, batch_size=2, clock=self.horloge, sleep=self.horloge.sleep, **kwargs
+        )
+
+    def test_token_bucket_respecte_le_debit_et_ralentit(self):
+        bucket = TokenBucket(10, 2, clock=self.horloge, sleep=self.horloge.sleep)
+        for _ in range(6):
+            bucket.acquire()
+        self.assertAlmostEqual(self.horloge.attendu, 0.4, places=6)
+
+        bucket.ralentir(pause=3)
+        self.assertEqual(bucket.rate, 5)
+        bucket.acquire()
+        self.assertAlmostEqual(self.horloge.attendu, 0.4 + 3 + 0.2, places=6)
+
+    def test_campagnes_simultanees_partagent_le_debit_du_numero(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        autre = Campagne.objects.create(nom="Autre", message_template="Salut", statut=Campagne.STATUT_EN_COURS)
+        MessageEnvoi.objects.bulk_create(
+            MessageEnvoi(campagne=autre, numero_whatsapp=f"23768000000{i}", message_final="Salut") for i in range(4)
+        )
+        envois = []
+
+        def envoyer(numero, message):
+            envois.append(int(self.horloge()))
+            return {"success": True, "message_id": f"wamid-{len(envois)}", "erreur": ""}
+
+        dispatchers = [
+            DispatcherCampagne(
+                campagne_id,
+                bucket=TokenBucket(10, 10, clock=self.horloge, sleep=self.horloge.sleep),
+                expediteur=DebitExpediteur("numero-1", 3, horloge=self.horloge, sleep=self.horloge.sleep),
+                envoyer=envoyer, clock=self.horloge, sleep=self.horloge.sleep,
+            )
+            for campagne_id in (self.campagne.id, autre.id)
+        ]
+        # Envois entrelaces : chaque seau local autoriserait 10/s, le numero n'en accepte que 3
+        for _ in range(4):
+            for dispatcher in dispatchers:
+                dispatcher._envoyer(dispatcher._lot_suivant(0).popleft())
+
+        self.assertEqual(len(envois), 8)
+        self.assertLessEqual(max(envois.count(seconde) for seconde in set(envois)), 3)
+
+        # Un Retry-After recu par une campagne suspend aussi l'autre
+        DebitExpediteur("numero-1", 3, horloge=self.horloge, sleep=self.horloge.sleep).ralentir(pause=5)
+        avant = self.horloge()
+        dispatchers[1].expediteur.acquire()
+        self.assertGreaterEqual(self.horloge() - avant, 5)
+
+    def test_429_ralentit_et_reessaie_le_message_sans_le_perdre(self):
+        meta = FakeMetaServer(erreurs=[429, 503], retry_after=1)
+        with meta, override_settings(
+            WHATSAPP_DRY_RUN=False, WHATSAPP_TOKEN="t", WHATSAPP_PHONE_ID="p", WHATSAPP_API_URL=meta.url
+        ):
+            bilan = self._dispatcher(max_tentatives=3).executer()
+
+        self.assertEqual(meta.requetes, 6)
+        self.assertEqual((bilan["envoyes"], bilan["echecs"], bilan["relances"]), (4, 0, 2))
+        self.assertLess(bilan["debit_cible"], 10)
+        self.campagne.refresh_from_db()
+        self.assertEqual((self.campagne.total_en_attente, self.campagne.total_envoyes), (0, 4))
+        self.assertEqual(progression(self.campagne.id)["envoyes"], 4)
+
+    def test_echec_definitif_apres_tentatives_ou_erreur_permanente(self):
+        resultats = iter(
+            [{"success": False, "message_id": "", "erreur": "numero invalide", "temporaire": False}]
+            + [{"success": False, "message_id": "", "erreur": "429", "temporaire": True, "retry_after": 0}] * 4
+            + [{"success": True, "message_id": f"wamid-{i}", "erreur": ""} for i in range(2)]
+        )
+        bilan = self._dispatcher(max_tentatives=2, envoyer=lambda numero, message: next(resultats)).executer()
+
+        self.assertEqual((bilan["envoyes"], bilan["echecs"]), (2, 2))
+        self.campagne.refresh_from_db()
+        self.assertEqual((self.campagne.total_en_attente, self.campagne.total_echecs), (0, 2))
@@ -11,6 +11,7 @@ urlpatterns = [
     path("contacts/importer/", views.importer_contacts, name="wa_import_contacts"),
     path("campagnes/creer/", views.creer_campagne, name="wa_creer"),
     path("campagnes/<int:pk>/", views.detail_campagne, name="wa_detail"),
+    path("campagnes/<int:pk>/progression/", views.progression_campagne, name="wa_progression"),
     path("campagnes/<int:pk>/lancer/", views.lancer_campagne, name="wa_lancer"),
     path("campagnes/<int:pk>/test/", views.envoyer_test_campagne, name="wa_test"),
     path("campagnes/<int:pk>/dupliquer/", views.dupliquer_campagne, name="wa_dupliquer"),
@@ -17,10 +17,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .dispatcher import progression
 from .forms import CampagneForm
 from .models import Campagne, ContactWhatsApp, MessageEnvoi
 from .services import AI_PRESETS, WhatsAppService
-from .tasks import lancer_campagne_direct, lancer_campagne_task, recalculer_stats_campagne
+from .tasks import appliquer_statut, lancer_campagne_direct, lancer_campagne_task, recalculer_stats_campagne
 
 
 def staff_required(view_func):
@@ -373,8 +374,8 @@ def creer_campagne(request):
 def detail_campagne(request, pk):
     """Detail d'une campagne avec progression et messages individuels."""
 
+    # Compteurs tenus a jour par delta : aucune agregation a l'affichage
     campagne = get_object_or_404(Campagne.objects.select_related("cree_par"), pk=pk)
-    recalculer_stats_campagne(campagne)
     messages_qs = campagne.messages.select_related("user", "commercial_prospect").order_by("-mis_a_jour_le")
     paginator = Paginator(messages_qs, 30)
     page_obj = paginator.get_page(request.GET.get("page"))
@@ -394,10 +395,30 @@ def detail_campagne(request, pk):
             "whatsapp_dry_run": settings.WHATSAPP_DRY_RUN,
             "whatsapp_config_ready": settings.WHATSAPP_CONFIG_READY,
             "contacts_selectionnes": campagne.destinataires_contacts.count(),
+            "dispatch": progression(campagne.pk),
         },
     )
 
 
+@staff_required
+def progression_campagne(request, pk):
+    """Compteurs et debit du dispatcher en JSON, pour le suivi en direct."""
+
+    campagne = get_object_or_404(Campagne, pk=pk)
+    return JsonResponse(
+        {
+            "statut": campagne.statut,
+            "total": campagne.total_destinataires,
+            "en_attente": campagne.total_en_attente,
+            "envoyes": campagne.total_envoyes,
+            "livres": campagne.total_livres,
+            "lus": campagne.total_lus,
+            "echecs": campagne.total_echecs,
+            "dispatch": progression(campagne.pk),
+        }
+    )
+
+
 def _percent(value, total):
     return round(value * 100 / total) if total else 0
 
@@ -677,11 +698,13 @@ def webhook_meta(request):
                 wa_status = status.get("status", "")
                 nouveau_statut = {"sent": "envoye", "delivered": "livre", "read": "lu", "failed": "echec"}.get(wa_status)
                 if message_id and nouveau_statut:
-                    update_data = {"statut": nouveau_statut, "mis_a_jour_le": timezone.now()}
+                    champs = {}
                     if nouveau_statut == "echec":
-                        update_data["erreur"] = str(status.get("errors", ""))
-                    MessageEnvoi.objects.filter(whatsapp_message_id=message_id).update(**update_data)
-                    for campagne in Campagne.objects.filter(messages__whatsapp_message_id=message_id).distinct():
-                        recalculer_stats_campagne(campagne)
+                        champs["erreur"] = str(status.get("errors", ""))
+                    messages_wa = MessageEnvoi.objects.filter(whatsapp_message_id=message_id).only(
+                        "pk", "statut", "campagne_id"
+                    )
+                    for msg in messages_wa:
+                        appliquer_statut(msg, nouveau_statut, **champs)
 
     return JsonResponse({"status": "ok"})